@@ -5,7 +5,7 @@ import base64
 from algosdk.future import transaction
 from algosdk import account, mnemonic
 from algosdk.v2client import algod
-from pyteal import compileTeal, Mode
+from pyteal import compileBytecode, Mode
 from vote import approval_program, clear_state_program
 
 # user declared account mnemonics
@@ -16,12 +16,6 @@ user_mnemonic = "A second distinct 25-word mnemonic goes here"
 algod_address = "http://localhost:4001"
 algod_token = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
 
-# helper function to compile program source
-def compile_program(client, source_code):
-    compile_response = client.compile(source_code)
-    return base64.b64decode(compile_response["result"])
-
-
 # helper function that converts a mnemonic passphrase into a private signing key
 def get_private_key_from_mnemonic(mn):
     private_key = mnemonic.to_private_key(mn)
@@ -312,24 +306,14 @@ def main():
     global_schema = transaction.StateSchema(global_ints, global_bytes)
     local_schema = transaction.StateSchema(local_ints, local_bytes)
 
-    # get PyTeal approval program
-    approval_program_ast = approval_program()
-    # compile program to TEAL assembly
-    approval_program_teal = compileTeal(
-        approval_program_ast, mode=Mode.Application, version=2
+    # compile PyTeal approval program to binary
+    approval_program_compiled = compileBytecode(
+        approval_program(), mode=Mode.Application, version=2
     )
-    # compile program to binary
-    approval_program_compiled = compile_program(algod_client, approval_program_teal)
-
-    # get PyTeal clear state program
-    clear_state_program_ast = clear_state_program()
-    # compile program to TEAL assembly
-    clear_state_program_teal = compileTeal(
-        clear_state_program_ast, mode=Mode.Application, version=2
-    )
-    # compile program to binary
-    clear_state_program_compiled = compile_program(
-        algod_client, clear_state_program_teal
+
+    # compile PyTeal clear state program to binary
+    clear_state_program_compiled = compileBytecode(
+        clear_state_program(), mode=Mode.Application, version=2
     )
 
     # configure registration and voting period
@@ -2,34 +2,15 @@
 
 import base64
 import params
-import uuid
 
 from algosdk import algod, transaction, account, mnemonic
 from periodic_payment import periodic_payment
 
 from pyteal import *
 
-# --------- compile & send transaction using Goal and Python SDK ----------
+# --------- compile & send transaction using Python SDK ----------
 
-teal_source = compileTeal(periodic_payment(), mode=Mode.Signature, version=2)
-
-# compile teal
-teal_file = str(uuid.uuid4()) + ".teal"
-with open(teal_file, "w+") as f:
-    f.write(teal_source)
-lsig_fname = str(uuid.uuid4()) + ".tealc"
-
-stdout, stderr = execute(["goal", "clerk", "compile", "-o", lsig_fname, teal_file])
-
-if stderr != "":
-    print(stderr)
-    raise
-elif len(stdout) < 59:
-    print("error in compile teal")
-    raise
-
-with open(lsig_fname, "rb") as f:
-    teal_bytes = f.read()
+teal_bytes = compileBytecode(periodic_payment(), mode=Mode.Signature, version=2)
 lsig = transaction.LogicSig(teal_bytes)
 
 # create algod clients
@@ -8,7 +8,15 @@ from pyteal.compiler import (
     DEFAULT_TEAL_VERSION,
     CompileOptions,
     compileTeal,
+    compileBytecode,
     OptimizeOptions,
+    CompileCache,
+    CompileStats,
+    PassStats,
+    collectCompileStats,
+    programAddress,
+    CompiledTemplate,
+    compileTemplate,
 )
 from pyteal.types import TealType
 from pyteal.errors import (
@@ -18,6 +26,7 @@ from pyteal.errors import (
     TealCompileError,
 )
 from pyteal.config import MAX_GROUP_SIZE, NUM_SLOTS
+from pyteal.context import CompileContext, getCompileContext
 
 # begin __all__
 __all__ = (
@@ -29,7 +38,15 @@ __all__ = (
         "DEFAULT_TEAL_VERSION",
         "CompileOptions",
         "compileTeal",
+        "compileBytecode",
         "OptimizeOptions",
+        "CompileCache",
+        "CompileStats",
+        "PassStats",
+        "collectCompileStats",
+        "programAddress",
+        "CompiledTemplate",
+        "compileTemplate",
         "TealType",
         "TealInternalError",
         "TealTypeError",
@@ -37,6 +54,8 @@ __all__ = (
         "TealCompileError",
         "MAX_GROUP_SIZE",
         "NUM_SLOTS",
+        "CompileContext",
+        "getCompileContext",
     ]
 )
 # end __all__
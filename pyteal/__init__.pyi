@@ -11,7 +11,15 @@ from pyteal.compiler import (
     DEFAULT_TEAL_VERSION,
     CompileOptions,
     compileTeal,
+    compileBytecode,
     OptimizeOptions,
+    CompileCache,
+    CompileStats,
+    PassStats,
+    collectCompileStats,
+    programAddress,
+    CompiledTemplate,
+    compileTemplate,
 )
 from pyteal.types import TealType
 from pyteal.errors import (
@@ -21,6 +29,7 @@ from pyteal.errors import (
     TealCompileError,
 )
 from pyteal.config import MAX_GROUP_SIZE, NUM_SLOTS
+from pyteal.context import CompileContext, getCompileContext
 
 __all__ = [
     "AccountParam",
@@ -63,7 +72,11 @@ __all__ = [
     "BytesSqrt",
     "BytesXor",
     "BytesZero",
+    "CompileCache",
+    "CompileContext",
     "CompileOptions",
+    "CompileStats",
+    "CompiledTemplate",
     "Concat",
     "Cond",
     "Continue",
@@ -85,6 +98,7 @@ __all__ = [
     "ExtractUint16",
     "ExtractUint32",
     "ExtractUint64",
+    "Fingerprint",
     "For",
     "Ge",
     "GeneratedID",
@@ -136,6 +150,7 @@ __all__ = [
     "OpUpMode",
     "OptimizeOptions",
     "Or",
+    "PassStats",
     "Pop",
     "Reject",
     "Return",
@@ -172,6 +187,7 @@ __all__ = [
     "TealType",
     "TealTypeError",
     "Tmpl",
+    "TraceMode",
     "Txn",
     "TxnArray",
     "TxnExpr",
@@ -183,5 +199,14 @@ __all__ = [
     "UnaryExpr",
     "While",
     "WideRatio",
+    "collectCompileStats",
+    "compileBytecode",
     "compileTeal",
+    "compileTemplate",
+    "getCompileContext",
+    "getTraceMode",
+    "programAddress",
+    "setTraceMode",
+    "structuralFingerprint",
+    "structurallyEqual",
 ]
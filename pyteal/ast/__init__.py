@@ -1,5 +1,5 @@
 # abstract types
-from pyteal.ast.expr import Expr
+from pyteal.ast.expr import Expr, TraceMode, getTraceMode, setTraceMode
 
 # basic types
 from pyteal.ast.leafexpr import LeafExpr
@@ -136,6 +136,11 @@ from pyteal.ast.scratch import (
     ScratchStore,
 )
 from pyteal.ast.scratchvar import DynamicScratchVar, ScratchVar
+from pyteal.ast.structural import (
+    Fingerprint,
+    structuralFingerprint,
+    structurallyEqual,
+)
 from pyteal.ast.maybe import MaybeValue
 from pyteal.ast.multi import MultiValue
 from pyteal.ast.opup import OpUp, OpUpMode
@@ -143,6 +148,9 @@ from pyteal.ast.ecdsa import EcdsaCurve, EcdsaVerify, EcdsaDecompress, EcdsaReco
 
 __all__ = [
     "Expr",
+    "TraceMode",
+    "getTraceMode",
+    "setTraceMode",
     "LeafExpr",
     "Addr",
     "Bytes",
@@ -248,6 +256,9 @@ __all__ = [
     "ScratchStore",
     "DynamicScratchVar",
     "ScratchVar",
+    "Fingerprint",
+    "structuralFingerprint",
+    "structurallyEqual",
     "MaybeValue",
     "MultiValue",
     "OpUp",
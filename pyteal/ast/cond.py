@@ -1,13 +1,81 @@
-from typing import List, cast, TYPE_CHECKING
+from typing import List, Optional, Tuple, Union, cast, TYPE_CHECKING
 
 from pyteal.types import TealType, require_type
-from pyteal.ir import TealOp, Op, TealSimpleBlock, TealConditionalBlock
+from pyteal.ir import TealOp, Op, TealBlock, TealSimpleBlock, TealConditionalBlock
 from pyteal.errors import TealInputError
 from pyteal.ast.expr import Expr
+from pyteal.ast.addr import Addr
+from pyteal.ast.arg import Arg
+from pyteal.ast.binaryexpr import BinaryExpr
+from pyteal.ast.bytes import Bytes
+from pyteal.ast.global_ import Global, GlobalField
+from pyteal.ast.int import Int, EnumInt
+from pyteal.ast.methodsig import MethodSignature
+from pyteal.ast.scratch import ScratchLoad, ScratchSlot
+from pyteal.ast.structural import structurallyEqual
+from pyteal.ast.txn import TxnExpr, TxnaExpr
 
 if TYPE_CHECKING:
     from pyteal.compiler import CompileOptions
 
+# the fewest consecutive arms which are compiled into a tree of comparisons
+DISPATCH_MIN_ARMS = 8
+
+# the most arms at a leaf of the tree, whose constants are compared one after another
+DISPATCH_LEAF_ARMS = 3
+
+# the longest byte string which can be compared with b<
+MAX_BYTE_MATH_LENGTH = 64
+
+# an arm which compares the subject against a constant: the value of the constant, which is an int
+# for byte strings, the expression of the constant, and the index of the arm
+DispatchArm = Tuple[int, Expr, int]
+
+
+def _constantValue(
+    expr: Expr, options: "CompileOptions"
+) -> Optional[Union[int, bytes]]:
+    """Get the value of an expression if it is a constant known at compile time."""
+    from pyteal.compiler.constants import (
+        extractAddrValue,
+        extractBytesValue,
+        extractMethodSigValue,
+        intEnumValues,
+    )
+
+    t = type(expr)
+    if t is Int:
+        return cast(Int, expr).value
+    if t is EnumInt:
+        return intEnumValues.get(cast(EnumInt, expr).name)
+    if t is MethodSignature:
+        return extractMethodSigValue(expr.__teal__(options)[0].ops[0])
+    if t is Bytes or t is Addr:
+        op = expr.__teal__(options)[0].ops[0]
+        value = (extractBytesValue if t is Bytes else extractAddrValue)(op)
+        return value if isinstance(value, bytes) else None
+    return None
+
+
+def _isDispatchSubject(expr: Expr) -> bool:
+    """Check if an expression reads a value without any side effects, which does not change while
+    the arms are compared, so that it can be evaluated once and compared against many constants."""
+    if isinstance(expr, (TxnExpr, TxnaExpr)):
+        # the indices of group and array fields may be expressions
+        return all(
+            type(getattr(expr, name)) is int
+            for name in ("txnIndex", "index")
+            if hasattr(expr, name)
+        )
+    if type(expr) is Arg:
+        return type(cast(Arg, expr).index) is int
+    if type(expr) is ScratchLoad:
+        return cast(ScratchLoad, expr).slot is not None
+    if type(expr) is Global:
+        # the remaining budget changes between comparisons
+        return cast(Global, expr).field != GlobalField.opcode_budget
+    return False
+
 
 class Cond(Expr):
     """A chainable branching expression that supports an arbitrary number of conditions."""
@@ -53,31 +121,202 @@ class Cond(Expr):
 
         self.value_type = value_type
         self.args = argv
+        # the slot in which the subjects of arms compiled into a tree of comparisons are stored. It
+        # is created with the Cond rather than when it is compiled, so that compiling it again, or
+        # in a worker process, uses the same slot
+        self._dispatchSlot = ScratchSlot()
 
     def __teal__(self, options: "CompileOptions"):
-        start = None
+        start: Optional[TealBlock] = None
         end = TealSimpleBlock([])
-        prevBranch = None
-        for i, (cond, pred) in enumerate(self.args):
-            condStart, condEnd = cond.__teal__(options)
-            predStart, predEnd = pred.__teal__(options)
-
-            branchBlock = TealConditionalBlock([])
-            branchBlock.setTrueBlock(predStart)
-
-            condEnd.setNextBlock(branchBlock)
-            predEnd.setNextBlock(end)
-            if i == 0:
-                start = condStart
+        # the branches which continue at the next arm if their condition is false
+        pending: List[TealConditionalBlock] = []
+
+        i = 0
+        while i < len(self.args):
+            nextStart: TealBlock
+            dispatch = (
+                self._dispatchArms(i, options)
+                if options.optimize.cond_dispatch
+                else None
+            )
+            if dispatch is not None:
+                subject, isBytes, arms = dispatch
+                i += len(arms)
+                nextStart, nextPending = self._dispatchTeal(
+                    subject, isBytes, arms, end, i == len(self.args), options
+                )
             else:
-                cast(TealConditionalBlock, prevBranch).setFalseBlock(condStart)
-            prevBranch = branchBlock
+                cond, pred = self.args[i]
+                i += 1
+                condStart, condEnd = cond.__teal__(options)
+                predStart, predEnd = pred.__teal__(options)
+
+                branchBlock = TealConditionalBlock([])
+                branchBlock.setTrueBlock(predStart)
+
+                condEnd.setNextBlock(branchBlock)
+                predEnd.setNextBlock(end)
+                nextStart, nextPending = condStart, [branchBlock]
+
+            if start is None:
+                start = nextStart
+            for branch in pending:
+                branch.setFalseBlock(nextStart)
+            pending = nextPending
 
         errBlock = TealSimpleBlock([TealOp(self, Op.err)])
-        cast(TealConditionalBlock, prevBranch).setFalseBlock(errBlock)
+        for branch in pending:
+            branch.setFalseBlock(errBlock)
 
         return start, end
 
+    def _dispatchArms(
+        self, first: int, options: "CompileOptions"
+    ) -> Optional[Tuple[Expr, bool, List[DispatchArm]]]:
+        """Find the consecutive arms, starting with the arm at index first, whose conditions
+        compare the same subject for equality against different constants.
+
+        Returns:
+            The subject, whether it is compared against byte strings, and the arms, or None if there are fewer than DISPATCH_MIN_ARMS arms or
+            they cannot be compared with the ops available in the TEAL version of options.
+        """
+        subject: Optional[Expr] = None
+        isBytes = False
+        arms: List[DispatchArm] = []
+        values = set()
+        for index in range(first, len(self.args)):
+            cond = self.args[index][0]
+            if type(cond) is not BinaryExpr or cast(BinaryExpr, cond).op != Op.eq:
+                break
+
+            binary = cast(BinaryExpr, cond)
+            side, constant = binary.argLeft, binary.argRight
+            value = _constantValue(constant, options)
+            if value is None:
+                side, constant = binary.argRight, binary.argLeft
+                value = _constantValue(constant, options)
+            if value is None or not _isDispatchSubject(side):
+                break
+
+            if subject is None:
+                subject = side
+                isBytes = isinstance(value, bytes)
+            elif isinstance(value, bytes) != isBytes or not structurallyEqual(
+                side, subject
+            ):
+                break
+
+            if isinstance(value, bytes):
+                # b< compares byte strings as big-endian integers
+                if len(value) > MAX_BYTE_MATH_LENGTH:
+                    break
+                value = int.from_bytes(value, "big")
+            if value in values:
+                break
+            values.add(value)
+            arms.append((value, constant, index))
+
+        if subject is None or len(arms) < DISPATCH_MIN_ARMS:
+            return None
+        if isBytes and options.version < Op.b_lt.min_version:
+            return None
+        return subject, isBytes, arms
+
+    def _compareTeal(
+        self,
+        slot: ScratchSlot,
+        constant: Expr,
+        op: TealOp,
+        options: "CompileOptions",
+    ) -> Tuple[TealBlock, TealConditionalBlock]:
+        """Compare the value in slot against a constant with op, and branch on the result."""
+        loadBlock = TealSimpleBlock([TealOp(self, Op.load, slot)])
+        constantStart, constantEnd = constant.__teal__(options)
+        loadBlock.setNextBlock(constantStart)
+        branchBlock = TealConditionalBlock([op])
+        constantEnd.setNextBlock(branchBlock)
+        return loadBlock, branchBlock
+
+    def _dispatchTeal(
+        self,
+        subject: Expr,
+        isBytes: bool,
+        arms: List[DispatchArm],
+        end: TealSimpleBlock,
+        last: bool,
+        options: "CompileOptions",
+    ) -> Tuple[TealBlock, List[TealConditionalBlock]]:
+        """Compile arms which compare a subject against different constants into a balanced tree of
+        comparisons, so that the body of any arm is reached after a number of comparisons which is
+        logarithmic in the number of arms.
+
+        The subject is evaluated once and stored in the dispatch slot. Each inner node of the tree
+        checks if the subject is less than the middle constant of its arms, and each leaf compares
+        the subject for equality against the constants of at most DISPATCH_LEAF_ARMS arms.
+
+        Returns:
+            The start of the tree, and the branches which continue at the next arm if the subject is
+            not equal to any of the constants.
+        """
+        slot = self._dispatchSlot
+        subjectStart, subjectEnd = subject.__teal__(options)
+        storeBlock = TealSimpleBlock([TealOp(self, Op.store, slot)])
+        subjectEnd.setNextBlock(storeBlock)
+        pending: List[TealConditionalBlock] = []
+
+        def build(arms: List[DispatchArm]) -> TealBlock:
+            if len(arms) <= DISPATCH_LEAF_ARMS:
+                first: Optional[TealBlock] = None
+                previous: Optional[TealConditionalBlock] = None
+                for _, constant, index in arms:
+                    cond, pred = self.args[index]
+                    compareStart, branchBlock = self._compareTeal(
+                        slot, constant, TealOp(cond, Op.eq), options
+                    )
+                    predStart, predEnd = pred.__teal__(options)
+                    branchBlock.setTrueBlock(predStart)
+                    predEnd.setNextBlock(end)
+
+                    if previous is None:
+                        first = compareStart
+                    else:
+                        previous.setFalseBlock(compareStart)
+                    previous = branchBlock
+
+                pending.append(cast(TealConditionalBlock, previous))
+                return cast(TealBlock, first)
+
+            middle = len(arms) // 2
+            compareStart, branchBlock = self._compareTeal(
+                slot,
+                arms[middle][1],
+                TealOp(self, Op.b_lt if isBytes else Op.lt),
+                options,
+            )
+            branchBlock.setTrueBlock(build(arms[:middle]))
+            branchBlock.setFalseBlock(build(arms[middle:]))
+            return compareStart
+
+        if isBytes and not last:
+            # b< fails on longer byte strings, which are not equal to any of the constants, so
+            # they continue at the next arm
+            guardBlock = TealConditionalBlock(
+                [
+                    TealOp(self, Op.load, slot),
+                    TealOp(self, Op.len),
+                    TealOp(self, Op.int, MAX_BYTE_MATH_LENGTH),
+                    TealOp(self, Op.le),
+                ]
+            )
+            storeBlock.setNextBlock(guardBlock)
+            pending.append(guardBlock)
+            guardBlock.setTrueBlock(build(sorted(arms, key=lambda arm: arm[0])))
+        else:
+            storeBlock.setNextBlock(build(sorted(arms, key=lambda arm: arm[0])))
+
+        return subjectStart, pending
+
     def __str__(self):
         ret_str = "(Cond"
         for a in self.args:
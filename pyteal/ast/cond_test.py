@@ -2,6 +2,8 @@ import pytest
 
 import pyteal as pt
 
+from pyteal.compiler.parallel import canCompileInParallel
+
 options = pt.CompileOptions()
 
 
@@ -124,3 +126,227 @@ def test_cond_invalid():
 
     with pytest.raises(pt.TealTypeError):
         pt.Cond([pt.Arg(0), pt.Int(2)])
+
+
+dispatchOptions = pt.OptimizeOptions(cond_dispatch=True)
+
+
+def compile_dispatch(expr, version=6):
+    return pt.compileTeal(
+        pt.Return(expr),
+        mode=pt.Mode.Application,
+        version=version,
+        optimize=dispatchOptions,
+    )
+
+
+def compile_linear(expr, version=6):
+    return pt.compileTeal(pt.Return(expr), mode=pt.Mode.Application, version=version)
+
+
+def test_cond_dispatch_uint64():
+    expr = pt.Cond(*[[pt.Txn.fee() == pt.Int(i), pt.Int(i * 10)] for i in range(8)])
+
+    expected = """#pragma version 2
+txn Fee
+store 0
+load 0
+int 4
+<
+bnz main_l5
+load 0
+int 6
+<
+bnz main_l12
+load 0
+int 6
+==
+bnz main_l18
+load 0
+int 7
+==
+bz main_l19
+int 70
+b main_l20
+main_l5:
+load 0
+int 2
+<
+bnz main_l9
+load 0
+int 2
+==
+bnz main_l17
+load 0
+int 3
+==
+bz main_l19
+int 30
+b main_l20
+main_l9:
+load 0
+int 0
+==
+bnz main_l16
+load 0
+int 1
+==
+bz main_l19
+int 10
+b main_l20
+main_l12:
+load 0
+int 4
+==
+bnz main_l15
+load 0
+int 5
+==
+bz main_l19
+int 50
+b main_l20
+main_l15:
+int 40
+b main_l20
+main_l16:
+int 0
+b main_l20
+main_l17:
+int 20
+b main_l20
+main_l18:
+int 60
+b main_l20
+main_l19:
+err
+main_l20:
+return"""
+    assert compile_dispatch(expr, 2) == expected
+
+
+def test_cond_dispatch_methods():
+    methods = ["method{}(uint64)void".format(i) for i in range(60)]
+    arms = [
+        [pt.Txn.application_args[0] == pt.MethodSignature(m), pt.Int(i)]
+        for i, m in enumerate(methods)
+    ]
+
+    # the last arm is reached after a logarithmic number of comparisons
+    actual = compile_dispatch(pt.Cond(*arms))
+    assert actual.count("txna ApplicationArgs 0") == 1
+    # the tree has 27 inner nodes, and at most 5 of them are visited before a leaf
+    assert actual.count("b<") == 27
+    assert actual.count("==") == 60
+    assert "len" not in actual
+
+    # byte strings longer than 64 bytes are not compared with b<, since an arm follows
+    actual = compile_dispatch(pt.Cond(*arms, [pt.Int(1), pt.Int(100)]))
+    assert "store 0\nload 0\nlen\nint 64\n<=\nbz main_l119\n" in actual
+
+    # b< is not available before version 4
+    expr = pt.Cond(*arms)
+    assert compile_dispatch(expr, 3) == compile_linear(expr, 3)
+
+
+def test_cond_dispatch_too_few_arms():
+    expr = pt.Cond(*[[pt.Txn.fee() == pt.Int(i), pt.Int(i)] for i in range(7)])
+    assert compile_dispatch(expr) == compile_linear(expr)
+
+
+def test_cond_dispatch_subjects():
+    # subjects which may have side effects, use dynamic indices, or change between comparisons are
+    # evaluated for every arm
+    for subject in (
+        pt.Btoi(pt.Txn.application_args[0]),
+        pt.Txn.application_args[pt.Int(0)],
+        pt.Gtxn[pt.Int(0)].fee(),
+        pt.Global.opcode_budget(),
+    ):
+        isInt = subject.type_of() == pt.TealType.uint64
+        expr = pt.Cond(
+            *[
+                [subject == (pt.Int(i) if isInt else pt.Bytes(str(i))), pt.Int(i)]
+                for i in range(10)
+            ]
+        )
+        assert compile_dispatch(expr) == compile_linear(expr)
+
+    # a scratch slot and a group transaction field are read once
+    slot = pt.ScratchVar(pt.TealType.uint64)
+    for subject in (slot.load(), pt.Gtxn[1].fee(), pt.Global.group_size()):
+        expr = pt.Cond(*[[pt.Int(i) == subject, pt.Int(i)] for i in range(10)])
+        actual = compile_dispatch(pt.Seq(slot.store(pt.Int(1)), expr))
+        assert actual.count("<\n") == 3
+
+
+def test_cond_dispatch_runs():
+    fee = pt.Txn.fee()
+    arms = [[fee == pt.Int(i), pt.Int(i)] for i in range(8)]
+    expr = pt.Cond(
+        [pt.Txn.application_id() == pt.Int(0), pt.Int(100)],
+        *arms,
+        [pt.Txn.on_completion() == pt.OnComplete.OptIn, pt.Int(200)],
+        # a repeated constant ends the run
+        *(arms + [[fee == pt.Int(3), pt.Int(300)]]),
+    )
+    actual = compile_dispatch(expr)
+    assert actual.count("txn Fee") == 3
+    assert actual.count("store ") == 2
+
+    # byte strings are compared as numbers, so strings which differ only in leading zeros end the
+    # run
+    arms = [[pt.Txn.note() == pt.Bytes(bytes([i])), pt.Int(i)] for i in range(1, 9)] + [
+        [pt.Txn.note() == pt.Bytes(b"\x00\x01"), pt.Int(9)]
+    ]
+    actual = compile_dispatch(pt.Cond(*arms))
+    assert actual.count("txn Note") == 2
+
+
+def router(count):
+    return pt.Cond(
+        *[
+            [pt.Txn.application_args[0] == pt.Bytes("m{}".format(i)), pt.Int(i)]
+            for i in range(count)
+        ]
+    )
+
+
+def test_cond_dispatch_compile_again():
+    @pt.Subroutine(pt.TealType.uint64)
+    def route(value):
+        return pt.If(value == pt.Int(0), router(8), pt.Int(1))
+
+    program = pt.Seq(pt.Pop(route(pt.Txn.fee())), router(8))
+    # the declaration of the subroutine creates a slot during the first compilation only, which
+    # must not change the slots of the routers
+    first = compile_dispatch(program)
+    assert compile_dispatch(program) == first
+
+
+@pytest.mark.skipif(
+    not canCompileInParallel(), reason="worker processes cannot be forked"
+)
+def test_cond_dispatch_parallel():
+    def build():
+        subroutines = [
+            pt.Subroutine(pt.TealType.uint64, "route{}".format(i))(lambda: router(8))
+            for i in range(6)
+        ]
+        return pt.Seq(
+            [pt.Pop(subroutine()) for subroutine in subroutines] + [pt.Int(1)]
+        )
+
+    stats = pt.CompileStats()
+    parallel = pt.compileTeal(
+        build(),
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=dispatchOptions,
+        parallel=4,
+        stats=stats,
+    )
+    assert parallel == pt.compileTeal(
+        build(), mode=pt.Mode.Application, version=6, optimize=dispatchOptions
+    )
+    # the routers are lowered by the worker processes
+    assert stats.parallel_fallback is False
@@ -1,24 +1,129 @@
+import sys
+import traceback
 from abc import ABC, abstractmethod
-from typing import Tuple, List, TYPE_CHECKING
+from enum import Enum
+from types import CodeType, FrameType
+from typing import Tuple, List, Optional, Union, cast, TYPE_CHECKING
 
 from pyteal.types import TealType
+from pyteal.errors import TealInputError
 from pyteal.ir import TealBlock, TealSimpleBlock
 
 if TYPE_CHECKING:
     from pyteal.compiler import CompileOptions
 
 
+class TraceMode(Enum):
+    """Enum of the ways an expression can record where it was defined."""
+
+    # Do not record where expressions are defined.
+    Off = 0
+
+    # Record the code objects and line numbers of the calling frames, and only format them as text
+    # when a trace is requested, e.g. by a TealCompileError.
+    Lightweight = 1
+
+    # Format the full stack trace as text when each expression is created.
+    Full = 2
+
+
+TraceMode.__module__ = "pyteal"
+
+_traceMode = TraceMode.Lightweight
+
+
+def getTraceMode() -> TraceMode:
+    """Get the TraceMode that is used when new expressions are created."""
+    return _traceMode
+
+
+def setTraceMode(mode: TraceMode) -> None:
+    """Set the TraceMode that is used when new expressions are created.
+
+    Expressions that already exist keep the trace that was recorded when they were created.
+
+    Args:
+        mode: The new TraceMode. Defaults to TraceMode.Lightweight if never set.
+    """
+    global _traceMode
+
+    if not isinstance(mode, TraceMode):
+        raise TealInputError("Invalid trace mode: {}".format(mode))
+    _traceMode = mode
+
+
+class _FrameTrace:
+    """A stack trace that has been captured but not yet formatted.
+
+    The trace is stored as a flat tuple of alternating code objects and line numbers, ordered from
+    the innermost frame outwards, which is much cheaper to create than the formatted text.
+    """
+
+    __slots__ = ("frames",)
+
+    def __init__(self, frame: Optional[FrameType]) -> None:
+        frames: List[Union[CodeType, int]] = []
+        while frame is not None:
+            frames.append(frame.f_code)
+            frames.append(frame.f_lineno)
+            frame = frame.f_back
+        self.frames = tuple(frames)
+
+    def format(self) -> List[str]:
+        codes = cast(Tuple[CodeType, ...], self.frames[-2::-2])
+        linenos = cast(Tuple[int, ...], self.frames[::-2])
+        summaries = [
+            traceback.FrameSummary(code.co_filename, lineno, code.co_name)
+            for code, lineno in zip(codes, linenos)
+        ]
+        return traceback.format_list(summaries)
+
+    def __reduce__(self):
+        # code objects cannot be pickled, so pickle the formatted trace instead
+        return list, (self.format(),)
+
+
+# the number of times an expression has been modified after it was created, which invalidates the
+# structural fingerprints that have been memoized on expressions
+_modifications = 0
+
+
+def getModificationCount() -> int:
+    """Get the number of times an expression has been modified after it was created."""
+    return _modifications
+
+
 class Expr(ABC):
     """Abstract base class for PyTeal expressions."""
 
     def __init__(self):
-        import traceback
-
-        self.trace = traceback.format_stack()[0:-1]
+        if _traceMode is TraceMode.Lightweight:
+            self._trace: Union[List[str], _FrameTrace] = _FrameTrace(sys._getframe(1))
+        elif _traceMode is TraceMode.Full:
+            self._trace = traceback.format_stack()[0:-1]
+        else:
+            self._trace = []
+
+    @property
+    def trace(self) -> List[str]:
+        """The formatted stack trace of where this expression was created."""
+        if isinstance(self._trace, _FrameTrace):
+            self._trace = self._trace.format()
+        return self._trace
+
+    @trace.setter
+    def trace(self, trace: List[str]) -> None:
+        self._trace = trace
 
     def getDefinitionTrace(self) -> List[str]:
         return self.trace
 
+    def _modified(self) -> None:
+        """Record that this expression was modified after it was created, for example by a builder
+        method such as If.Then."""
+        global _modifications
+        _modifications += 1
+
     @abstractmethod
     def type_of(self) -> TealType:
         """Get the return type of this expression."""
@@ -0,0 +1,78 @@
+import pickle
+
+import pytest
+
+import pyteal as pt
+
+
+@pytest.fixture
+def restore_trace_mode():
+    mode = pt.getTraceMode()
+    yield
+    pt.setTraceMode(mode)
+
+
+def test_trace_mode_default():
+    assert pt.getTraceMode() == pt.TraceMode.Lightweight
+
+
+def test_trace_mode_invalid(restore_trace_mode):
+    with pytest.raises(pt.TealInputError):
+        pt.setTraceMode("full")
+
+
+def test_trace_mode_off(restore_trace_mode):
+    pt.setTraceMode(pt.TraceMode.Off)
+    expr = pt.Int(1)
+    assert expr.getDefinitionTrace() == []
+
+    error = pt.TealCompileError("message", expr)
+    assert str(error).startswith("message\n")
+
+
+def test_trace_mode_lightweight_matches_full(restore_trace_mode):
+    pt.setTraceMode(pt.TraceMode.Full)
+    full = pt.Int(1)
+    pt.setTraceMode(pt.TraceMode.Lightweight)
+    lightweight = pt.Int(1)
+
+    fullTrace = full.getDefinitionTrace()
+    lightweightTrace = lightweight.getDefinitionTrace()
+
+    assert len(fullTrace) == len(lightweightTrace)
+    # only the line of this test function should differ
+    assert fullTrace[:-2] == lightweightTrace[:-2]
+    assert fullTrace[-1] == lightweightTrace[-1]
+    assert "test_trace_mode_lightweight_matches_full" in lightweightTrace[-2]
+    assert "lightweight = pt.Int(1)" in lightweightTrace[-2]
+    assert "super().__init__()" in lightweightTrace[-1]
+
+
+def test_trace_mode_lightweight_formats_once():
+    expr = pt.Int(1)
+    trace = expr.getDefinitionTrace()
+    assert expr.getDefinitionTrace() is trace
+
+
+def test_trace_copy():
+    source = pt.Int(1)
+    target = pt.Return(source)
+    target.trace = source.trace
+    assert target.getDefinitionTrace() == source.getDefinitionTrace()
+
+
+def test_trace_compile_error():
+    expr = pt.Int(1)
+    error = pt.TealCompileError("message", expr)
+    assert "test_trace_compile_error" in str(error)
+    assert "expr = pt.Int(1)" in str(error)
+
+
+def test_trace_pickle():
+    expr = pt.Int(1)
+    expected = expr.getDefinitionTrace()
+
+    copy = pickle.loads(pickle.dumps(pt.Int(1)))
+    actual = copy.getDefinitionTrace()
+    assert len(actual) == len(expected)
+    assert "copy = pickle.loads(pickle.dumps(pt.Int(1)))" in actual[-2]
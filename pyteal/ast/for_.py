@@ -94,6 +94,7 @@ class For(Expr):
             raise TealCompileError("For expression already has a doBlock", self)
         require_type(doBlock, TealType.none)
         self.doBlock = doBlock
+        self._modified()
         return self
 
 
@@ -105,6 +105,7 @@ class If(Expr):
 
         if not self.elseBranch:
             self.thenBranch = thenBranch
+            self._modified()
         else:
             if not isinstance(self.elseBranch, If):
                 raise TealInputError("Else-Then block is malformed")
@@ -117,6 +118,7 @@ class If(Expr):
 
         if not self.elseBranch:
             self.elseBranch = If(cond)
+            self._modified()
         else:
             if not isinstance(self.elseBranch, If):
                 raise TealInputError("Else-ElseIf block is malformed")
@@ -133,6 +135,7 @@ class If(Expr):
         if not self.elseBranch:
             require_type(elseBranch, self.thenBranch.type_of())
             self.elseBranch = elseBranch
+            self._modified()
         else:
             if not isinstance(self.elseBranch, If):
                 raise TealInputError("Else-Else block is malformed")
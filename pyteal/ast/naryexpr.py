@@ -1,13 +1,53 @@
-from typing import Sequence, cast, TYPE_CHECKING
+from typing import List, Sequence, Tuple, cast, TYPE_CHECKING
 
 from pyteal.types import TealType, require_type
 from pyteal.errors import TealInputError
-from pyteal.ir import TealOp, Op, TealSimpleBlock
+from pyteal.ir import TealOp, Op, TealBlock, TealSimpleBlock, TealConditionalBlock
 from pyteal.ast.expr import Expr
+from pyteal.ast.int import Int
+from pyteal.ast.unaryexpr import UnaryExpr
+from pyteal.ast.binaryexpr import BinaryExpr
+from pyteal.ast.ternaryexpr import TernaryExpr
 
 if TYPE_CHECKING:
     from pyteal.compiler import CompileOptions
 
+# the smallest static opcode cost of the operands after the first one of an And or Or for which
+# short-circuit evaluation is used, since the branches cost about as much as the ops they replace
+SHORT_CIRCUIT_MIN_COST = 4
+
+# ops which always produce 0 or 1
+_BOOLEAN_OPS = (
+    Op.logic_not,
+    Op.logic_and,
+    Op.logic_or,
+    Op.lt,
+    Op.gt,
+    Op.le,
+    Op.ge,
+    Op.eq,
+    Op.neq,
+    Op.b_lt,
+    Op.b_gt,
+    Op.b_le,
+    Op.b_ge,
+    Op.b_eq,
+    Op.b_neq,
+    Op.getbit,
+    Op.ed25519verify,
+)
+
+
+def _isBoolean(expr: Expr) -> bool:
+    """Check if an expression always evaluates to 0 or 1."""
+    if isinstance(expr, Int):
+        return expr.value in (0, 1)
+    if isinstance(expr, (UnaryExpr, BinaryExpr, TernaryExpr)):
+        return expr.op in _BOOLEAN_OPS
+    if isinstance(expr, NaryExpr) and expr.op in (Op.logic_and, Op.logic_or):
+        return len(expr.args) > 1 or _isBoolean(expr.args[0])
+    return False
+
 
 class NaryExpr(Expr):
     """N-ary expression base class.
@@ -32,21 +72,64 @@ class NaryExpr(Expr):
         self.args = args
 
     def __teal__(self, options: "CompileOptions"):
-        start = None
-        end = None
-        for i, arg in enumerate(self.args):
-            argStart, argEnd = arg.__teal__(options)
-            if i == 0:
-                start = argStart
-                end = argEnd
-            else:
-                cast(TealSimpleBlock, end).setNextBlock(argStart)
-                opBlock = TealSimpleBlock([TealOp(self, self.op)])
-                argEnd.setNextBlock(opBlock)
-                end = opBlock
+        args = [arg.__teal__(options) for arg in self.args]
+
+        if (
+            options.optimize.short_circuit
+            and self.op in (Op.logic_and, Op.logic_or)
+            and len(args) > 1
+            and sum(
+                op.op.cost
+                for argStart, _ in args[1:]
+                for block in TealBlock.Iterate(argStart)
+                for op in block.ops
+            )
+            >= SHORT_CIRCUIT_MIN_COST
+        ):
+            return self._shortCircuitTeal(args)
+
+        start, end = args[0]
+        for argStart, argEnd in args[1:]:
+            cast(TealSimpleBlock, end).setNextBlock(argStart)
+            opBlock = TealSimpleBlock([TealOp(self, self.op)])
+            argEnd.setNextBlock(opBlock)
+            end = opBlock
 
         return start, end
 
+    def _shortCircuitTeal(
+        self, args: List[Tuple[TealBlock, TealSimpleBlock]]
+    ) -> Tuple[TealBlock, TealSimpleBlock]:
+        """Lower an And or Or into branches which skip the remaining operands once the first
+        operand which is zero, for And, or not zero, for Or, has been evaluated.
+
+        The last operand is left on the stack when it is reached, so it is converted to 0 or 1
+        unless it is known to be one of them already.
+        """
+        isAnd = self.op == Op.logic_and
+        end = TealSimpleBlock([])
+        # the block which produces the result when an operand other than the last one decides it
+        decidedBlock = TealSimpleBlock([TealOp(self, Op.int, 0 if isAnd else 1)])
+        decidedBlock.setNextBlock(end)
+
+        for (_, argEnd), (nextStart, _) in zip(args, args[1:]):
+            branchBlock = TealConditionalBlock([])
+            if isAnd:
+                branchBlock.setTrueBlock(nextStart)
+                branchBlock.setFalseBlock(decidedBlock)
+            else:
+                branchBlock.setTrueBlock(decidedBlock)
+                branchBlock.setFalseBlock(nextStart)
+            argEnd.setNextBlock(branchBlock)
+
+        lastBlock = TealSimpleBlock([])
+        if not _isBoolean(self.args[-1]):
+            lastBlock.ops = [TealOp(self, Op.logic_not), TealOp(self, Op.logic_not)]
+        args[-1][1].setNextBlock(lastBlock)
+        lastBlock.setNextBlock(end)
+
+        return args[0][0], end
+
     def __str__(self):
         ret_str = "(" + str(self.op)
         for a in self.args:
@@ -72,6 +155,10 @@ def And(*args: Expr) -> NaryExpr:
     All arguments must be PyTeal expressions that evaluate to uint64, and there must be at least one
     argument.
 
+    Every argument is evaluated, unless the program is compiled with
+    :code:`OptimizeOptions(short_circuit=True)`, in which case the arguments after the first one
+    which is zero may not be evaluated.
+
     Example:
         ``And(Txn.amount() == Int(500), Txn.fee() <= Int(10))``
     """
@@ -85,6 +172,10 @@ def Or(*args: Expr) -> NaryExpr:
 
     All arguments must be PyTeal expressions that evaluate to uint64, and there must be at least one
     argument.
+
+    Every argument is evaluated, unless the program is compiled with
+    :code:`OptimizeOptions(short_circuit=True)`, in which case the arguments after the first one
+    which is nonzero may not be evaluated.
     """
     return NaryExpr(Op.logic_or, TealType.uint64, TealType.uint64, args)
 
@@ -247,3 +247,86 @@ def test_concat_invalid():
 
     with pytest.raises(pt.TealTypeError):
         pt.Concat(pt.Int(1), pt.Int(2))
+
+
+def compile_short_circuit(program):
+    return pt.compileTeal(
+        program,
+        mode=pt.Mode.Signature,
+        version=6,
+        optimize=pt.OptimizeOptions(short_circuit=True),
+    )
+
+
+def test_and_short_circuit():
+    program = pt.Return(
+        pt.And(
+            pt.Txn.fee() <= pt.Int(1000),
+            pt.Ed25519Verify(pt.Arg(0), pt.Arg(1), pt.Txn.sender()),
+        )
+    )
+
+    # ed25519verify always produces 0 or 1, so it is not converted
+    expected = """#pragma version 6
+txn Fee
+int 1000
+<=
+bnz main_l2
+int 0
+b main_l3
+main_l2:
+arg 0
+arg 1
+txn Sender
+ed25519verify
+main_l3:
+return"""
+    assert compile_short_circuit(program) == expected
+
+
+def test_or_short_circuit():
+    program = pt.Return(
+        pt.Or(
+            pt.Txn.fee() == pt.Int(0),
+            pt.Txn.amount(),
+            pt.Btoi(pt.Arg(0)) + pt.Int(1),
+        )
+    )
+
+    expected = """#pragma version 6
+txn Fee
+int 0
+==
+bnz main_l2
+txn Amount
+bz main_l3
+main_l2:
+int 1
+b main_l4
+main_l3:
+arg 0
+btoi
+int 1
++
+!
+!
+main_l4:
+return"""
+    assert compile_short_circuit(program) == expected
+
+
+def test_short_circuit_cheap_operands():
+    # the operands after the first one cost less than the branches which would skip them
+    program = pt.Return(pt.And(pt.Txn.fee() <= pt.Int(1000), pt.Txn.amount()))
+    assert compile_short_circuit(program) == pt.compileTeal(
+        program, mode=pt.Mode.Signature, version=6
+    )
+
+
+def test_short_circuit_concat():
+    program = pt.Return(
+        pt.Len(pt.Concat(pt.Txn.note(), pt.Sha256(pt.Arg(0)), pt.Sha256(pt.Arg(1))))
+    )
+    assert compile_short_circuit(program) == pt.compileTeal(
+        program, mode=pt.Mode.Signature, version=6
+    )
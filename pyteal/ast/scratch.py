@@ -3,6 +3,7 @@ from typing import cast, TYPE_CHECKING, Optional
 from pyteal.types import TealType, require_type
 from pyteal.config import NUM_SLOTS
 from pyteal.errors import TealInputError, TealInternalError
+from pyteal.context import getCompileContext
 from pyteal.ast.expr import Expr
 
 if TYPE_CHECKING:
@@ -12,11 +13,6 @@ if TYPE_CHECKING:
 class ScratchSlot:
     """Represents the allocation of a scratch space slot."""
 
-    # Unique identifier for the compiler to automatically assign slots
-    # The id field is used by the compiler to map to an actual slot in the source code
-    # Slot ids under 256 are manually reserved slots
-    nextSlotId = NUM_SLOTS
-
     def __init__(self, requestedSlotId: int = None):
         """Initializes a scratch slot with a particular id
 
@@ -25,8 +21,10 @@ class ScratchSlot:
             This id may be a Python int in the range [0-256).
         """
         if requestedSlotId is None:
-            self.id = ScratchSlot.nextSlotId
-            ScratchSlot.nextSlotId += 1
+            # Unique identifier for the compiler to automatically assign slots
+            # The id field is used by the compiler to map to an actual slot in the source code
+            # Slot ids under 256 are manually reserved slots
+            self.id = getCompileContext().allocateSlotId()
             self.isReservedSlot = False
         else:
             if requestedSlotId < 0 or requestedSlotId >= NUM_SLOTS:
@@ -0,0 +1,250 @@
+import hashlib
+import marshal
+from enum import Enum
+from typing import Any, Dict, List, Tuple, Union
+
+from pyteal.errors import TealInputError
+from pyteal.ast.expr import Expr, getModificationCount
+from pyteal.ast.scratch import ScratchSlot
+from pyteal.ast.scratchvar import ScratchVar
+from pyteal.ast.subroutine import SubroutineDefinition
+
+# an object whose identity is part of a fingerprint
+Reference = Union[ScratchSlot, SubroutineDefinition]
+
+# the attribute in which the fingerprint of an expression is memoized, along with the modification
+# count when it was computed
+_MEMO = "_fingerprint"
+
+# attributes of expressions which are not part of their structure, including the scratch slots the
+# compiler keeps on them so that compiling them again uses the same slots
+_IGNORED = frozenset((_MEMO, "_trace", "_cseSlots", "_dispatchSlot"))
+
+_PRIMITIVES = (type(None), bool, int, str, bytes, float)
+
+
+class Fingerprint:
+    """The structure of an expression.
+
+    A fingerprint has two parts:
+
+    * digest: A hash of the expression's type, its constants and operators, and the fingerprints of
+      its children. ScratchSlots which are not reserved slots and SubroutineDefinitions are hashed
+      by the order in which they are first used in the expression rather than by their ids, so two
+      expressions built the same way have the same digest even if they use different slots or
+      subroutines. The bodies of subroutines are not part of the digest.
+    * references: These ScratchSlots and SubroutineDefinitions, in the order in which they are
+      first used.
+
+    Two fingerprints are equal if their digests are equal and they reference the same slots and
+    subroutines, i.e. if the expressions would compile to the same TEAL in the same program.
+    """
+
+    __slots__ = ("digest", "references")
+
+    def __init__(self, digest: bytes, references: Tuple[Reference, ...]) -> None:
+        self.digest = digest
+        self.references = references
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            type(other) is Fingerprint
+            and self.digest == other.digest
+            and len(self.references) == len(other.references)
+            and all(a is b for a, b in zip(self.references, other.references))
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.digest, tuple(id(ref) for ref in self.references)))
+
+    def __repr__(self) -> str:
+        return "Fingerprint({}, {})".format(self.digest.hex(), list(self.references))
+
+
+Fingerprint.__module__ = "pyteal"
+
+
+def _memoized(node: Union[Expr, ScratchVar], modifications: int) -> Any:
+    memo = node.__dict__.get(_MEMO)
+    if memo is not None and memo[0] == modifications:
+        return memo[1]
+    return None
+
+
+# the kinds of values which can be attributes of expressions
+_PRIMITIVE, _NODE, _ENUM, _SEQUENCE, _SLOT, _SUBROUTINE, _UNKNOWN = range(1, 8)
+
+# the kind of each type of value which has been encountered
+_kinds: Dict[type, int] = dict()
+
+
+def _kindOf(t: type) -> int:
+    kind = _kinds.get(t)
+    if kind is None:
+        if t in _PRIMITIVES:
+            kind = _PRIMITIVE
+        elif issubclass(t, (Expr, ScratchVar)):
+            kind = _NODE
+        elif issubclass(t, Enum):
+            kind = _ENUM
+        elif issubclass(t, (list, tuple)):
+            kind = _SEQUENCE
+        elif issubclass(t, ScratchSlot):
+            kind = _SLOT
+        elif issubclass(t, SubroutineDefinition):
+            kind = _SUBROUTINE
+        else:
+            kind = _UNKNOWN
+        _kinds[t] = kind
+    return kind
+
+
+def _pending(
+    value: Any, modifications: int, pending: List[Union[Expr, ScratchVar]]
+) -> None:
+    """Find the expressions and ScratchVars directly contained in an attribute value which have not
+    been fingerprinted."""
+    kind = _kinds.get(type(value)) or _kindOf(type(value))
+    if kind == _NODE:
+        memo = value.__dict__.get(_MEMO)
+        if memo is None or memo[0] != modifications:
+            pending.append(value)
+    elif kind == _SEQUENCE:
+        for item in value:
+            _pending(item, modifications, pending)
+
+
+# the encodings of enum members, keyed by identity
+_enumCodes: Dict[int, Tuple[str, str, str]] = dict()
+
+
+class _Encoder:
+    """Encodes the attributes of one expression, whose children have already been fingerprinted.
+
+    Each attribute is encoded as a Python value made of primitives, tuples and lists, which is
+    serialized with marshal and hashed to produce the digest. Marshal version 2 is used since it does
+    not write back-references, whose presence depends on reference counts.
+    """
+
+    __slots__ = ("references", "indices")
+
+    def __init__(self) -> None:
+        self.references: List[Reference] = []
+        # local indices of self.references, keyed by identity
+        self.indices: Dict[int, int] = dict()
+
+    def reference(self, ref: Reference) -> int:
+        index = self.indices.get(id(ref))
+        if index is None:
+            index = len(self.references)
+            self.indices[id(ref)] = index
+            self.references.append(ref)
+        return index
+
+    def encode(self, value: Any) -> Any:
+        kind = _kinds.get(type(value)) or _kindOf(type(value))
+        if kind == _PRIMITIVE:
+            return value
+        if kind == _NODE:
+            child: Fingerprint = value.__dict__[_MEMO][1]
+            if len(child.references) == 0:
+                return child.digest
+            return (
+                child.digest,
+                tuple([self.reference(ref) for ref in child.references]),
+            )
+        if kind == _ENUM:
+            code = _enumCodes.get(id(value))
+            if code is None:
+                code = _enumCodes[id(value)] = (
+                    "enum",
+                    type(value).__qualname__,
+                    value.name,
+                )
+            return code
+        if kind == _SEQUENCE:
+            return [self.encode(item) for item in value]
+        if kind == _SLOT:
+            if value.isReservedSlot:
+                return ("reserved slot", value.id)
+            return ("slot", self.reference(value))
+        if kind == _SUBROUTINE:
+            return ("subroutine", self.reference(value))
+        raise TealInputError(
+            "Cannot fingerprint a value of type {}".format(type(value))
+        )
+
+    def fingerprint(self, node: Union[Expr, ScratchVar]) -> Fingerprint:
+        encoded = [_typeName(type(node))]
+        for name, value in sorted(node.__dict__.items()):
+            if name not in _IGNORED:
+                encoded.append(name)
+                encoded.append(self.encode(value))
+
+        digest = hashlib.blake2b(marshal.dumps(encoded, 2), digest_size=16).digest()
+        return Fingerprint(digest, tuple(self.references))
+
+
+_typeNames: Dict[type, str] = dict()
+
+
+def _typeName(t: type) -> str:
+    name = _typeNames.get(t)
+    if name is None:
+        name = _typeNames[t] = t.__module__ + "." + t.__qualname__
+    return name
+
+
+def structuralFingerprint(expr: Union[Expr, ScratchVar]) -> Fingerprint:
+    """Get the fingerprint of an expression's structure.
+
+    The fingerprint of every expression in the tree is memoized on the expression, so computing the
+    fingerprint again, or computing the fingerprint of a larger expression that contains this one,
+    only visits new expressions. Memoized fingerprints are discarded if any expression is modified
+    by a builder method such as If.Then or While.Do.
+
+    Args:
+        expr: The expression, or a ScratchVar.
+
+    Raises:
+        TealInputError: if an attribute of an expression in the tree has a type which cannot be
+            fingerprinted.
+    """
+    modifications = getModificationCount()
+    memo = _memoized(expr, modifications)
+    if memo is not None:
+        return memo
+
+    # visit the tree without recursion, fingerprinting each expression after its children
+    stack: List[Union[Expr, ScratchVar]] = [expr]
+    while len(stack) != 0:
+        node = stack[-1]
+        attributes = node.__dict__
+        memo = attributes.get(_MEMO)
+        if memo is not None and memo[0] == modifications:
+            stack.pop()
+            continue
+
+        pending: List[Union[Expr, ScratchVar]] = []
+        for name, value in attributes.items():
+            if name not in _IGNORED:
+                _pending(value, modifications, pending)
+        if len(pending) != 0:
+            # visit the node again once its children have been fingerprinted
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+        attributes[_MEMO] = (modifications, _Encoder().fingerprint(node))
+
+    return _memoized(expr, modifications)
+
+
+def structurallyEqual(a: Union[Expr, ScratchVar], b: Union[Expr, ScratchVar]) -> bool:
+    """Check if two expressions have the same structure and use the same ScratchSlots and
+    SubroutineDefinitions.
+
+    Unlike ==, which creates an Eq expression, this compares the expressions themselves. See
+    :any:`Fingerprint` for what is compared.
+    """
+    return a is b or structuralFingerprint(a) == structuralFingerprint(b)
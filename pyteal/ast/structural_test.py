@@ -0,0 +1,144 @@
+import pytest
+
+import pyteal as pt
+
+
+def test_fingerprint_same_structure():
+    a = pt.Btoi(pt.Txn.application_args[1]) + pt.Int(2)
+    b = pt.Btoi(pt.Txn.application_args[1]) + pt.Int(2)
+
+    assert pt.structuralFingerprint(a) == pt.structuralFingerprint(b)
+    assert hash(pt.structuralFingerprint(a)) == hash(pt.structuralFingerprint(b))
+    assert pt.structurallyEqual(a, b)
+
+
+def test_fingerprint_differs():
+    expr = pt.Btoi(pt.Txn.application_args[1]) + pt.Int(2)
+    others = [
+        pt.Btoi(pt.Txn.application_args[0]) + pt.Int(2),
+        pt.Btoi(pt.Txn.application_args[1]) + pt.Int(3),
+        pt.Btoi(pt.Txn.application_args[1]) - pt.Int(2),
+        pt.Btoi(pt.Txn.accounts[1]) + pt.Int(2),
+        pt.Int(2) + pt.Btoi(pt.Txn.application_args[1]),
+        pt.Len(pt.Txn.application_args[1]) + pt.Int(2),
+    ]
+
+    fingerprint = pt.structuralFingerprint(expr)
+    for other in others:
+        assert pt.structuralFingerprint(other).digest != fingerprint.digest
+        assert not pt.structurallyEqual(expr, other)
+
+    assert pt.structuralFingerprint(pt.Int(1)) != pt.structuralFingerprint(
+        pt.Bytes("base16", "0x01")
+    )
+    assert pt.structuralFingerprint(pt.Bytes("1")) != pt.structuralFingerprint(
+        pt.Bytes("base16", "0x31")
+    )
+
+
+def test_fingerprint_slots():
+    a = pt.ScratchVar(pt.TealType.uint64)
+    b = pt.ScratchVar(pt.TealType.uint64)
+
+    assert pt.structurallyEqual(a.load(), a.load())
+    assert pt.structurallyEqual(a.store(pt.Int(1)), a.store(pt.Int(1)))
+
+    # different slots used in the same way have the same digest, but are not equal
+    assert pt.structuralFingerprint(a.load()).digest == (
+        pt.structuralFingerprint(b.load()).digest
+    )
+    assert not pt.structurallyEqual(a.load(), b.load())
+
+    # the order in which slots are used is part of the digest
+    same = pt.Seq(a.store(pt.Int(1)), a.store(pt.Int(2)))
+    different = pt.Seq(a.store(pt.Int(1)), b.store(pt.Int(2)))
+    assert pt.structuralFingerprint(same).digest != (
+        pt.structuralFingerprint(different).digest
+    )
+
+    fingerprint = pt.structuralFingerprint(pt.Seq(b.store(a.load()), a.load()))
+    assert fingerprint.references == (b.slot, a.slot)
+
+
+def test_fingerprint_reserved_slots():
+    a = pt.ScratchVar(pt.TealType.uint64, 10)
+    b = pt.ScratchVar(pt.TealType.uint64, 10)
+    c = pt.ScratchVar(pt.TealType.uint64, 11)
+
+    assert pt.structurallyEqual(a.load(), b.load())
+    assert pt.structuralFingerprint(a.load()).references == ()
+    assert pt.structuralFingerprint(a.load()).digest != (
+        pt.structuralFingerprint(c.load()).digest
+    )
+
+
+def test_fingerprint_subroutines():
+    @pt.Subroutine(pt.TealType.uint64)
+    def first(x):
+        return x + pt.Int(1)
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def second(x):
+        return x * pt.Int(2)
+
+    assert pt.structurallyEqual(first(pt.Int(1)), first(pt.Int(1)))
+
+    # the body of a subroutine is not part of the fingerprint of a call
+    assert pt.structuralFingerprint(first(pt.Int(1))).digest == (
+        pt.structuralFingerprint(second(pt.Int(1))).digest
+    )
+    assert not pt.structurallyEqual(first(pt.Int(1)), second(pt.Int(1)))
+    assert pt.structuralFingerprint(first(pt.Int(1))).references == (first.subroutine,)
+
+
+def test_fingerprint_dict_key():
+    seen = {}
+    for expr in [pt.Int(1), pt.Int(2), pt.Int(1), pt.Txn.fee(), pt.Txn.fee()]:
+        seen.setdefault(pt.structuralFingerprint(expr), []).append(expr)
+    assert [len(exprs) for exprs in seen.values()] == [2, 1, 2]
+
+
+def test_fingerprint_memoized():
+    child = pt.Txn.fee() + pt.Int(1)
+    fingerprint = pt.structuralFingerprint(child)
+    assert pt.structuralFingerprint(child) is fingerprint
+
+    parent = child * pt.Int(2)
+    pt.structuralFingerprint(parent)
+    assert pt.structuralFingerprint(child) is fingerprint
+
+
+def test_fingerprint_modified():
+    expr = pt.If(pt.Txn.fee() > pt.Int(1)).Then(pt.Pop(pt.Int(1)))
+    parent = pt.Seq(expr, pt.Approve())
+    before = pt.structuralFingerprint(parent)
+
+    expr.Else(pt.Pop(pt.Int(0)))
+    after = pt.structuralFingerprint(parent)
+    assert after != before
+
+    expected = pt.If(pt.Txn.fee() > pt.Int(1))
+    expected.Then(pt.Pop(pt.Int(1))).Else(pt.Pop(pt.Int(0)))
+    assert after == pt.structuralFingerprint(pt.Seq(expected, pt.Approve()))
+
+
+def test_fingerprint_deep():
+    expr = pt.Int(0)
+    for i in range(5000):
+        expr = expr + pt.Int(i)
+
+    other = pt.Int(0)
+    for i in range(5000):
+        other = other + pt.Int(i)
+
+    assert pt.structurallyEqual(expr, other)
+
+
+def test_fingerprint_invalid():
+    class Custom(pt.Int):
+        def __init__(self, value: int) -> None:
+            super().__init__(value)
+            self.callback = lambda: value
+
+    with pytest.raises(pt.TealInputError):
+        pt.structuralFingerprint(pt.Return(Custom(1)))
@@ -1,8 +1,10 @@
+import threading
 from inspect import Parameter, get_annotations, isclass, signature
 from types import MappingProxyType
 from typing import Callable, List, Optional, Type, Union, TYPE_CHECKING
 
 from pyteal.errors import TealInputError, verifyTealVersion
+from pyteal.context import getCompileContext
 from pyteal.ir import TealOp, Op, TealBlock
 from pyteal.types import TealType
 
@@ -14,13 +16,16 @@ if TYPE_CHECKING:
     from pyteal.compiler import CompileOptions
 
 
+# held while evaluating subroutine declarations. This is reentrant because evaluating a declaration
+# may evaluate the declarations of other subroutines.
+_declarationLock = threading.RLock()
+
+
 class SubroutineDefinition:
     """
     Class that leverages TEAL's `callsub` and `retsub` opcode-pair for subroutines
     """
 
-    nextSubroutineId = 0
-
     def __init__(
         self,
         implementation: Callable[..., Expr],
@@ -35,8 +40,7 @@ class SubroutineDefinition:
                 If omitted, the name defaults to the implementation's __name__ attribute
         """
         super().__init__()
-        self.id = SubroutineDefinition.nextSubroutineId
-        SubroutineDefinition.nextSubroutineId += 1
+        self.id = getCompileContext().allocateSubroutineId()
 
         self.returnType = returnType
         self.declaration: Optional["SubroutineDeclaration"] = None
@@ -153,8 +157,11 @@ class SubroutineDefinition:
 
     def getDeclaration(self) -> "SubroutineDeclaration":
         if self.declaration is None:
-            # lazy evaluate subroutine
-            self.declaration = evaluateSubroutine(self)
+            # lazy evaluate subroutine, only once even if the subroutine is compiled by multiple
+            # threads, since evaluating it allocates ids
+            with _declarationLock:
+                if self.declaration is None:
+                    self.declaration = evaluateSubroutine(self)
         return self.declaration
 
     def name(self) -> str:
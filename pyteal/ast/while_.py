@@ -75,6 +75,7 @@ class While(Expr):
             raise TealCompileError("While expression already has a doBlock", self)
         require_type(doBlock, TealType.none)
         self.doBlock = doBlock
+        self._modified()
         return self
 
 
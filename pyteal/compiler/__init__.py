@@ -4,9 +4,14 @@ from pyteal.compiler.compiler import (
     DEFAULT_TEAL_VERSION,
     CompileOptions,
     compileTeal,
+    compileBytecode,
 )
 
 from pyteal.compiler.optimizer import OptimizeOptions
+from pyteal.compiler.cache import CompileCache
+from pyteal.compiler.stats import CompileStats, PassStats, collectCompileStats
+from pyteal.compiler.assembler import programAddress
+from pyteal.compiler.template import CompiledTemplate, compileTemplate
 
 __all__ = [
     "MAX_TEAL_VERSION",
@@ -14,5 +19,13 @@ __all__ = [
     "DEFAULT_TEAL_VERSION",
     "CompileOptions",
     "compileTeal",
+    "compileBytecode",
     "OptimizeOptions",
+    "CompileCache",
+    "CompileStats",
+    "PassStats",
+    "collectCompileStats",
+    "programAddress",
+    "CompiledTemplate",
+    "compileTemplate",
 ]
@@ -0,0 +1,716 @@
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from algosdk import encoding
+
+from pyteal.ast import EcdsaCurve, GlobalField, TxnField
+from pyteal.ir import Op, TealComponent, TealOp, TealLabel, LabelReference
+from pyteal.errors import TealInputError, TealInternalError
+from pyteal.compiler.constants import (
+    extractIntValue,
+    extractBytesValue,
+    extractAddrValue,
+    extractMethodSigValue,
+    parseBytesValue,
+)
+
+T = TypeVar("T")
+
+# the first TEAL version in which algod reorders the constants of pseudo-ops by frequency and loads
+# single-use constants with pushint and pushbytes
+OPTIMIZE_CONSTANTS_VERSION = 4
+
+
+class Immediate(Enum):
+    """Enum of the kinds of immediate arguments that follow an opcode in TEAL bytecode."""
+
+    # an unsigned 8-bit integer
+    uint8 = 0
+    # a varuint
+    varuint = 1
+    # a varuint length followed by that many bytes
+    bytes = 2
+    # a varuint count followed by that many varuints
+    ints = 3
+    # a varuint count followed by that many length-prefixed byte strings
+    byteslist = 4
+    # a signed 16-bit offset to a label, relative to the end of the instruction
+    label = 5
+    # fields and curves, encoded as an unsigned 8-bit index
+    txn_field = 6
+    global_field = 7
+    asset_holding_field = 8
+    asset_params_field = 9
+    app_params_field = 10
+    acct_params_field = 11
+    ecdsa_curve = 12
+
+
+_U8 = Immediate.uint8
+_TXN = Immediate.txn_field
+
+# fmt: off
+OPCODES: Dict[Op, Tuple[int, Tuple[Immediate, ...]]] = {
+    Op.err:                 (0x00, ()),
+    Op.sha256:              (0x01, ()),
+    Op.keccak256:           (0x02, ()),
+    Op.sha512_256:          (0x03, ()),
+    Op.ed25519verify:       (0x04, ()),
+    Op.ecdsa_verify:        (0x05, (Immediate.ecdsa_curve,)),
+    Op.ecdsa_pk_decompress: (0x06, (Immediate.ecdsa_curve,)),
+    Op.ecdsa_pk_recover:    (0x07, (Immediate.ecdsa_curve,)),
+    Op.add:                 (0x08, ()),
+    Op.minus:               (0x09, ()),
+    Op.div:                 (0x0A, ()),
+    Op.mul:                 (0x0B, ()),
+    Op.lt:                  (0x0C, ()),
+    Op.gt:                  (0x0D, ()),
+    Op.le:                  (0x0E, ()),
+    Op.ge:                  (0x0F, ()),
+    Op.logic_and:           (0x10, ()),
+    Op.logic_or:            (0x11, ()),
+    Op.eq:                  (0x12, ()),
+    Op.neq:                 (0x13, ()),
+    Op.logic_not:           (0x14, ()),
+    Op.len:                 (0x15, ()),
+    Op.itob:                (0x16, ()),
+    Op.btoi:                (0x17, ()),
+    Op.mod:                 (0x18, ()),
+    Op.bitwise_or:          (0x19, ()),
+    Op.bitwise_and:         (0x1A, ()),
+    Op.bitwise_xor:         (0x1B, ()),
+    Op.bitwise_not:         (0x1C, ()),
+    Op.mulw:                (0x1D, ()),
+    Op.addw:                (0x1E, ()),
+    Op.divmodw:             (0x1F, ()),
+    Op.intcblock:           (0x20, (Immediate.ints,)),
+    Op.intc:                (0x21, (_U8,)),
+    Op.intc_0:              (0x22, ()),
+    Op.intc_1:              (0x23, ()),
+    Op.intc_2:              (0x24, ()),
+    Op.intc_3:              (0x25, ()),
+    Op.bytecblock:          (0x26, (Immediate.byteslist,)),
+    Op.bytec:               (0x27, (_U8,)),
+    Op.bytec_0:             (0x28, ()),
+    Op.bytec_1:             (0x29, ()),
+    Op.bytec_2:             (0x2A, ()),
+    Op.bytec_3:             (0x2B, ()),
+    Op.arg:                 (0x2C, (_U8,)),
+    Op.txn:                 (0x31, (_TXN,)),
+    Op.global_:             (0x32, (Immediate.global_field,)),
+    Op.gtxn:                (0x33, (_U8, _TXN)),
+    Op.load:                (0x34, (_U8,)),
+    Op.store:               (0x35, (_U8,)),
+    Op.txna:                (0x36, (_TXN, _U8)),
+    Op.gtxna:               (0x37, (_U8, _TXN, _U8)),
+    Op.gtxns:               (0x38, (_TXN,)),
+    Op.gtxnsa:              (0x39, (_TXN, _U8)),
+    Op.gload:               (0x3A, (_U8, _U8)),
+    Op.gloads:              (0x3B, (_U8,)),
+    Op.gaid:                (0x3C, (_U8,)),
+    Op.gaids:               (0x3D, ()),
+    Op.loads:               (0x3E, ()),
+    Op.stores:              (0x3F, ()),
+    Op.bnz:                 (0x40, (Immediate.label,)),
+    Op.bz:                  (0x41, (Immediate.label,)),
+    Op.b:                   (0x42, (Immediate.label,)),
+    Op.return_:             (0x43, ()),
+    Op.assert_:             (0x44, ()),
+    Op.pop:                 (0x48, ()),
+    Op.dup:                 (0x49, ()),
+    Op.dup2:                (0x4A, ()),
+    Op.dig:                 (0x4B, (_U8,)),
+    Op.swap:                (0x4C, ()),
+    Op.select:              (0x4D, ()),
+    Op.cover:               (0x4E, (_U8,)),
+    Op.uncover:             (0x4F, (_U8,)),
+    Op.concat:              (0x50, ()),
+    Op.substring:           (0x51, (_U8, _U8)),
+    Op.substring3:          (0x52, ()),
+    Op.getbit:              (0x53, ()),
+    Op.setbit:              (0x54, ()),
+    Op.getbyte:             (0x55, ()),
+    Op.setbyte:             (0x56, ()),
+    Op.extract:             (0x57, (_U8, _U8)),
+    Op.extract3:            (0x58, ()),
+    Op.extract_uint16:      (0x59, ()),
+    Op.extract_uint32:      (0x5A, ()),
+    Op.extract_uint64:      (0x5B, ()),
+    Op.balance:             (0x60, ()),
+    Op.app_opted_in:        (0x61, ()),
+    Op.app_local_get:       (0x62, ()),
+    Op.app_local_get_ex:    (0x63, ()),
+    Op.app_global_get:      (0x64, ()),
+    Op.app_global_get_ex:   (0x65, ()),
+    Op.app_local_put:       (0x66, ()),
+    Op.app_global_put:      (0x67, ()),
+    Op.app_local_del:       (0x68, ()),
+    Op.app_global_del:      (0x69, ()),
+    Op.asset_holding_get:   (0x70, (Immediate.asset_holding_field,)),
+    Op.asset_params_get:    (0x71, (Immediate.asset_params_field,)),
+    Op.app_params_get:      (0x72, (Immediate.app_params_field,)),
+    Op.acct_params_get:     (0x73, (Immediate.acct_params_field,)),
+    Op.min_balance:         (0x78, ()),
+    Op.pushbytes:           (0x80, (Immediate.bytes,)),
+    Op.pushint:             (0x81, (Immediate.varuint,)),
+    Op.callsub:             (0x88, (Immediate.label,)),
+    Op.retsub:              (0x89, ()),
+    Op.shl:                 (0x90, ()),
+    Op.shr:                 (0x91, ()),
+    Op.sqrt:                (0x92, ()),
+    Op.bitlen:              (0x93, ()),
+    Op.exp:                 (0x94, ()),
+    Op.expw:                (0x95, ()),
+    Op.bsqrt:               (0x96, ()),
+    Op.divw:                (0x97, ()),
+    Op.b_add:               (0xA0, ()),
+    Op.b_minus:             (0xA1, ()),
+    Op.b_div:               (0xA2, ()),
+    Op.b_mul:               (0xA3, ()),
+    Op.b_lt:                (0xA4, ()),
+    Op.b_gt:                (0xA5, ()),
+    Op.b_le:                (0xA6, ()),
+    Op.b_ge:                (0xA7, ()),
+    Op.b_eq:                (0xA8, ()),
+    Op.b_neq:               (0xA9, ()),
+    Op.b_mod:               (0xAA, ()),
+    Op.b_or:                (0xAB, ()),
+    Op.b_and:               (0xAC, ()),
+    Op.b_xor:               (0xAD, ()),
+    Op.b_not:               (0xAE, ()),
+    Op.bzero:               (0xAF, ()),
+    Op.log:                 (0xB0, ()),
+    Op.itxn_begin:          (0xB1, ()),
+    Op.itxn_field:          (0xB2, (_TXN,)),
+    Op.itxn_submit:         (0xB3, ()),
+    Op.itxn:                (0xB4, (_TXN,)),
+    Op.itxna:               (0xB5, (_TXN, _U8)),
+    Op.itxn_next:           (0xB6, ()),
+    Op.gitxn:               (0xB7, (_U8, _TXN)),
+    Op.gitxna:              (0xB8, (_U8, _TXN, _U8)),
+    Op.txnas:               (0xC0, (_TXN,)),
+    Op.gtxnas:              (0xC1, (_U8, _TXN)),
+    Op.gtxnsas:             (0xC2, (_TXN,)),
+    Op.args:                (0xC3, ()),
+    Op.gloadss:             (0xC4, ()),
+    Op.itxnas:              (0xC5, (_TXN,)),
+    Op.gitxnas:             (0xC6, (_U8, _TXN)),
+}
+# fmt: on
+
+# ops which have a shorter form without immediates for the first 4 indices, e.g. intc_0 for intc 0
+_SHORT_FORMS = {
+    Op.intc: OPCODES[Op.intc_0][0],
+    Op.bytec: OPCODES[Op.bytec_0][0],
+    Op.arg: 0x2D,
+}
+
+_FIELDS: Dict[Immediate, Dict[str, int]] = {
+    Immediate.txn_field: {field.arg_name: field.id for field in TxnField},
+    Immediate.global_field: {field.arg_name: field.id for field in GlobalField},
+    Immediate.ecdsa_curve: {curve.arg_name: curve.id for curve in EcdsaCurve},
+    Immediate.asset_holding_field: {
+        name: i for i, name in enumerate(["AssetBalance", "AssetFrozen"])
+    },
+    Immediate.asset_params_field: {
+        name: i
+        for i, name in enumerate(
+            [
+                "AssetTotal",
+                "AssetDecimals",
+                "AssetDefaultFrozen",
+                "AssetUnitName",
+                "AssetName",
+                "AssetURL",
+                "AssetMetadataHash",
+                "AssetManager",
+                "AssetReserve",
+                "AssetFreeze",
+                "AssetClawback",
+                "AssetCreator",
+            ]
+        )
+    },
+    Immediate.app_params_field: {
+        name: i
+        for i, name in enumerate(
+            [
+                "AppApprovalProgram",
+                "AppClearStateProgram",
+                "AppGlobalNumUint",
+                "AppGlobalNumByteSlice",
+                "AppLocalNumUint",
+                "AppLocalNumByteSlice",
+                "AppExtraProgramPages",
+                "AppCreator",
+                "AppAddress",
+            ]
+        )
+    },
+    Immediate.acct_params_field: {
+        name: i
+        for i, name in enumerate(["AcctBalance", "AcctMinBalance", "AcctAuthAddr"])
+    },
+}
+
+_PSEUDO_OPS = (Op.int, Op.byte, Op.addr, Op.method_signature)
+
+# the estimated size of a pseudo-op, which is assembled into a reference to a constant block
+PSEUDO_OP_SIZE = 2
+
+# a value which is either known when the program is compiled, or the name of a template variable
+# whose value is filled in when the program is linked
+IntArg = Union[int, str]
+BytesArg = Union[bytes, str]
+TemplateValues = Mapping[str, Union[int, bytes]]
+
+# kinds of tokens in a tokenized program
+_FIXED = 0  # bytecode which does not depend on labels or constants, arg is the bytes
+_LABEL = 1  # a label, arg is its name
+_JUMP = 2  # an op with a label immediate, arg is the opcode and label
+_INT = 3  # an int pseudo-op, arg is an IntArg
+_BYTES = 4  # a byte, addr, or method pseudo-op, arg is a BytesArg
+_INTCBLOCK = 5  # arg is a list of IntArgs
+_BYTECBLOCK = 6  # arg is a list of BytesArgs
+_PUSHINT = 7  # a pushint with a template variable, arg is its name
+_PUSHBYTES = 8  # a pushbytes with a template variable, arg is its name
+
+# a token of a tokenized program: its kind, arg, and the op it came from, if any
+Token = Tuple[int, Any, Optional[TealOp]]
+
+
+def encodeVaruint(value: int) -> bytes:
+    """Encode an unsigned 64-bit integer as a varuint, 7 bits per byte starting with the lowest."""
+    if not (0 <= value < 2**64):
+        raise TealInternalError("Value out of range for a varuint: {}".format(value))
+
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def immediateArgs(op: TealOp) -> List[Union[int, str]]:
+    """Get the immediate arguments of an op, without any trailing comment."""
+    args: List[Union[int, str]] = []
+    for arg in op.args:
+        if arg == "//":
+            break
+        if isinstance(arg, LabelReference):
+            args.append(arg.getLabel())
+        elif isinstance(arg, (int, str)):
+            args.append(arg)
+        else:
+            raise TealInternalError("Unresolved argument in {}: {}".format(op, arg))
+    return args
+
+
+# ops which end the execution of a block
+_EXIT_OPS = (Op.retsub, Op.return_, Op.err)
+
+
+def opSize(op: TealOp) -> int:
+    """Estimate the number of bytes an op is assembled into.
+
+    The size of an op whose immediates are not known until the program is assembled, such as the
+    index of a scratch slot or the offset of a label, is estimated from the kinds of its immediates.
+    """
+    if op.op in _PSEUDO_OPS:
+        return PSEUDO_OP_SIZE
+
+    spec = OPCODES.get(op.op)
+    if spec is None:
+        return 1
+
+    size = 1
+    for kind in spec[1]:
+        size += 2 if kind == Immediate.label else 1
+    return size
+
+
+def _parseUint(arg: Union[int, str], bits: int) -> int:
+    if isinstance(arg, str):
+        try:
+            arg = int(arg, 0)
+        except ValueError:
+            raise TealInternalError("Expected an integer argument: {}".format(arg))
+    if not (0 <= arg < 2**bits):
+        raise TealInternalError(
+            "Argument out of range for a {}-bit integer: {}".format(bits, arg)
+        )
+    return arg
+
+
+def _intArg(arg: Union[int, str]) -> IntArg:
+    if isinstance(arg, str) and arg.startswith("TMPL_"):
+        return arg
+    return _parseUint(arg, 64)
+
+
+def _bytesArg(arg: Union[int, str]) -> BytesArg:
+    if not isinstance(arg, str):
+        raise TealInternalError("Expected a byte string argument: {}".format(arg))
+    if arg.startswith("TMPL_"):
+        return arg
+    return parseBytesValue(arg)
+
+
+def _encodeBytes(value: bytes) -> bytes:
+    return encodeVaruint(len(value)) + value
+
+
+def _assembleOp(op: TealOp, program: bytearray) -> None:
+    """Assemble an op whose immediates do not depend on labels or template variables."""
+    spec = OPCODES.get(op.op)
+    if spec is None:
+        raise TealInternalError("Op cannot be assembled into bytecode: {}".format(op))
+    opcode, immediates = spec
+    args = immediateArgs(op)
+
+    if op.op in _SHORT_FORMS and len(args) == 1:
+        index = _parseUint(args[0], 8)
+        if index < 4:
+            program.append(_SHORT_FORMS[op.op] + index)
+            return
+
+    if len(args) != len(immediates):
+        raise TealInternalError(
+            "Expected {} immediate arguments for {}, got {}".format(
+                len(immediates), op.op, len(args)
+            )
+        )
+
+    program.append(opcode)
+
+    for kind, arg in zip(immediates, args):
+        if kind == Immediate.uint8:
+            program.append(_parseUint(arg, 8))
+        elif kind == Immediate.varuint:
+            program += encodeVaruint(_parseUint(arg, 64))
+        elif kind == Immediate.bytes:
+            program += _encodeBytes(cast(bytes, _bytesArg(arg)))
+        else:
+            field = _FIELDS[kind].get(cast(str, arg))
+            if field is None:
+                raise TealInternalError(
+                    "Unknown {} in {}: {}".format(kind.name, op.op, arg)
+                )
+            program.append(field)
+
+
+def _pseudoOpValue(op: TealOp) -> Union[IntArg, BytesArg]:
+    if op.op == Op.int:
+        return extractIntValue(op)
+    if op.op == Op.byte:
+        return extractBytesValue(op)
+    if op.op == Op.addr:
+        return extractAddrValue(op)
+    return extractMethodSigValue(op)
+
+
+def tokenizeProgram(teal: Sequence[TealComponent]) -> List[Token]:
+    """Assemble the parts of a compiled program which do not depend on where labels are placed
+    or on the values of template variables.
+
+    Consecutive ops which only have fixed immediates are assembled into a single token. Use
+    linkProgram to assemble the tokens into bytecode.
+
+    Raises:
+        TealInternalError: if the program cannot be assembled.
+    """
+    tokens: List[Token] = []
+    fixed = bytearray()
+    labels: Set[str] = set()
+    jumps: List[Tuple[str, TealOp]] = []
+
+    def flush() -> None:
+        if len(fixed) != 0:
+            tokens.append((_FIXED, bytes(fixed), None))
+            fixed.clear()
+
+    for component in teal:
+        if isinstance(component, TealLabel):
+            label = component.getLabelRef().getLabel()
+            if label in labels:
+                raise TealInternalError("Duplicate label: {}".format(label))
+            labels.add(label)
+            flush()
+            tokens.append((_LABEL, label, None))
+            continue
+
+        if not isinstance(component, TealOp):
+            raise TealInternalError(
+                "Unexpected component type: {}".format(type(component))
+            )
+
+        op = component.op
+        if op in _PSEUDO_OPS:
+            value = _pseudoOpValue(component)
+            flush()
+            tokens.append((_INT if op == Op.int else _BYTES, value, component))
+        elif op == Op.intcblock:
+            flush()
+            ints = [_intArg(arg) for arg in immediateArgs(component)]
+            tokens.append((_INTCBLOCK, ints, component))
+        elif op == Op.bytecblock:
+            flush()
+            byteStrings = [_bytesArg(arg) for arg in immediateArgs(component)]
+            tokens.append((_BYTECBLOCK, byteStrings, component))
+        elif op in (Op.pushint, Op.pushbytes) and any(
+            isinstance(arg, str) and arg.startswith("TMPL_")
+            for arg in immediateArgs(component)
+        ):
+            flush()
+            name = immediateArgs(component)[0]
+            tokens.append(
+                (_PUSHINT if op == Op.pushint else _PUSHBYTES, name, component)
+            )
+        elif op in OPCODES and OPCODES[op][1] == (Immediate.label,):
+            args = immediateArgs(component)
+            if len(args) != 1:
+                raise TealInternalError("Expected a label in {}".format(component))
+            label = cast(str, args[0])
+            jumps.append((label, component))
+            flush()
+            tokens.append((_JUMP, (OPCODES[op][0], label), component))
+        else:
+            _assembleOp(component, fixed)
+
+    flush()
+
+    for label, jump in jumps:
+        if label not in labels:
+            raise TealInternalError("Unknown label in {}: {}".format(jump, label))
+
+    return tokens
+
+
+def _templateValue(name: str, values: TemplateValues) -> Union[int, bytes]:
+    value = values.get(name)
+    if value is None:
+        raise TealInputError("No value for the template variable {}".format(name))
+    return value
+
+
+def _resolveInt(arg: IntArg, values: TemplateValues) -> int:
+    if not isinstance(arg, str):
+        return arg
+    value = _templateValue(arg, values)
+    if not isinstance(value, int):
+        raise TealInputError("Expected an int for the template variable {}".format(arg))
+    return value
+
+
+def _resolveBytes(arg: BytesArg, values: TemplateValues) -> bytes:
+    if not isinstance(arg, str):
+        return arg
+    value = _templateValue(arg, values)
+    if not isinstance(value, bytes):
+        raise TealInputError("Expected bytes for the template variable {}".format(arg))
+    return value
+
+
+def constantBlock(refs: List[T], version: int) -> List[T]:
+    """Choose the constants to put in a constant block the same way algod's assembler does for
+    pseudo-ops.
+
+    Constants are placed in the block in the order they are first used. Starting with TEAL version
+    4, algod sorts the block by the number of times each constant is used and loads constants which
+    are only used once with pushint or pushbytes instead. These rules differ slightly from the ones
+    used by createConstantBlocks, so that programs compiled without assembleConstants assemble to
+    the same bytes as they would with algod.
+
+    Args:
+        refs: The value of each constant pseudo-op in the program, in order.
+        version: The TEAL version of the program.
+    """
+    freqs: Dict[T, int] = dict()
+    for value in refs:
+        freqs[value] = freqs.get(value, 0) + 1
+
+    if version < OPTIMIZE_CONSTANTS_VERSION:
+        return list(freqs)
+
+    # sorting is stable, so constants used equally often stay in order of first use
+    return [
+        value
+        for value in sorted(freqs, key=freqs.__getitem__, reverse=True)
+        if freqs[value] > 1
+    ]
+
+
+def _constantRef(index: int, opcode: int) -> bytes:
+    # opcode is the opcode of intc or bytec, which are followed by their 4 short forms
+    if index < 4:
+        return bytes([opcode + 1 + index])
+    return bytes([opcode, index])
+
+
+def linkProgram(
+    tokens: List[Token], version: int, values: TemplateValues = {}
+) -> bytes:
+    """Assemble a tokenized program into bytecode.
+
+    Args:
+        tokens: The program, tokenized by tokenizeProgram.
+        version: The TEAL version of the program.
+        values (optional): The values of the program's template variables, keyed by name. Ints
+            must be ints, and byte strings and addresses must be bytes.
+
+    Raises:
+        TealInputError: if a template variable does not have a value of the right type.
+        TealInternalError: if the program cannot be assembled.
+    """
+    intRefs: List[int] = []
+    byteRefs: List[bytes] = []
+    hasBlocks = False
+    for kind, arg, _ in tokens:
+        if kind == _INT:
+            intRefs.append(_resolveInt(arg, values))
+        elif kind == _BYTES:
+            byteRefs.append(_resolveBytes(arg, values))
+        elif kind == _INTCBLOCK or kind == _BYTECBLOCK:
+            hasBlocks = True
+
+    if hasBlocks and (len(intRefs) != 0 or len(byteRefs) != 0):
+        raise TealInternalError(
+            "Cannot assemble constant pseudo-ops in a program with constant blocks"
+        )
+
+    intBlock = constantBlock(intRefs, version)
+    byteBlock = constantBlock(byteRefs, version)
+    intIndices = {value: i for i, value in enumerate(intBlock)}
+    byteIndices = {value: i for i, value in enumerate(byteBlock)}
+
+    pieces: List[bytes] = [encodeVaruint(version)]
+    if len(intBlock) != 0:
+        pieces.append(_encodeIntcblock(intBlock))
+    if len(byteBlock) != 0:
+        pieces.append(_encodeBytecblock(byteBlock))
+    position = sum(len(piece) for piece in pieces)
+
+    labels: Dict[str, int] = dict()
+    # the index of the piece, position, opcode and label, and op of every jump
+    jumps: List[Tuple[int, int, Tuple[int, str], Optional[TealOp]]] = []
+    intRefIter = iter(intRefs)
+    byteRefIter = iter(byteRefs)
+
+    for kind, arg, op in tokens:
+        if kind == _FIXED:
+            piece = arg
+        elif kind == _LABEL:
+            labels[arg] = position
+            continue
+        elif kind == _JUMP:
+            jumps.append((len(pieces), position, arg, op))
+            piece = b"\x00\x00\x00"
+        elif kind == _INT:
+            value = next(intRefIter)
+            index = intIndices.get(value)
+            if index is None:
+                piece = bytes([_PUSHINT_OPCODE]) + encodeVaruint(value)
+            else:
+                piece = _constantRef(index, _INTC_OPCODE)
+        elif kind == _BYTES:
+            data = next(byteRefIter)
+            index = byteIndices.get(data)
+            if index is None:
+                piece = bytes([_PUSHBYTES_OPCODE]) + _encodeBytes(data)
+            else:
+                piece = _constantRef(index, _BYTEC_OPCODE)
+        elif kind == _INTCBLOCK:
+            piece = _encodeIntcblock([_resolveInt(a, values) for a in arg])
+        elif kind == _BYTECBLOCK:
+            piece = _encodeBytecblock([_resolveBytes(a, values) for a in arg])
+        elif kind == _PUSHINT:
+            piece = bytes([_PUSHINT_OPCODE]) + encodeVaruint(_resolveInt(arg, values))
+        elif kind == _PUSHBYTES:
+            piece = bytes([_PUSHBYTES_OPCODE]) + _encodeBytes(
+                _resolveBytes(arg, values)
+            )
+        else:
+            raise TealInternalError("Unexpected token: {}".format(kind))
+
+        pieces.append(piece)
+        position += len(piece)
+
+    for index, start, (opcode, label), op in jumps:
+        # offsets are relative to the end of the instruction
+        offset = labels[label] - (start + 3)
+        if offset < 0 and version < 4:
+            raise TealInternalError(
+                "Backwards branch in {} requires TEAL version 4 or higher".format(op)
+            )
+        if not (-0x8000 <= offset <= 0x7FFF):
+            raise TealInternalError("Label too far away in {}".format(op))
+        pieces[index] = bytes([opcode]) + (offset & 0xFFFF).to_bytes(2, "big")
+
+    return b"".join(pieces)
+
+
+_INTC_OPCODE = OPCODES[Op.intc][0]
+_BYTEC_OPCODE = OPCODES[Op.bytec][0]
+_PUSHINT_OPCODE = OPCODES[Op.pushint][0]
+_PUSHBYTES_OPCODE = OPCODES[Op.pushbytes][0]
+
+
+def _encodeIntcblock(block: List[int]) -> bytes:
+    return (
+        bytes([OPCODES[Op.intcblock][0]])
+        + encodeVaruint(len(block))
+        + b"".join(encodeVaruint(value) for value in block)
+    )
+
+
+def _encodeBytecblock(block: List[bytes]) -> bytes:
+    return (
+        bytes([OPCODES[Op.bytecblock][0]])
+        + encodeVaruint(len(block))
+        + b"".join(_encodeBytes(value) for value in block)
+    )
+
+
+def assembleBytecode(teal: Sequence[TealComponent], version: int) -> bytes:
+    """Assemble a compiled program into TEAL bytecode, without calling algod.
+
+    Args:
+        teal: The compiled program. Constants may be loaded either with pseudo-ops or with constant
+            blocks, but not both.
+        version: The TEAL version of the program.
+
+    Returns:
+        The bytecode of the program, identical to the output of algod's assembler for the program's
+        TEAL source.
+
+    Raises:
+        TealInputError: if the program contains a template variable.
+        TealInternalError: if the program cannot be assembled.
+    """
+    return linkProgram(tokenizeProgram(teal), version)
+
+
+def programAddress(program: bytes) -> str:
+    """Get the address of the contract account of a program.
+
+    This is the SHA-512/256 hash of the program prefixed with "Program", encoded as an Algorand
+    address. It is the address of the account controlled by the program when it is used as a logic
+    signature.
+
+    Args:
+        program: The bytecode of the program.
+    """
+    return encoding.encode_address(encoding.checksum(b"Program" + program))
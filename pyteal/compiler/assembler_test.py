@@ -0,0 +1,272 @@
+import base64
+
+import pytest
+from algosdk import logic
+
+import pyteal as pt
+from pyteal.compiler.assembler import (
+    assembleBytecode,
+    encodeVaruint,
+    opSize,
+)
+
+
+def test_encode_varuint():
+    assert encodeVaruint(0) == bytes([0x00])
+    assert encodeVaruint(1) == bytes([0x01])
+    assert encodeVaruint(127) == bytes([0x7F])
+    assert encodeVaruint(128) == bytes([0x80, 0x01])
+    assert encodeVaruint(300) == bytes([0xAC, 0x02])
+    assert encodeVaruint(2**64 - 1) == bytes([0xFF] * 9 + [0x01])
+
+    with pytest.raises(pt.TealInternalError):
+        encodeVaruint(-1)
+
+    with pytest.raises(pt.TealInternalError):
+        encodeVaruint(2**64)
+
+
+def test_opSize():
+    slot = pt.ScratchSlot()
+    assert opSize(pt.TealOp(None, pt.Op.add)) == 1
+    assert opSize(pt.TealOp(None, pt.Op.int, 5)) == 2
+    assert opSize(pt.TealOp(None, pt.Op.load, slot)) == 2
+    assert opSize(pt.TealOp(None, pt.Op.txn, "Sender")) == 2
+    assert opSize(pt.TealOp(None, pt.Op.bnz, "label")) == 3
+
+
+def test_compile_bytecode_int():
+    program = pt.compileBytecode(pt.Int(1), pt.Mode.Signature, version=2)
+    assert base64.b64encode(program) == b"AiABASJD"
+
+    program = pt.compileBytecode(pt.Int(1), pt.Mode.Application, version=6)
+    assert base64.b64encode(program) == b"BoEBQw=="
+
+
+def test_pseudo_ops_in_order_of_first_use():
+    teal = [
+        pt.TealOp(None, pt.Op.int, 5),
+        pt.TealOp(None, pt.Op.byte, '"a"'),
+        pt.TealOp(None, pt.Op.int, 7),
+        pt.TealOp(None, pt.Op.int, 7),
+        pt.TealOp(None, pt.Op.int, "pay"),
+        pt.TealOp(None, pt.Op.byte, "0x61"),
+    ]
+
+    expected = bytes(
+        [0x03]
+        + [0x20, 0x03, 0x05, 0x07, 0x01]
+        + [0x26, 0x01, 0x01, 0x61]
+        + [0x22, 0x28, 0x23, 0x23, 0x24, 0x28]
+    )
+    assert assembleBytecode(teal, 3) == expected
+
+
+def test_pseudo_ops_by_frequency():
+    teal = [
+        pt.TealOp(None, pt.Op.int, 5),
+        pt.TealOp(None, pt.Op.byte, '"a"'),
+        pt.TealOp(None, pt.Op.int, 7),
+        pt.TealOp(None, pt.Op.int, 7),
+        pt.TealOp(None, pt.Op.int, 300),
+        pt.TealOp(
+            None,
+            pt.Op.addr,
+            "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAY5HFKQ",
+        ),
+        pt.TealOp(None, pt.Op.int, 5),
+        pt.TealOp(None, pt.Op.int, 5),
+    ]
+
+    expected = bytes(
+        [0x04]
+        + [0x20, 0x02, 0x05, 0x07]
+        + [0x22, 0x80, 0x01, 0x61, 0x23, 0x23, 0x81, 0xAC, 0x02]
+        + [0x80, 0x20]
+        + [0x00] * 32
+        + [0x22, 0x22]
+    )
+    assert assembleBytecode(teal, 4) == expected
+
+
+def test_assembled_constants():
+    teal = [
+        pt.TealOp(None, pt.Op.intcblock, 0, 1, 2, 3, 4, 2**64 - 1),
+        pt.TealOp(None, pt.Op.bytecblock, "0x0102", '"hi"', "base64(AA==)"),
+        pt.TealOp(None, pt.Op.intc_0, "//", 0),
+        pt.TealOp(None, pt.Op.intc_3, "//", 3),
+        pt.TealOp(None, pt.Op.intc, 5, "//", 2**64 - 1),
+        pt.TealOp(None, pt.Op.bytec_1, "//", '"hi"'),
+        pt.TealOp(None, pt.Op.bytec, 2, "//", "base64(AA==)"),
+        pt.TealOp(None, pt.Op.pushint, 1000, "//", 1000),
+        pt.TealOp(None, pt.Op.pushbytes, "0x", "//", '""'),
+    ]
+
+    expected = bytes(
+        [0x05]
+        + [0x20, 0x06, 0x00, 0x01, 0x02, 0x03, 0x04]
+        + [0xFF] * 9
+        + [0x01]
+        + [0x26, 0x03, 0x02, 0x01, 0x02, 0x02, 0x68, 0x69, 0x01, 0x00]
+        + [0x22, 0x25, 0x21, 0x05, 0x29, 0x2A]
+        + [0x81, 0xE8, 0x07]
+        + [0x80, 0x00]
+    )
+    assert assembleBytecode(teal, 5) == expected
+
+
+def test_short_forms():
+    teal = [
+        pt.TealOp(None, pt.Op.arg, 0),
+        pt.TealOp(None, pt.Op.arg, 3),
+        pt.TealOp(None, pt.Op.arg, 4),
+        pt.TealOp(None, pt.Op.intc, 2),
+        pt.TealOp(None, pt.Op.bytec, 1),
+    ]
+
+    expected = bytes([0x02, 0x2D, 0x30, 0x2C, 0x04, 0x24, 0x29])
+    assert assembleBytecode(teal, 2) == expected
+
+
+def test_immediates():
+    teal = [
+        pt.TealOp(None, pt.Op.txn, "Sender"),
+        pt.TealOp(None, pt.Op.txn, "NumAccounts"),
+        pt.TealOp(None, pt.Op.txna, "ApplicationArgs", 1),
+        pt.TealOp(None, pt.Op.gtxn, 2, "Amount"),
+        pt.TealOp(None, pt.Op.gtxna, 0, "Accounts", "3"),
+        pt.TealOp(None, pt.Op.global_, "CurrentApplicationID"),
+        pt.TealOp(None, pt.Op.load, 10),
+        pt.TealOp(None, pt.Op.store, 255),
+        pt.TealOp(None, pt.Op.substring, 1, 4),
+        pt.TealOp(None, pt.Op.asset_holding_get, "AssetFrozen"),
+        pt.TealOp(None, pt.Op.asset_params_get, "AssetCreator"),
+        pt.TealOp(None, pt.Op.app_params_get, "AppAddress"),
+        pt.TealOp(None, pt.Op.acct_params_get, "AcctAuthAddr"),
+        pt.TealOp(None, pt.Op.ecdsa_verify, "Secp256k1"),
+        pt.TealOp(None, pt.Op.itxn_field, "TypeEnum"),
+        pt.TealOp(None, pt.Op.gitxna, 1, "Logs", 2),
+    ]
+
+    expected = bytes(
+        [0x06]
+        + [0x31, 0x00, 0x31, 0x1D, 0x36, 0x1A, 0x01, 0x33, 0x02, 0x08]
+        + [0x37, 0x00, 0x1C, 0x03, 0x32, 0x08, 0x34, 0x0A, 0x35, 0xFF]
+        + [0x51, 0x01, 0x04, 0x70, 0x01, 0x71, 0x0B, 0x72, 0x08, 0x73, 0x02]
+        + [0x05, 0x00, 0xB2, 0x10, 0xB8, 0x01, 0x3A, 0x02]
+    )
+    assert assembleBytecode(teal, 6) == expected
+
+
+def test_invalid_immediates():
+    with pytest.raises(pt.TealInternalError):
+        assembleBytecode([pt.TealOp(None, pt.Op.txn, "NotAField")], 6)
+
+    with pytest.raises(pt.TealInternalError):
+        assembleBytecode([pt.TealOp(None, pt.Op.load, 256)], 6)
+
+    with pytest.raises(pt.TealInternalError):
+        assembleBytecode([pt.TealOp(None, pt.Op.substring, 1)], 6)
+
+    with pytest.raises(pt.TealInternalError):
+        assembleBytecode(
+            [
+                pt.TealOp(None, pt.Op.intcblock, 1),
+                pt.TealOp(None, pt.Op.int, 1),
+            ],
+            6,
+        )
+
+    with pytest.raises(pt.TealInputError):
+        assembleBytecode([pt.TealOp(None, pt.Op.int, "TMPL_AMOUNT")], 6)
+
+    with pytest.raises(pt.TealInputError):
+        assembleBytecode([pt.TealOp(None, pt.Op.pushint, "TMPL_AMOUNT")], 6)
+
+
+def test_labels():
+    l1 = pt.LabelReference("l1")
+    l2 = pt.LabelReference("l2")
+    teal = [
+        pt.TealLabel(None, l1),
+        pt.TealOp(None, pt.Op.pushint, 1),
+        pt.TealOp(None, pt.Op.bnz, l2),
+        pt.TealOp(None, pt.Op.b, l1),
+        pt.TealOp(None, pt.Op.callsub, "sub"),
+        pt.TealLabel(None, l2),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, pt.LabelReference("sub")),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+
+    expected = bytes(
+        [0x04, 0x81, 0x01]
+        + [0x40, 0x00, 0x06]
+        + [0x42, 0xFF, 0xF8]
+        + [0x88, 0x00, 0x01]
+        + [0x00, 0x89]
+    )
+    assert assembleBytecode(teal, 4) == expected
+
+    with pytest.raises(pt.TealInternalError):
+        assembleBytecode(teal, 3)
+
+    with pytest.raises(pt.TealInternalError):
+        assembleBytecode([pt.TealOp(None, pt.Op.b, "missing")], 4)
+
+    with pytest.raises(pt.TealInternalError):
+        assembleBytecode([pt.TealLabel(None, l1), pt.TealLabel(None, l1)], 4)
+
+
+def test_label_too_far():
+    label = pt.LabelReference("end")
+    teal = [pt.TealOp(None, pt.Op.bnz, label)]
+    teal += [pt.TealOp(None, pt.Op.pop)] * 0x7FFF
+    teal.append(pt.TealLabel(None, label))
+    assert assembleBytecode(teal, 2)[1:4] == bytes([0x40, 0x7F, 0xFF])
+
+    teal.insert(1, pt.TealOp(None, pt.Op.pop))
+    with pytest.raises(pt.TealInternalError):
+        assembleBytecode(teal, 2)
+
+
+def test_periodic_payment():
+    from examples.signature.periodic_payment import periodic_payment
+
+    program = pt.compileBytecode(periodic_payment(), pt.Mode.Signature, version=2)
+    assert program.hex() == (
+        "02200701e80732008827d00fb0ea01260206d36dec74313620f64e639fb9e8a6f117b6112576"
+        "1a32aabf049271f6d9b6e3a548a9819dddfd66311022123101230c103102241825121031042104"
+        "3102081210310628121031093203123120320312103107291210310821051210310929123120"
+        "320312103107320312103102210612103108251210111043"
+    )
+
+
+def test_assemble_constants_option():
+    from examples.application.vote import approval_program
+
+    for version in (4, 5, 6):
+        program = pt.compileBytecode(
+            approval_program(),
+            pt.Mode.Application,
+            version=version,
+            assembleConstants=True,
+        )
+        assert program[0] == version
+
+        # the constants of this program satisfy both sets of rules, so they assemble identically
+        assert program == pt.compileBytecode(
+            approval_program(), pt.Mode.Application, version=version
+        )
+
+
+def test_compile_bytecode_stats():
+    stats = pt.CompileStats()
+    pt.compileBytecode(pt.Int(1), pt.Mode.Signature, version=2, stats=stats)
+    assert "assembleBytecode" in stats.passTotals()
+    assert "assemble" not in stats.passTotals()
+
+
+def test_program_address():
+    program = pt.compileBytecode(pt.Int(1), pt.Mode.Signature, version=2)
+    assert pt.programAddress(program) == logic.address(program)
@@ -0,0 +1,316 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from pyteal.ast import Expr, ScratchSlot, SubroutineDefinition, structuralFingerprint
+from pyteal.ast.structural import Reference
+from pyteal.ir import Mode
+from pyteal.errors import TealInputError
+
+if TYPE_CHECKING:
+    from pyteal.compiler.optimizer import OptimizeOptions
+
+
+def _digest(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(len(part).to_bytes(4, "big"))
+        h.update(part)
+    return h.digest()
+
+
+def _programDigest(ast: Expr) -> bytes:
+    """Compute a digest of a PyTeal program that depends only on the program's structure.
+
+    The digest combines the structural fingerprints of the program and of the declaration of every
+    subroutine it uses. ScratchSlots and SubroutineDefinitions are identified by the order in which
+    they are first used in the whole program, rather than by their ids, which depend on how many
+    were previously created. The relative order of their ids is hashed as well, since the compiler
+    uses it to assign slots and order subroutines.
+
+    Raises:
+        TealInputError: if the program contains a value which cannot be fingerprinted.
+    """
+    # every slot and subroutine used by the program, in the order in which they are first used
+    references: List[Reference] = []
+    indices: Dict[int, int] = dict()
+
+    def fingerprintDigest(expr: Expr) -> bytes:
+        fingerprint = structuralFingerprint(expr)
+        for ref in fingerprint.references:
+            if id(ref) not in indices:
+                indices[id(ref)] = len(references)
+                references.append(ref)
+        return _digest(
+            fingerprint.digest,
+            repr([indices[id(ref)] for ref in fingerprint.references]).encode(),
+        )
+
+    parts = [fingerprintDigest(ast)]
+
+    # a subroutine's declaration may use more subroutines, so iterate by index
+    visited = 0
+    while visited < len(references):
+        ref = references[visited]
+        visited += 1
+        if not isinstance(ref, SubroutineDefinition):
+            continue
+        parts.append(
+            _digest(
+                ref.name().encode(),
+                repr(ref.returnType).encode(),
+                repr(ref.arguments()).encode(),
+                repr(sorted(ref.by_ref_args)).encode(),
+                fingerprintDigest(ref.getDeclaration()),
+            )
+        )
+
+    for kind in (ScratchSlot, SubroutineDefinition):
+        ordered = sorted(
+            (ref for ref in references if isinstance(ref, kind)),
+            key=lambda ref: ref.id,
+        )
+        parts.append(repr([indices[id(ref)] for ref in ordered]).encode())
+
+    return _digest(*parts)
+
+
+_compilerFingerprint: Optional[bytes] = None
+
+
+def _getCompilerFingerprint() -> bytes:
+    """Get a digest of the PyTeal source code, so that cached programs are invalidated when the
+    compiler changes."""
+    global _compilerFingerprint
+
+    if _compilerFingerprint is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        h = hashlib.blake2b(digest_size=16)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if not filename.endswith(".py") or filename.endswith("_test.py"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                h.update(os.path.relpath(path, root).encode())
+                with open(path, "rb") as f:
+                    h.update(f.read())
+        _compilerFingerprint = h.digest()
+
+    return _compilerFingerprint
+
+
+def compileCacheKey(
+    ast: Expr,
+    mode: Mode,
+    version: int,
+    assembleConstants: bool,
+    optimize: "OptimizeOptions",
+) -> Optional[str]:
+    """Compute the key used to cache the compiled output of a program.
+
+    Args:
+        ast: The PyTeal expression to compile.
+        mode: The mode of the program.
+        version: The TEAL version of the program.
+        assembleConstants: Whether constants will be assembled.
+        optimize: The OptimizeOptions used to compile the program.
+
+    Returns:
+        A hex string which is the same for any two programs that have the same structure and
+        compile options, or None if the program contains values that cannot be hashed structurally.
+    """
+    try:
+        programDigest = _programDigest(ast)
+    except TealInputError:
+        return None
+
+    optimizeDigest = _digest(
+        repr(
+            [
+                (name, value)
+                for name, value in sorted(vars(optimize).items())
+                if not name.startswith("_")
+            ]
+        ).encode()
+    )
+
+    return hashlib.blake2b(
+        _getCompilerFingerprint()
+        + _digest(repr(mode).encode(), repr(version).encode())
+        + _digest(repr(assembleConstants).encode())
+        + optimizeDigest
+        + programDigest,
+        digest_size=32,
+    ).hexdigest()
+
+
+class CompileCacheStats:
+    """Hit and miss counts of a CompileCache."""
+
+    def __init__(self) -> None:
+        # number of lookups served from memory
+        self.memory_hits = 0
+        # number of lookups served from disk
+        self.disk_hits = 0
+        # number of lookups which required compiling the program
+        self.misses = 0
+        # number of programs which could not be cached, because they could not be hashed
+        self.uncacheable = 0
+        # number of entries removed from memory or disk to stay within the size limits
+        self.evictions = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def __repr__(self) -> str:
+        return (
+            "CompileCacheStats(hits={}, memory_hits={}, disk_hits={}, misses={}, "
+            "uncacheable={}, evictions={})"
+        ).format(
+            self.hits,
+            self.memory_hits,
+            self.disk_hits,
+            self.misses,
+            self.uncacheable,
+            self.evictions,
+        )
+
+
+class CompileCache:
+    """A cache of compiled TEAL programs, which can be passed to :any:`compileTeal`.
+
+    Programs are keyed by a hash of their structure and compile options, so compiling an unchanged
+    program returns the previously compiled TEAL without lowering the program again. Entries are
+    kept in an in-memory LRU cache and, if a directory is provided, in files on disk so they can be
+    reused by other processes.
+
+    Example:
+        .. code-block:: python
+
+            cache = CompileCache(directory=".pyteal_cache")
+            teal = compileTeal(approval_program(), mode=Mode.Application, version=6, cache=cache)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        directory: str = None,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        """Create a new CompileCache.
+
+        Args:
+            max_entries (optional): The maximum number of programs kept in memory. Defaults to 256.
+            directory (optional): A directory in which to store compiled programs. If omitted,
+                programs are only cached in memory. The directory is created if it does not exist.
+            max_disk_bytes (optional): The maximum total size of the programs stored in directory.
+                When this is exceeded, the least recently used programs are removed. Defaults to
+                64 MiB.
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.memory: OrderedDict[str, str] = OrderedDict()
+        self.stats = CompileCacheStats()
+        # held while the cache is read or modified, so it can be shared by concurrent compilations
+        self.lock = threading.RLock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory or "", key + ".teal")
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the cached TEAL for a key, or None if it is not cached."""
+        with self.lock:
+            teal = self.memory.get(key)
+            if teal is not None:
+                self.memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return teal
+
+            if self.directory is not None:
+                path = self._path(key)
+                try:
+                    with open(path, "r") as f:
+                        teal = f.read()
+                    # refresh the modification time, which is used to evict old entries
+                    os.utime(path)
+                except OSError:
+                    teal = None
+
+                if teal is not None:
+                    self._putMemory(key, teal)
+                    self.stats.disk_hits += 1
+                    return teal
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: str, teal: str) -> None:
+        """Add compiled TEAL to the cache."""
+        with self.lock:
+            self._putMemory(key, teal)
+
+            if self.directory is not None:
+                fd, tmpPath = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    f.write(teal)
+                os.replace(tmpPath, self._path(key))
+                self._evictDisk()
+
+    def clear(self) -> None:
+        """Remove all programs from the cache, including those stored on disk."""
+        with self.lock:
+            self.memory.clear()
+            for path, _, _ in self._diskEntries():
+                os.remove(path)
+
+    def _putMemory(self, key: str, teal: str) -> None:
+        self.memory[key] = teal
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _diskEntries(self) -> List[Tuple[str, int, float]]:
+        if self.directory is None:
+            return []
+
+        entries: List[Tuple[str, int, float]] = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".teal"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evictDisk(self) -> None:
+        entries = self._diskEntries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_disk_bytes:
+            return
+
+        # remove the least recently used entries first
+        entries.sort(key=lambda entry: entry[2])
+        for path, size, _ in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats.evictions += 1
+
+
+CompileCache.__module__ = "pyteal"
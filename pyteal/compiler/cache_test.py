@@ -0,0 +1,177 @@
+import os
+
+import pytest
+
+import pyteal as pt
+
+from pyteal.compiler.cache import compileCacheKey
+
+
+def build_program(value: int = 1) -> pt.Expr:
+    @pt.Subroutine(pt.TealType.uint64)
+    def double(x):
+        return x * pt.Int(2)
+
+    counter = pt.ScratchVar(pt.TealType.uint64)
+    return pt.Seq(
+        counter.store(pt.Int(value)),
+        pt.If(pt.Txn.fee() > pt.Int(1000), counter.store(double(counter.load()))),
+        pt.Return(counter.load() > pt.Int(0)),
+    )
+
+
+def key_of(
+    program: pt.Expr,
+    mode: pt.Mode = pt.Mode.Application,
+    version: int = 6,
+    assembleConstants: bool = False,
+    optimize: pt.OptimizeOptions = None,
+) -> str:
+    key = compileCacheKey(
+        program, mode, version, assembleConstants, optimize or pt.OptimizeOptions()
+    )
+    assert key is not None
+    return key
+
+
+def test_key_structurally_equal():
+    assert key_of(build_program()) == key_of(build_program())
+
+
+def test_key_differs():
+    key = key_of(build_program())
+
+    assert key != key_of(build_program(2))
+    assert key != key_of(build_program(), mode=pt.Mode.Signature)
+    assert key != key_of(build_program(), version=5)
+    assert key != key_of(build_program(), assembleConstants=True)
+    assert key != key_of(
+        build_program(), optimize=pt.OptimizeOptions(scratch_slots=True)
+    )
+
+
+def test_key_slot_order():
+    a = pt.ScratchVar(pt.TealType.uint64)
+    b = pt.ScratchVar(pt.TealType.uint64)
+    first = pt.Seq(a.store(pt.Int(1)), b.store(pt.Int(2)), pt.Return(a.load()))
+
+    c = pt.ScratchVar(pt.TealType.uint64)
+    d = pt.ScratchVar(pt.TealType.uint64)
+    # the slots are used in the same places, but their ids are in the opposite order
+    second = pt.Seq(d.store(pt.Int(1)), c.store(pt.Int(2)), pt.Return(d.load()))
+
+    assert key_of(first) != key_of(second)
+
+
+def test_key_uncacheable():
+    class Custom(pt.Int):
+        def __init__(self, value: int) -> None:
+            super().__init__(value)
+            self.callback = lambda: value
+
+    program = pt.Return(Custom(1))
+    assert (
+        compileCacheKey(program, pt.Mode.Application, 6, False, pt.OptimizeOptions())
+        is None
+    )
+
+    cache = pt.CompileCache()
+    actual = pt.compileTeal(program, mode=pt.Mode.Application, version=6, cache=cache)
+    assert actual == pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+    assert cache.stats.uncacheable == 1
+    assert cache.stats.hits == 0
+    assert cache.stats.misses == 0
+    assert len(cache.memory) == 0
+
+
+def test_compile_memory():
+    cache = pt.CompileCache()
+    expected = pt.compileTeal(build_program(), mode=pt.Mode.Application, version=6)
+
+    first = pt.compileTeal(
+        build_program(), mode=pt.Mode.Application, version=6, cache=cache
+    )
+    assert first == expected
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 0
+
+    second = pt.compileTeal(
+        build_program(), mode=pt.Mode.Application, version=6, cache=cache
+    )
+    assert second == expected
+    assert cache.stats.misses == 1
+    assert cache.stats.memory_hits == 1
+    assert cache.stats.disk_hits == 0
+
+
+def test_compile_disk(tmp_path):
+    directory = str(tmp_path / "cache")
+    expected = pt.compileTeal(build_program(), mode=pt.Mode.Application, version=6)
+
+    cache = pt.CompileCache(directory=directory)
+    pt.compileTeal(build_program(), mode=pt.Mode.Application, version=6, cache=cache)
+    assert cache.stats.misses == 1
+    assert len(os.listdir(directory)) == 1
+
+    other = pt.CompileCache(directory=directory)
+    actual = pt.compileTeal(
+        build_program(), mode=pt.Mode.Application, version=6, cache=other
+    )
+    assert actual == expected
+    assert other.stats.misses == 0
+    assert other.stats.disk_hits == 1
+
+    # the entry is promoted to memory after it is read from disk
+    pt.compileTeal(build_program(), mode=pt.Mode.Application, version=6, cache=other)
+    assert other.stats.memory_hits == 1
+
+    other.clear()
+    assert len(os.listdir(directory)) == 0
+    assert len(other.memory) == 0
+
+
+def test_memory_eviction():
+    cache = pt.CompileCache(max_entries=2)
+    cache.put("a", "teal a")
+    cache.put("b", "teal b")
+    assert cache.get("a") == "teal a"
+
+    # b is now the least recently used entry
+    cache.put("c", "teal c")
+    assert cache.stats.evictions == 1
+    assert list(cache.memory.keys()) == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_disk_eviction(tmp_path):
+    cache = pt.CompileCache(directory=str(tmp_path), max_disk_bytes=25)
+    cache.put("a", "x" * 10)
+    os.utime(os.path.join(str(tmp_path), "a.teal"), (1, 1))
+    cache.put("b", "x" * 10)
+    os.utime(os.path.join(str(tmp_path), "b.teal"), (2, 2))
+    assert cache.stats.evictions == 0
+
+    cache.put("c", "x" * 10)
+    assert cache.stats.evictions == 1
+    assert sorted(os.listdir(str(tmp_path))) == ["b.teal", "c.teal"]
+
+
+@pytest.mark.parametrize("assembleConstants", [False, True])
+def test_compile_options(assembleConstants):
+    cache = pt.CompileCache()
+    for version in (5, 6):
+        expected = pt.compileTeal(
+            build_program(),
+            mode=pt.Mode.Application,
+            version=version,
+            assembleConstants=assembleConstants,
+        )
+        actual = pt.compileTeal(
+            build_program(),
+            mode=pt.Mode.Application,
+            version=version,
+            assembleConstants=assembleConstants,
+            cache=cache,
+        )
+        assert actual == expected
+    assert cache.stats.misses == 2
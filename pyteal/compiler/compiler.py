@@ -1,6 +1,15 @@
+from contextlib import nullcontext
+from copy import copy
 from typing import List, Tuple, Set, Dict, Optional, cast
 
-from pyteal.compiler.optimizer import OptimizeOptions, apply_global_optimizations
+from pyteal.compiler.optimizer import (
+    OptimizeOptions,
+    apply_global_optimizations,
+    apply_stack_arguments,
+    apply_peephole_optimizations,
+    apply_jump_threading,
+    apply_tail_merging,
+)
 
 from pyteal.types import TealType
 from pyteal.ast import (
@@ -10,7 +19,7 @@ from pyteal.ast import (
     SubroutineDefinition,
     SubroutineDeclaration,
 )
-from pyteal.ir import Mode, TealComponent, TealOp, TealBlock, TealSimpleBlock
+from pyteal.ir import Mode, Op, TealComponent, TealOp, TealBlock, TealSimpleBlock
 from pyteal.errors import TealInputError, TealInternalError
 
 from pyteal.compiler.sort import sortBlocks
@@ -24,6 +33,24 @@ from pyteal.compiler.subroutines import (
     resolveSubroutines,
 )
 from pyteal.compiler.constants import createConstantBlocks
+from pyteal.compiler.inline import inlineSubroutines
+from pyteal.compiler.cse import eliminateCommonSubexpressions
+from pyteal.compiler.folding import foldConstants
+from pyteal.compiler.assembler import assembleBytecode
+from pyteal.compiler.cache import CompileCache, compileCacheKey
+from pyteal.compiler.parallel import (
+    canCompileInParallel,
+    compileSubroutinesInParallel,
+)
+from pyteal.compiler.stats import (
+    MAIN_PROGRAM,
+    CompileStats,
+    MeasurePass,
+    flatSize,
+    getStatsCallbacks,
+    graphSize,
+    skipMeasure,
+)
 
 MAX_TEAL_VERSION = 6
 MIN_TEAL_VERSION = 2
@@ -113,18 +140,52 @@ def verifyOpsForMode(teal: List[TealComponent], mode: Mode):
                 )
 
 
-def compileSubroutine(
+def optimizeExpressions(
     ast: Expr,
     options: CompileOptions,
-    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
-    subroutine_start_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
-    subroutine_end_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
-) -> None:
+    name: str,
+    measure: MeasurePass = skipMeasure,
+) -> Expr:
+    """Apply the optimizations in options which rewrite the expressions of the main program or a
+    subroutine declaration, rather than its graph of blocks.
+
+    Returns:
+        The rewritten program. ast is not modified.
+    """
+    source = ast
+    if options.optimize.constant_folding:
+        folded = 0
+        with measure("foldConstants", name, changes=lambda: folded):
+            ast, folded = foldConstants(ast, options)
+
+    if options.optimize.common_subexpressions:
+        with measure("eliminateCommonSubexpressions", name):
+            ast = eliminateCommonSubexpressions(ast, options, source)
+
+    return ast
+
+
+def lowerSubroutine(
+    ast: Expr,
+    options: CompileOptions,
+    measure: MeasurePass = skipMeasure,
+) -> Tuple[TealBlock, TealSimpleBlock, List[TealComponent]]:
+    """Lower the main program or a subroutine declaration to a normalized graph of blocks.
+
+    This does not compile any subroutines referenced by ast.
+
+    Returns:
+        The start and end blocks of the graph, and the flattened graph, which has been checked
+        against the mode and version in options.
+    """
     currentSubroutine = (
         cast(SubroutineDeclaration, ast).subroutine
         if isinstance(ast, SubroutineDeclaration)
         else None
     )
+    name = currentSubroutine.name() if currentSubroutine is not None else MAIN_PROGRAM
+
+    ast = optimizeExpressions(ast, options, name, measure)
 
     if not ast.has_return():
         if ast.type_of() == TealType.none:
@@ -138,19 +199,50 @@ def compileSubroutine(
             ret_expr.trace = ast.trace
             ast = ret_expr
 
+    start: TealBlock
+    end: TealSimpleBlock
+    teal: List[TealComponent]
+
     options.setSubroutine(currentSubroutine)
-    start, end = ast.__teal__(options)
-    start.addIncoming()
-    start.validateTree()
+    with measure("lower", name, lambda: graphSize(start)):
+        start, end = ast.__teal__(options)
+
+    with measure("validateTree", name):
+        start.addIncoming()
+        start.validateTree()
+
+    with measure("NormalizeBlocks", name, lambda: graphSize(start)):
+        start = TealBlock.NormalizeBlocks(start)
+        start.validateTree()
+
+    with measure("sortBlocks", name):
+        order = sortBlocks(start, end)
+
+    with measure("flattenBlocks", name, lambda: flatSize(teal)):
+        teal = flattenBlocks(order)
 
-    start = TealBlock.NormalizeBlocks(start)
-    start.validateTree()
+    with measure("verifyOps", name):
+        verifyOpsForVersion(teal, options.version)
+        verifyOpsForMode(teal, options.mode)
 
-    order = sortBlocks(start, end)
-    teal = flattenBlocks(order)
+    return start, end, teal
 
-    verifyOpsForVersion(teal, options.version)
-    verifyOpsForMode(teal, options.mode)
+
+def compileSubroutine(
+    ast: Expr,
+    options: CompileOptions,
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
+    subroutine_start_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    subroutine_end_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    measure: MeasurePass = skipMeasure,
+) -> None:
+    currentSubroutine = (
+        cast(SubroutineDeclaration, ast).subroutine
+        if isinstance(ast, SubroutineDeclaration)
+        else None
+    )
+
+    start, end, teal = lowerSubroutine(ast, options, measure)
 
     subroutine_start_blocks[currentSubroutine] = start
     subroutine_end_blocks[currentSubroutine] = end
@@ -171,23 +263,55 @@ def compileSubroutine(
             subroutineGraph,
             subroutine_start_blocks,
             subroutine_end_blocks,
+            measure,
         )
 
 
 def sort_subroutine_blocks(
     subroutine_start_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
     subroutine_end_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    measure: MeasurePass = skipMeasure,
 ) -> Dict[Optional[SubroutineDefinition], List[TealComponent]]:
     subroutine_mapping: Dict[
         Optional[SubroutineDefinition], List[TealComponent]
     ] = dict()
     for subroutine, start in subroutine_start_blocks.items():
-        order = sortBlocks(start, subroutine_end_blocks[subroutine])
-        subroutine_mapping[subroutine] = flattenBlocks(order)
+        name = subroutine.name() if subroutine is not None else MAIN_PROGRAM
+        with measure(
+            "sortSubroutineBlocks",
+            name,
+            lambda: flatSize(subroutine_mapping[subroutine]),
+        ):
+            order = sortBlocks(start, subroutine_end_blocks[subroutine])
+            subroutine_mapping[subroutine] = flattenBlocks(order)
 
     return subroutine_mapping
 
 
+def verifyCompileArgs(version: int, parallel: int) -> None:
+    """Check the version and number of parallel processes passed to a compile function.
+
+    Raises:
+        TealInputError: if either argument is invalid.
+    """
+    if (
+        not (MIN_TEAL_VERSION <= version <= MAX_TEAL_VERSION)
+        or type(version) is not int
+    ):
+        raise TealInputError(
+            "Unsupported TEAL version: {}. Excepted an integer in the range [{}, {}]".format(
+                version, MIN_TEAL_VERSION, MAX_TEAL_VERSION
+            )
+        )
+
+    if type(parallel) is not int or parallel < 0:
+        raise TealInputError(
+            "Invalid number of parallel processes: {}. Expected a non-negative integer".format(
+                parallel
+            )
+        )
+
+
 def compileTeal(
     ast: Expr,
     mode: Mode,
@@ -195,6 +319,9 @@ def compileTeal(
     version: int = DEFAULT_TEAL_VERSION,
     assembleConstants: bool = False,
     optimize: OptimizeOptions = None,
+    cache: CompileCache = None,
+    stats: CompileStats = None,
+    parallel: int = 0,
 ) -> str:
     """Compile a PyTeal expression into TEAL assembly.
 
@@ -210,6 +337,19 @@ def compileTeal(
             the compiled program's size. Enabling this option requires a minimum TEAL version of 3.
             Defaults to false.
         optimize (optional): OptimizeOptions that determine which optimizations will be applied.
+        cache (optional): A CompileCache to look up the compiled program in before compiling it. If
+            the program is not in the cache, it will be compiled and then added to the cache.
+            Programs that cannot be hashed structurally are compiled without using the cache.
+            Defaults to None, in which case the program is always compiled.
+        stats (optional): A CompileStats in which to record the time, allocations, and IR sizes of
+            each compiler pass. Defaults to None, in which case stats are only recorded if a
+            callback has been registered with :any:`collectCompileStats`.
+        parallel (optional): The number of worker processes used to lower the program and its
+            subroutines. The output is identical to a serial compile. Worker processes are forked,
+            so if the platform does not support forking, the program is compiled serially. It is
+            also compiled serially if an expression creates a ScratchSlot or SubroutineDefinition
+            while it is lowered, which is recorded in the parallel_fallback attribute of stats.
+            Defaults to 0, in which case the program is compiled in the current process.
 
     Returns:
         A TEAL assembly program compiled from the input expression.
@@ -218,24 +358,187 @@ def compileTeal(
         TealInputError: if an operation in ast is not supported by the supplied mode and version.
         TealInternalError: if an internal error is encounter during compilation.
     """
-    if (
-        not (MIN_TEAL_VERSION <= version <= MAX_TEAL_VERSION)
-        or type(version) is not int
-    ):
-        raise TealInputError(
-            "Unsupported TEAL version: {}. Excepted an integer in the range [{}, {}]".format(
-                version, MIN_TEAL_VERSION, MAX_TEAL_VERSION
-            )
+    verifyCompileArgs(version, parallel)
+
+    options = CompileOptions(mode=mode, version=version, optimize=optimize)
+
+    callbacks = getStatsCallbacks()
+    if stats is None and len(callbacks) != 0:
+        stats = CompileStats(trace_allocations=any(trace for _, trace in callbacks))
+
+    with stats.compiling() if stats is not None else nullcontext():
+        program, cached = compileProgram(
+            ast, options, assembleConstants, cache, stats, parallel
         )
+        if stats is not None and cache is not None:
+            stats.cache_hit = cached
+
+    if stats is not None:
+        for callback, _ in callbacks:
+            callback(stats)
+
+    return program
+
+
+def compileBytecode(
+    ast: Expr,
+    mode: Mode,
+    *,
+    version: int = DEFAULT_TEAL_VERSION,
+    assembleConstants: bool = False,
+    optimize: OptimizeOptions = None,
+    stats: CompileStats = None,
+    parallel: int = 0,
+) -> bytes:
+    """Compile a PyTeal expression into TEAL bytecode, without calling algod.
+
+    The bytecode is identical to the output of algod's assembler for the program produced by
+    :any:`compileTeal` with the same arguments.
+
+    Args:
+        ast: The PyTeal expression to assemble.
+        mode: The mode of the program to assemble. Must be Signature or Application.
+        version (optional): The TEAL version used to assemble the program. Defaults to 2 if not
+            included.
+        assembleConstants (optional): When true, constants are assembled by the compiler, as in
+            :any:`compileTeal`. Otherwise they are assembled the same way algod assembles the
+            pseudo-ops `int`, `byte`, and `addr`. Defaults to false.
+        optimize (optional): OptimizeOptions that determine which optimizations will be applied.
+        stats (optional): A CompileStats in which to record the time, allocations, and IR sizes of
+            each compiler pass. Defaults to None, in which case stats are only recorded if a
+            callback has been registered with :any:`collectCompileStats`.
+        parallel (optional): The number of worker processes used to lower the program and its
+            subroutines, as in :any:`compileTeal`. Defaults to 0.
+
+    Returns:
+        The bytecode of the program. Use :any:`programAddress` to get the address of its contract
+        account.
+
+    Raises:
+        TealInputError: if an operation in ast is not supported by the supplied mode and version,
+            or if ast contains a template variable.
+        TealInternalError: if an internal error is encounter during compilation.
+    """
+    verifyCompileArgs(version, parallel)
 
     options = CompileOptions(mode=mode, version=version, optimize=optimize)
 
+    callbacks = getStatsCallbacks()
+    if stats is None and len(callbacks) != 0:
+        stats = CompileStats(trace_allocations=any(trace for _, trace in callbacks))
+
+    with stats.compiling() if stats is not None else nullcontext():
+        teal = compileComponents(ast, options, assembleConstants, stats, parallel)
+        with stats.measure("assembleBytecode") if stats is not None else nullcontext():
+            program = assembleBytecode(teal, version)
+
+    if stats is not None:
+        for callback, _ in callbacks:
+            callback(stats)
+
+    return program
+
+
+def compileProgram(
+    ast: Expr,
+    options: CompileOptions,
+    assembleConstants: bool,
+    cache: Optional[CompileCache],
+    stats: Optional[CompileStats],
+    parallel: int,
+) -> Tuple[str, bool]:
+    """Compile a program, or look it up in a cache.
+
+    Returns:
+        The compiled TEAL program, and whether it was found in the cache.
+    """
+    version = options.version
+    measure = stats.measure if stats is not None else skipMeasure
+
+    cacheKey: Optional[str] = None
+    if cache is not None:
+        with measure("cacheLookup"):
+            cacheKey = compileCacheKey(
+                ast, options.mode, version, assembleConstants, options.optimize
+            )
+            cached = cache.get(cacheKey) if cacheKey is not None else None
+        if cacheKey is None:
+            with cache.lock:
+                cache.stats.uncacheable += 1
+        elif cached is not None:
+            return cached, True
+
+    teal = compileComponents(ast, options, assembleConstants, stats, parallel)
+
+    with measure("assemble"):
+        lines = ["#pragma version {}".format(version)]
+        lines += [i.assemble() for i in teal]
+        program = "\n".join(lines)
+
+    if cache is not None and cacheKey is not None:
+        cache.put(cacheKey, program)
+
+    return program, False
+
+
+def compileComponents(
+    ast: Expr,
+    options: CompileOptions,
+    assembleConstants: bool,
+    stats: Optional[CompileStats],
+    parallel: int,
+) -> List[TealComponent]:
+    """Compile a program into a flat list of TealComponents, ready to be assembled."""
+    version = options.version
+    measure = stats.measure if stats is not None else skipMeasure
+
     subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]] = dict()
     subroutine_start_blocks: Dict[Optional[SubroutineDefinition], TealBlock] = dict()
     subroutine_end_blocks: Dict[Optional[SubroutineDefinition], TealBlock] = dict()
-    compileSubroutine(
-        ast, options, subroutineGraph, subroutine_start_blocks, subroutine_end_blocks
+    compiledInParallel = (
+        parallel > 0
+        and canCompileInParallel()
+        and compileSubroutinesInParallel(
+            ast,
+            options,
+            subroutineGraph,
+            subroutine_start_blocks,
+            subroutine_end_blocks,
+            parallel,
+            stats,
+        )
     )
+    if parallel > 0 and stats is not None:
+        stats.parallel_fallback = not compiledInParallel
+    if not compiledInParallel:
+        compileSubroutine(
+            ast,
+            options,
+            subroutineGraph,
+            subroutine_start_blocks,
+            subroutine_end_blocks,
+            measure,
+        )
+
+    if options.optimize.inline_subroutines:
+        inlined: List[SubroutineDefinition] = []
+        with measure("inlineSubroutines", changes=lambda: len(inlined)):
+            inlined = inlineSubroutines(
+                subroutineGraph,
+                subroutine_start_blocks,
+                subroutine_end_blocks,
+                options.mode,
+                options.optimize,
+            )
+
+    if options.optimize.stack_arguments and version >= Op.uncover.min_version:
+        for subroutine, start in subroutine_start_blocks.items():
+            if subroutine is None:
+                continue
+            with measure(
+                "optimizeStackArguments", subroutine.name(), lambda: graphSize(start)
+            ):
+                apply_stack_arguments(start, subroutine.argumentCount())
 
     # note: optimizations are off by default, in which case, apply_global_optimizations
     # won't make any changes. Because the optimizer is invoked on a subroutine's
@@ -243,24 +546,71 @@ def compileTeal(
     # is necessary for the dependency checking of local slots. Global slots, slots
     # used by DynamicScratchVar, and reserved slots are not optimized.
     if options.optimize.scratch_slots:
-        options.optimize._skip_slots = collect_unoptimized_slots(
-            subroutine_start_blocks
+        # the skipped slots are specific to this program, so they are stored in a copy of the
+        # options, which may be shared with other compilations
+        optimize = copy(options.optimize)
+        with measure("collectUnoptimizedSlots"):
+            optimize._skip_slots = collect_unoptimized_slots(subroutine_start_blocks)
+        for subroutine, start in subroutine_start_blocks.items():
+            name = subroutine.name() if subroutine is not None else MAIN_PROGRAM
+            with measure("optimizeScratchSlots", name, lambda: graphSize(start)):
+                apply_global_optimizations(start, optimize)
+
+    teal: List[TealComponent]
+
+    # with the scratch slot optimization, only the local slots which are live after a recursive
+    # call are spilled around it
+    liveSlotsAtCalls: Optional[Dict[int, Set[int]]] = (
+        dict() if options.optimize.scratch_slots else None
+    )
+    with measure("assignScratchSlots"):
+        localSlotAssignments = assignScratchSlotsToSubroutines(
+            subroutine_start_blocks, options.optimize.scratch_slots, liveSlotsAtCalls
         )
-        for start in subroutine_start_blocks.values():
-            apply_global_optimizations(start, options.optimize)
-
-    localSlotAssignments = assignScratchSlotsToSubroutines(subroutine_start_blocks)
 
     subroutineMapping: Dict[
         Optional[SubroutineDefinition], List[TealComponent]
-    ] = sort_subroutine_blocks(subroutine_start_blocks, subroutine_end_blocks)
+    ] = sort_subroutine_blocks(subroutine_start_blocks, subroutine_end_blocks, measure)
 
-    spillLocalSlotsDuringRecursion(
-        version, subroutineMapping, subroutineGraph, localSlotAssignments
-    )
+    with measure(
+        "spillLocalSlotsDuringRecursion",
+        size=lambda: flatSize(
+            [stmt for stmts in subroutineMapping.values() for stmt in stmts]
+        ),
+    ):
+        spillLocalSlotsDuringRecursion(
+            version,
+            subroutineMapping,
+            subroutineGraph,
+            localSlotAssignments,
+            liveSlotsAtCalls,
+        )
+
+    with measure("resolveSubroutines"):
+        subroutineLabels = resolveSubroutines(subroutineMapping)
+
+    with measure("flattenSubroutines", size=lambda: flatSize(teal)):
+        teal = flattenSubroutines(subroutineMapping, subroutineLabels)
+
+    if options.optimize.peephole:
+        with measure(
+            "optimizePeephole",
+            size=lambda: flatSize(teal),
+            changes=lambda: sum(hits.values()),
+        ):
+            teal, hits = apply_peephole_optimizations(teal, version, options.mode)
+
+    if options.optimize.tail_merging:
+        saved = 0
+        with measure("mergeTails", size=lambda: flatSize(teal), changes=lambda: saved):
+            teal, saved = apply_tail_merging(teal, version)
 
-    subroutineLabels = resolveSubroutines(subroutineMapping)
-    teal = flattenSubroutines(subroutineMapping, subroutineLabels)
+    if options.optimize.jump_threading:
+        threaded = 0
+        with measure(
+            "threadJumps", size=lambda: flatSize(teal), changes=lambda: threaded
+        ):
+            teal, threaded = apply_jump_threading(teal)
 
     if assembleConstants:
         if version < 3:
@@ -269,8 +619,7 @@ def compileTeal(
                     version
                 )
             )
-        teal = createConstantBlocks(teal)
+        with measure("createConstantBlocks", size=lambda: flatSize(teal)):
+            teal = createConstantBlocks(teal)
 
-    lines = ["#pragma version {}".format(version)]
-    lines += [i.assemble() for i in teal]
-    return "\n".join(lines)
+    return teal
@@ -72,16 +72,16 @@ def test_compile_branch_multiple():
     expected = """
 #pragma version 2
 int 1
-bnz main_l4
-int 3
 bnz main_l3
+int 3
+bnz main_l4
 int 5
 b main_l5
 main_l3:
-int 4
+int 2
 b main_l5
 main_l4:
-int 2
+int 4
 main_l5:
 return
 """.strip()
@@ -840,8 +840,12 @@ main_l3:
 load 0
 int 6
 <
-bnz main_l6
-main_l4:
+bz main_l5
+load 0
+int 3
+==
+bz main_l7
+main_l5:
 load 0
 int 5
 <
@@ -851,11 +855,7 @@ int 1
 +
 store 0
 b main_l1
-main_l6:
-load 0
-int 3
-==
-bnz main_l4
+main_l7:
 load 0
 int 1
 +
@@ -951,18 +951,16 @@ def test_compile_subroutine_with_return():
 txn Sender
 global CreatorAddress
 ==
-bnz main_l3
-main_l1:
+bz main_l2
+txna ApplicationArgs 0
+callsub storeValue_0
+main_l2:
 callsub getValue_1
 byte "fail"
 ==
 bz main_l4
 int 0
 return
-main_l3:
-txna ApplicationArgs 0
-callsub storeValue_0
-b main_l1
 main_l4:
 int 1
 return
@@ -1062,11 +1060,11 @@ store 0
 load 0
 int 0
 ==
-bnz isEven_0_l4
+bnz isEven_0_l3
 load 0
 int 1
 ==
-bnz isEven_0_l3
+bnz isEven_0_l4
 load 0
 int 2
 -
@@ -1079,10 +1077,10 @@ swap
 pop
 b isEven_0_l5
 isEven_0_l3:
-int 0
+int 1
 b isEven_0_l5
 isEven_0_l4:
-int 1
+int 0
 isEven_0_l5:
 retsub
     """.strip()
@@ -1116,11 +1114,11 @@ store 0
 load 0
 int 0
 ==
-bnz isEven_0_l4
+bnz isEven_0_l3
 load 0
 int 1
 ==
-bnz isEven_0_l3
+bnz isEven_0_l4
 load 0
 int 2
 -
@@ -1131,10 +1129,10 @@ swap
 store 0
 b isEven_0_l5
 isEven_0_l3:
-int 0
+int 1
 b isEven_0_l5
 isEven_0_l4:
-int 1
+int 0
 isEven_0_l5:
 retsub
     """.strip()
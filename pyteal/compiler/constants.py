@@ -62,6 +62,15 @@ def extractBytesValue(op: TealOp) -> Union[str, bytes]:
     value = op.args[0]
     if value.startswith("TMPL_"):
         return value
+    return parseBytesValue(value)
+
+
+def parseBytesValue(value: str) -> bytes:
+    """Parse a byte string written in one of the formats accepted by the byte pseudo-op.
+
+    Raises:
+        TealInternalError: if the value is not in a recognized format.
+    """
     if value.startswith('"') and value.endswith('"'):
         return unescapeStr(value).encode("utf-8")
     if value.startswith("0x"):
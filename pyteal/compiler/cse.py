@@ -0,0 +1,689 @@
+from copy import copy
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    cast,
+)
+
+from pyteal.types import TealType
+from pyteal.ast import (
+    Expr,
+    Addr,
+    App,
+    Arg,
+    Assert,
+    BinaryExpr,
+    Break,
+    Bytes,
+    Cond,
+    Continue,
+    EnumInt,
+    Err,
+    Fingerprint,
+    For,
+    Global,
+    GlobalField,
+    If,
+    Int,
+    MethodSignature,
+    NaryExpr,
+    Return,
+    ScratchLoad,
+    ScratchSlot,
+    ScratchStackStore,
+    ScratchStore,
+    Seq,
+    SubroutineCall,
+    SubroutineDeclaration,
+    Tmpl,
+    TxnExpr,
+    TxnaExpr,
+    UnaryExpr,
+    While,
+    structuralFingerprint,
+)
+from pyteal.ast.gtxn import GtxnExpr, GtxnaExpr
+from pyteal.ast.return_ import ExitProgram
+from pyteal.ast.ternaryexpr import TernaryExpr
+from pyteal.ast.substring import ExtractExpr, SubstringExpr, SuffixExpr
+from pyteal.ir import Op, TealBlock, TealOp, TealSimpleBlock
+from pyteal.errors import TealCompileError, TealInputError, TealInternalError
+
+if TYPE_CHECKING:
+    from pyteal.compiler.compiler import CompileOptions
+
+# The value of an expression may depend on the state of the application, the state of accounts, and
+# scratch slots. An expression which changes one of these kills every available value which depends
+# on it. The dependencies of a value are a set of these states and the ScratchSlots it loads.
+_APP_STATE = "app state"
+_ACCOUNT_STATE = "account state"
+
+Dependencies = FrozenSet[object]
+
+_NO_DEPENDENCIES: Dependencies = frozenset()
+
+_APP_STATE_READS = frozenset((Op.app_opted_in, Op.app_local_get, Op.app_global_get))
+_APP_STATE_WRITES = frozenset(
+    (Op.app_local_put, Op.app_global_put, Op.app_local_del, Op.app_global_del)
+)
+_ACCOUNT_STATE_READS = frozenset((Op.balance, Op.min_balance))
+
+# the attribute of a program in which the slots of its reused values are kept, which is not part of
+# its structure
+_SLOTS = "_cseSlots"
+
+# ops of UnaryExprs which have an effect but no value
+_UNARY_EFFECTS = frozenset((Op.pop, Op.log))
+
+# transaction ops whose values are the same for the whole program, unlike the fields of inner
+# transactions
+_TXN_OPS = frozenset(
+    (
+        Op.txn,
+        Op.txna,
+        Op.txnas,
+        Op.gtxn,
+        Op.gtxna,
+        Op.gtxnas,
+        Op.gtxns,
+        Op.gtxnsa,
+        Op.gtxnsas,
+    )
+)
+
+# expressions without operands whose values are the same for the whole program
+_CONSTANTS = (Int, EnumInt, Bytes, Addr, MethodSignature, Tmpl, Arg)
+
+# the attributes of expressions whose operands are evaluated in order and then consumed by one op
+_OPERANDS: Dict[type, Tuple[str, ...]] = {
+    UnaryExpr: ("arg",),
+    BinaryExpr: ("argLeft", "argRight"),
+    TernaryExpr: ("firstArg", "secondArg", "thirdArg"),
+    NaryExpr: ("args",),
+    App: ("args",),
+    SubstringExpr: ("stringArg", "startArg", "endArg"),
+    ExtractExpr: ("stringArg", "startArg", "lenArg"),
+    SuffixExpr: ("stringArg", "startArg"),
+}
+
+# expressions whose operands are evaluated with nothing in between, so an operand which is the same
+# as the one before it can be duplicated on the stack
+_ADJACENT_OPERANDS = (BinaryExpr, TernaryExpr)
+
+
+class CSEValue(Expr):
+    """The first evaluation of a repeated value, which saves the value if it is reused later."""
+
+    def __init__(self, value: Expr) -> None:
+        super().__init__()
+        self.value = value
+        self.trace = value.trace
+        # the slot the value is saved in, if any
+        self.slot: Optional[ScratchSlot] = None
+
+    def __teal__(self, options: "CompileOptions"):
+        start, end = self.value.__teal__(options)
+        if self.slot is None:
+            return start, end
+
+        saveBlock = TealSimpleBlock(
+            [TealOp(self, Op.dup), TealOp(self, Op.store, self.slot)]
+        )
+        end.setNextBlock(saveBlock)
+        return start, saveBlock
+
+    def __str__(self):
+        return str(self.value)
+
+    def type_of(self):
+        return self.value.type_of()
+
+    def has_return(self):
+        return False
+
+
+class CSEReuse(Expr):
+    """A later evaluation of a repeated value, which reuses the value of its first evaluation."""
+
+    def __init__(self, original: Expr) -> None:
+        super().__init__()
+        self.original = original
+        self.trace = original.trace
+        # the slot the value was saved in, or None if the value is duplicated from the operand
+        # before this one, in which case dup is True
+        self.slot: Optional[ScratchSlot] = None
+        self.dup = False
+
+    def __teal__(self, options: "CompileOptions"):
+        if self.slot is not None:
+            return TealBlock.FromOp(options, TealOp(self, Op.load, self.slot))
+        if self.dup:
+            return TealBlock.FromOp(options, TealOp(self, Op.dup))
+        return self.original.__teal__(options)
+
+    def __str__(self):
+        return str(self.original)
+
+    def type_of(self):
+        return self.original.type_of()
+
+    def has_return(self):
+        return False
+
+
+class _Entry:
+    """A value which has been evaluated, and may be reused."""
+
+    def __init__(
+        self, original: Expr, fingerprint: Fingerprint, dependencies: Dependencies
+    ) -> None:
+        self.original = original
+        self.fingerprint = fingerprint
+        self.dependencies = dependencies
+        self.value = CSEValue(original)
+        self.reuses: List[CSEReuse] = []
+        # whether the first reuse immediately follows the first evaluation
+        self.adjacent = False
+
+    def isDuplicated(self) -> bool:
+        """Check if the value is reused once, immediately after the first evaluation, so it can be
+        duplicated on the stack rather than saved."""
+        return self.adjacent and len(self.reuses) == 1
+
+
+# the values which are available to be reused, keyed by fingerprint
+_Available = Dict[Fingerprint, _Entry]
+
+_Operands = Tuple[Dict[str, Any], Optional[Dependencies]]
+
+
+def _surviving(before: _Available, *afters: _Available) -> _Available:
+    """Get the values in before which are still available in every one of afters."""
+    return {
+        fingerprint: entry
+        for fingerprint, entry in before.items()
+        if all(after.get(fingerprint) is entry for after in afters)
+    }
+
+
+def _update(available: _Available, surviving: _Available) -> None:
+    available.clear()
+    available.update(surviving)
+
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a is b
+
+
+def _replace(expr: Expr, changes: Dict[str, Any]) -> Expr:
+    """Copy an expression with some attributes replaced, or return it if they are unchanged."""
+    if all(_same(getattr(expr, name), value) for name, value in changes.items()):
+        return expr
+    replaced = copy(expr)
+    # the copy must not keep the memoized fingerprint of the original
+    replaced.__dict__.pop("_fingerprint", None)
+    for name, value in changes.items():
+        setattr(replaced, name, value)
+    return replaced
+
+
+class _Eliminator:
+    """Finds the repeated values of the main program or a subroutine.
+
+    Expressions are visited in the order they are evaluated. A value can be reused if it has been
+    evaluated on every path to the reuse, and none of its dependencies have changed since. Values
+    are never moved, so nothing is evaluated on a path where it was not evaluated before.
+    """
+
+    def __init__(
+        self,
+        excluded: Set[Fingerprint],
+        loopKills: Dict[int, Optional[Set[object]]],
+    ) -> None:
+        # fingerprints of values which are not worth reusing
+        self.excluded = excluded
+        # the dependencies killed by each loop, keyed by the identity of the loop
+        self.loopKills = loopKills
+        self.entries: List[_Entry] = []
+        # the dependencies which have been killed, or None if any state may have changed
+        self.killed: Optional[Set[object]] = set()
+        # the entry of the last reuse which was found
+        self.lastReused: Optional[_Entry] = None
+
+    def kill(self, available: _Available, killed: Optional[Set[object]]) -> None:
+        """Remove the values which depend on killed from available. If killed is None, any state
+        may have changed, so every value which has a dependency is removed."""
+        if killed is None:
+            self.killed = None
+        elif self.killed is not None:
+            self.killed |= killed
+
+        for fingerprint, entry in list(available.items()):
+            if len(entry.dependencies) != 0 and (
+                killed is None or not entry.dependencies.isdisjoint(killed)
+            ):
+                del available[fingerprint]
+
+    def visit(
+        self, expr: Expr, available: _Available
+    ) -> Tuple[Expr, Optional[Dependencies]]:
+        """Visit an expression, updating available to the values which are available after it.
+
+        Returns:
+            The rewritten expression, and the dependencies of its value, or None if it has no value
+            which can be reused.
+        """
+        t = type(expr)
+
+        if isinstance(expr, _CONSTANTS):
+            return expr, _NO_DEPENDENCIES
+        if t in (TxnExpr, TxnaExpr, GtxnExpr, GtxnaExpr):
+            return self.visitTxn(expr, available)
+        if t is Global:
+            if cast(Global, expr).field == GlobalField.opcode_budget:
+                return expr, None
+            return expr, _NO_DEPENDENCIES
+        if t is ScratchLoad:
+            load = cast(ScratchLoad, expr)
+            if load.index_expression is not None:
+                return self.visitOpaque(expr, available)
+            return expr, frozenset((load.slot,))
+        if t in _OPERANDS:
+            return self.visitOperation(expr, available)
+
+        if t is Seq:
+            args = [self.visit(arg, available)[0] for arg in cast(Seq, expr).args]
+            return _replace(expr, {"args": args}), None
+        if t is If:
+            return self.visitIf(cast(If, expr), available), None
+        if t is Cond:
+            return self.visitCond(cast(Cond, expr), available), None
+        if t is While:
+            return self.visitWhile(cast(While, expr), available), None
+        if t is For:
+            return self.visitFor(cast(For, expr), available), None
+        if t is Return:
+            value = cast(Return, expr).value
+            if value is None:
+                return expr, None
+            return _replace(expr, {"value": self.visit(value, available)[0]}), None
+        if t is ExitProgram:
+            success = self.visit(cast(ExitProgram, expr).success, available)[0]
+            return _replace(expr, {"success": success}), None
+        if t is Assert:
+            cond = self.visit(cast(Assert, expr).cond, available)[0]
+            return _replace(expr, {"cond": cond}), None
+        if t is ScratchStore and cast(ScratchStore, expr).index_expression is None:
+            store = cast(ScratchStore, expr)
+            value = self.visit(store.value, available)[0]
+            self.kill(available, {store.slot})
+            return _replace(expr, {"value": value}), None
+        if t is ScratchStackStore:
+            self.kill(available, {cast(ScratchStackStore, expr).slot})
+            return expr, None
+        if t is SubroutineCall:
+            callArgs = [
+                self.visit(arg, available)[0] if isinstance(arg, Expr) else arg
+                for arg in cast(SubroutineCall, expr).args
+            ]
+            # the subroutine may change any state
+            self.kill(available, None)
+            return _replace(expr, {"args": callArgs}), None
+        if t is SubroutineDeclaration:
+            body = self.visit(cast(SubroutineDeclaration, expr).body, available)[0]
+            return _replace(expr, {"body": body}), None
+        if t in (Break, Continue, Err):
+            return expr, None
+
+        return self.visitOpaque(expr, available)
+
+    def visitOpaque(
+        self, expr: Expr, available: _Available
+    ) -> Tuple[Expr, Optional[Dependencies]]:
+        """Visit an expression which is not understood, and which may change any state."""
+        self.kill(available, None)
+        return expr, None
+
+    def visitTxn(
+        self, expr: Expr, available: _Available
+    ) -> Tuple[Expr, Optional[Dependencies]]:
+        if isinstance(expr, TxnaExpr):
+            ops = [expr.staticOp, expr.dynamicOp]
+        else:
+            ops = [cast(TxnExpr, expr).op]
+        if any(op is not None and op not in _TXN_OPS for op in ops):
+            return self.visitOpaque(expr, available)
+
+        names = [
+            name
+            for name in ("txnIndex", "index")
+            if isinstance(getattr(expr, name, None), Expr)
+        ]
+        if len(names) == 0:
+            return expr, _NO_DEPENDENCIES
+        return self.visitValue(expr, names, available)
+
+    def visitOperation(
+        self, expr: Expr, available: _Available
+    ) -> Tuple[Expr, Optional[Dependencies]]:
+        t = type(expr)
+        if t is App:
+            app = cast(App, expr)
+            op: Optional[Op] = app.field.get_op()
+            if op in _APP_STATE_WRITES:
+                args = [self.visit(arg, available)[0] for arg in app.args]
+                self.kill(available, {_APP_STATE})
+                return _replace(expr, {"args": args}), None
+            if op not in _APP_STATE_READS:
+                return self.visitOpaque(expr, available)
+        else:
+            op = getattr(expr, "op", None)
+
+        if t is UnaryExpr and op in _UNARY_EFFECTS:
+            arg = self.visit(cast(UnaryExpr, expr).arg, available)[0]
+            return _replace(expr, {"arg": arg}), None
+
+        visitOperands: Optional[Callable[[], _Operands]] = None
+        if t is NaryExpr and op in (Op.logic_and, Op.logic_or):
+            nary = cast(NaryExpr, expr)
+            visitOperands = partial(self.visitLogicOperands, nary, available)
+
+        state = _NO_DEPENDENCIES
+        if op in _APP_STATE_READS:
+            state = frozenset((_APP_STATE,))
+        elif op in _ACCOUNT_STATE_READS:
+            state = frozenset((_ACCOUNT_STATE,))
+        return self.visitValue(expr, _OPERANDS[t], available, visitOperands, state)
+
+    def visitValue(
+        self,
+        expr: Expr,
+        names: Sequence[str],
+        available: _Available,
+        visitOperands: Optional[Callable[[], _Operands]] = None,
+        state: Dependencies = _NO_DEPENDENCIES,
+    ) -> Tuple[Expr, Optional[Dependencies]]:
+        """Visit an expression which has a value that may be reused, and whose operands are the
+        attributes in names. The value also depends on state, besides the dependencies of its
+        operands."""
+        try:
+            fingerprint: Optional[Fingerprint] = structuralFingerprint(expr)
+        except TealInputError:
+            fingerprint = None
+
+        if fingerprint is not None:
+            entry = available.get(fingerprint)
+            if entry is not None:
+                reuse = CSEReuse(expr)
+                entry.reuses.append(reuse)
+                self.lastReused = entry
+                return reuse, entry.dependencies
+
+        if visitOperands is not None:
+            changes, dependencies = visitOperands()
+        else:
+            changes, dependencies = self.visitOperands(expr, names, available)
+        rewritten = _replace(expr, changes)
+        if dependencies is not None:
+            dependencies = dependencies | state
+
+        if (
+            dependencies is None
+            or fingerprint is None
+            or fingerprint in self.excluded
+            or expr.type_of() == TealType.none
+        ):
+            return rewritten, dependencies
+
+        entry = _Entry(expr, fingerprint, dependencies)
+        entry.value.value = rewritten
+        self.entries.append(entry)
+        available[fingerprint] = entry
+        return entry.value, dependencies
+
+    def visitOperands(
+        self, expr: Expr, names: Sequence[str], available: _Available
+    ) -> _Operands:
+        changes: Dict[str, Any] = dict()
+        dependencies: Optional[Set[object]] = set()
+        adjacent = isinstance(expr, _ADJACENT_OPERANDS)
+        previous: Optional[Expr] = None
+
+        for name in names:
+            value = getattr(expr, name)
+            operands = value if isinstance(value, (list, tuple)) else [value]
+
+            rewrittenOperands = []
+            for operand in operands:
+                rewritten, operandDependencies = self.visit(operand, available)
+                if adjacent and isinstance(rewritten, CSEReuse):
+                    entry = self.lastReused
+                    if entry is not None and entry.value is previous:
+                        entry.adjacent = len(entry.reuses) == 1
+                previous = rewritten
+                rewrittenOperands.append(rewritten)
+
+                if operandDependencies is None:
+                    dependencies = None
+                elif dependencies is not None:
+                    dependencies |= operandDependencies
+
+            if isinstance(value, list):
+                changes[name] = rewrittenOperands
+            elif isinstance(value, tuple):
+                changes[name] = tuple(rewrittenOperands)
+            else:
+                changes[name] = rewrittenOperands[0]
+
+        return changes, frozenset(dependencies) if dependencies is not None else None
+
+    def visitLogicOperands(self, expr: NaryExpr, available: _Available) -> _Operands:
+        """Visit the operands of And or Or. Only the first operand is always evaluated, since the
+        others may be skipped by short-circuit evaluation."""
+        first, dependencies = self.visit(expr.args[0], available)
+        args = [first]
+
+        state = dict(available)
+        for arg in expr.args[1:]:
+            rewritten, argDependencies = self.visit(arg, state)
+            args.append(rewritten)
+            if argDependencies is None or dependencies is None:
+                dependencies = None
+            else:
+                dependencies = dependencies | argDependencies
+
+        _update(available, _surviving(available, state))
+        return {"args": args}, dependencies
+
+    def visitIf(self, expr: If, available: _Available) -> Expr:
+        if expr.thenBranch is None:
+            return self.visitOpaque(expr, available)[0]
+        cond = self.visit(expr.cond, available)[0]
+
+        thenState = dict(available)
+        thenBranch = self.visit(expr.thenBranch, thenState)[0]
+        elseState = dict(available)
+        elseBranch = None
+        if expr.elseBranch is not None:
+            elseBranch = self.visit(expr.elseBranch, elseState)[0]
+
+        _update(available, _surviving(available, thenState, elseState))
+        return _replace(
+            expr, {"cond": cond, "thenBranch": thenBranch, "elseBranch": elseBranch}
+        )
+
+    def visitCond(self, expr: Cond, available: _Available) -> Expr:
+        # each condition is only evaluated if the ones before it are false, so only the values of
+        # the first condition are available in every branch
+        state = available
+        afterFirst: _Available = dict()
+        bodyStates: List[_Available] = []
+        args = []
+        for i, (cond, body) in enumerate(expr.args):
+            rewrittenCond = self.visit(cond, state)[0]
+            if i == 0:
+                afterFirst = dict(state)
+                state = dict(state)
+
+            bodyState = dict(state)
+            args.append([rewrittenCond, self.visit(body, bodyState)[0]])
+            bodyStates.append(bodyState)
+
+        _update(available, _surviving(afterFirst, state, *bodyStates))
+        return _replace(expr, {"args": args})
+
+    def visitLoop(
+        self,
+        available: _Available,
+        cond: Expr,
+        body: Expr,
+        step: Optional[Expr],
+    ) -> Tuple[Expr, Expr, Optional[Expr]]:
+        """Visit the condition, body and step of a loop.
+
+        A value which depends on something the loop changes is not available anywhere in the loop,
+        since the loop may repeat, or after it.
+        """
+        if id(body) not in self.loopKills:
+            inner = _Eliminator(set(), self.loopKills)
+            for expr in [cond, body] if step is None else [cond, step, body]:
+                inner.visit(expr, dict())
+            self.loopKills[id(body)] = inner.killed
+        self.kill(available, self.loopKills[id(body)])
+        rewrittenCond = self.visit(cond, available)[0]
+
+        rewrittenBody = self.visit(body, dict(available))[0]
+        # the body may run between the condition and the step or the end of the loop, so the values
+        # of the condition which depend on something the loop changes are no longer available
+        self.kill(available, self.loopKills[id(body)])
+        # the step is reached from the end of the body, or from a Continue anywhere in it
+        rewrittenStep = None
+        if step is not None:
+            rewrittenStep = self.visit(step, dict(available))[0]
+
+        # the loop ends when its condition is false, or from a Break anywhere in its body
+        return rewrittenCond, rewrittenBody, rewrittenStep
+
+    def visitWhile(self, expr: While, available: _Available) -> Expr:
+        if expr.doBlock is None:
+            return self.visitOpaque(expr, available)[0]
+        cond, body, _ = self.visitLoop(available, expr.cond, expr.doBlock, None)
+        return _replace(expr, {"cond": cond, "doBlock": body})
+
+    def visitFor(self, expr: For, available: _Available) -> Expr:
+        if expr.doBlock is None:
+            return self.visitOpaque(expr, available)[0]
+        start = self.visit(expr.start, available)[0]
+        cond, body, step = self.visitLoop(available, expr.cond, expr.doBlock, expr.step)
+        return _replace(
+            expr, {"start": start, "cond": cond, "doBlock": body, "step": step}
+        )
+
+
+def _cost(expr: Expr, options: "CompileOptions", costs: Dict[Fingerprint, int]) -> int:
+    """Estimate the opcode cost of evaluating an expression once."""
+    fingerprint = structuralFingerprint(expr)
+    cost = costs.get(fingerprint)
+    if cost is None:
+        try:
+            start, _ = expr.__teal__(options)
+            cost = sum(
+                op.getOp().cost
+                for block in TealBlock.Iterate(start)
+                for op in block.ops
+                if isinstance(op, TealOp)
+            )
+        except (TealCompileError, TealInputError, TealInternalError):
+            # the error is raised again when the program is lowered
+            cost = 0
+        costs[fingerprint] = cost
+    return cost
+
+
+def _isProfitable(entry: _Entry, cost: int) -> bool:
+    if entry.isDuplicated():
+        # the reuse is replaced by a dup
+        return cost > 1
+    # the value is saved with a dup and a store, and each reuse is replaced by a load
+    return len(entry.reuses) * (cost - 1) > 2
+
+
+def eliminateCommonSubexpressions(
+    ast: Expr, options: "CompileOptions", source: Optional[Expr] = None
+) -> Expr:
+    """Evaluate the repeated values of the main program or a subroutine declaration only once.
+
+    A value is reused if the same expression has already been evaluated on every path to it, and
+    nothing it depends on, such as application state or a scratch slot it loads, may have changed
+    since. A value which is used again immediately is duplicated on the stack, and otherwise it is
+    saved in a scratch slot. Values are only reused if this reduces the opcode cost.
+
+    The slots are kept on source, keyed by the fingerprints of the values saved in them, and reused
+    when the program is compiled again, so that new slots do not change the order of the slots
+    created since the last compilation, such as those of subroutine declarations.
+
+    Args:
+        ast: The main program or subroutine declaration.
+        options: The options of the compilation.
+        source (optional): The program before it was rewritten by other optimizations, which keeps
+            the slots. Defaults to ast.
+
+    Returns:
+        The rewritten program, or ast if no value is reused. ast is not modified.
+    """
+    excluded: Set[Fingerprint] = set()
+    costs: Dict[Fingerprint, int] = dict()
+    loopKills: Dict[int, Optional[Set[object]]] = dict()
+
+    while True:
+        eliminator = _Eliminator(excluded, loopKills)
+        rewritten, _ = eliminator.visit(ast, dict())
+        reused = [entry for entry in eliminator.entries if len(entry.reuses) != 0]
+
+        # values which are not reused may contain repeated values of their own, so the program is
+        # visited again until every value which is reused is profitable
+        unprofitable = {
+            entry.fingerprint
+            for entry in reused
+            if not _isProfitable(entry, _cost(entry.original, options, costs))
+        }
+        if len(unprofitable) == 0:
+            break
+        excluded |= unprofitable
+
+    if len(reused) == 0:
+        return ast
+
+    slots: Dict[Fingerprint, List[ScratchSlot]] = (
+        source if source is not None else ast
+    ).__dict__.setdefault(_SLOTS, dict())
+    # the number of values with each fingerprint which have been given a slot, since a value may be
+    # evaluated again after one of its dependencies changes
+    counts: Dict[Fingerprint, int] = dict()
+    for entry in reused:
+        if entry.isDuplicated():
+            entry.reuses[0].dup = True
+            continue
+
+        count = counts.get(entry.fingerprint, 0)
+        counts[entry.fingerprint] = count + 1
+        allocated = slots.setdefault(entry.fingerprint, [])
+        if count == len(allocated):
+            allocated.append(ScratchSlot())
+        slot = allocated[count]
+        entry.value.slot = slot
+        for reuse in entry.reuses:
+            reuse.slot = slot
+
+    return rewritten
@@ -0,0 +1,425 @@
+import pytest
+
+import pyteal as pt
+
+from pyteal.compiler.cse import eliminateCommonSubexpressions
+from pyteal.compiler.parallel import canCompileInParallel
+
+options = pt.CompileOptions(mode=pt.Mode.Application, version=6)
+
+
+def compile_cse(program: pt.Expr, version: int = 6, **kwargs) -> str:
+    return pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=version,
+        optimize=pt.OptimizeOptions(common_subexpressions=True),
+        **kwargs,
+    )
+
+
+def expected_teal(*lines: str, version: int = 6) -> str:
+    return "\n".join(["#pragma version {}".format(version)] + list(lines))
+
+
+def note_hash() -> pt.Expr:
+    return pt.Sha256(pt.Txn.note())
+
+
+def test_nothing_repeated():
+    program = pt.Seq(pt.Pop(note_hash()), pt.Txn.amount() + pt.Int(1))
+    assert eliminateCommonSubexpressions(program, options) is program
+
+
+def test_program_not_modified():
+    program = pt.Seq(pt.Pop(note_hash()), pt.Pop(note_hash()), pt.Int(1))
+    before = str(program)
+    fingerprint = pt.structuralFingerprint(program)
+
+    rewritten = eliminateCommonSubexpressions(program, options)
+    assert rewritten is not program
+    assert str(program) == before
+    assert pt.structuralFingerprint(program) == fingerprint
+    assert pt.compileTeal(
+        program, mode=pt.Mode.Application, version=6
+    ) == expected_teal(
+        "txn Note", "sha256", "pop", "txn Note", "sha256", "pop", "int 1", "return"
+    )
+
+
+def test_reuse_in_slot():
+    program = pt.Seq(
+        pt.Pop(note_hash()),
+        pt.Assert(note_hash() == pt.Bytes("a")),
+        pt.Len(note_hash()),
+    )
+    assert compile_cse(program) == expected_teal(
+        "txn Note",
+        "sha256",
+        "dup",
+        "store 0",
+        "pop",
+        "load 0",
+        'byte "a"',
+        "==",
+        "assert",
+        "load 0",
+        "len",
+        "return",
+    )
+
+
+def test_reuse_adjacent_operand():
+    value = pt.Txn.amount() + pt.Int(1)
+    assert compile_cse(value * value) == expected_teal(
+        "txn Amount", "int 1", "+", "dup", "*", "return"
+    )
+
+
+def test_adjacent_operand_reused_again():
+    value = pt.Txn.amount() + pt.Int(1)
+    program = (value * value) + value
+    assert compile_cse(program) == expected_teal(
+        "txn Amount",
+        "int 1",
+        "+",
+        "dup",
+        "store 0",
+        "load 0",
+        "*",
+        "load 0",
+        "+",
+        "return",
+    )
+
+
+def test_unprofitable():
+    # saving the value costs as much as evaluating it again
+    program = pt.Seq(pt.Pop(pt.Txn.amount() + pt.Int(1)), pt.Txn.amount() + pt.Int(1))
+    assert compile_cse(program) == pt.compileTeal(
+        program, mode=pt.Mode.Application, version=6
+    )
+
+    # but it is worth saving if it is reused twice
+    program = pt.Seq(
+        pt.Pop(pt.Txn.amount() + pt.Int(1)),
+        pt.Pop(pt.Txn.amount() + pt.Int(1)),
+        pt.Txn.amount() + pt.Int(1),
+    )
+    assert compile_cse(program).count("+") == 1
+
+
+def test_inner_value_reused():
+    # the outer values are not worth reusing, so the more costly inner value is reused
+    program = pt.Seq(
+        pt.Pop(pt.Len(note_hash())), pt.Pop(pt.Btoi(note_hash())), pt.Int(1)
+    )
+    assert compile_cse(program) == expected_teal(
+        "txn Note",
+        "sha256",
+        "dup",
+        "store 0",
+        "len",
+        "pop",
+        "load 0",
+        "btoi",
+        "pop",
+        "int 1",
+        "return",
+    )
+
+
+def test_branches():
+    # a value from the condition is available in both branches
+    program = (
+        pt.If(pt.Len(note_hash()) > pt.Int(0))
+        .Then(pt.Pop(note_hash()))
+        .Else(pt.Pop(pt.Btoi(note_hash())))
+    )
+    teal = compile_cse(pt.Seq(program, pt.Int(1)))
+    assert teal.count("sha256") == 1
+    assert teal.count("load 0") == 2
+
+    # a value from one branch is not available after the If
+    program = pt.Seq(
+        pt.If(pt.Txn.fee() > pt.Int(0)).Then(pt.Pop(note_hash())),
+        pt.Pop(note_hash()),
+        pt.Int(1),
+    )
+    assert compile_cse(program).count("sha256") == 2
+
+    # or even if both branches evaluate it, since they do so separately
+    program = pt.Seq(
+        pt.If(pt.Txn.fee() > pt.Int(0))
+        .Then(pt.Pop(note_hash()))
+        .Else(pt.Pop(pt.Len(note_hash()))),
+        pt.Pop(note_hash()),
+        pt.Int(1),
+    )
+    assert compile_cse(program).count("sha256") == 3
+
+
+def test_cond():
+    program = pt.Seq(
+        pt.Cond(
+            [pt.Len(note_hash()) == pt.Int(0), pt.Pop(note_hash())],
+            [pt.Btoi(note_hash()) == pt.Int(1), pt.Pop(pt.Btoi(note_hash()))],
+        ),
+        pt.Pop(pt.Btoi(note_hash())),
+        pt.Int(1),
+    )
+    teal = compile_cse(program)
+    # the hash from the first condition is reused everywhere, but Btoi of it is only available in
+    # the branch of the second condition
+    assert teal.count("sha256") == 1
+    assert teal.count("btoi") == 2
+
+
+def test_and_or():
+    for op in (pt.And, pt.Or):
+        program = pt.Seq(
+            pt.Pop(op(pt.Len(note_hash()), pt.Btoi(pt.Sha256(pt.Txn.sender())))),
+            pt.Pop(note_hash()),
+            pt.Pop(pt.Sha256(pt.Txn.sender())),
+            pt.Int(1),
+        )
+        teal = compile_cse(program)
+        # the first operand is always evaluated, and the second may not be
+        assert teal.count("txn Note\nsha256") == 1
+        assert teal.count("txn Sender\nsha256") == 2
+
+
+def test_app_state():
+    def value():
+        return pt.Sha256(pt.App.globalGet(pt.Bytes("k")))
+
+    program = pt.Seq(
+        pt.Pop(value()),
+        pt.Pop(value()),
+        pt.App.globalPut(pt.Bytes("k"), pt.Bytes("v")),
+        pt.Pop(value()),
+        pt.Int(1),
+    )
+    assert compile_cse(program).count("app_global_get") == 2
+
+    program = pt.Seq(
+        pt.Pop(value()),
+        pt.Log(pt.Bytes("log")),
+        pt.Pop(value()),
+        pt.Int(1),
+    )
+    assert compile_cse(program).count("app_global_get") == 1
+
+
+def test_bare_state_reads():
+    def globalValue():
+        return pt.App.globalGet(pt.Bytes("u0"))
+
+    @pt.Subroutine(pt.TealType.none)
+    def reset():
+        return pt.App.globalPut(pt.Bytes("u0"), pt.Int(0))
+
+    # a read of state with only constant operands still depends on the state
+    program = pt.Seq(
+        pt.Pop(globalValue() + globalValue() + globalValue() + globalValue()),
+        reset(),
+        pt.Return(globalValue()),
+    )
+    teal = compile_cse(program)
+    assert teal.count("app_global_get") == 2
+    assert teal.index("callsub reset_0") < teal.rindex("app_global_get")
+
+    def localValue():
+        return pt.App.localGet(pt.Int(0), pt.Bytes("u0"))
+
+    program = pt.Seq(
+        pt.Pop(localValue() + localValue() + localValue() + localValue()),
+        pt.App.localPut(pt.Int(0), pt.Bytes("u0"), pt.Int(0)),
+        pt.Return(localValue()),
+    )
+    assert compile_cse(program).count("app_local_get") == 2
+
+    def balance():
+        return pt.Balance(pt.Int(0))
+
+    program = pt.Seq(
+        pt.Pop(balance() + balance() + balance() + balance()),
+        pt.InnerTxnBuilder.Begin(),
+        pt.InnerTxnBuilder.SetField(pt.TxnField.type_enum, pt.TxnType.Payment),
+        pt.InnerTxnBuilder.Submit(),
+        pt.Return(balance()),
+    )
+    assert compile_cse(program).count("balance") == 2
+
+
+def test_scratch_store():
+    var = pt.ScratchVar(pt.TealType.bytes)
+    other = pt.ScratchVar(pt.TealType.bytes)
+
+    program = pt.Seq(
+        var.store(pt.Txn.note()),
+        pt.Pop(pt.Sha256(var.load())),
+        other.store(pt.Bytes("x")),
+        pt.Pop(pt.Sha256(var.load())),
+        var.store(pt.Bytes("y")),
+        pt.Pop(pt.Sha256(var.load())),
+        pt.Int(1),
+    )
+    assert compile_cse(program).count("sha256") == 2
+
+
+def test_subroutine_call():
+    @pt.Subroutine(pt.TealType.none)
+    def effect():
+        return pt.App.globalPut(pt.Bytes("k"), pt.Bytes("v"))
+
+    program = pt.Seq(
+        pt.Pop(pt.Sha256(pt.App.globalGet(pt.Bytes("k")))),
+        pt.Pop(note_hash()),
+        effect(),
+        pt.Pop(pt.Sha256(pt.App.globalGet(pt.Bytes("k")))),
+        pt.Pop(note_hash()),
+        pt.Int(1),
+    )
+    teal = compile_cse(program)
+    assert teal.count("app_global_get") == 2
+    assert teal.count("txn Note\nsha256") == 1
+
+
+def test_subroutine_body():
+    @pt.Subroutine(pt.TealType.uint64)
+    def hashLength(value):
+        return pt.Len(pt.Sha256(value)) + pt.Btoi(pt.Sha256(value))
+
+    teal = compile_cse(hashLength(pt.Txn.note()))
+    assert teal.count("sha256") == 1
+
+
+def test_loops():
+    i = pt.ScratchVar(pt.TealType.uint64)
+
+    # a value from before the loop which the loop does not change is available in it
+    program = pt.Seq(
+        pt.Pop(note_hash()),
+        pt.For(
+            i.store(pt.Int(0)), i.load() < pt.Int(3), i.store(i.load() + pt.Int(1))
+        ).Do(pt.Pop(note_hash())),
+        pt.Pop(note_hash()),
+        pt.Int(1),
+    )
+    assert compile_cse(program).count("sha256") == 1
+
+    # a value the loop changes is not, and a value from the body is not available after it
+    program = pt.Seq(
+        i.store(pt.Txn.fee()),
+        pt.Pop(pt.Sha256(pt.Itob(i.load()))),
+        pt.For(
+            i.store(pt.Int(0)), i.load() < pt.Int(3), i.store(i.load() + pt.Int(1))
+        ).Do(pt.Seq(pt.Pop(pt.Sha256(pt.Itob(i.load()))), pt.Pop(note_hash()))),
+        pt.Pop(pt.Sha256(pt.Itob(i.load()))),
+        pt.Pop(note_hash()),
+        pt.Int(1),
+    )
+    teal = compile_cse(program)
+    assert teal.count("itob\nsha256") == 3
+    assert teal.count("txn Note\nsha256") == 2
+
+    program = pt.Seq(
+        i.store(pt.Int(0)),
+        pt.While(pt.Len(note_hash()) > i.load()).Do(
+            pt.Seq(pt.Pop(note_hash()), i.store(i.load() + pt.Int(1)))
+        ),
+        pt.Pop(note_hash()),
+        pt.Int(1),
+    )
+    assert compile_cse(program).count("sha256") == 1
+
+
+def test_loop_condition_after_loop():
+    i = pt.ScratchVar(pt.TealType.uint64)
+
+    def cond():
+        return pt.Btoi(pt.Itob(i.load())) < pt.Int(3)
+
+    # the loop can end from a Break after the body changes i, so the value of the condition from
+    # before the Break is not available after the loop
+    program = pt.Seq(
+        i.store(pt.Int(0)),
+        pt.While(cond()).Do(
+            pt.Seq(
+                i.store(i.load() + pt.Int(1)),
+                pt.If(i.load() == pt.Btoi(pt.Txn.application_args[0])).Then(pt.Break()),
+            )
+        ),
+        pt.Return(cond()),
+    )
+    for version in (5, 6):
+        assert compile_cse(program, version=version).count("itob\nbtoi") == 2
+
+    # nor is it available in the step, which runs after the body
+    program = pt.Seq(
+        pt.For(i.store(pt.Int(0)), cond(), i.store(i.load() + cond() + pt.Int(1))).Do(
+            i.store(i.load() + pt.Int(2))
+        ),
+        pt.Int(1),
+    )
+    assert compile_cse(program).count("itob\nbtoi") == 2
+
+
+def test_volatile_values():
+    def budget_hash():
+        return pt.Sha256(pt.Itob(pt.Global.opcode_budget()))
+
+    program = pt.Seq(pt.Pop(budget_hash()), pt.Pop(budget_hash()), pt.Int(1))
+    assert compile_cse(program).count("sha256") == 2
+
+
+def test_compile_again():
+    @pt.Subroutine(pt.TealType.uint64)
+    def hashLength(value):
+        return pt.Len(pt.Sha256(value)) + pt.Btoi(pt.Sha256(value))
+
+    program = pt.Seq(
+        pt.Pop(note_hash()),
+        pt.Pop(hashLength(note_hash())),
+        pt.Int(1),
+    )
+    # the declaration of the subroutine creates slots during the first compilation only, which must
+    # not change the order of the slots of the reused values
+    first = compile_cse(program)
+    assert compile_cse(program) == first
+    assert compile_cse(program) == first
+    assert pt.structurallyEqual(
+        program,
+        pt.Seq(pt.Pop(note_hash()), pt.Pop(hashLength(note_hash())), pt.Int(1)),
+    )
+
+
+def test_stats():
+    stats = pt.CompileStats()
+    compile_cse(
+        pt.Seq(pt.Pop(note_hash()), pt.Pop(note_hash()), pt.Int(1)), stats=stats
+    )
+    assert "eliminateCommonSubexpressions" in {p.name for p in stats.passes}
+
+
+@pytest.mark.skipif(
+    not canCompileInParallel(), reason="worker processes cannot be forked"
+)
+def test_parallel_matches_serial():
+    def build():
+        @pt.Subroutine(pt.TealType.uint64)
+        def first(value):
+            return pt.Len(pt.Sha256(value)) + pt.Btoi(pt.Sha256(value))
+
+        @pt.Subroutine(pt.TealType.uint64)
+        def second(value):
+            return first(value) * first(pt.Sha256(value)) + pt.Len(pt.Sha256(value))
+
+        return pt.Seq(
+            pt.Pop(note_hash()),
+            pt.Pop(second(note_hash())),
+            pt.Int(1),
+        )
+
+    assert compile_cse(build(), parallel=2) == compile_cse(build())
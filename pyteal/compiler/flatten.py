@@ -31,11 +31,14 @@ def flattenBlocks(blocks: List[TealBlock]) -> List[TealComponent]:
             labelRefs[index] = LabelReference("l{}".format(index))
         return labelRefs[index]
 
+    # map each block's identity to its position, so jump targets can be found in constant time
+    blockIndices: Dict[int, int] = {id(block): i for i, block in enumerate(blocks)}
+
     def blockIndexByReference(block: TealBlock) -> int:
-        for i, b in enumerate(blocks):
-            if block is b:
-                return i
-        raise ValueError("Block not present in list: {}".format(block))
+        index = blockIndices.get(id(block))
+        if index is None:
+            raise ValueError("Block not present in list: {}".format(block))
+        return index
 
     for i, block in enumerate(blocks):
         code = list(block.ops)
@@ -264,6 +264,39 @@ def test_flattenBlocks_multiple_branch_converge():
     assert actual == expected
 
 
+def test_flattenBlocks_many_blocks():
+    # every block jumps back to the first block, which ends the program
+    numBlocks = 10000
+    end = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    branches = [
+        pt.TealConditionalBlock([pt.TealOp(None, pt.Op.int, i)])
+        for i in range(numBlocks)
+    ]
+    for branch, nextBranch in zip(branches, branches[1:]):
+        branch.setTrueBlock(end)
+        branch.setFalseBlock(nextBranch)
+    branches[-1].setTrueBlock(end)
+    branches[-1].setFalseBlock(end)
+
+    blocks = [end] + branches
+
+    endLabel = pt.LabelReference("l0")
+    expected = [pt.TealLabel(None, endLabel), pt.TealOp(None, pt.Op.return_)]
+    for i in range(numBlocks - 1):
+        expected += [
+            pt.TealOp(None, pt.Op.int, i),
+            pt.TealOp(None, pt.Op.bnz, endLabel),
+        ]
+    expected += [
+        pt.TealOp(None, pt.Op.int, numBlocks - 1),
+        pt.TealOp(None, pt.Op.bnz, endLabel),
+        pt.TealOp(None, pt.Op.b, endLabel),
+    ]
+    actual = flattenBlocks(blocks)
+
+    assert actual == expected
+
+
 def test_flattenSubroutines_no_subroutines():
     subroutineToLabel = OrderedDict()
 
@@ -0,0 +1,305 @@
+from copy import copy
+from math import isqrt
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+    cast,
+)
+
+from pyteal.ast import Expr, BinaryExpr, Bytes, Int, NaryExpr, UnaryExpr
+from pyteal.ir import Op
+from pyteal.compiler.constants import extractBytesValue
+
+if TYPE_CHECKING:
+    from pyteal.compiler.compiler import CompileOptions
+
+# the value of a constant expression: an int for uint64 values and bytes for byte strings
+Constant = Union[int, bytes]
+
+UINT64_MAX = 2**64 - 1
+
+# the maximum length of a byte string in the AVM
+MAX_BYTES_LENGTH = 4096
+
+
+class _Fails(Exception):
+    """Raised when an operation would fail at runtime with the given operands."""
+
+    pass
+
+
+def _uint64(value: int) -> int:
+    if not (0 <= value <= UINT64_MAX):
+        raise _Fails()
+    return value
+
+
+def _div(a: int, b: int) -> int:
+    if b == 0:
+        raise _Fails()
+    return a // b
+
+
+def _mod(a: int, b: int) -> int:
+    if b == 0:
+        raise _Fails()
+    return a % b
+
+
+def _exp(a: int, b: int) -> int:
+    if a == 0 and b == 0:
+        raise _Fails()
+    # avoid computing huge powers which would overflow anyway
+    if a > 1 and b >= 64:
+        raise _Fails()
+    return _uint64(a**b)
+
+
+def _shiftAmount(b: int) -> int:
+    if b >= 64:
+        raise _Fails()
+    return b
+
+
+def _btoi(a: bytes) -> int:
+    if len(a) > 8:
+        raise _Fails()
+    return int.from_bytes(a, "big")
+
+
+def _bitlen(a: Constant) -> int:
+    if isinstance(a, bytes):
+        return int.from_bytes(a, "big").bit_length()
+    return a.bit_length()
+
+
+def _getbit(a: Constant, index: int) -> int:
+    if isinstance(a, bytes):
+        if index >= len(a) * 8:
+            raise _Fails()
+        return (a[index // 8] >> (7 - index % 8)) & 1
+    return (a >> _shiftAmount(index)) & 1
+
+
+def _getbyte(a: bytes, index: int) -> int:
+    if index >= len(a):
+        raise _Fails()
+    return a[index]
+
+
+def _extractUint(size: int) -> Callable[[bytes, int], int]:
+    def extract(a: bytes, start: int) -> int:
+        if start + size > len(a):
+            raise _Fails()
+        return int.from_bytes(a[start : start + size], "big")
+
+    return extract
+
+
+def _concat(a: bytes, b: bytes) -> bytes:
+    if len(a) + len(b) > MAX_BYTES_LENGTH:
+        raise _Fails()
+    return a + b
+
+
+_UNARY_OPS: Dict[Op, Callable[[Any], Constant]] = {
+    Op.logic_not: lambda a: int(a == 0),
+    Op.bitwise_not: lambda a: UINT64_MAX - a,
+    Op.len: len,
+    Op.itob: lambda a: a.to_bytes(8, "big"),
+    Op.btoi: _btoi,
+    Op.sqrt: isqrt,
+    Op.bitlen: _bitlen,
+}
+
+_BINARY_OPS: Dict[Op, Callable[[Any, Any], Constant]] = {
+    Op.add: lambda a, b: _uint64(a + b),
+    Op.minus: lambda a, b: _uint64(a - b),
+    Op.mul: lambda a, b: _uint64(a * b),
+    Op.div: _div,
+    Op.mod: _mod,
+    Op.exp: _exp,
+    Op.bitwise_and: lambda a, b: a & b,
+    Op.bitwise_or: lambda a, b: a | b,
+    Op.bitwise_xor: lambda a, b: a ^ b,
+    Op.shl: lambda a, b: (a << _shiftAmount(b)) & UINT64_MAX,
+    Op.shr: lambda a, b: a >> _shiftAmount(b),
+    Op.eq: lambda a, b: int(a == b),
+    Op.neq: lambda a, b: int(a != b),
+    Op.lt: lambda a, b: int(a < b),
+    Op.le: lambda a, b: int(a <= b),
+    Op.gt: lambda a, b: int(a > b),
+    Op.ge: lambda a, b: int(a >= b),
+    Op.logic_and: lambda a, b: int(a != 0 and b != 0),
+    Op.logic_or: lambda a, b: int(a != 0 or b != 0),
+    Op.concat: _concat,
+    Op.getbit: _getbit,
+    Op.getbyte: _getbyte,
+    Op.extract_uint16: _extractUint(2),
+    Op.extract_uint32: _extractUint(4),
+    Op.extract_uint64: _extractUint(8),
+}
+
+
+class _Folder:
+    def __init__(self, options: "CompileOptions") -> None:
+        self.options = options
+        # the folded version of each expression which has been visited, keyed by identity, so that
+        # expressions used in several places are only folded once
+        self.folded: Dict[int, Expr] = dict()
+        # the originals of self.folded, which are kept alive so that their ids are not reused
+        self.originals: List[Expr] = []
+        self.count = 0
+
+    def constantOf(self, expr: Expr) -> Optional[Constant]:
+        if type(expr) is Int:
+            return cast(Int, expr).value
+        if type(expr) is Bytes:
+            value = extractBytesValue(expr.__teal__(self.options)[0].ops[0])
+            return value if isinstance(value, bytes) else None
+        return None
+
+    def makeConstant(self, original: Expr, value: Constant) -> Expr:
+        constant: Expr = Int(value) if isinstance(value, int) else Bytes(value)
+        constant.trace = original.trace
+        self.count += 1
+        return constant
+
+    def available(self, op: Op) -> bool:
+        # ops which are not available are left for the compiler to report
+        return op.min_version <= self.options.version
+
+    def fold(self, expr: Expr) -> Expr:
+        """Fold an expression and its children, returning expr if nothing was folded."""
+        folded = self.folded.get(id(expr))
+        if folded is not None:
+            return folded
+
+        changes: Dict[str, Any] = dict()
+        for name, value in vars(expr).items():
+            if name.startswith("_"):
+                continue
+            foldedValue = self.foldValue(value)
+            if foldedValue is not value:
+                changes[name] = foldedValue
+
+        folded = expr
+        if len(changes) != 0:
+            folded = copy(expr)
+            # the copy must not keep the memoized fingerprint of the original
+            folded.__dict__.pop("_fingerprint", None)
+            for name, value in changes.items():
+                setattr(folded, name, value)
+
+        folded = self.foldOp(folded)
+        self.folded[id(expr)] = folded
+        self.originals.append(expr)
+        return folded
+
+    def foldValue(self, value: Any) -> Any:
+        if isinstance(value, Expr):
+            return self.fold(value)
+        if isinstance(value, (list, tuple)):
+            items = [self.foldValue(item) for item in value]
+            if all(a is b for a, b in zip(items, value)):
+                return value
+            return items if isinstance(value, list) else tuple(items)
+        return value
+
+    def foldOp(self, expr: Expr) -> Expr:
+        """Evaluate an operation whose operands have been folded, if they are all constants."""
+        t = type(expr)
+
+        if t is UnaryExpr:
+            unary = cast(UnaryExpr, expr)
+            fn = _UNARY_OPS.get(unary.op)
+            arg = self.constantOf(unary.arg)
+            if fn is None or arg is None or not self.available(unary.op):
+                return expr
+            return self.evaluate(expr, fn, arg)
+
+        if t is BinaryExpr:
+            binary = cast(BinaryExpr, expr)
+            fn2 = _BINARY_OPS.get(binary.op)
+            left = self.constantOf(binary.argLeft)
+            right = self.constantOf(binary.argRight)
+            if (
+                fn2 is None
+                or left is None
+                or right is None
+                or not self.available(binary.op)
+            ):
+                return expr
+            return self.evaluate(expr, fn2, left, right)
+
+        if t is NaryExpr:
+            return self.foldNary(cast(NaryExpr, expr))
+
+        return expr
+
+    def foldNary(self, expr: NaryExpr) -> Expr:
+        """Fold the operands of a NaryExpr which are constants and are not preceded by any other
+        operand, since the operation is applied from left to right."""
+        fn = _BINARY_OPS.get(expr.op)
+        if fn is None or not self.available(expr.op):
+            return expr
+
+        constants: List[Constant] = []
+        for arg in expr.args:
+            value = self.constantOf(arg)
+            if value is None:
+                break
+            constants.append(value)
+        if len(constants) < 2:
+            return expr
+
+        result = constants[0]
+        try:
+            for value in constants[1:]:
+                result = fn(result, value)
+        except _Fails:
+            return expr
+
+        constant = self.makeConstant(expr, result)
+        if len(constants) == len(expr.args):
+            return constant
+
+        partial = copy(expr)
+        partial.__dict__.pop("_fingerprint", None)
+        partial.args = [constant] + list(expr.args[len(constants) :])
+        return partial
+
+    def evaluate(
+        self, expr: Expr, fn: Callable[..., Constant], *operands: Constant
+    ) -> Expr:
+        try:
+            value = fn(*operands)
+        except _Fails:
+            return expr
+        return self.makeConstant(expr, value)
+
+
+def foldConstants(ast: Expr, options: "CompileOptions") -> Tuple[Expr, int]:
+    """Evaluate operations whose operands are constants at compile time.
+
+    UnaryExprs, BinaryExprs and NaryExprs whose operands are Int or Bytes literals, or fold to them,
+    are replaced by the literal they evaluate to. Operations which would fail at runtime with their
+    operands, for instance because of uint64 overflow or underflow, division by zero, or an index
+    out of bounds, are not folded, so the program still fails in the same way.
+
+    Args:
+        ast: The main program or subroutine declaration.
+        options: The options of the compilation.
+
+    Returns:
+        The folded program, which is ast if nothing was folded, and the number of operations that
+        were folded. ast is not modified.
+    """
+    folder = _Folder(options)
+    return folder.fold(ast), folder.count
@@ -0,0 +1,237 @@
+import pytest
+
+import pyteal as pt
+
+from pyteal.compiler.folding import foldConstants
+
+UINT64_MAX = 2**64 - 1
+
+
+def fold(expr: pt.Expr, version: int = 6):
+    return foldConstants(
+        expr, pt.CompileOptions(mode=pt.Mode.Application, version=version)
+    )
+
+
+def constant_value(expr: pt.Expr):
+    if isinstance(expr, pt.Int):
+        return expr.value
+    assert isinstance(expr, pt.Bytes) and expr.base == "base16"
+    return bytes.fromhex(expr.byte_str)
+
+
+@pytest.mark.parametrize(
+    "expr, expected",
+    [
+        (pt.Int(60) * pt.Int(60) * pt.Int(24), 86400),
+        (pt.Int(UINT64_MAX - 1) + pt.Int(1), UINT64_MAX),
+        (pt.Int(5) - pt.Int(5), 0),
+        (pt.Int(2**32) * pt.Int(2**32 - 1), 2**64 - 2**32),
+        (pt.Int(7) / pt.Int(2), 3),
+        (pt.Int(7) % pt.Int(4), 3),
+        (pt.Exp(pt.Int(2), pt.Int(63)), 2**63),
+        (pt.Exp(pt.Int(1), pt.Int(1000)), 1),
+        (pt.Exp(pt.Int(0), pt.Int(5)), 0),
+        (pt.BitwiseAnd(pt.Int(6), pt.Int(3)), 2),
+        (pt.BitwiseOr(pt.Int(6), pt.Int(3)), 7),
+        (pt.BitwiseXor(pt.Int(6), pt.Int(3)), 5),
+        (pt.ShiftLeft(pt.Int(2**63 + 1), pt.Int(1)), 2),
+        (pt.ShiftRight(pt.Int(8), pt.Int(3)), 1),
+        (pt.Int(1) == pt.Int(1), 1),
+        (pt.Bytes("a") == pt.Bytes("base16", "61"), 1),
+        (pt.Bytes("a") != pt.Bytes("b"), 1),
+        (pt.Int(1) < pt.Int(2), 1),
+        (pt.Int(1) <= pt.Int(0), 0),
+        (pt.Int(1) > pt.Int(2), 0),
+        (pt.Int(2) >= pt.Int(2), 1),
+        (pt.GetBit(pt.Int(4), pt.Int(2)), 1),
+        (pt.GetBit(pt.Bytes("base16", "f0"), pt.Int(3)), 1),
+        (pt.GetBit(pt.Bytes("base16", "f0"), pt.Int(4)), 0),
+        (pt.GetByte(pt.Bytes("base16", "00ff"), pt.Int(1)), 255),
+        (pt.ExtractUint16(pt.Bytes("base16", "000102"), pt.Int(1)), 0x0102),
+        (pt.ExtractUint64(pt.Bytes(bytes(range(8))), pt.Int(0)), 0x0001020304050607),
+        (pt.Not(pt.Int(0)), 1),
+        (pt.Not(pt.Int(3)), 0),
+        (pt.BitwiseNot(pt.Int(0)), UINT64_MAX),
+        (pt.Len(pt.Bytes("hello")), 5),
+        (pt.Len(pt.Bytes("base64", "AAAA")), 3),
+        (pt.Itob(pt.Int(258)), bytes([0, 0, 0, 0, 0, 0, 1, 2])),
+        (pt.Btoi(pt.Bytes("base16", "0102")), 258),
+        (pt.Btoi(pt.Bytes("")), 0),
+        (pt.Sqrt(pt.Int(99)), 9),
+        (pt.BitLen(pt.Int(8)), 4),
+        (pt.BitLen(pt.Bytes("base16", "0001")), 1),
+        (pt.And(pt.Int(1), pt.Int(2)), 1),
+        (pt.And(pt.Int(1), pt.Int(0), pt.Int(2)), 0),
+        (pt.Or(pt.Int(0), pt.Int(0)), 0),
+        (pt.Or(pt.Int(0), pt.Int(3)), 1),
+        (pt.Concat(pt.Bytes("a"), pt.Bytes("b"), pt.Bytes("base16", "00")), b"ab\x00"),
+        (pt.Btoi(pt.Itob(pt.Int(7) + pt.Int(1))), 8),
+    ],
+)
+def test_fold(expr, expected):
+    folded, count = fold(expr)
+    assert type(folded) in (pt.Int, pt.Bytes)
+    assert constant_value(folded) == expected
+    assert count >= 1
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        pt.Int(UINT64_MAX) + pt.Int(1),
+        pt.Int(0) - pt.Int(1),
+        pt.Int(2**32) * pt.Int(2**32),
+        pt.Int(1) / pt.Int(0),
+        pt.Int(1) % pt.Int(0),
+        pt.Exp(pt.Int(0), pt.Int(0)),
+        pt.Exp(pt.Int(2), pt.Int(64)),
+        pt.ShiftLeft(pt.Int(1), pt.Int(64)),
+        pt.ShiftRight(pt.Int(1), pt.Int(64)),
+        pt.GetBit(pt.Int(1), pt.Int(64)),
+        pt.GetBit(pt.Bytes("base16", "ff"), pt.Int(8)),
+        pt.GetByte(pt.Bytes("a"), pt.Int(1)),
+        pt.ExtractUint32(pt.Bytes("abc"), pt.Int(0)),
+        pt.Btoi(pt.Bytes("base16", "00" * 9)),
+        pt.Concat(pt.Bytes("a" * 4000), pt.Bytes("b" * 97)),
+        pt.Sha256(pt.Bytes("a")),
+        pt.Int(1) + pt.Txn.fee(),
+        pt.Tmpl.Int("TMPL_A") + pt.Int(1),
+        pt.Itob(pt.Txn.fee()) == pt.Bytes("a"),
+    ],
+)
+def test_not_folded(expr):
+    folded, count = fold(expr)
+    assert folded is expr
+    assert count == 0
+
+
+def test_fold_failing_operand():
+    # the operands are folded even if the operation fails
+    expr = (pt.Int(1) + pt.Int(2)) / (pt.Int(3) - pt.Int(3))
+    folded, count = fold(expr)
+    assert count == 2
+    assert type(folded) is pt.BinaryExpr
+    assert folded.argLeft.value == 3
+    assert folded.argRight.value == 0
+
+
+def test_fold_version():
+    # ops which are not available in the version are left for the compiler to report
+    expr = pt.Sqrt(pt.Int(4))
+    assert fold(expr, version=3) == (expr, 0)
+    with pytest.raises(pt.TealInputError):
+        pt.compileTeal(
+            expr,
+            mode=pt.Mode.Application,
+            version=3,
+            optimize=pt.OptimizeOptions(constant_folding=True),
+        )
+
+
+def test_fold_nary_prefix():
+    expr = pt.Concat(pt.Bytes("a"), pt.Bytes("b"), pt.Txn.note(), pt.Bytes("c"))
+    folded, count = fold(expr)
+    assert count == 1
+    assert len(folded.args) == 3
+    assert constant_value(folded.args[0]) == b"ab"
+    assert folded.args[1] is expr.args[2]
+    assert folded.args[2] is expr.args[3]
+
+    expr = pt.And(pt.Int(1), pt.Txn.fee(), pt.Int(1), pt.Int(1))
+    assert fold(expr) == (expr, 0)
+
+
+def test_fold_nested():
+    x = pt.ScratchVar(pt.TealType.uint64)
+    shared = pt.Int(2) * pt.Int(3)
+    program = pt.Seq(
+        x.store(shared),
+        pt.If(x.load() > shared + pt.Int(1))
+        .Then(pt.Pop(pt.Len(pt.Bytes("abc"))))
+        .Else(pt.Pop(pt.Int(1))),
+        pt.Cond([pt.Int(1) == pt.Int(1), pt.Return(shared)]),
+    )
+    before = str(program)
+
+    folded, count = fold(program)
+    # shared is folded once and counted once, and the original program is not modified
+    assert count == 4
+    assert str(program) == before
+    assert folded.args[1].cond.argRight.value == 7
+    assert folded.args[2].args[0][1].value is folded.args[0].value
+
+    actual = pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(constant_folding=True),
+    )
+    assert actual == "\n".join(
+        [
+            "#pragma version 6",
+            "int 6",
+            "store 0",
+            "load 0",
+            "int 7",
+            ">",
+            "bnz main_l2",
+            "int 1",
+            "pop",
+            "b main_l3",
+            "main_l2:",
+            "int 3",
+            "pop",
+            "main_l3:",
+            "int 1",
+            "bnz main_l5",
+            "err",
+            "main_l5:",
+            "int 6",
+            "return",
+        ]
+    )
+
+
+def test_fold_subroutine():
+    @pt.Subroutine(pt.TealType.uint64)
+    def seconds(days):
+        return days * pt.Int(24) * pt.Int(60) * pt.Int(60)
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def week():
+        return pt.Int(7) * pt.Int(24) * pt.Int(60) * pt.Int(60)
+
+    actual = pt.compileTeal(
+        seconds(pt.Int(2)) + week(),
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(constant_folding=True),
+    )
+    # the multiplications by constants in seconds are applied one at a time, so they cannot be
+    # folded without changing when the program fails
+    assert actual.count("*") == 3
+    assert "int 604800" in actual
+
+
+def test_fold_stats():
+    program = pt.Seq(
+        pt.Assert(pt.Txn.fee() < pt.Int(60) * pt.Int(60) * pt.Int(24)),
+        pt.Pop(pt.Int(1) / pt.Int(0)),
+        pt.Len(pt.Bytes("abc")) == pt.Int(3),
+    )
+    stats = pt.CompileStats()
+    pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(constant_folding=True),
+        stats=stats,
+    )
+    assert stats.passTotals()["foldConstants"].changes == 4
+    assert [p.changes for p in stats.passes if p.name == "lower"] == [None]
+    assert "changes" in stats.report()
+
+    stats = pt.CompileStats()
+    pt.compileTeal(program, mode=pt.Mode.Application, version=6, stats=stats)
+    assert "foldConstants" not in stats.passTotals()
@@ -0,0 +1,273 @@
+from typing import Dict, List, Optional, Set, Tuple, cast
+
+from pyteal.ast import SubroutineDefinition
+from pyteal.ir import (
+    Mode,
+    Op,
+    TealBlock,
+    TealConditionalBlock,
+    TealOp,
+    TealSimpleBlock,
+)
+from pyteal.compiler.assembler import opSize
+from pyteal.compiler.optimizer import OptimizeOptions
+from pyteal.compiler.subroutines import strongly_connected_components
+
+# the estimated size in bytes of a callsub op, which is followed by a 2 byte offset, and of a jump
+CALLSUB_SIZE = 3
+JUMP_SIZE = 3
+
+# ops which end the execution of a block
+_EXIT_OPS = (Op.retsub, Op.return_, Op.err)
+
+
+def _subroutineCalls(start: TealBlock) -> List[TealOp]:
+    """Get the callsub ops of a control flow graph."""
+    return [
+        op
+        for block in TealBlock.Iterate(start)
+        for op in block.ops
+        if op.op == Op.callsub
+    ]
+
+
+def _copyBody(
+    start: TealBlock, continuation: TealBlock
+) -> Tuple[TealBlock, List[TealBlock]]:
+    """Copy the control flow graph of a subroutine, so that it continues at continuation where it
+    would return.
+
+    Returns:
+        The start of the copy, and the blocks of the copy which continue at continuation.
+    """
+    blocks = list(TealBlock.Iterate(start))
+    copies: Dict[int, TealBlock] = dict()
+    returns: List[TealBlock] = []
+    exits: Set[int] = set()
+
+    for block in blocks:
+        ops: List[TealOp] = []
+        exitOp: Optional[TealOp] = None
+        for op in block.ops:
+            if op.op in _EXIT_OPS:
+                exitOp = op
+                break
+            # ops are copied, since later passes identify some ops by their identity
+            ops.append(TealOp(op.expr, op.op, *op.args))
+
+        copy: TealBlock
+        if exitOp is None and type(block) is TealConditionalBlock:
+            copy = TealConditionalBlock(ops)
+        else:
+            copy = TealSimpleBlock(ops)
+
+        if exitOp is not None:
+            exits.add(id(block))
+            if exitOp.op == Op.retsub:
+                cast(TealSimpleBlock, copy).setNextBlock(continuation)
+                returns.append(copy)
+            else:
+                ops.append(TealOp(exitOp.expr, exitOp.op, *exitOp.args))
+
+        copies[id(block)] = copy
+
+    for block in blocks:
+        if id(block) in exits:
+            continue
+        copy = copies[id(block)]
+        if type(block) is TealConditionalBlock:
+            conditional = cast(TealConditionalBlock, block)
+            copyConditional = cast(TealConditionalBlock, copy)
+            if conditional.trueBlock is not None:
+                copyConditional.setTrueBlock(copies[id(conditional.trueBlock)])
+            if conditional.falseBlock is not None:
+                copyConditional.setFalseBlock(copies[id(conditional.falseBlock)])
+        else:
+            nextBlock = cast(TealSimpleBlock, block).nextBlock
+            if nextBlock is not None:
+                cast(TealSimpleBlock, copy).setNextBlock(copies[id(nextBlock)])
+
+    return copies[id(start)], returns
+
+
+def inlineCalls(
+    start: TealBlock, callee: SubroutineDefinition, calleeStart: TealBlock
+) -> TealBlock:
+    """Replace every call to a subroutine in a control flow graph with a copy of the subroutine's
+    control flow graph.
+
+    A block is split at each call. The ops before the call are moved to a new block which continues
+    at the start of the copy, and the returns of the copy continue at the ops after the call, which
+    stay in the original block, so that its successors do not change.
+
+    Args:
+        start: The start of the control flow graph of the caller. Its blocks are modified in place.
+        callee: The subroutine whose calls are inlined. It must not call itself.
+        calleeStart: The start of the control flow graph of callee.
+
+    Returns:
+        The start of the caller's control flow graph, which is a new block if the first block of
+        the graph contained a call.
+    """
+    blocks = list(TealBlock.Iterate(start))
+    predecessors: Dict[int, List[TealBlock]] = {id(block): [] for block in blocks}
+    for block in blocks:
+        for successor in block.getOutgoing():
+            predecessors[id(successor)].append(block)
+
+    for block in blocks:
+        while True:
+            index = next(
+                (
+                    i
+                    for i, op in enumerate(block.ops)
+                    if op.op == Op.callsub and op.args[0] is callee
+                ),
+                None,
+            )
+            if index is None:
+                break
+
+            head = TealSimpleBlock(block.ops[:index])
+            block.ops = block.ops[index + 1 :]
+            # a block which branches to this one on both paths appears twice
+            for predecessor in predecessors[id(block)]:
+                predecessor.replaceOutgoing(block, head)
+            predecessors[id(head)] = predecessors[id(block)]
+            if block is start:
+                start = head
+
+            bodyStart, returns = _copyBody(calleeStart, block)
+            head.setNextBlock(bodyStart)
+            predecessors[id(block)] = returns
+
+    return start
+
+
+def _shouldInline(
+    start: TealBlock,
+    callSites: int,
+    mode: Mode,
+    options: OptimizeOptions,
+) -> bool:
+    """Decide whether to inline a subroutine, from the size or cost of its body."""
+    if callSites == 1:
+        return True
+
+    bodyOps = [
+        op
+        for block in TealBlock.Iterate(start)
+        for op in block.ops
+        if op.op != Op.retsub
+    ]
+    if mode == Mode.Signature:
+        returns = sum(
+            1
+            for block in TealBlock.Iterate(start)
+            for op in block.ops
+            if op.op == Op.retsub
+        )
+        bodySize = sum(opSize(op) for op in bodyOps)
+        # every return but one is replaced by a jump in each copy
+        inlinedSize = callSites * (bodySize + (returns - 1) * JUMP_SIZE)
+        calledSize = bodySize + returns * opSize(TealOp(None, Op.retsub))
+        calledSize += callSites * CALLSUB_SIZE
+        return inlinedSize - calledSize <= options.inline_size_threshold
+
+    return sum(op.op.cost for op in bodyOps) <= options.inline_cost_threshold
+
+
+def inlineSubroutines(
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
+    subroutine_start_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    subroutine_end_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    mode: Mode,
+    options: OptimizeOptions,
+) -> List[SubroutineDefinition]:
+    """Inline subroutines into their callers, and remove them from the program.
+
+    A subroutine is inlined if it is called from a single place, or if it is small enough. Programs
+    in Signature mode are limited in size, so their subroutines are inlined if doing so grows the
+    program by at most :code:`options.inline_size_threshold` bytes, estimated with :any:`opSize`.
+    Programs in Application mode are limited in opcode cost, so their subroutines are inlined if
+    the static cost of their body is at most :code:`options.inline_cost_threshold`, which bounds
+    the growth of the program while removing the cost of :code:`callsub` and :code:`retsub` from
+    every call.
+
+    Subroutines which may call themselves, which are in a strongly connected component of the call
+    graph with more than one subroutine or call themselves directly, are never inlined, and neither
+    are subroutines which never return. Subroutines are visited in reverse topological order, so a
+    subroutine is considered after the subroutines it calls have been inlined into it.
+
+    Args:
+        subroutineGraph: The graph of subroutine calls. Each key is a subroutine, and each value is
+            the set of subroutines it calls. Inlined subroutines are removed, and their callees are
+            added to the callees of their callers.
+        subroutine_start_blocks: The start of the control flow graph of every subroutine, with the
+            key None for the main program. Inlined subroutines are removed, and the graphs of their
+            callers are modified in place.
+        subroutine_end_blocks: The end of the control flow graph of every subroutine. Inlined
+            subroutines are removed.
+        mode: The mode of the program, which decides which threshold is used.
+        options: The optimization options, which contain the thresholds.
+
+    Returns:
+        The subroutines which were inlined.
+    """
+    components = strongly_connected_components(subroutineGraph)
+    componentSizes: Dict[int, int] = dict()
+    for component in components.values():
+        componentSizes[component] = componentSizes.get(component, 0) + 1
+
+    # the number of calls to each subroutine, and the subroutines they are in
+    callSites: Dict[SubroutineDefinition, int] = dict()
+    callers: Dict[SubroutineDefinition, List[Optional[SubroutineDefinition]]] = dict()
+    for caller, start in subroutine_start_blocks.items():
+        for op in _subroutineCalls(start):
+            callee = cast(SubroutineDefinition, op.args[0])
+            callSites[callee] = callSites.get(callee, 0) + 1
+            calleeCallers = callers.setdefault(callee, [])
+            if caller not in calleeCallers:
+                calleeCallers.append(caller)
+
+    inlined: List[SubroutineDefinition] = []
+    for subroutine in sorted(
+        subroutineGraph, key=lambda subroutine: (components[subroutine], subroutine.id)
+    ):
+        if (
+            componentSizes[components[subroutine]] > 1
+            or subroutine in subroutineGraph[subroutine]
+            or subroutine not in callSites
+        ):
+            continue
+
+        start = subroutine_start_blocks[subroutine]
+        if not any(
+            op.op == Op.retsub for block in TealBlock.Iterate(start) for op in block.ops
+        ):
+            continue
+        if not _shouldInline(start, callSites[subroutine], mode, options):
+            continue
+
+        subroutineCallers = callers.pop(subroutine)
+        for caller in subroutineCallers:
+            subroutine_start_blocks[caller] = inlineCalls(
+                subroutine_start_blocks[caller], subroutine, start
+            )
+            if caller is not None:
+                subroutineGraph[caller].discard(subroutine)
+                subroutineGraph[caller] |= subroutineGraph[subroutine]
+
+        for callee in subroutineGraph[subroutine]:
+            calleeCallers = callers[callee]
+            calleeCallers.remove(subroutine)
+            for caller in subroutineCallers:
+                if caller not in calleeCallers:
+                    calleeCallers.append(caller)
+
+        del subroutineGraph[subroutine]
+        del subroutine_start_blocks[subroutine]
+        del subroutine_end_blocks[subroutine]
+        inlined.append(subroutine)
+
+    return inlined
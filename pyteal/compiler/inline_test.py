@@ -0,0 +1,221 @@
+import pyteal as pt
+
+from pyteal.compiler.inline import inlineCalls, inlineSubroutines
+
+
+def compile_inlined(program, mode=pt.Mode.Application, **kwargs):
+    return pt.compileTeal(
+        program,
+        mode=mode,
+        version=6,
+        optimize=pt.OptimizeOptions(inline_subroutines=True, **kwargs),
+    )
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def isEven(x):
+    return x % pt.Int(2) == pt.Int(0)
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def double(x):
+    return x + x
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def fib(n):
+    return pt.If(n <= pt.Int(1)).Then(n).Else(fib(n - pt.Int(1)) + fib(n - pt.Int(2)))
+
+
+def test_single_call_site():
+    actual = compile_inlined(pt.Return(isEven(pt.Int(4))))
+    expected = """#pragma version 6
+int 4
+store 0
+load 0
+int 2
+%
+int 0
+==
+return"""
+    assert actual == expected
+
+
+def test_small_subroutine_application():
+    program = pt.Return(pt.And(isEven(pt.Int(4)), isEven(double(pt.Int(3)))))
+
+    actual = compile_inlined(program)
+    assert "callsub" not in actual
+    assert "retsub" not in actual
+
+    # the body of isEven costs more than the threshold, and it has two call sites
+    actual = compile_inlined(program, inline_cost_threshold=5)
+    assert actual.count("callsub isEven_0") == 2
+    assert "callsub double_1" not in actual
+
+
+def test_small_subroutine_signature():
+    program = pt.Return(pt.And(isEven(pt.Int(4)), isEven(double(pt.Int(3)))))
+
+    # inlining isEven twice takes more space than calling it, so only double is inlined
+    actual = compile_inlined(program, pt.Mode.Signature)
+    expected = """#pragma version 6
+int 4
+callsub isEven_0
+int 3
+store 1
+load 1
+load 1
++
+callsub isEven_0
+&&
+return
+
+// isEven
+isEven_0:
+store 0
+load 0
+int 2
+%
+int 0
+==
+retsub"""
+    assert actual == expected
+
+    actual = compile_inlined(program, pt.Mode.Signature, inline_size_threshold=3)
+    assert "callsub" not in actual
+
+
+def test_recursive_not_inlined():
+    @pt.Subroutine(pt.TealType.uint64)
+    def isOdd(n):
+        return (
+            pt.If(n == pt.Int(0)).Then(pt.Int(0)).Else(isEvenRecursive(n - pt.Int(1)))
+        )
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def isEvenRecursive(n):
+        return pt.If(n == pt.Int(0)).Then(pt.Int(1)).Else(isOdd(n - pt.Int(1)))
+
+    program = pt.Return(fib(pt.Int(5)) + isOdd(pt.Int(3)))
+    assert compile_inlined(program) == pt.compileTeal(
+        program, mode=pt.Mode.Application, version=6
+    )
+
+
+def test_no_return_not_inlined():
+    @pt.Subroutine(pt.TealType.none)
+    def fail():
+        return pt.Err()
+
+    program = pt.Seq(fail(), pt.Approve())
+    assert compile_inlined(program) == pt.compileTeal(
+        program, mode=pt.Mode.Application, version=6
+    )
+
+
+def test_multiple_returns():
+    @pt.Subroutine(pt.TealType.uint64)
+    def clamp(x):
+        return pt.Seq(
+            pt.If(x > pt.Int(10)).Then(pt.Return(pt.Int(10))),
+            pt.If(x == pt.Int(0)).Then(pt.Approve()),
+            x,
+        )
+
+    actual = compile_inlined(pt.Return(clamp(pt.Int(3)) + pt.Int(1)))
+    expected = """#pragma version 6
+int 3
+store 0
+load 0
+int 10
+>
+bnz main_l4
+load 0
+int 0
+==
+bnz main_l5
+load 0
+b main_l6
+main_l4:
+int 10
+b main_l6
+main_l5:
+int 1
+return
+main_l6:
+int 1
++
+return"""
+    assert actual == expected
+
+
+def test_inlineCalls():
+    callee = pt.SubroutineDefinition(lambda: pt.Int(1), pt.TealType.uint64)
+    calleeStart = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.int, 1), pt.TealOp(None, pt.Op.retsub)]
+    )
+
+    # a loop whose body calls the subroutine twice
+    loop = pt.TealConditionalBlock(
+        [
+            pt.TealOp(None, pt.Op.callsub, callee),
+            pt.TealOp(None, pt.Op.callsub, callee),
+            pt.TealOp(None, pt.Op.add),
+        ]
+    )
+    end = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    loop.setTrueBlock(loop)
+    loop.setFalseBlock(end)
+
+    start = inlineCalls(loop, callee, calleeStart)
+
+    assert type(start) is pt.TealSimpleBlock
+    assert start.ops == []
+    first = start.nextBlock
+    assert first.ops == [pt.TealOp(None, pt.Op.int, 1)]
+    middle = first.nextBlock
+    assert middle.ops == []
+    second = middle.nextBlock
+    assert second.ops == [pt.TealOp(None, pt.Op.int, 1)]
+    assert second.nextBlock is loop
+    assert loop.ops == [pt.TealOp(None, pt.Op.add)]
+    assert loop.trueBlock is start
+    assert loop.falseBlock is end
+
+    # the ops of each copy are new objects
+    assert first.ops[0] is not calleeStart.ops[0]
+    assert first.ops[0] is not second.ops[0]
+
+
+def test_inlineSubroutines_graph():
+    @pt.Subroutine(pt.TealType.uint64)
+    def quadruple(x):
+        return double(double(x))
+
+    program = pt.Return(quadruple(fib(pt.Int(3))))
+    options = pt.CompileOptions(
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(inline_subroutines=True),
+    )
+
+    graph = dict()
+    starts = dict()
+    ends = dict()
+    pt.compiler.compiler.compileSubroutine(program, options, graph, starts, ends)
+    quadrupleDef = quadruple.subroutine
+    doubleDef = double.subroutine
+    fibDef = fib.subroutine
+    assert graph == {
+        quadrupleDef: {doubleDef},
+        doubleDef: set(),
+        fibDef: {fibDef},
+    }
+
+    inlined = inlineSubroutines(graph, starts, ends, options.mode, options.optimize)
+
+    assert inlined == [doubleDef, quadrupleDef]
+    assert graph == {fibDef: {fibDef}}
+    assert set(starts.keys()) == {None, fibDef}
+    assert set(ends.keys()) == {None, fibDef}
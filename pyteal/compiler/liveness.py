@@ -0,0 +1,106 @@
+from typing import Dict, Iterator, List, Set, cast
+
+from pyteal.ast import ScratchSlot
+from pyteal.ir import TealBlock, TealOp, Op
+
+
+def slotBits(
+    blocks: List[TealBlock], skip_slots: Set[ScratchSlot]
+) -> Dict[ScratchSlot, int]:
+    """Assign a bit to each slot whose liveness can be tracked in a control flow graph.
+
+    Slots in skip_slots and slots which are referenced by an op other than a load or store are not
+    tracked, since their value may be accessed indirectly.
+    """
+    candidates: Set[ScratchSlot] = set()
+    excluded = set(skip_slots)
+    for block in blocks:
+        for op in block.ops:
+            slots = op.getSlots()
+            if len(slots) == 0:
+                continue
+            if (op.op == Op.store or op.op == Op.load) and len(slots) == 1:
+                candidates.add(slots[0])
+            else:
+                excluded.update(slots)
+
+    bits: Dict[ScratchSlot, int] = dict()
+    for slot in candidates - excluded:
+        bits[slot] = 1 << len(bits)
+    return bits
+
+
+def slotBit(op: TealOp, bits: Dict[ScratchSlot, int]) -> int:
+    """Get the bit of the slot a load or store op accesses, or 0 if the slot is not tracked."""
+    if op.op != Op.store and op.op != Op.load:
+        return 0
+    return bits.get(cast(ScratchSlot, op.args[0]), 0)
+
+
+def computeLiveOut(
+    blocks: List[TealBlock], bits: Dict[ScratchSlot, int]
+) -> Dict[int, int]:
+    """Compute which slots are live at the end of each block, i.e. may be loaded before they are
+    stored again, as a mask of slot bits keyed by the id of the block.
+
+    This is a backwards dataflow analysis which is solved with a worklist, so each block is only
+    revisited when the slots live at the start of one of its successors change.
+    """
+    # the slots each block loads before storing them, and the slots it stores
+    uses: Dict[int, int] = dict()
+    defs: Dict[int, int] = dict()
+    predecessors: Dict[int, List[TealBlock]] = {id(block): [] for block in blocks}
+    for block in blocks:
+        use = 0
+        define = 0
+        for op in reversed(block.ops):
+            bit = slotBit(op, bits)
+            if bit == 0:
+                continue
+            if op.op == Op.load:
+                use |= bit
+            else:
+                use &= ~bit
+                define |= bit
+        uses[id(block)] = use
+        defs[id(block)] = define
+        for successor in block.getOutgoing():
+            predecessors[id(successor)].append(block)
+
+    live_in: Dict[int, int] = {id(block): 0 for block in blocks}
+    live_out: Dict[int, int] = {id(block): 0 for block in blocks}
+    # blocks are visited in reverse breadth-first order, so most successors are visited before
+    # their predecessors
+    worklist = list(blocks)
+    queued = {id(block) for block in blocks}
+    while len(worklist) != 0:
+        block = worklist.pop()
+        key = id(block)
+        queued.discard(key)
+
+        out = 0
+        for successor in block.getOutgoing():
+            out |= live_in[id(successor)]
+        live_out[key] = out
+
+        new_in = uses[key] | (out & ~defs[key])
+        if new_in == live_in[key]:
+            continue
+        live_in[key] = new_in
+        for predecessor in predecessors[key]:
+            if id(predecessor) not in queued:
+                queued.add(id(predecessor))
+                worklist.append(predecessor)
+
+    return live_out
+
+
+def slotsOf(mask: int, slots: List[ScratchSlot]) -> Iterator[ScratchSlot]:
+    """Iterate over the slots whose bits are set in mask, where slots lists the slots in the order
+    of their bits."""
+    index = 0
+    while mask != 0:
+        if mask & 1:
+            yield slots[index]
+        mask >>= 1
+        index += 1
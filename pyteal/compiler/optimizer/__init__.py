@@ -2,3 +2,11 @@ from pyteal.compiler.optimizer.optimizer import (
     OptimizeOptions,
     apply_global_optimizations,
 )
+from pyteal.compiler.optimizer.arguments import apply_stack_arguments
+from pyteal.compiler.optimizer.jumps import apply_jump_threading
+from pyteal.compiler.optimizer.peephole import (
+    PEEPHOLE_RULES,
+    PeepholeRule,
+    apply_peephole_optimizations,
+)
+from pyteal.compiler.optimizer.tails import apply_tail_merging
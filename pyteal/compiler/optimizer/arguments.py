@@ -0,0 +1,330 @@
+from typing import Dict, List, Optional, Tuple, cast
+
+from pyteal.ast import ScratchSlot, SubroutineDefinition
+from pyteal.ir import Op, TealBlock, TealConditionalBlock, TealOp
+from pyteal.types import TealType
+from pyteal.compiler.liveness import computeLiveOut, slotBit
+
+# the number of values each op pops from and pushes to the stack, for the ops whose effect does not
+# depend on their arguments
+_STACK_EFFECTS: Dict[Op, Tuple[int, int]] = {
+    Op.err: (0, 0),
+    Op.sha256: (1, 1),
+    Op.keccak256: (1, 1),
+    Op.sha512_256: (1, 1),
+    Op.ed25519verify: (3, 1),
+    Op.add: (2, 1),
+    Op.minus: (2, 1),
+    Op.div: (2, 1),
+    Op.mul: (2, 1),
+    Op.lt: (2, 1),
+    Op.gt: (2, 1),
+    Op.le: (2, 1),
+    Op.ge: (2, 1),
+    Op.logic_and: (2, 1),
+    Op.logic_or: (2, 1),
+    Op.eq: (2, 1),
+    Op.neq: (2, 1),
+    Op.logic_not: (1, 1),
+    Op.len: (1, 1),
+    Op.itob: (1, 1),
+    Op.btoi: (1, 1),
+    Op.mod: (2, 1),
+    Op.bitwise_or: (2, 1),
+    Op.bitwise_and: (2, 1),
+    Op.bitwise_xor: (2, 1),
+    Op.bitwise_not: (1, 1),
+    Op.mulw: (2, 2),
+    Op.addw: (2, 2),
+    Op.intcblock: (0, 0),
+    Op.intc: (0, 1),
+    Op.intc_0: (0, 1),
+    Op.intc_1: (0, 1),
+    Op.intc_2: (0, 1),
+    Op.intc_3: (0, 1),
+    Op.int: (0, 1),
+    Op.bytecblock: (0, 0),
+    Op.bytec: (0, 1),
+    Op.bytec_0: (0, 1),
+    Op.bytec_1: (0, 1),
+    Op.bytec_2: (0, 1),
+    Op.bytec_3: (0, 1),
+    Op.byte: (0, 1),
+    Op.addr: (0, 1),
+    Op.method_signature: (0, 1),
+    Op.arg: (0, 1),
+    Op.txn: (0, 1),
+    Op.global_: (0, 1),
+    Op.gtxn: (0, 1),
+    Op.load: (0, 1),
+    Op.store: (1, 0),
+    Op.txna: (0, 1),
+    Op.gtxna: (0, 1),
+    Op.return_: (1, 0),
+    Op.pop: (1, 0),
+    Op.dup: (1, 2),
+    Op.dup2: (2, 4),
+    Op.concat: (2, 1),
+    Op.substring: (1, 1),
+    Op.substring3: (3, 1),
+    Op.balance: (1, 1),
+    Op.app_opted_in: (2, 1),
+    Op.app_local_get: (2, 1),
+    Op.app_local_get_ex: (3, 2),
+    Op.app_global_get: (1, 1),
+    Op.app_global_get_ex: (2, 2),
+    Op.app_local_put: (3, 0),
+    Op.app_global_put: (2, 0),
+    Op.app_local_del: (2, 0),
+    Op.app_global_del: (1, 0),
+    Op.asset_holding_get: (2, 2),
+    Op.asset_params_get: (1, 2),
+    Op.gtxns: (1, 1),
+    Op.gtxnsa: (1, 1),
+    Op.assert_: (1, 0),
+    Op.swap: (2, 2),
+    Op.select: (3, 1),
+    Op.getbit: (2, 1),
+    Op.setbit: (3, 1),
+    Op.getbyte: (2, 1),
+    Op.setbyte: (3, 1),
+    Op.min_balance: (1, 1),
+    Op.pushbytes: (0, 1),
+    Op.pushint: (0, 1),
+    Op.shl: (2, 1),
+    Op.shr: (2, 1),
+    Op.sqrt: (1, 1),
+    Op.bitlen: (1, 1),
+    Op.exp: (2, 1),
+    Op.divmodw: (4, 4),
+    Op.expw: (2, 2),
+    Op.b_add: (2, 1),
+    Op.b_minus: (2, 1),
+    Op.b_div: (2, 1),
+    Op.b_mul: (2, 1),
+    Op.b_lt: (2, 1),
+    Op.b_gt: (2, 1),
+    Op.b_le: (2, 1),
+    Op.b_ge: (2, 1),
+    Op.b_eq: (2, 1),
+    Op.b_neq: (2, 1),
+    Op.b_mod: (2, 1),
+    Op.b_or: (2, 1),
+    Op.b_and: (2, 1),
+    Op.b_xor: (2, 1),
+    Op.b_not: (1, 1),
+    Op.bzero: (1, 1),
+    Op.gload: (0, 1),
+    Op.gloads: (1, 1),
+    Op.gaid: (0, 1),
+    Op.gaids: (1, 1),
+    Op.retsub: (0, 0),
+    Op.ecdsa_verify: (5, 1),
+    Op.ecdsa_pk_decompress: (1, 2),
+    Op.ecdsa_pk_recover: (4, 2),
+    Op.loads: (1, 1),
+    Op.stores: (2, 0),
+    Op.extract: (1, 1),
+    Op.extract3: (3, 1),
+    Op.extract_uint16: (2, 1),
+    Op.extract_uint32: (2, 1),
+    Op.extract_uint64: (2, 1),
+    Op.app_params_get: (1, 2),
+    Op.log: (1, 0),
+    Op.itxn_begin: (0, 0),
+    Op.itxn_field: (1, 0),
+    Op.itxn_submit: (0, 0),
+    Op.itxn: (0, 1),
+    Op.itxna: (0, 1),
+    Op.txnas: (1, 1),
+    Op.gtxnas: (1, 1),
+    Op.gtxnsas: (2, 1),
+    Op.args: (1, 1),
+    Op.bsqrt: (1, 1),
+    Op.divw: (3, 1),
+    Op.itxn_next: (0, 0),
+    Op.itxnas: (1, 1),
+    Op.gitxn: (0, 1),
+    Op.gitxna: (0, 1),
+    Op.gitxnas: (1, 1),
+    Op.gloadss: (2, 1),
+    Op.acct_params_get: (1, 2),
+}
+
+
+def _stackEffect(op: TealOp) -> Optional[Tuple[int, int]]:
+    """Get the number of values an op pops from and pushes to the stack, counting the values an op
+    like dig reads as popped and pushed again. Returns None if the effect is not known."""
+    if op.op == Op.callsub:
+        subroutine = cast(SubroutineDefinition, op.args[0])
+        return (
+            subroutine.argumentCount(),
+            0 if subroutine.returnType == TealType.none else 1,
+        )
+    if op.op == Op.dig:
+        depth = cast(int, op.args[0])
+        return depth + 1, depth + 2
+    if op.op == Op.cover or op.op == Op.uncover:
+        depth = cast(int, op.args[0])
+        return depth + 1, depth + 1
+    return _STACK_EFFECTS.get(op.op)
+
+
+def _liveAfterOps(
+    block: TealBlock, liveOut: int, bits: Dict[ScratchSlot, int]
+) -> List[int]:
+    """Get the slots live after each op of a block, followed by the slots live at its start."""
+    live = liveOut
+    liveAfter: List[int] = []
+    for op in reversed(block.ops):
+        liveAfter.append(live)
+        bit = slotBit(op, bits)
+        if op.op == Op.load:
+            live |= bit
+        else:
+            live &= ~bit
+    liveAfter.reverse()
+    liveAfter.append(live)
+    return liveAfter
+
+
+def _accessArgument(consume: bool, depth: int) -> List[TealOp]:
+    """Get the ops which copy, or move if consume is true, the value depth values below the top of
+    the stack to the top."""
+    if consume:
+        if depth == 0:
+            return []
+        if depth == 1:
+            return [TealOp(None, Op.swap)]
+        return [TealOp(None, Op.uncover, depth)]
+    if depth == 0:
+        return [TealOp(None, Op.dup)]
+    return [TealOp(None, Op.dig, depth)]
+
+
+def apply_stack_arguments(start: TealBlock, argumentCount: int) -> bool:
+    """Keep the arguments of a subroutine on the stack instead of storing them in scratch slots.
+
+    A subroutine stores its arguments into scratch slots before its body runs, and loads a slot at
+    every use of an argument. This removes the store of an argument and replaces its loads with
+    :code:`dig`, or with :code:`uncover` at its last use, so it is removed from the stack by the
+    time the subroutine returns.
+
+    An argument is only kept on the stack if it is only accessed with loads, it is used, and
+    wherever a branch is taken, it is either used again on every path from the branch or on none
+    of them, since otherwise the stack would have a different shape when the paths join. The
+    arguments are stored starting from the top of the stack, so only the first arguments, which are
+    at the bottom, can be kept. The control flow graph is not changed if the effect of an op on the
+    stack is not known, or if the stack height differs between the paths which join at a block.
+
+    This requires :code:`uncover`, which is available in TEAL version 5 and later.
+
+    Args:
+        start: The start of the subroutine's control flow graph. Its blocks are modified in place.
+        argumentCount: The number of arguments of the subroutine, which are on the stack when it
+            starts and stored into their slots by its first ops.
+
+    Returns:
+        True if any argument is kept on the stack.
+    """
+    if argumentCount == 0 or len(start.ops) < argumentCount:
+        return False
+
+    prologue = start.ops[:argumentCount]
+    if any(op.op != Op.store or len(op.getSlots()) != 1 for op in prologue):
+        return False
+    # the argument slots, in the order their values are on the stack, from the bottom
+    argumentSlots = [cast(ScratchSlot, op.args[0]) for op in reversed(prologue)]
+    if len(set(argumentSlots)) != argumentCount:
+        return False
+
+    blocks = list(TealBlock.Iterate(start))
+    prologueIds = set(id(op) for op in prologue)
+    candidates = set(argumentSlots)
+    for block in blocks:
+        if start in block.getOutgoing():
+            # the arguments would be stored again
+            return False
+        for op in block.ops:
+            if op.op != Op.load and id(op) not in prologueIds:
+                candidates.difference_update(op.getSlots())
+
+    bits = {slot: 1 << i for i, slot in enumerate(candidates)}
+    liveOut = computeLiveOut(blocks, bits)
+    liveAfter = {
+        id(block): _liveAfterOps(block, liveOut[id(block)], bits) for block in blocks
+    }
+
+    # an argument is eligible if it is live once the arguments are stored, and if it is live at
+    # the end of a block, it is live at the start of every successor
+    eligible = liveAfter[id(start)][argumentCount - 1]
+    for block in blocks:
+        for successor in block.getOutgoing():
+            eligible &= ~(liveOut[id(block)] & ~liveAfter[id(successor)][-1])
+
+    kept: List[ScratchSlot] = []
+    for slot in argumentSlots:
+        if slot not in bits or not eligible & bits[slot]:
+            break
+        kept.append(slot)
+    if len(kept) == 0:
+        return False
+    keptMask = sum(bits[slot] for slot in kept)
+
+    # simulate the stack, as the number of values above the kept arguments and the arguments which
+    # are still on the stack, to find the depth of each access
+    newOps: Dict[int, List[TealOp]] = dict()
+    entryStates: Dict[int, Tuple[int, int]] = {id(start): (0, keptMask)}
+    worklist = [start]
+    while len(worklist) != 0:
+        block = worklist.pop()
+        height, present = entryStates[id(block)]
+        ops: List[TealOp] = []
+        first = 0
+        if block is start:
+            # the arguments which are not kept are above the kept ones, so they are still stored
+            ops.extend(start.ops[: argumentCount - len(kept)])
+            first = argumentCount
+
+        for index in range(first, len(block.ops)):
+            op = block.ops[index]
+            bit = slotBit(op, bits)
+            if bit & keptMask:
+                depth = height + sum(
+                    1
+                    for slot in kept[kept.index(cast(ScratchSlot, op.args[0])) + 1 :]
+                    if present & bits[slot]
+                )
+                consume = not liveAfter[id(block)][index] & bit
+                ops.extend(_accessArgument(consume, depth))
+                if consume:
+                    present &= ~bit
+                height += 1
+                continue
+
+            effect = _stackEffect(op)
+            if effect is None or effect[0] > height:
+                return False
+            if op.op == Op.retsub and present != 0:
+                return False
+            height += effect[1] - effect[0]
+            ops.append(op)
+
+        if type(block) is TealConditionalBlock:
+            if height == 0:
+                return False
+            height -= 1
+
+        newOps[id(block)] = ops
+        for successor in block.getOutgoing():
+            state = (height, present)
+            if id(successor) not in entryStates:
+                entryStates[id(successor)] = state
+                worklist.append(successor)
+            elif entryStates[id(successor)] != state:
+                return False
+
+    for block in blocks:
+        if id(block) in newOps:
+            block.ops = newOps[id(block)]
+    return True
@@ -0,0 +1,188 @@
+import pyteal as pt
+
+from pyteal.compiler.optimizer.arguments import apply_stack_arguments
+
+
+def compile_stack_arguments(program, version=6):
+    return pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=version,
+        optimize=pt.OptimizeOptions(stack_arguments=True),
+    )
+
+
+def subroutine_code(teal, name):
+    lines = teal.splitlines()
+    start = lines.index("{}:".format(name)) + 1
+    end = lines.index("retsub", start) + 1
+    return lines[start:end]
+
+
+def test_single_use():
+    @pt.Subroutine(pt.TealType.uint64)
+    def mix(a, b, c):
+        return a * pt.Int(3) + b - c
+
+    teal = compile_stack_arguments(mix(pt.Int(1), pt.Int(2), pt.Int(3)))
+    assert subroutine_code(teal, "mix_0") == [
+        "uncover 2",
+        "int 3",
+        "*",
+        "uncover 2",
+        "+",
+        "swap",
+        "-",
+        "retsub",
+    ]
+
+
+def test_multiple_uses():
+    @pt.Subroutine(pt.TealType.none)
+    def logTwice(a, b):
+        return pt.Seq(pt.Log(a), pt.Log(b), pt.Log(a))
+
+    teal = compile_stack_arguments(
+        pt.Seq(logTwice(pt.Bytes("a"), pt.Bytes("b")), pt.Int(1))
+    )
+    assert subroutine_code(teal, "logTwice_0") == [
+        "dig 1",
+        "log",
+        "log",
+        "log",
+        "retsub",
+    ]
+
+
+def test_branches():
+    @pt.Subroutine(pt.TealType.uint64)
+    def choose(a, b):
+        return pt.If(a > b).Then(a - b).Else(b - a)
+
+    teal = compile_stack_arguments(choose(pt.Int(1), pt.Int(2)))
+    assert subroutine_code(teal, "choose_0") == [
+        "dig 1",
+        "dig 1",
+        ">",
+        "bnz choose_0_l2",
+        "swap",
+        "-",
+        "b choose_0_l3",
+        "choose_0_l2:",
+        "swap",
+        "swap",
+        "-",
+        "choose_0_l3:",
+        "retsub",
+    ]
+
+
+def test_used_on_one_path():
+    @pt.Subroutine(pt.TealType.uint64)
+    def maybe(a, b):
+        return pt.If(a).Then(b).Else(pt.Int(0))
+
+    # b is only used if a is not zero, so it is stored, which leaves a on the stack
+    teal = compile_stack_arguments(maybe(pt.Int(1), pt.Int(2)))
+    assert subroutine_code(teal, "maybe_0") == [
+        "store 0",
+        "bnz maybe_0_l2",
+        "int 0",
+        "b maybe_0_l3",
+        "maybe_0_l2:",
+        "load 0",
+        "maybe_0_l3:",
+        "retsub",
+    ]
+
+
+def test_loop():
+    @pt.Subroutine(pt.TealType.uint64)
+    def triangle(n):
+        i = pt.ScratchVar(pt.TealType.uint64)
+        total = pt.ScratchVar(pt.TealType.uint64)
+        return pt.Seq(
+            total.store(pt.Int(0)),
+            pt.For(i.store(pt.Int(0)), i.load() < n, i.store(i.load() + pt.Int(1))).Do(
+                total.store(total.load() + i.load())
+            ),
+            total.load(),
+        )
+
+    # n is needed again whenever the loop continues, but not once it exits
+    program = triangle(pt.Int(10))
+    teal = compile_stack_arguments(program)
+    assert teal == pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+
+
+def test_recursion():
+    @pt.Subroutine(pt.TealType.uint64)
+    def fib(n):
+        return (
+            pt.If(n <= pt.Int(1)).Then(n).Else(fib(n - pt.Int(1)) + fib(n - pt.Int(2)))
+        )
+
+    # the argument is part of each call's stack, so it does not need to be spilled
+    teal = compile_stack_arguments(fib(pt.Int(10)))
+    assert subroutine_code(teal, "fib_0") == [
+        "dup",
+        "int 1",
+        "<=",
+        "bnz fib_0_l2",
+        "dup",
+        "int 1",
+        "-",
+        "callsub fib_0",
+        "swap",
+        "int 2",
+        "-",
+        "callsub fib_0",
+        "+",
+        "b fib_0_l3",
+        "fib_0_l2:",
+        "fib_0_l3:",
+        "retsub",
+    ]
+
+
+def test_version():
+    @pt.Subroutine(pt.TealType.uint64)
+    def add(a, b):
+        return a + b
+
+    # uncover is not available before version 5
+    program = add(pt.Int(1), pt.Int(2))
+    assert compile_stack_arguments(program, 4) == pt.compileTeal(
+        program, mode=pt.Mode.Application, version=4
+    )
+
+
+def test_unknown_stack_height():
+    slot = pt.ScratchSlot()
+    ops = [
+        pt.TealOp(None, pt.Op.store, slot),
+        # dig reaches below the values pushed by the subroutine
+        pt.TealOp(None, pt.Op.dig, 1),
+        pt.TealOp(None, pt.Op.load, slot),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+    block = pt.TealSimpleBlock(list(ops))
+    assert not apply_stack_arguments(block, 1)
+    assert block.ops == ops
+
+
+def test_argument_stored_again():
+    slot = pt.ScratchSlot()
+    ops = [
+        pt.TealOp(None, pt.Op.store, slot),
+        pt.TealOp(None, pt.Op.load, slot),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.store, slot),
+        pt.TealOp(None, pt.Op.load, slot),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+    block = pt.TealSimpleBlock(list(ops))
+    assert not apply_stack_arguments(block, 1)
+    assert block.ops == ops
@@ -0,0 +1,233 @@
+from typing import Dict, List, Optional, Set, Tuple, cast
+
+from pyteal.ir import LabelReference, Op, TealComponent, TealLabel, TealOp
+
+# ops after which execution does not continue at the next op
+_UNCONDITIONAL_OPS = (Op.b, Op.return_, Op.err, Op.retsub)
+
+# ops which end the execution of a program or subroutine, and which replace a jump to them
+_EXIT_OPS = (Op.return_, Op.err, Op.retsub)
+
+_JUMP_OPS = (Op.b, Op.bz, Op.bnz)
+
+_INVERTED_JUMPS = {Op.bz: Op.bnz, Op.bnz: Op.bz}
+
+
+def _target(op: TealOp) -> str:
+    """Get the name of the label a jump or callsub op goes to."""
+    arg = op.args[0]
+    return arg.getLabel() if isinstance(arg, LabelReference) else cast(str, arg)
+
+
+def _resolveTargets(
+    teal: List[TealComponent],
+) -> Tuple[Dict[str, Optional[int]], Dict[str, TealLabel]]:
+    """Find the op each label of a flattened program leads to, following unconditional jumps.
+
+    Returns:
+        The index of the op at which execution continues after a jump to each label, or None if it
+        continues at the end of the program, and the last label before that op, which is used for
+        jumps to any label that leads to it.
+    """
+    # the index of the first op at or after each label, and the last label before it
+    firstOps: Dict[str, Optional[int]] = dict()
+    lastLabels: Dict[str, TealLabel] = dict()
+    run: List[TealLabel] = []
+    for i, stmt in enumerate(teal):
+        if isinstance(stmt, TealLabel):
+            run.append(stmt)
+            continue
+        for label in run:
+            firstOps[label.getLabelRef().getLabel()] = i
+            lastLabels[label.getLabelRef().getLabel()] = run[-1]
+        run = []
+    for label in run:
+        firstOps[label.getLabelRef().getLabel()] = None
+        lastLabels[label.getLabelRef().getLabel()] = run[-1]
+
+    targets: Dict[str, Optional[int]] = dict()
+    targetLabels: Dict[str, TealLabel] = dict()
+    for name in firstOps:
+        # follow the chain of jumps until an op which is not a jump, a resolved label, or a cycle
+        chain: List[str] = []
+        seen: Set[str] = set()
+        current = name
+        while current not in targets and current not in seen:
+            chain.append(current)
+            seen.add(current)
+            index = firstOps[current]
+            if index is None:
+                break
+            op = teal[index]
+            if not isinstance(op, TealOp) or op.op != Op.b:
+                break
+            current = _target(op)
+
+        if current in targets:
+            target, targetLabel = targets[current], targetLabels[current]
+        else:
+            target, targetLabel = firstOps[current], lastLabels[current]
+        for link in chain:
+            targets[link] = target
+            targetLabels[link] = targetLabel
+
+    return targets, targetLabels
+
+
+def _reachable(teal: List[TealComponent], labels: Dict[str, int]) -> List[bool]:
+    """Find the ops of a flattened program which can be executed, starting from its first op."""
+    reachable = [False] * len(teal)
+    pending = [0]
+    while len(pending) != 0:
+        i = pending.pop()
+        while i < len(teal) and not reachable[i]:
+            reachable[i] = True
+            stmt = teal[i]
+            i += 1
+            if not isinstance(stmt, TealOp):
+                continue
+            if stmt.op in _JUMP_OPS or stmt.op == Op.callsub:
+                pending.append(labels[_target(stmt)])
+            if stmt.op in _UNCONDITIONAL_OPS:
+                break
+    return reachable
+
+
+def _removeJumpsToNext(teal: List[TealComponent]) -> Tuple[List[TealComponent], int]:
+    """Remove the jumps to the label which follows them, and invert a conditional jump over an
+    unconditional one, so that the conditional jump goes to the target of the unconditional one."""
+    # the ops which are kept, and the labels before each of them
+    ops: List[TealOp] = []
+    labelsBefore: List[List[TealLabel]] = []
+    run: List[TealLabel] = []
+    runNames: Set[str] = set()
+    changes = 0
+
+    def removeJumpsToRun() -> None:
+        nonlocal run, changes
+        while len(ops) != 0:
+            last = ops[-1]
+            if last.op not in _JUMP_OPS:
+                break
+
+            if _target(last) in runNames:
+                # a conditional jump to the next op only pops its condition
+                if last.op == Op.b:
+                    ops.pop()
+                    run = labelsBefore.pop() + run
+                else:
+                    ops[-1] = TealOp(last.expr, Op.pop)
+            elif (
+                last.op == Op.b
+                and len(ops) >= 2
+                and len(labelsBefore[-1]) == 0
+                and ops[-2].op in _INVERTED_JUMPS
+                and _target(ops[-2]) in runNames
+            ):
+                previous = ops[-2]
+                ops[-2] = TealOp(
+                    previous.expr, _INVERTED_JUMPS[previous.op], last.args[0]
+                )
+                ops.pop()
+                labelsBefore.pop()
+            else:
+                break
+            changes += 1
+
+    for stmt in teal:
+        if isinstance(stmt, TealLabel):
+            run.append(stmt)
+            runNames.add(stmt.getLabelRef().getLabel())
+            continue
+        if len(run) != 0:
+            removeJumpsToRun()
+        labelsBefore.append(run)
+        ops.append(cast(TealOp, stmt))
+        run = []
+        runNames = set()
+    if len(run) != 0:
+        removeJumpsToRun()
+
+    output: List[TealComponent] = []
+    for labels, op in zip(labelsBefore, ops):
+        output += labels
+        output.append(op)
+    output += run
+    return output, changes
+
+
+def apply_jump_threading(
+    teal: List[TealComponent],
+) -> Tuple[List[TealComponent], int]:
+    """Simplify the jumps of a flattened program, and remove the ops and labels which are no longer
+    needed.
+
+    A jump to a label which is followed by other labels, or by an unconditional jump, goes directly
+    to the op where execution continues, through any number of jumps. An unconditional jump to a
+    :code:`return`, :code:`err` or :code:`retsub` op is replaced by a copy of that op. The ops which
+    cannot be reached from the start of the program, such as the ops after an unconditional jump
+    which no longer have a label that is jumped to, are then removed, as are jumps to the label
+    which follows them and the labels which are no longer referenced. A conditional jump over an
+    unconditional jump is inverted, so that it goes to the target of the unconditional jump instead.
+
+    Each step visits every component of the program a constant number of times, so this takes time
+    linear in the length of the program.
+
+    Args:
+        teal: The flattened program, after the labels of its subroutines have been resolved. It is
+            not modified.
+
+    Returns:
+        The simplified program, and the number of jumps which were changed or removed plus the
+        number of unreachable ops which were removed.
+    """
+    targets, targetLabels = _resolveTargets(teal)
+
+    threaded: List[TealComponent] = []
+    changes = 0
+    for stmt in teal:
+        if isinstance(stmt, TealOp) and stmt.op in _JUMP_OPS:
+            name = _target(stmt)
+            target = targets[name]
+            targetOp = teal[target] if target is not None else None
+            if (
+                stmt.op == Op.b
+                and isinstance(targetOp, TealOp)
+                and targetOp.op in _EXIT_OPS
+            ):
+                stmt = TealOp(targetOp.expr, targetOp.op)
+                changes += 1
+            else:
+                targetLabel = targetLabels[name].getLabelRef()
+                if targetLabel.getLabel() != name:
+                    stmt = TealOp(stmt.expr, stmt.op, targetLabel)
+                    changes += 1
+        threaded.append(stmt)
+
+    labels = {
+        stmt.getLabelRef().getLabel(): i
+        for i, stmt in enumerate(threaded)
+        if isinstance(stmt, TealLabel)
+    }
+    reachable = _reachable(threaded, labels)
+    kept = [
+        stmt
+        for i, stmt in enumerate(threaded)
+        if reachable[i] or isinstance(stmt, TealLabel)
+    ]
+    removedOps = len(threaded) - len(kept)
+
+    kept, removedJumps = _removeJumpsToNext(kept)
+
+    referenced: Set[str] = set()
+    for stmt in kept:
+        if isinstance(stmt, TealOp) and (stmt.op in _JUMP_OPS or stmt.op == Op.callsub):
+            referenced.add(_target(stmt))
+    output = [
+        stmt
+        for stmt in kept
+        if not isinstance(stmt, TealLabel)
+        or stmt.getLabelRef().getLabel() in referenced
+    ]
+
+    return output, changes + removedOps + removedJumps
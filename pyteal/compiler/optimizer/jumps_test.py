@@ -0,0 +1,231 @@
+import pyteal as pt
+
+from pyteal.compiler.optimizer.jumps import apply_jump_threading
+
+
+def thread(teal):
+    with pt.TealComponent.Context.ignoreExprEquality():
+        return apply_jump_threading(teal)
+
+
+def test_label_run():
+    teal = [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 0),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    actual, changes = thread(teal)
+    assert actual == [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 0),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    assert changes == 1
+
+
+def test_jump_chain():
+    teal = [
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.log),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l3")),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, pt.LabelReference("l3")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    before = list(teal)
+
+    actual, changes = thread(teal)
+    assert actual == [
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l3")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.log),
+        pt.TealLabel(None, pt.LabelReference("l3")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    # three jumps are threaded, the unreachable err is removed, and the jump to l3 which follows
+    # the log is removed
+    assert changes == 5
+    assert teal == before
+
+
+def test_jump_to_exit():
+    teal = [
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    actual, changes = thread(teal)
+    assert actual == [
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    assert changes == 1
+
+    # a conditional jump to an exit op is kept, since the op is only executed on one side
+    teal = [
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+    assert thread(teal) == (teal, 0)
+
+
+def test_unreachable():
+    teal = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 3),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    actual, changes = thread(teal)
+    assert actual == [pt.TealOp(None, pt.Op.int, 1), pt.TealOp(None, pt.Op.return_)]
+    assert changes == 3
+
+
+def test_subroutines_reachable():
+    teal = [
+        pt.TealOp(None, pt.Op.callsub, "sub_0"),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, pt.LabelReference("sub_0")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.retsub),
+        pt.TealLabel(None, pt.LabelReference("sub_1")),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+    actual, changes = thread(teal)
+    assert actual == teal[:5]
+    assert changes == 2
+
+
+def test_invert_jump():
+    teal = [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.log),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    actual, changes = thread(teal)
+    assert actual == [
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.log),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    assert changes == 1
+
+
+def test_jump_to_next():
+    teal = [
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l1")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    actual, changes = thread(teal)
+    assert actual == [
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    assert changes == 1
+
+
+def test_cycle():
+    teal = [
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l3")),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l1")),
+    ]
+    actual, _ = thread(teal)
+    # every label in the cycle leads to l1, so the conditional jump goes to the next op
+    assert actual == [
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l1")),
+    ]
+
+
+def test_linear():
+    # a chain of jumps which each go to the next one is resolved without following it from every
+    # label, and the run of labels it leaves is not rescanned for each label
+    count = 20000
+    teal = [pt.TealOp(None, pt.Op.bz, pt.LabelReference("l0"))]
+    for i in range(count):
+        teal += [
+            pt.TealLabel(None, pt.LabelReference("l{}".format(i))),
+            pt.TealOp(None, pt.Op.b, pt.LabelReference("l{}".format(i + 1))),
+        ]
+    teal += [
+        pt.TealLabel(None, pt.LabelReference("l{}".format(count))),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    actual, _ = thread(teal)
+    assert actual == [
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+
+def test_compile():
+    program = pt.Return(
+        pt.Cond(
+            [pt.Txn.application_args[0] == pt.Bytes("a"), pt.Int(1)],
+            [pt.Txn.application_args[0] == pt.Bytes("b"), pt.Int(2)],
+        )
+    )
+    expected = pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+    assert expected.count("b main_l") == 2
+
+    stats = pt.CompileStats()
+    actual = pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(jump_threading=True),
+        stats=stats,
+    )
+    assert "b main_l" not in actual
+    assert actual.count("return") == 2
+    # two jumps are replaced with a return, and the return they went to is no longer reachable
+    assert stats.passTotals()["threadJumps"].changes == 3
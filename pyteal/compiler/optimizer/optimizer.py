@@ -1,7 +1,7 @@
-from typing import Set
+from typing import Dict, List, Set, Tuple
 from pyteal.ast import ScratchSlot
 from pyteal.ir import TealBlock, TealOp, Op
-from pyteal.errors import TealInternalError
+from pyteal.compiler.liveness import computeLiveOut, slotBit, slotBits
 
 
 class OptimizeOptions:
@@ -21,83 +21,168 @@ class OptimizeOptions:
     Args:
 
         scratch_slots (optional): cancel contiguous store/load operations
-            that have no load dependencies elsewhere.
+            when the slot is not loaded again before it is next stored, and
+            replace stores to slots which are not loaded again with pops.
+            Local slots whose values are never needed at the same time also
+            share slot IDs, and only the local slots whose values are needed
+            after a recursive call are spilled to the stack around it.
+        constant_folding (optional): evaluate operations whose operands are
+            Int or Bytes literals at compile time. Operations which would fail
+            at runtime, such as an overflowing addition or a division by zero,
+            are not folded.
+        common_subexpressions (optional): evaluate repeated expressions only
+            once, when their first evaluation happens on every path to the
+            repetition and the state they read has not changed since. The
+            value is duplicated on the stack or saved in a new scratch slot.
+        peephole (optional): rewrite short sequences of adjacent ops in the
+            final program with cheaper equivalents, for instance :code:`int 0; ==`
+            with :code:`!`, or remove them, for instance :code:`dup; pop` or a
+            jump to the label which follows it.
+        stack_arguments (optional): keep the arguments of subroutines on
+            the stack instead of storing them in scratch slots, and access
+            them with :code:`dig`, or :code:`uncover` at their last use, when
+            every path through the subroutine uses them consistently. This
+            requires TEAL version 5 or later, and has no effect otherwise.
+        inline_subroutines (optional): replace the calls to subroutines which
+            are called from a single place, or which are small, with a copy of
+            their body. Subroutines which may call themselves are never inlined.
+            In Signature mode, a subroutine is small if inlining it grows the
+            program by at most inline_size_threshold bytes, and in Application
+            mode, if the static opcode cost of its body is at most
+            inline_cost_threshold.
+        inline_size_threshold (optional): the estimated number of bytes a
+            Signature mode program may grow by when a subroutine is inlined.
+            Defaults to 0, so subroutines are only inlined when this does not
+            grow the program.
+        inline_cost_threshold (optional): the largest static opcode cost of the
+            body of a subroutine which is inlined in an Application mode
+            program. Defaults to 16.
+        cond_dispatch (optional): compile runs of at least 8 consecutive arms
+            of a Cond which compare the same transaction field, global field,
+            argument, or scratch slot for equality against different constants,
+            such as a method router, into a balanced tree of comparisons. The
+            subject is evaluated once, and any arm is reached after a number of
+            comparisons which is logarithmic in the number of arms, instead of
+            linear. Comparing byte strings requires TEAL version 4 or later.
+        short_circuit (optional): compile an And or Or into branches which
+            skip its remaining operands once its value is known, when the
+            static opcode cost of the operands after the first one is at least
+            4. The skipped operands are not evaluated, so their side effects do
+            not happen and they cannot fail the program. Programs which depend
+            on every operand being evaluated should not enable this.
+        jump_threading (optional): make jumps to a label which is followed by
+            another label or by an unconditional jump go directly to where
+            execution continues, replace jumps to a :code:`return`, :code:`err`
+            or :code:`retsub` op with a copy of it, and remove the ops which can
+            no longer be reached, the jumps to the next op, and the labels which
+            are no longer referenced, after the program is flattened.
+        tail_merging (optional): merge identical runs of ops which end the
+            branches of the flattened program with :code:`b`, :code:`return`,
+            :code:`err` or :code:`retsub` into one shared copy, which the other
+            branches jump to, when the run is estimated to take more bytes than
+            the jump. This makes the program smaller, at the cost of one jump
+            op on the paths which are redirected. Before TEAL version 4, the
+            last copy of each run is kept, so that the jumps only go forward.
     """
 
-    def __init__(self, *, scratch_slots: bool = False):
+    def __init__(
+        self,
+        *,
+        scratch_slots: bool = False,
+        constant_folding: bool = False,
+        common_subexpressions: bool = False,
+        peephole: bool = False,
+        stack_arguments: bool = False,
+        inline_subroutines: bool = False,
+        inline_size_threshold: int = 0,
+        inline_cost_threshold: int = 16,
+        cond_dispatch: bool = False,
+        short_circuit: bool = False,
+        jump_threading: bool = False,
+        tail_merging: bool = False,
+    ):
         self.scratch_slots = scratch_slots
+        self.constant_folding = constant_folding
+        self.common_subexpressions = common_subexpressions
+        self.peephole = peephole
+        self.stack_arguments = stack_arguments
+        self.inline_subroutines = inline_subroutines
+        self.inline_size_threshold = inline_size_threshold
+        self.inline_cost_threshold = inline_cost_threshold
+        self.cond_dispatch = cond_dispatch
+        self.short_circuit = short_circuit
+        self.jump_threading = jump_threading
+        self.tail_merging = tail_merging
         self._skip_slots: Set[ScratchSlot] = set()
 
 
-def _remove_extraneous_slot_access(start: TealBlock, remove: Set[ScratchSlot]):
-    def keep_op(op: TealOp) -> bool:
-        if type(op) != TealOp or (op.op != Op.store and op.op != Op.load):
-            return True
+def _eliminate_slot_accesses(
+    block: TealBlock, live: int, bits: Dict[ScratchSlot, int]
+) -> None:
+    """Remove the slot accesses of a block which are not needed, given the slots which are live at
+    the end of the block.
 
-        return not set(op.getSlots()).issubset(remove)
-
-    for block in TealBlock.Iterate(start):
-        block.ops = list(filter(keep_op, block.ops))
+    A store followed by a load of the same slot is removed if the slot is not live after the load,
+    since the value can stay on the stack instead. A store to a slot which is not live after it is
+    replaced by a pop.
+    """
+    # the ops that are kept, in reverse order, along with the slots live after each of them
+    kept: List[Tuple[TealOp, int]] = []
+    for op in reversed(block.ops):
+        bit = slotBit(op, bits)
+        if bit == 0:
+            kept.append((op, live))
+            continue
 
+        if op.op == Op.load:
+            kept.append((op, live))
+            live |= bit
+            continue
 
-# Very dumb, overly eager dependency checking. A "dependency" is considered
-# any time the slot is loaded from in the entire control flow graph. This
-# can definitely be improved in the future.
-def _has_load_dependencies(
-    cur_block: TealBlock, start: TealBlock, slot: ScratchSlot, pos: int
-) -> bool:
-    for block in TealBlock.Iterate(start):
-        for i, op in enumerate(block.ops):
-            if block == cur_block and i == pos:
+        if len(kept) != 0:
+            next_op, live_after = kept[-1]
+            if (
+                next_op.op == Op.load
+                and next_op.args[0] == op.args[0]
+                and not live_after & bit
+            ):
+                kept.pop()
+                live = live_after
                 continue
 
-            if type(op) == TealOp and op.op == Op.load and slot in set(op.getSlots()):
-                return True
-
-    return False
-
+        if not live & bit:
+            kept.append((TealOp(op.expr, Op.pop), live))
+        else:
+            kept.append((op, live))
+            live &= ~bit
 
-def _apply_slot_to_stack(
-    cur_block: TealBlock, start: TealBlock, skip_slots: Set[ScratchSlot]
-):
-    slots_to_remove = set()
-    # surprisingly, this slicing is totally safe - even if the list is empty.
-    for i, op in enumerate(cur_block.ops[:-1]):
-        if type(op) != TealOp or op.op != Op.store:
-            continue
-
-        if set(op.getSlots()).issubset(skip_slots):
-            continue
+    if len(kept) != len(block.ops) or any(
+        new is not old for (new, _), old in zip(reversed(kept), block.ops)
+    ):
+        block.ops = [op for op, _ in reversed(kept)]
 
-        next_op = cur_block.ops[i + 1]
-        if type(next_op) != TealOp or next_op.op != Op.load:
-            continue
 
-        cur_slots, next_slots = op.getSlots(), next_op.getSlots()
-        if len(cur_slots) != 1 or len(next_slots) != 1:
-            raise TealInternalError(
-                "load/store op does not have exactly one slot argument"
-            )
-        if cur_slots[0] != next_slots[0]:
-            continue
+def _apply_slot_to_stack(start: TealBlock, skip_slots: Set[ScratchSlot]) -> None:
+    """Keep the values of slots on the stack where possible, in the control flow graph of a
+    subroutine or the main program.
 
-        if not _has_load_dependencies(cur_block, start, cur_slots[0], i + 1):
-            slots_to_remove.add(cur_slots[0])
+    The liveness of slots is computed once for the whole graph, after which each block is rewritten
+    independently, since removing an access that is not needed does not change which slots are live
+    at the end of any block.
+    """
+    blocks = list(TealBlock.Iterate(start))
+    bits = slotBits(blocks, skip_slots)
+    if len(bits) == 0:
+        return
 
-    _remove_extraneous_slot_access(start, slots_to_remove)
+    live_out = computeLiveOut(blocks, bits)
+    for block in blocks:
+        _eliminate_slot_accesses(block, live_out[id(block)], bits)
 
 
 def apply_global_optimizations(start: TealBlock, options: OptimizeOptions) -> TealBlock:
-    # limit number of iterations to length of teal program to avoid potential
-    # infinite loops.
-    for block in TealBlock.Iterate(start):
-        for _ in range(len(block.ops)):
-            prev_ops = block.ops.copy()
-            if options.scratch_slots:
-                _apply_slot_to_stack(block, start, options._skip_slots)
-
-            if prev_ops == block.ops:
-                break
+    if options.scratch_slots:
+        _apply_slot_to_stack(start, options._skip_slots)
 
     return start
 
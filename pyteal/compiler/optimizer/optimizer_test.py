@@ -9,7 +9,7 @@ def test_optimize_single_block():
 
     # empty check
     empty_block = pt.TealSimpleBlock([])
-    _apply_slot_to_stack(empty_block, empty_block, {})
+    _apply_slot_to_stack(empty_block, set())
 
     expected = pt.TealSimpleBlock([])
     assert empty_block == expected
@@ -21,7 +21,7 @@ def test_optimize_single_block():
             pt.TealOp(None, pt.Op.load, slot1),
         ]
     )
-    _apply_slot_to_stack(block, block, {})
+    _apply_slot_to_stack(block, set())
 
     expected = pt.TealSimpleBlock([])
     assert block == expected
@@ -35,34 +35,169 @@ def test_optimize_single_block():
             pt.TealOp(None, pt.Op.load, slot1),
         ]
     )
-    _apply_slot_to_stack(block, block, {})
+    _apply_slot_to_stack(block, set())
 
-    expected = pt.TealSimpleBlock(
+    expected = pt.TealSimpleBlock([])
+    assert block == expected
+
+    # replace dead stores with pops
+    block = pt.TealSimpleBlock(
         [
             pt.TealOp(None, pt.Op.store, slot1),
             pt.TealOp(None, pt.Op.load, slot1),
+            pt.TealOp(None, pt.Op.store, slot1),
         ]
     )
+    _apply_slot_to_stack(block, set())
+
+    expected = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.pop)])
     assert block == expected
 
-    _apply_slot_to_stack(block, block, {})
-    expected = pt.TealSimpleBlock([])
+    # a store whose value is loaded again later is kept
+    block = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+        ]
+    )
+    expected = pt.TealSimpleBlock(list(block.ops))
+    _apply_slot_to_stack(block, set())
     assert block == expected
 
-    # remove extraneous stores
+    # but a later store of the same slot ends its value
     block = pt.TealSimpleBlock(
         [
             pt.TealOp(None, pt.Op.store, slot1),
             pt.TealOp(None, pt.Op.load, slot1),
             pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
         ]
     )
-    _apply_slot_to_stack(block, block, {})
+    _apply_slot_to_stack(block, set())
 
-    expected = pt.TealSimpleBlock([])
+    expected = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+        ]
+    )
+    assert block == expected
+
+    # skipped slots are not optimized
+    block = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+        ]
+    )
+    expected = pt.TealSimpleBlock(list(block.ops))
+    _apply_slot_to_stack(block, {slot1})
     assert block == expected
 
 
+def test_optimize_branches():
+    slot1 = pt.ScratchSlot(1)
+    slot2 = pt.ScratchSlot(2)
+
+    # slot1 is loaded on one path, so its store is kept, but slot2 is never loaded after its store
+    start = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.store, slot2),
+            pt.TealOp(None, pt.Op.load, slot2),
+        ]
+    )
+    branch = pt.TealConditionalBlock([])
+    loads = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.load, slot1)])
+    end = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    start.setNextBlock(branch)
+    branch.setTrueBlock(loads)
+    branch.setFalseBlock(end)
+    loads.setNextBlock(end)
+
+    _apply_slot_to_stack(start, set())
+
+    assert start.ops == [pt.TealOp(None, pt.Op.store, slot1)]
+    assert loads.ops == [pt.TealOp(None, pt.Op.load, slot1)]
+
+
+def test_optimize_loop():
+    slot1 = pt.ScratchSlot(1)
+
+    # slot1 is loaded at the start of the loop, so it is live at the end of the loop body
+    start = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.store, slot1)])
+    condition = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.load, slot1)])
+    body = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+            pt.TealOp(None, pt.Op.pop),
+            pt.TealOp(None, pt.Op.int, 0),
+            pt.TealOp(None, pt.Op.store, slot1),
+        ]
+    )
+    end = pt.TealSimpleBlock([])
+    start.setNextBlock(condition)
+    condition.setTrueBlock(body)
+    condition.setFalseBlock(end)
+    body.setNextBlock(condition)
+
+    _apply_slot_to_stack(start, set())
+
+    assert start.ops == [pt.TealOp(None, pt.Op.store, slot1)]
+    assert body.ops == [
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.int, 0),
+        pt.TealOp(None, pt.Op.store, slot1),
+    ]
+
+
+def test_optimize_overwritten_value():
+    var = pt.ScratchVar(pt.TealType.uint64)
+    program = pt.Seq(var.store(pt.Int(1)), var.store(pt.Int(2)), var.load())
+
+    expected = """#pragma version 4
+int 1
+pop
+int 2
+return""".strip()
+    actual = pt.compileTeal(
+        program,
+        version=4,
+        mode=pt.Mode.Application,
+        optimize=OptimizeOptions(scratch_slots=True),
+    )
+    assert actual == expected
+
+
+def test_optimize_large_program():
+    # each slot is stored in many branches and loaded once at the end
+    count = 200
+    rounds = 8
+    slots = [pt.ScratchVar(pt.TealType.uint64) for _ in range(count)]
+    program = pt.Seq(
+        pt.Seq(*[var.store(pt.Int(0)) for var in slots]),
+        *[
+            pt.If(pt.Txn.fee() > pt.Int(i)).Then(
+                pt.Seq(*[var.store(pt.Txn.fee() + var.load()) for var in slots])
+            )
+            for i in range(rounds)
+        ],
+        pt.Seq(*[pt.Pop(var.load()) for var in slots]),
+        pt.Int(1),
+    )
+    actual = pt.compileTeal(
+        program,
+        version=6,
+        mode=pt.Mode.Application,
+        optimize=OptimizeOptions(scratch_slots=True),
+    )
+    assert actual.count("store") == (rounds + 1) * count
+
+
 def test_optimize_subroutine():
     @pt.Subroutine(pt.TealType.uint64)
     def add(a1: pt.Expr, a2: pt.Expr) -> pt.Expr:
@@ -551,8 +686,20 @@ return""".strip()
     )
     assert actual == expected
 
-    # optimization should not change the code because the candidate slot
-    # is used by the dynamic slot variable.
+    # optimization should not change the accesses of the candidate slot
+    # because it is used by the dynamic slot variable. The index stored in
+    # the dynamic slot variable is never loaded, so its store is removed.
+    expected = """#pragma version 4
+int 1
+store 0
+int 0
+pop
+int 2
+store 0
+load 0
+pop
+int 1
+return""".strip()
     optimize_options = OptimizeOptions(scratch_slots=True)
     actual = pt.compileTeal(
         program, version=4, mode=pt.Mode.Application, optimize=optimize_options
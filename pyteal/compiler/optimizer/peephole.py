@@ -0,0 +1,266 @@
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from pyteal.ir import Mode, Op, TealComponent, TealLabel, TealOp
+
+# A replacement element: the index of a matched op to keep as it is, a new op without arguments, or
+# a new op with the arguments of the matched op at the index.
+Replacement = Union[int, Op, Tuple[Op, int]]
+
+# A condition on the matched ops and, for rules which match before a label, the label.
+Condition = Callable[[List[TealOp], Optional[TealLabel]], bool]
+
+
+class PeepholeRule:
+    """A rewrite of a sequence of adjacent ops in a flattened program."""
+
+    def __init__(
+        self,
+        name: str,
+        pattern: Sequence[Op],
+        replacement: Sequence[Replacement],
+        *,
+        condition: Condition = None,
+        before_label: bool = False,
+    ) -> None:
+        """Create a new PeepholeRule.
+
+        Args:
+            name: The name of the rule, used to report how often it was applied.
+            pattern: The ops to match, in order. The ops must be adjacent, i.e. not separated by a
+                label.
+            replacement: The ops which replace the matched ops. An int keeps the matched op at that
+                index, an Op adds a new op without arguments, and a tuple of an Op and an int adds a
+                new op with the arguments of the matched op at that index. The replacement must not
+                be longer than the pattern.
+            condition (optional): A function which receives the matched ops and the label after
+                them, if before_label is true, and returns whether the rule applies.
+            before_label (optional): If true, the rule only matches ops which are followed by a
+                label. The label is kept.
+        """
+        if len(pattern) == 0 or len(replacement) > len(pattern):
+            raise ValueError(
+                "Invalid peephole rule {}: the replacement must not be longer than the pattern".format(
+                    name
+                )
+            )
+        self.name = name
+        self.pattern = tuple(pattern)
+        self.replacement = tuple(replacement)
+        self.condition = condition
+        self.before_label = before_label
+
+    def newOps(self) -> List[Op]:
+        """Get the ops the replacement adds, which must be available for the rule to apply."""
+        ops: List[Op] = []
+        for element in self.replacement:
+            if isinstance(element, Op):
+                ops.append(element)
+            elif isinstance(element, tuple):
+                ops.append(element[0])
+        return ops
+
+    def isAvailable(self, version: int, mode: Mode) -> bool:
+        return all(op.min_version <= version and op.mode & mode for op in self.newOps())
+
+    def rewrite(self, matched: List[TealOp]) -> List[TealOp]:
+        ops: List[TealOp] = []
+        for element in self.replacement:
+            if isinstance(element, int):
+                ops.append(matched[element])
+            elif isinstance(element, Op):
+                ops.append(TealOp(matched[0].expr, element))
+            else:
+                op, index = element
+                ops.append(TealOp(matched[index].expr, op, *matched[index].args))
+        return ops
+
+    def __repr__(self) -> str:
+        return "PeepholeRule({!r})".format(self.name)
+
+
+def _intArg(value: int) -> Callable[[List[TealOp], Optional[TealLabel]], bool]:
+    def condition(ops: List[TealOp], label: Optional[TealLabel]) -> bool:
+        return ops[0].args == [value]
+
+    return condition
+
+
+def _sameArgs(ops: List[TealOp], label: Optional[TealLabel]) -> bool:
+    return ops[0].args == ops[1].args
+
+
+def _jumpsToLabel(ops: List[TealOp], label: Optional[TealLabel]) -> bool:
+    return label is not None and ops[-1].args == [label.getLabelRef()]
+
+
+_TRUTH_TESTS = (Op.bnz, Op.bz, Op.assert_)
+
+_NEGATIONS = (
+    (Op.eq, Op.neq),
+    (Op.neq, Op.eq),
+    (Op.lt, Op.ge),
+    (Op.ge, Op.lt),
+    (Op.gt, Op.le),
+    (Op.le, Op.gt),
+)
+
+_IDENTITIES = (
+    (Op.add, 0),
+    (Op.minus, 0),
+    (Op.bitwise_or, 0),
+    (Op.bitwise_xor, 0),
+    (Op.mul, 1),
+    (Op.div, 1),
+)
+
+PEEPHOLE_RULES: List[PeepholeRule] = (
+    [
+        PeepholeRule("swap swap", [Op.swap, Op.swap], []),
+        PeepholeRule("dup pop", [Op.dup, Op.pop], []),
+        PeepholeRule("dup swap", [Op.dup, Op.swap], [0]),
+        PeepholeRule("itob btoi", [Op.itob, Op.btoi], []),
+        PeepholeRule("load store", [Op.load, Op.store], [], condition=_sameArgs),
+        PeepholeRule("load load", [Op.load, Op.load], [0, Op.dup], condition=_sameArgs),
+        PeepholeRule("dig 0", [Op.dig], [Op.dup], condition=_intArg(0)),
+        PeepholeRule("cover 1", [Op.cover], [Op.swap], condition=_intArg(1)),
+        PeepholeRule("uncover 1", [Op.uncover], [Op.swap], condition=_intArg(1)),
+        PeepholeRule("int 0 ==", [Op.int, Op.eq], [Op.logic_not], condition=_intArg(0)),
+        PeepholeRule("! bnz", [Op.logic_not, Op.bnz], [(Op.bz, 1)]),
+        PeepholeRule("! bz", [Op.logic_not, Op.bz], [(Op.bnz, 1)]),
+        PeepholeRule("b next", [Op.b], [], condition=_jumpsToLabel, before_label=True),
+        PeepholeRule(
+            "bnz next", [Op.bnz], [Op.pop], condition=_jumpsToLabel, before_label=True
+        ),
+        PeepholeRule(
+            "bz next", [Op.bz], [Op.pop], condition=_jumpsToLabel, before_label=True
+        ),
+    ]
+    + [
+        PeepholeRule("{} !".format(compare), [compare, Op.logic_not], [negation])
+        for compare, negation in _NEGATIONS
+    ]
+    + [
+        PeepholeRule(
+            "int {} {}".format(value, op), [Op.int, op], [], condition=_intArg(value)
+        )
+        for op, value in _IDENTITIES
+    ]
+    # a truth test only checks whether its operand is zero
+    + [
+        PeepholeRule(
+            "int 0 != {}".format(test),
+            [Op.int, Op.neq, test],
+            [2],
+            condition=_intArg(0),
+        )
+        for test in _TRUTH_TESTS
+    ]
+    + [
+        PeepholeRule("! ! {}".format(test), [Op.logic_not, Op.logic_not, test], [2])
+        for test in _TRUTH_TESTS
+    ]
+)
+
+
+def _ruleTables(
+    rules: Sequence[PeepholeRule], version: int, mode: Mode
+) -> Tuple[Dict[Op, List[PeepholeRule]], Dict[Op, List[PeepholeRule]]]:
+    """Index the rules which are available in the version and mode by the last op of their
+    pattern, separately for rules which match before a label."""
+    tables: Tuple[Dict[Op, List[PeepholeRule]], Dict[Op, List[PeepholeRule]]] = (
+        dict(),
+        dict(),
+    )
+    for rule in rules:
+        if rule.isAvailable(version, mode):
+            table = tables[1] if rule.before_label else tables[0]
+            table.setdefault(rule.pattern[-1], []).append(rule)
+    return tables
+
+
+def _matchTail(
+    output: List[TealComponent], end: int, rule: PeepholeRule
+) -> Optional[List[TealOp]]:
+    """Match the pattern of rule against the ops of output which end just before index end."""
+    start = end - len(rule.pattern)
+    if start < 0:
+        return None
+    matched: List[TealOp] = []
+    for component, op in zip(output[start:end], rule.pattern):
+        if not isinstance(component, TealOp) or component.op != op:
+            return None
+        matched.append(component)
+    return matched
+
+
+def apply_peephole_optimizations(
+    teal: List[TealComponent],
+    version: int,
+    mode: Mode,
+    rules: Sequence[PeepholeRule] = PEEPHOLE_RULES,
+) -> Tuple[List[TealComponent], Dict[str, int]]:
+    """Rewrite short sequences of adjacent ops in a flattened program with cheaper ones.
+
+    The program is scanned once. Each component is appended to the output and the rules whose
+    pattern ends with it are tried against the end of the output. When a rule applies, the matched
+    ops are removed and its replacement is scanned again, so that rules which apply to the result
+    are found without rescanning the program. Since a replacement is never longer than its pattern,
+    this reaches a fixed point in time linear in the length of the program.
+
+    Rules whose replacement uses ops that are not available in the version or mode are skipped.
+
+    Args:
+        teal: The flattened program. It is not modified.
+        version: The TEAL version of the program.
+        mode: The mode of the program.
+        rules (optional): The rules to apply, in order of priority. Defaults to PEEPHOLE_RULES.
+
+    Returns:
+        The rewritten program, and the number of times each rule was applied, keyed by rule name.
+    """
+    opRules, labelRules = _ruleTables(rules, version, mode)
+    hits: Dict[str, int] = dict()
+    output: List[TealComponent] = []
+    pending = list(reversed(teal))
+
+    while len(pending) != 0:
+        component = pending.pop()
+        output.append(component)
+
+        label: Optional[TealLabel] = None
+        if isinstance(component, TealLabel):
+            previous = output[-2] if len(output) > 1 else None
+            if not isinstance(previous, TealOp):
+                continue
+            label = component
+            candidates = labelRules.get(previous.op, [])
+            end = len(output) - 1
+        elif isinstance(component, TealOp):
+            candidates = opRules.get(component.op, [])
+            end = len(output)
+        else:
+            continue
+
+        for rule in candidates:
+            matched = _matchTail(output, end, rule)
+            if matched is None or (
+                rule.condition is not None and not rule.condition(matched, label)
+            ):
+                continue
+
+            del output[end - len(matched) :]
+            if label is not None:
+                pending.append(label)
+            pending.extend(reversed(rule.rewrite(matched)))
+            hits[rule.name] = hits.get(rule.name, 0) + 1
+            break
+
+    return output, hits
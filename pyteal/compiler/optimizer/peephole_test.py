@@ -0,0 +1,222 @@
+import pytest
+
+import pyteal as pt
+
+from pyteal.compiler.optimizer.peephole import (
+    PEEPHOLE_RULES,
+    PeepholeRule,
+    apply_peephole_optimizations,
+)
+
+
+def optimize(teal, version=6, mode=pt.Mode.Application, **kwargs):
+    with pt.TealComponent.Context.ignoreExprEquality():
+        return apply_peephole_optimizations(teal, version, mode, **kwargs)
+
+
+def op(op, *args):
+    return pt.TealOp(None, op, *args)
+
+
+def label(name):
+    return pt.TealLabel(None, pt.LabelReference(name))
+
+
+@pytest.mark.parametrize(
+    "teal, expected, rule",
+    [
+        ([op(pt.Op.swap), op(pt.Op.swap)], [], "swap swap"),
+        ([op(pt.Op.dup), op(pt.Op.pop)], [], "dup pop"),
+        ([op(pt.Op.dup), op(pt.Op.swap)], [op(pt.Op.dup)], "dup swap"),
+        ([op(pt.Op.itob), op(pt.Op.btoi)], [], "itob btoi"),
+        ([op(pt.Op.load, 1), op(pt.Op.store, 1)], [], "load store"),
+        (
+            [op(pt.Op.load, 1), op(pt.Op.load, 1)],
+            [op(pt.Op.load, 1), op(pt.Op.dup)],
+            "load load",
+        ),
+        ([op(pt.Op.dig, 0)], [op(pt.Op.dup)], "dig 0"),
+        ([op(pt.Op.cover, 1)], [op(pt.Op.swap)], "cover 1"),
+        ([op(pt.Op.uncover, 1)], [op(pt.Op.swap)], "uncover 1"),
+        ([op(pt.Op.int, 0), op(pt.Op.eq)], [op(pt.Op.logic_not)], "int 0 =="),
+        (
+            [op(pt.Op.logic_not), op(pt.Op.bnz, pt.LabelReference("l1"))],
+            [op(pt.Op.bz, pt.LabelReference("l1"))],
+            "! bnz",
+        ),
+        (
+            [op(pt.Op.logic_not), op(pt.Op.bz, pt.LabelReference("l1"))],
+            [op(pt.Op.bnz, pt.LabelReference("l1"))],
+            "! bz",
+        ),
+        ([op(pt.Op.lt), op(pt.Op.logic_not)], [op(pt.Op.ge)], "< !"),
+        ([op(pt.Op.neq), op(pt.Op.logic_not)], [op(pt.Op.eq)], "!= !"),
+        ([op(pt.Op.int, 0), op(pt.Op.add)], [], "int 0 +"),
+        ([op(pt.Op.int, 1), op(pt.Op.mul)], [], "int 1 *"),
+        (
+            [op(pt.Op.int, 0), op(pt.Op.neq), op(pt.Op.assert_)],
+            [op(pt.Op.assert_)],
+            "int 0 != assert",
+        ),
+        (
+            [op(pt.Op.logic_not), op(pt.Op.logic_not), op(pt.Op.assert_)],
+            [op(pt.Op.assert_)],
+            "! ! assert",
+        ),
+        (
+            [op(pt.Op.b, pt.LabelReference("l1")), label("l1")],
+            [label("l1")],
+            "b next",
+        ),
+        (
+            [op(pt.Op.bnz, pt.LabelReference("l1")), label("l1")],
+            [op(pt.Op.pop), label("l1")],
+            "bnz next",
+        ),
+        (
+            [op(pt.Op.bz, pt.LabelReference("l1")), label("l1")],
+            [op(pt.Op.pop), label("l1")],
+            "bz next",
+        ),
+    ],
+)
+def test_rule(teal, expected, rule):
+    actual, hits = optimize(teal)
+    assert actual == expected
+    assert hits == {rule: 1}
+
+
+@pytest.mark.parametrize(
+    "teal",
+    [
+        [op(pt.Op.load, 1), op(pt.Op.load, 2)],
+        [op(pt.Op.load, 1), op(pt.Op.store, 2)],
+        [op(pt.Op.int, 1), op(pt.Op.eq)],
+        [op(pt.Op.int, "TMPL_ZERO"), op(pt.Op.eq)],
+        [op(pt.Op.int, 0), op(pt.Op.mul)],
+        [op(pt.Op.int, 0), op(pt.Op.neq)],
+        [op(pt.Op.dig, 1)],
+        [op(pt.Op.cover, 2)],
+        # a label between the ops may be jumped to
+        [op(pt.Op.dup), label("l1"), op(pt.Op.pop)],
+        [op(pt.Op.b, pt.LabelReference("l2")), label("l1")],
+        [label("l1"), op(pt.Op.b, pt.LabelReference("l1"))],
+    ],
+)
+def test_no_rule(teal):
+    actual, hits = optimize(teal)
+    assert actual == teal
+    assert hits == {}
+
+
+def test_fixed_point():
+    teal = [
+        op(pt.Op.swap),
+        op(pt.Op.dup),
+        op(pt.Op.pop),
+        op(pt.Op.swap),
+        op(pt.Op.int, 0),
+        op(pt.Op.eq),
+        op(pt.Op.bnz, pt.LabelReference("l1")),
+        op(pt.Op.dup),
+        op(pt.Op.bz, pt.LabelReference("l2")),
+        label("l2"),
+        op(pt.Op.int, 1),
+        op(pt.Op.return_),
+        label("l1"),
+        op(pt.Op.err),
+    ]
+    before = list(teal)
+
+    actual, hits = optimize(teal)
+    assert actual == [
+        op(pt.Op.bz, pt.LabelReference("l1")),
+        label("l2"),
+        op(pt.Op.int, 1),
+        op(pt.Op.return_),
+        label("l1"),
+        op(pt.Op.err),
+    ]
+    assert hits == {
+        "dup pop": 2,
+        "swap swap": 1,
+        "int 0 ==": 1,
+        "! bnz": 1,
+        "bz next": 1,
+    }
+    assert teal == before
+
+
+def test_version():
+    # swap is not available before version 3
+    rule = PeepholeRule("pop dup", [pt.Op.pop, pt.Op.dup], [pt.Op.swap])
+    teal = [op(pt.Op.pop), op(pt.Op.dup)]
+    assert optimize(teal, version=2, rules=[rule]) == (teal, {})
+    assert optimize(teal, version=3, rules=[rule]) == ([op(pt.Op.swap)], {"pop dup": 1})
+
+
+def test_mode():
+    rule = PeepholeRule("pop pop", [pt.Op.pop, pt.Op.pop], [(pt.Op.app_global_get, 0)])
+    teal = [op(pt.Op.pop), op(pt.Op.pop)]
+    assert optimize(teal, mode=pt.Mode.Signature, rules=[rule]) == (teal, {})
+    assert optimize(teal, mode=pt.Mode.Application, rules=[rule])[1] == {"pop pop": 1}
+
+
+def test_invalid_rule():
+    with pytest.raises(ValueError):
+        PeepholeRule("dup", [pt.Op.dup], [pt.Op.dup, pt.Op.dup])
+    with pytest.raises(ValueError):
+        PeepholeRule("empty", [], [])
+
+
+def test_rule_names_unique():
+    names = [rule.name for rule in PEEPHOLE_RULES]
+    assert len(names) == len(set(names))
+
+
+def test_linear():
+    # every rule application is found without rescanning the program, even when it makes another
+    # rule apply to the ops before it
+    count = 20000
+    teal = (
+        [op(pt.Op.int, 1), op(pt.Op.int, 2)]
+        + [op(pt.Op.dup)] * count
+        + [op(pt.Op.pop)] * count
+        + [op(pt.Op.swap)] * (2 * count)
+    )
+    actual, hits = optimize(teal)
+    assert actual == [op(pt.Op.int, 1), op(pt.Op.int, 2)]
+    assert hits == {"dup pop": count, "swap swap": count}
+
+
+def test_compile():
+    program = pt.Seq(
+        pt.If(pt.Txn.fee() == pt.Int(0)).Then(pt.Log(pt.Bytes("free"))),
+        pt.Return(pt.Not(pt.Txn.amount() < pt.Int(100))),
+    )
+    expected = pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+    assert "int 0\n==\nbz" in expected
+
+    stats = pt.CompileStats()
+    actual = pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(peephole=True),
+        stats=stats,
+    )
+    assert actual == "\n".join(
+        [
+            "#pragma version 6",
+            "txn Fee",
+            "bnz main_l2",
+            'byte "free"',
+            "log",
+            "main_l2:",
+            "txn Amount",
+            "int 100",
+            ">=",
+            "return",
+        ]
+    )
+    assert stats.passTotals()["optimizePeephole"].changes == 3
@@ -0,0 +1,202 @@
+from typing import Dict, Hashable, List, Optional, Set, Tuple, cast
+
+from pyteal.ir import LabelReference, Op, TealComponent, TealLabel, TealOp
+from pyteal.compiler.assembler import immediateArgs, opSize
+
+# ops after which execution does not continue at the next op, which end the tails that are merged
+_TAIL_END_OPS = (Op.b, Op.return_, Op.err, Op.retsub)
+
+# the first TEAL version in which a jump may go backward
+_BACKWARD_JUMP_VERSION = 4
+
+# the estimated size in bytes of the jump which replaces a merged tail
+_JUMP_SIZE = opSize(TealOp(None, Op.b, LabelReference("")))
+
+
+def _opKey(op: TealOp) -> Hashable:
+    """Get a key which is equal for ops that are assembled into the same bytecode."""
+    return op.op, tuple(immediateArgs(op))
+
+
+def _segments(teal: List[TealComponent]) -> List[List[int]]:
+    """Split a flattened program into the runs of ops which end with an unconditional op, and which
+    do not contain a label, so execution can only enter them at their first op.
+
+    Returns:
+        The indices of the ops of each run, in the order of the program.
+    """
+    segments: List[List[int]] = []
+    current: List[int] = []
+    for i, stmt in enumerate(teal):
+        if isinstance(stmt, TealLabel):
+            current = []
+            continue
+        current.append(i)
+        if isinstance(stmt, TealOp) and stmt.op in _TAIL_END_OPS:
+            segments.append(current)
+            current = []
+    return segments
+
+
+def _beforeSuffix(
+    teal: List[TealComponent], segment: List[int], depth: int
+) -> Optional[TealComponent]:
+    """Get the component before the suffix of a segment with the given number of ops."""
+    start = segment[len(segment) - depth]
+    return teal[start - 1] if start >= 1 else None
+
+
+def apply_tail_merging(
+    teal: List[TealComponent], version: int
+) -> Tuple[List[TealComponent], int]:
+    """Merge the identical tails of a flattened program into one shared copy.
+
+    A tail is a run of ops which ends with :code:`b`, :code:`return`, :code:`err` or
+    :code:`retsub`, such as the ops which approve or reject the program at the end of each branch
+    of a router. The runs are inserted into a trie of their reversed ops, so every group of runs
+    which end with the same ops is found by following common paths from the last op, in time linear
+    in the length of the program.
+
+    Groups are merged from the longest common suffix to the shortest. One run of each group keeps
+    its suffix, preferably a run whose suffix already follows a label, and the suffix of every other
+    run is replaced by a jump to a label before the kept suffix, or removed if the kept suffix
+    follows it. Before TEAL version 4, where jumps cannot go backward, the last run of each group
+    keeps its suffix instead, so that every jump to it goes forward. A suffix is only merged if it
+    is larger than the jump, by the estimate of :any:`opSize`, so that every merge makes the program
+    smaller. A run which keeps its suffix may still have a shorter suffix merged into another run
+    later, and a run whose suffix is replaced is not merged again.
+
+    Args:
+        teal: The flattened program, after the labels of its subroutines have been resolved. It is
+            not modified.
+        version: The TEAL version of the program.
+
+    Returns:
+        The program with merged tails, and the estimated number of bytes saved.
+    """
+    segments = _segments(teal)
+
+    # the trie of reversed segments: each node is a suffix, with the segments which end with it
+    children: List[Dict[Hashable, int]] = [dict()]
+    depths: List[int] = [0]
+    sizes: List[int] = [0]
+    nodeSegments: List[List[int]] = [[]]
+    for s, segment in enumerate(segments):
+        node = 0
+        for i in reversed(segment):
+            op = teal[i]
+            assert isinstance(op, TealOp)
+            key = _opKey(op)
+            child = children[node].get(key)
+            if child is None:
+                child = len(children)
+                children[node][key] = child
+                children.append(dict())
+                depths.append(depths[node] + 1)
+                sizes.append(sizes[node] + opSize(op))
+                nodeSegments.append([])
+            node = child
+            nodeSegments[node].append(s)
+
+    candidates = [
+        node
+        for node in range(1, len(children))
+        if len(nodeSegments[node]) > 1 and sizes[node] > _JUMP_SIZE
+    ]
+    candidates.sort(key=lambda node: -depths[node])
+
+    names: Set[str] = {
+        stmt.getLabelRef().getLabel() for stmt in teal if isinstance(stmt, TealLabel)
+    }
+    nextLabel = 0
+
+    def newLabel() -> LabelReference:
+        nonlocal nextLabel
+        while "tail_l{}".format(nextLabel) in names:
+            nextLabel += 1
+        name = "tail_l{}".format(nextLabel)
+        names.add(name)
+        return LabelReference(name)
+
+    # the segments whose suffix has been replaced by a jump, and the segments which keep a suffix
+    # that other segments jump to
+    replaced: Set[int] = set()
+    anchors: Set[int] = set()
+    # the labels inserted before ops, and the ops which are replaced by a jump along with the ops
+    # after them in their segment
+    labelsBefore: Dict[int, List[TealLabel]] = dict()
+    jumps: Dict[int, Tuple[int, TealOp]] = dict()
+    saved = 0
+    for node in candidates:
+        available = [s for s in nodeSegments[node] if s not in replaced]
+        if len(available) < 2:
+            continue
+
+        if version < _BACKWARD_JUMP_VERSION:
+            # the segments are in the order of the program, so every other segment is before it
+            anchor = available[-1]
+        else:
+            # a segment which already keeps a suffix, or whose suffix already has a label, is kept
+            anchor = next(
+                (s for s in available if s in anchors),
+                next(
+                    (
+                        s
+                        for s in available
+                        if isinstance(
+                            _beforeSuffix(teal, segments[s], depths[node]), TealLabel
+                        )
+                    ),
+                    available[0],
+                ),
+            )
+        anchors.add(anchor)
+        anchorSegment = segments[anchor]
+        start = anchorSegment[len(anchorSegment) - depths[node]]
+        previous = _beforeSuffix(teal, anchorSegment, depths[node])
+        if isinstance(previous, TealLabel):
+            target = previous.getLabelRef()
+        elif start in labelsBefore:
+            target = labelsBefore[start][-1].getLabelRef()
+        else:
+            target = newLabel()
+            labelsBefore[start] = [TealLabel(None, target)]
+
+        for s in available:
+            if s == anchor:
+                continue
+            segment = segments[s]
+            first = segment[len(segment) - depths[node]]
+            jumps[first] = (segment[-1], TealOp(teal[first].expr, Op.b, target))
+            replaced.add(s)
+            saved += sizes[node] - _JUMP_SIZE
+
+    if saved == 0:
+        return list(teal), 0
+
+    output: List[TealComponent] = []
+    i = 0
+    while i < len(teal):
+        output += labelsBefore.get(i, [])
+        if i in jumps:
+            last, jump = jumps[i]
+            i = last + 1
+            # the jump is not needed if the suffix it goes to follows it
+            following: List[TealLabel] = []
+            while i < len(teal) and isinstance(teal[i], TealLabel):
+                following.append(cast(TealLabel, teal[i]))
+                i += 1
+            targetName = cast(LabelReference, jump.args[0]).getLabel()
+            if any(
+                label.getLabelRef().getLabel() == targetName
+                for label in following + labelsBefore.get(i, [])
+            ):
+                saved += _JUMP_SIZE
+            else:
+                output.append(jump)
+            output += following
+            continue
+        output.append(teal[i])
+        i += 1
+
+    return output, saved
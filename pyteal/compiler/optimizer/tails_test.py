@@ -0,0 +1,278 @@
+import pyteal as pt
+
+from pyteal.compiler.optimizer.tails import apply_tail_merging
+
+
+def merge(teal, version=6):
+    with pt.TealComponent.Context.ignoreExprEquality():
+        return apply_tail_merging(teal, version)
+
+
+def approve():
+    return [
+        pt.TealOp(None, pt.Op.byte, '"done"'),
+        pt.TealOp(None, pt.Op.log),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+
+def test_merge():
+    teal = (
+        [
+            pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+            pt.TealOp(None, pt.Op.int, 2),
+        ]
+        + approve()
+        + [pt.TealLabel(None, pt.LabelReference("l1")), pt.TealOp(None, pt.Op.int, 3)]
+        + approve()
+    )
+    before = list(teal)
+
+    actual, saved = merge(teal)
+    assert actual == [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealLabel(None, pt.LabelReference("tail_l0")),
+        *approve(),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 3),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("tail_l0")),
+    ]
+    # the tail takes an estimated 6 bytes, and the jump 3
+    assert saved == 3
+    assert teal == before
+
+
+def test_small_tail():
+    teal = [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.err),
+    ]
+    assert merge(teal) == (teal, 0)
+
+
+def test_existing_label():
+    teal = [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l2")),
+        *approve(),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        *approve(),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.err),
+    ]
+    actual, saved = merge(teal)
+    assert actual == [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.bz, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        *approve(),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.err),
+    ]
+    assert saved == 6
+
+
+def test_nested_tails():
+    teal = [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 5),
+        pt.TealOp(None, pt.Op.int, 2),
+        *approve(),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 5),
+        pt.TealOp(None, pt.Op.int, 2),
+        *approve(),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 3),
+        *approve(),
+    ]
+    actual, saved = merge(teal)
+    # the longest common tail is merged first, into the branch which already has a label, and the
+    # last branch jumps into the middle of it
+    assert actual == [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 5),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealLabel(None, pt.LabelReference("tail_l0")),
+        *approve(),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 3),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("tail_l0")),
+    ]
+    # the first branch falls through to the tail it is merged with, so it needs no jump
+    assert saved == 10 + (6 - 3)
+
+
+def test_jump_tails():
+    teal = [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l3")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l4")),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l3")),
+        pt.TealLabel(None, pt.LabelReference("l3")),
+        pt.TealLabel(None, pt.LabelReference("l4")),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    actual, saved = merge(teal)
+    # only the tails which jump to the same label are merged, and the one with a label is kept
+    assert (
+        actual
+        == teal[:1] + [pt.TealOp(None, pt.Op.b, pt.LabelReference("l2"))] + teal[5:]
+    )
+    assert saved == 5
+
+
+def test_forward_jumps():
+    teal = (
+        [
+            pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+            pt.TealOp(None, pt.Op.int, 2),
+        ]
+        + approve()
+        + [pt.TealLabel(None, pt.LabelReference("l1")), pt.TealOp(None, pt.Op.int, 3)]
+        + approve()
+        + [pt.TealLabel(None, pt.LabelReference("l2")), pt.TealOp(None, pt.Op.int, 4)]
+        + approve()
+    )
+
+    # the tail after l2 is kept, although the first tail follows no label, since jumps cannot go
+    # backward before version 4
+    actual, saved = merge(teal, version=3)
+    assert actual == [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("tail_l0")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.int, 3),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("tail_l0")),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.int, 4),
+        pt.TealLabel(None, pt.LabelReference("tail_l0")),
+        *approve(),
+    ]
+    assert saved == 2 * (6 - 3)
+
+
+def test_unique_labels():
+    teal = [
+        pt.TealOp(None, pt.Op.bnz, pt.LabelReference("tail_l0")),
+        pt.TealOp(None, pt.Op.int, 2),
+        *approve(),
+        pt.TealLabel(None, pt.LabelReference("tail_l0")),
+        pt.TealOp(None, pt.Op.int, 3),
+        *approve(),
+    ]
+    actual, _ = merge(teal)
+    assert actual[2] == pt.TealLabel(None, pt.LabelReference("tail_l1"))
+    assert actual[-1] == pt.TealOp(None, pt.Op.b, pt.LabelReference("tail_l1"))
+
+
+def test_many_tails():
+    count = 5000
+    teal = []
+    for i in range(count):
+        teal += [
+            pt.TealLabel(None, pt.LabelReference("l{}".format(i))),
+            pt.TealOp(None, pt.Op.int, i),
+            *approve(),
+        ]
+
+    actual, saved = merge(teal)
+    assert actual.count(pt.TealOp(None, pt.Op.log)) == 1
+    assert (
+        actual.count(pt.TealOp(None, pt.Op.b, pt.LabelReference("tail_l0")))
+        == count - 1
+    )
+    assert saved == (count - 1) * (6 - 3)
+
+
+def test_compile():
+    def finish():
+        return pt.Seq(pt.Log(pt.Bytes("done")), pt.Approve())
+
+    program = pt.Cond(
+        *[
+            [
+                pt.Txn.application_args[0] == pt.Bytes("method{}".format(i)),
+                pt.Seq(pt.App.globalPut(pt.Bytes("last"), pt.Int(i)), finish()),
+            ]
+            for i in range(3)
+        ]
+    )
+    expected = pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+    assert expected.count("log") == 3
+
+    stats = pt.CompileStats()
+    actual = pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(tail_merging=True),
+        stats=stats,
+    )
+    assert actual.count("log") == 1
+    assert actual.count("app_global_put") == 1
+    assert stats.passTotals()["mergeTails"].changes == 2 * (7 - 3)
+
+    size = len(pt.compileBytecode(program, mode=pt.Mode.Application, version=6))
+    mergedSize = len(
+        pt.compileBytecode(
+            program,
+            mode=pt.Mode.Application,
+            version=6,
+            optimize=pt.OptimizeOptions(tail_merging=True),
+        )
+    )
+    assert mergedSize < size
+
+
+def test_compile_version_3():
+    program = pt.Cond(
+        *[
+            [
+                pt.Txn.application_args[0] == pt.Bytes("method{}".format(i)),
+                pt.Seq(
+                    pt.App.globalPut(pt.Bytes("last"), pt.Int(i)),
+                    pt.App.globalPut(pt.Bytes("calls"), pt.Int(1)),
+                    pt.Approve(),
+                ),
+            ]
+            for i in range(3)
+        ]
+    )
+    optimize = pt.OptimizeOptions(tail_merging=True)
+    actual = pt.compileTeal(
+        program, mode=pt.Mode.Application, version=3, optimize=optimize
+    )
+    assert actual.count("app_global_put") == 2
+
+    # the merged program only jumps forward, so it can be assembled before version 4
+    size = len(pt.compileBytecode(program, mode=pt.Mode.Application, version=3))
+    mergedSize = len(
+        pt.compileBytecode(
+            program, mode=pt.Mode.Application, version=3, optimize=optimize
+        )
+    )
+    assert mergedSize < size
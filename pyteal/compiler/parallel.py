@@ -0,0 +1,364 @@
+import gc
+import io
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from copy import copy
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from pyteal.ast import (
+    Expr,
+    ScratchSlot,
+    ScratchVar,
+    SubroutineDeclaration,
+    SubroutineDefinition,
+)
+from pyteal.ir import TealBlock, TealConditionalBlock, TealOp, TealSimpleBlock
+
+from pyteal.errors import TealInternalError
+from pyteal.compiler.stats import (
+    MAIN_PROGRAM,
+    CompileStats,
+    PassStats,
+    skipMeasure,
+)
+
+if TYPE_CHECKING:
+    from pyteal.compiler.compiler import CompileOptions
+
+
+class _SharedObjects:
+    """Objects which are shared with forked worker processes.
+
+    Worker processes are forked after these objects have been created, so an object can be sent
+    between the parent and a worker by its index in this list, rather than by pickling a copy. This
+    preserves the identity of ScratchSlots and SubroutineDefinitions, which the compiler relies on.
+    """
+
+    def __init__(self) -> None:
+        self.objects: List[object] = []
+        # indices of objects in self.objects, keyed by identity
+        self.indices: Dict[int, int] = dict()
+
+    def add(self, obj: object) -> bool:
+        """Add an object, returning False if it was already added."""
+        if id(obj) in self.indices:
+            return False
+        self.indices[id(obj)] = len(self.objects)
+        self.objects.append(obj)
+        return True
+
+    def indexOf(self, obj: object) -> Optional[int]:
+        index = self.indices.get(id(obj))
+        if index is not None and self.objects[index] is obj:
+            return index
+        return None
+
+
+def findReferencedSubroutines(
+    ast: Expr, shared: _SharedObjects
+) -> Set[SubroutineDefinition]:
+    """Find the subroutines called by the main program or a subroutine declaration, without
+    lowering it.
+
+    Every expression, ScratchVar, ScratchSlot and SubroutineDefinition that is reachable from ast
+    is added to shared. The declarations of referenced subroutines are not searched.
+    """
+    referenced: Set[SubroutineDefinition] = set()
+
+    stack: List[Any] = [ast]
+    if isinstance(ast, SubroutineDeclaration):
+        # a declaration refers to its own subroutine, which it does not call unless it is recursive
+        shared.add(ast)
+        shared.add(ast.subroutine)
+        stack = [ast.body]
+    while len(stack) != 0:
+        value = stack.pop()
+
+        if isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, SubroutineDefinition):
+            shared.add(value)
+            referenced.add(value)
+        elif isinstance(value, ScratchSlot):
+            shared.add(value)
+        elif isinstance(value, (Expr, ScratchVar)):
+            if shared.add(value):
+                stack.extend(vars(value).values())
+
+    return referenced
+
+
+class _Unshareable(Exception):
+    """Raised when a worker creates a ScratchSlot or SubroutineDefinition, since these objects
+    would not exist in the parent process."""
+
+    pass
+
+
+class _WorkerPickler(pickle.Pickler):
+    def __init__(self, file: io.BytesIO, shared: _SharedObjects) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.shared = shared
+
+    def persistent_id(self, obj: Any) -> Optional[int]:
+        index = self.shared.indexOf(obj)
+        if index is None and isinstance(obj, (ScratchSlot, SubroutineDefinition)):
+            raise _Unshareable()
+        return index
+
+
+class _ParentUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, shared: _SharedObjects) -> None:
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, pid: Any) -> object:
+        return self.shared.objects[pid]
+
+
+# a graph of blocks, encoded as a list of (is conditional, ops, outgoing indices, incoming indices)
+# for each block, in the order of TealBlock.Iterate
+EncodedGraph = List[Tuple[bool, List[TealOp], List[Optional[int]], List[int]]]
+
+
+def encodeGraph(blocks: List[TealBlock]) -> EncodedGraph:
+    """Encode a graph of blocks without references between blocks, so that pickling it does not
+    recurse through every block.
+
+    Args:
+        blocks: Every block in the graph.
+    """
+    indices = {id(block): i for i, block in enumerate(blocks)}
+
+    def indexOf(block: Optional[TealBlock]) -> Optional[int]:
+        return indices[id(block)] if block is not None else None
+
+    encoded: EncodedGraph = []
+    for block in blocks:
+        if isinstance(block, TealConditionalBlock):
+            outgoing = [indexOf(block.trueBlock), indexOf(block.falseBlock)]
+        elif isinstance(block, TealSimpleBlock):
+            outgoing = [indexOf(block.nextBlock)]
+        else:
+            raise TealInternalError("Unexpected block type: {}".format(type(block)))
+        incoming = [indices[id(b)] for b in block.incoming]
+        encoded.append(
+            (isinstance(block, TealConditionalBlock), block.ops, outgoing, incoming)
+        )
+    return encoded
+
+
+def decodeGraph(encoded: EncodedGraph) -> List[TealBlock]:
+    """Decode a graph of blocks encoded by encodeGraph. The first block is the start block."""
+    blocks: List[TealBlock] = [
+        TealConditionalBlock(ops) if conditional else TealSimpleBlock(ops)
+        for conditional, ops, _, _ in encoded
+    ]
+
+    def blockAt(index: Optional[int]) -> Optional[TealBlock]:
+        return blocks[index] if index is not None else None
+
+    for block, (_, _, outgoing, incoming) in zip(blocks, encoded):
+        if isinstance(block, TealConditionalBlock):
+            block.trueBlock = blockAt(outgoing[0])
+            block.falseBlock = blockAt(outgoing[1])
+        elif isinstance(block, TealSimpleBlock):
+            block.nextBlock = blockAt(outgoing[0])
+        block.incoming = [blocks[i] for i in incoming]
+    return blocks
+
+
+class _WorkerState:
+    """The state of a compilation, inherited by forked worker processes."""
+
+    def __init__(
+        self,
+        asts: List[Expr],
+        options: "CompileOptions",
+        shared: _SharedObjects,
+        stats: Optional[CompileStats],
+    ) -> None:
+        self.asts = asts
+        self.options = options
+        self.shared = shared
+        self.profile = stats is not None
+        self.trace_allocations = stats is not None and stats.trace_allocations
+
+
+_workerState: Optional[_WorkerState] = None
+
+
+def _initWorker(state: _WorkerState) -> None:
+    global _workerState
+    _workerState = state
+
+
+def _lowerInWorker(index: int) -> Optional[bytes]:
+    """Lower the program or subroutine at index in a worker process.
+
+    Returns:
+        The pickled encoded graph, index of the end block, and stats of each pass, or the pickled
+        error raised while lowering, which the parent raises again. Returns None if the result
+        refers to a ScratchSlot or SubroutineDefinition created in the worker, in which case the
+        parent compiles the program serially.
+    """
+    from pyteal.compiler.compiler import lowerSubroutine
+
+    state = _workerState
+    assert state is not None
+
+    result: Any
+    try:
+        stats = (
+            CompileStats(trace_allocations=state.trace_allocations)
+            if state.profile
+            else None
+        )
+        with stats.compiling() if stats is not None else nullcontext():
+            start, end, _ = lowerSubroutine(
+                state.asts[index],
+                state.options,
+                stats.measure if stats is not None else skipMeasure,
+            )
+        blocks = list(TealBlock.Iterate(start))
+        encoded = encodeGraph(blocks)
+        endIndex = next(i for i, block in enumerate(blocks) if block is end)
+        result = (encoded, endIndex, stats.passes if stats is not None else [])
+    except Exception as error:
+        result = error
+
+    buffer = io.BytesIO()
+    try:
+        _WorkerPickler(buffer, state.shared).dump(result)
+    except _Unshareable:
+        return None
+    return buffer.getvalue()
+
+
+def _lowerAll(state: _WorkerState, processes: int, count: int) -> List[Optional[bytes]]:
+    with ProcessPoolExecutor(
+        max_workers=min(processes, count),
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_initWorker,
+        initargs=(state,),
+    ) as executor:
+        chunksize = max(1, count // (processes * 4))
+        return list(executor.map(_lowerInWorker, range(count), chunksize=chunksize))
+
+
+def canCompileInParallel() -> bool:
+    """Check if worker processes can be forked on this platform."""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def compileSubroutinesInParallel(
+    ast: Expr,
+    options: "CompileOptions",
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
+    subroutine_start_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    subroutine_end_blocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    processes: int,
+    stats: Optional[CompileStats],
+) -> bool:
+    """Lower the main program and every subroutine it references on a pool of worker processes.
+
+    The result is the same as compileSubroutine. Subroutine declarations are evaluated in the parent
+    process in the same order as compileSubroutine evaluates them, so ScratchSlots and
+    SubroutineDefinitions created by declarations receive the same ids as in a serial compile. If
+    the program is then compiled serially, the ScratchSlots created while it is lowered receive ids
+    after those of every declaration, which only changes the output if a declaration evaluated
+    later in a serial compile creates slots.
+
+    An error raised while lowering the program or a subroutine is raised again in the parent
+    process, and if several are lowered with errors, the error of the first in the order of
+    compileSubroutine is raised.
+
+    Returns:
+        True if the program was compiled, or False if it must be compiled serially instead, because
+        it has no subroutines, or because lowering it or a subroutine created a ScratchSlot or
+        SubroutineDefinition, which would not exist in the parent process. The output dictionaries
+        are only modified if the program was compiled.
+    """
+    from pyteal.compiler.compiler import optimizeExpressions
+
+    shared = _SharedObjects()
+    order: List[Optional[SubroutineDefinition]] = []
+    asts: List[Expr] = []
+    references: List[Set[SubroutineDefinition]] = []
+    discovered: Set[SubroutineDefinition] = set()
+
+    measure = stats.measure if stats is not None else skipMeasure
+
+    # mirror the order in which compileSubroutine visits subroutines
+    def discover(subroutine: Optional[SubroutineDefinition], ast: Expr) -> None:
+        # this may create ScratchSlots, so it must happen before the workers are forked
+        name = subroutine.name() if subroutine is not None else MAIN_PROGRAM
+        ast = optimizeExpressions(ast, options, name, measure)
+
+        referenced = findReferencedSubroutines(ast, shared)
+        order.append(subroutine)
+        asts.append(ast)
+        references.append(referenced)
+
+        for next in sorted(referenced, key=lambda subroutine: subroutine.id):
+            if next not in discovered:
+                discovered.add(next)
+                discover(next, next.getDeclaration())
+
+    discover(None, ast)
+
+    if len(order) < 2:
+        return False
+
+    # the expressions have already been optimized
+    workerOptions = copy(options)
+    workerOptions.optimize = copy(options.optimize)
+    workerOptions.optimize.constant_folding = False
+    workerOptions.optimize.common_subexpressions = False
+
+    state = _WorkerState(asts, workerOptions, shared, stats)
+    # move existing objects out of the collector's generations, so that collections in workers do
+    # not write to every object inherited from this process, which would copy its memory
+    gc.freeze()
+    try:
+        results = _lowerAll(state, processes, len(order))
+    finally:
+        gc.unfreeze()
+
+    lowered: List[Tuple[TealBlock, TealBlock, List[PassStats]]] = []
+    for result, referenced in zip(results, references):
+        if result is None:
+            return False
+
+        loaded = _ParentUnpickler(io.BytesIO(result), shared).load()
+        if isinstance(loaded, Exception):
+            raise loaded
+
+        encoded, endIndex, passes = loaded
+        blocks = decodeGraph(encoded)
+
+        # the subroutines called by the lowered program must be the ones which were discovered
+        called = {
+            subroutine
+            for block in blocks
+            for op in block.ops
+            for subroutine in op.getSubroutines()
+        }
+        if called != referenced:
+            return False
+
+        lowered.append((blocks[0], blocks[endIndex], passes))
+
+    for subroutine, referenced, (start, end, passes) in zip(order, references, lowered):
+        subroutine_start_blocks[subroutine] = start
+        subroutine_end_blocks[subroutine] = end
+        if subroutine is not None:
+            subroutineGraph[subroutine] = referenced
+        if stats is not None:
+            stats.passes += passes
+
+    return True
@@ -0,0 +1,201 @@
+import pytest
+
+import pyteal as pt
+
+from pyteal.compiler.parallel import canCompileInParallel
+
+pytestmark = pytest.mark.skipif(
+    not canCompileInParallel(), reason="worker processes cannot be forked"
+)
+
+
+def build_program() -> pt.Expr:
+    @pt.Subroutine(pt.TealType.uint64)
+    def factorial(n):
+        return pt.If(n <= pt.Int(1), pt.Int(1), n * factorial(n - pt.Int(1)))
+
+    @pt.Subroutine(pt.TealType.none)
+    def increment(counter: pt.ScratchVar):
+        return counter.store(counter.load() + pt.Int(1))
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def lazy(x):
+        # this subroutine is only created when the declaration of lazy is evaluated
+        @pt.Subroutine(pt.TealType.uint64)
+        def inner(y):
+            temp = pt.ScratchVar(pt.TealType.uint64)
+            return pt.Seq(temp.store(y * pt.Int(3)), temp.load() + factorial(y))
+
+        return inner(x) + inner(x + pt.Int(1))
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def balance(index):
+        return pt.AssetHolding.balance(pt.Txn.accounts[index], pt.Int(7)).outputReducer(
+            lambda value, has_value: pt.If(has_value, value, pt.Int(0))
+        )
+
+    counter = pt.ScratchVar(pt.TealType.uint64)
+    return pt.Seq(
+        counter.store(pt.Int(0)),
+        pt.For(pt.Seq(), counter.load() < pt.Int(10), increment(counter)).Do(
+            pt.Pop(lazy(counter.load()))
+        ),
+        pt.Cond(
+            [pt.Txn.application_id() == pt.Int(0), pt.Approve()],
+            [
+                pt.Txn.on_completion() == pt.OnComplete.NoOp,
+                pt.Return(factorial(counter.load()) > balance(pt.Int(1))),
+            ],
+        ),
+        pt.Reject(),
+    )
+
+
+@pytest.mark.parametrize("assembleConstants", [False, True])
+@pytest.mark.parametrize("scratch_slots", [False, True])
+@pytest.mark.parametrize("common_subexpressions", [False, True])
+@pytest.mark.parametrize("constant_folding", [False, True])
+def test_parallel_matches_serial(
+    assembleConstants, scratch_slots, common_subexpressions, constant_folding
+):
+    options = dict(
+        mode=pt.Mode.Application,
+        version=6,
+        assembleConstants=assembleConstants,
+        optimize=pt.OptimizeOptions(
+            scratch_slots=scratch_slots,
+            common_subexpressions=common_subexpressions,
+            constant_folding=constant_folding,
+        ),
+    )
+    expected = pt.compileTeal(build_program(), **options)
+    actual = pt.compileTeal(build_program(), parallel=2, **options)
+    assert actual == expected
+
+
+def test_parallel_examples():
+    from examples.application import security_token, vote
+
+    for build in (vote.approval_program, security_token.approval_program):
+        expected = pt.compileTeal(build(), mode=pt.Mode.Application, version=5)
+        actual = pt.compileTeal(
+            build(), mode=pt.Mode.Application, version=5, parallel=2
+        )
+        assert actual == expected
+
+
+def test_parallel_no_subroutines():
+    program = pt.Return(pt.Txn.fee() < pt.Int(1000))
+    expected = pt.compileTeal(program, mode=pt.Mode.Signature, version=5)
+    actual = pt.compileTeal(program, mode=pt.Mode.Signature, version=5, parallel=2)
+    assert actual == expected
+
+
+def test_parallel_stats():
+    stats = pt.CompileStats()
+    pt.compileTeal(
+        build_program(), mode=pt.Mode.Application, version=6, parallel=2, stats=stats
+    )
+
+    lowered = {p.subroutine for p in stats.passes if p.name == "lower"}
+    assert lowered == {"<main>", "factorial", "increment", "lazy", "inner", "balance"}
+    assert stats.parallel_fallback is False
+
+
+class SlotPerLowering(pt.Expr):
+    """An expression which creates a new slot each time it is lowered."""
+
+    def __init__(self, value: pt.Expr) -> None:
+        super().__init__()
+        self.value = value
+
+    def __teal__(self, options):
+        slot = pt.ScratchSlot()
+        return pt.Seq(slot.store(self.value), slot.load()).__teal__(options)
+
+    def __str__(self):
+        return "(SlotPerLowering {})".format(self.value)
+
+    def type_of(self):
+        return self.value.type_of()
+
+    def has_return(self):
+        return False
+
+
+def test_parallel_fallback():
+    def build():
+        @pt.Subroutine(pt.TealType.uint64)
+        def fee():
+            return pt.Txn.fee()
+
+        @pt.Subroutine(pt.TealType.uint64)
+        def stored():
+            return SlotPerLowering(fee() + pt.Int(1))
+
+        return pt.Return(stored() > fee())
+
+    expected = pt.compileTeal(build(), mode=pt.Mode.Application, version=6)
+
+    # the slot created by a worker would not exist in this process, so the program is compiled
+    # serially
+    stats = pt.CompileStats()
+    actual = pt.compileTeal(
+        build(), mode=pt.Mode.Application, version=6, parallel=2, stats=stats
+    )
+    assert actual == expected
+    assert stats.parallel_fallback is True
+
+
+def test_parallel_error():
+    @pt.Subroutine(pt.TealType.none)
+    def log(value):
+        return pt.Log(value)
+
+    program = pt.Seq(log(pt.Bytes("message")), pt.Approve())
+
+    with pytest.raises(pt.TealInputError) as serial:
+        pt.compileTeal(program, mode=pt.Mode.Application, version=4)
+
+    with pytest.raises(pt.TealInputError) as parallel:
+        pt.compileTeal(program, mode=pt.Mode.Application, version=4, parallel=2)
+
+    assert parallel.value == serial.value
+
+
+def test_parallel_invalid():
+    program = pt.Approve()
+    for invalid in (-1, 1.5, "2"):
+        with pytest.raises(pt.TealInputError):
+            pt.compileTeal(
+                program, mode=pt.Mode.Application, version=6, parallel=invalid
+            )
+
+
+def test_compile_subroutines_in_parallel():
+    from pyteal.compiler.compiler import compileSubroutine
+    from pyteal.compiler.parallel import compileSubroutinesInParallel
+
+    program = build_program()
+    options = pt.CompileOptions(mode=pt.Mode.Application, version=6)
+
+    serialGraph: dict = {}
+    serialStarts: dict = {}
+    serialEnds: dict = {}
+    compileSubroutine(program, options, serialGraph, serialStarts, serialEnds)
+
+    parallelGraph: dict = {}
+    parallelStarts: dict = {}
+    parallelEnds: dict = {}
+    assert compileSubroutinesInParallel(
+        program, options, parallelGraph, parallelStarts, parallelEnds, 2, None
+    )
+
+    assert list(parallelStarts.keys()) == list(serialStarts.keys())
+    assert list(parallelEnds.keys()) == list(serialEnds.keys())
+    assert parallelGraph == serialGraph
+
+    with pt.TealComponent.Context.ignoreExprEquality():
+        for subroutine, start in serialStarts.items():
+            assert parallelStarts[subroutine] == start
+            assert parallelEnds[subroutine] == serialEnds[subroutine]
@@ -4,6 +4,7 @@ from pyteal.ast import ScratchSlot, SubroutineDefinition
 from pyteal.ir import TealBlock, Op
 from pyteal.errors import TealInternalError
 from pyteal.config import NUM_SLOTS
+from pyteal.compiler.liveness import computeLiveOut, slotBit, slotBits, slotsOf
 
 
 def collect_unoptimized_slots(
@@ -87,8 +88,239 @@ def collectScratchSlots(
     return global_slots, local_slots
 
 
+def findReachableSubroutines(
+    subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock]
+) -> Dict[Optional[SubroutineDefinition], Set[SubroutineDefinition]]:
+    """Find the subroutines each subroutine may call, directly or indirectly.
+
+    Args:
+        subroutineBlocks: A mapping from subroutine to the subroutine's control flow graph.
+        The key None is taken to mean the main program routine.
+
+    Returns:
+        A dictionary whose keys are the same as subroutineBlocks, and whose values are the
+        subroutines which may be invoked while that subroutine is running.
+    """
+    callees: Dict[Optional[SubroutineDefinition], Set[SubroutineDefinition]] = dict()
+    for subroutine, start in subroutineBlocks.items():
+        called: Set[SubroutineDefinition] = set()
+        for block in TealBlock.Iterate(start):
+            for op in block.ops:
+                called.update(op.getSubroutines())
+        callees[subroutine] = called
+
+    reachable: Dict[Optional[SubroutineDefinition], Set[SubroutineDefinition]] = dict()
+    for subroutine in subroutineBlocks:
+        found: Set[SubroutineDefinition] = set()
+        stack = list(callees[subroutine])
+        while len(stack) != 0:
+            callee = stack.pop()
+            if callee in found:
+                continue
+            found.add(callee)
+            stack.extend(callees.get(callee, ()))
+        reachable[subroutine] = found
+
+    return reachable
+
+
+def buildSlotInterferenceGraph(
+    subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    localSlots: Dict[Optional[SubroutineDefinition], Set[ScratchSlot]],
+) -> Dict[ScratchSlot, Set[ScratchSlot]]:
+    """Find which local slots may hold values that are needed at the same time.
+
+    Two slots of the same subroutine interfere if one is stored while the other is live, i.e. may
+    be loaded before it is stored again. A slot which is live across a call to a subroutine
+    interferes with the local slots of every other subroutine which may run during the call, since
+    they could overwrite it.
+
+    Args:
+        subroutineBlocks: A mapping from subroutine to the subroutine's control flow graph.
+        The key None is taken to mean the main program routine.
+        localSlots: The local slots of each subroutine which may share an ID with other slots.
+
+    Returns:
+        A dictionary whose keys are the slots in localSlots, and whose values are the slots they
+        interfere with.
+    """
+    graph: Dict[ScratchSlot, Set[ScratchSlot]] = {
+        slot: set() for slots in localSlots.values() for slot in slots
+    }
+    reachable = findReachableSubroutines(subroutineBlocks)
+
+    def addEdge(a: ScratchSlot, b: ScratchSlot) -> None:
+        graph[a].add(b)
+        graph[b].add(a)
+
+    for subroutine, start in subroutineBlocks.items():
+        blocks = list(TealBlock.Iterate(start))
+        shared = localSlots.get(subroutine, set())
+        bits = slotBits(
+            blocks,
+            set(slot for block in blocks for op in block.ops for slot in op.getSlots())
+            - shared,
+        )
+        if len(bits) == 0:
+            continue
+        slots = sorted(bits, key=lambda slot: bits[slot])
+
+        # the slots which are live across a call to each subroutine
+        liveAcrossCalls: Dict[SubroutineDefinition, int] = dict()
+        liveOut = computeLiveOut(blocks, bits)
+        for block in blocks:
+            live = liveOut[id(block)]
+            for op in reversed(block.ops):
+                bit = slotBit(op, bits)
+                if bit == 0:
+                    for callee in op.getSubroutines():
+                        liveAcrossCalls[callee] = liveAcrossCalls.get(callee, 0) | live
+                elif op.op == Op.store:
+                    for other in slotsOf(live & ~bit, slots):
+                        addEdge(slots[bit.bit_length() - 1], other)
+                    live &= ~bit
+                else:
+                    live |= bit
+
+        for callee, live in liveAcrossCalls.items():
+            if live == 0:
+                continue
+            # a recursive call does not need to be considered, since the caller's local slots are
+            # spilled to the stack around it, see spillLocalSlotsDuringRecursion
+            running = ({callee} | reachable[callee]) - {subroutine}
+            for slot in slotsOf(live, slots):
+                for runningSubroutine in running:
+                    for otherSlot in localSlots.get(runningSubroutine, set()):
+                        if otherSlot is not slot:
+                            addEdge(slot, otherSlot)
+
+    return graph
+
+
+def findLiveSlotsAtCalls(
+    subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    localSlots: Dict[Optional[SubroutineDefinition], Set[ScratchSlot]],
+) -> Dict[int, Set[ScratchSlot]]:
+    """Find the local slots whose values are needed after each subroutine call.
+
+    A slot is live after a call if it may be loaded before it is stored again once the call
+    returns. Reserved slots and slots which may be accessed indirectly, such as the slots
+    referenced by DynamicScratchVars, are always considered live.
+
+    Args:
+        subroutineBlocks: A mapping from subroutine to the subroutine's control flow graph.
+        The key None is taken to mean the main program routine.
+        localSlots: The slots referenced by only one subroutine, for each subroutine.
+
+    Returns:
+        A dictionary whose keys are the ids of the callsub ops in the program, and whose values are
+        the local slots of the calling subroutine which are live after that op.
+    """
+    liveSlots: Dict[int, Set[ScratchSlot]] = dict()
+    for subroutine, start in subroutineBlocks.items():
+        blocks = list(TealBlock.Iterate(start))
+        local = localSlots.get(subroutine, set())
+        if len(local) == 0 or not any(
+            op.op == Op.callsub for block in blocks for op in block.ops
+        ):
+            continue
+
+        bits = slotBits(
+            blocks,
+            set(slot for block in blocks for op in block.ops for slot in op.getSlots())
+            - set(slot for slot in local if not slot.isReservedSlot),
+        )
+        untracked = set(slot for slot in local if slot not in bits)
+        slots = sorted(bits, key=lambda slot: bits[slot])
+
+        liveOut = computeLiveOut(blocks, bits)
+        for block in blocks:
+            live = liveOut[id(block)]
+            for op in reversed(block.ops):
+                bit = slotBit(op, bits)
+                if bit == 0:
+                    if op.op == Op.callsub:
+                        liveSlots[id(op)] = untracked.union(slotsOf(live, slots))
+                elif op.op == Op.store:
+                    live &= ~bit
+                else:
+                    live |= bit
+
+    return liveSlots
+
+
+def shareScratchSlots(
+    subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    allSlots: Set[ScratchSlot],
+    globalSlots: Set[ScratchSlot],
+    localSlots: Dict[Optional[SubroutineDefinition], Set[ScratchSlot]],
+) -> Dict[ScratchSlot, int]:
+    """Assign slot IDs so that local slots whose values are never needed at the same time share an
+    ID.
+
+    Reserved slots keep their requested IDs. Global slots and slots which may be accessed
+    indirectly, such as the slots referenced by DynamicScratchVars, get IDs which no other slot
+    uses. The remaining slots are colored greedily in the order they were created, using the lowest
+    ID which no interfering slot uses.
+
+    Args:
+        subroutineBlocks: A mapping from subroutine to the subroutine's control flow graph.
+        The key None is taken to mean the main program routine.
+        allSlots: All slots referenced by the program.
+        globalSlots: The slots referenced by more than one subroutine.
+        localSlots: The slots referenced by only one subroutine, for each subroutine.
+
+    Returns:
+        The ID assigned to each slot in allSlots.
+    """
+    pinned = set(globalSlots)
+    for start in subroutineBlocks.values():
+        for block in TealBlock.Iterate(start):
+            for op in block.ops:
+                if op.op != Op.store and op.op != Op.load:
+                    pinned.update(op.getSlots())
+
+    shareable = {
+        subroutine: set(
+            slot for slot in slots if slot not in pinned and not slot.isReservedSlot
+        )
+        for subroutine, slots in localSlots.items()
+    }
+    graph = buildSlotInterferenceGraph(subroutineBlocks, shareable)
+
+    reservedIds = set(slot.id for slot in allSlots if slot.isReservedSlot)
+    # IDs which only one slot may use
+    exclusiveIds = set(reservedIds)
+    usedIds = set(reservedIds)
+
+    assignments: Dict[ScratchSlot, int] = dict()
+    for slot in sorted(allSlots, key=lambda slot: slot.id):
+        if slot.isReservedSlot:
+            assignments[slot] = slot.id
+            continue
+
+        if slot in graph:
+            unavailable = exclusiveIds | set(
+                assignments[other] for other in graph[slot] if other in assignments
+            )
+        else:
+            unavailable = usedIds
+
+        slotId = 0
+        while slotId in unavailable:
+            slotId += 1
+        assignments[slot] = slotId
+        usedIds.add(slotId)
+        if slot not in graph:
+            exclusiveIds.add(slotId)
+
+    return assignments
+
+
 def assignScratchSlotsToSubroutines(
     subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    shareSlots: bool = False,
+    liveSlotsAtCalls: Dict[int, Set[int]] = None,
 ) -> Dict[Optional[SubroutineDefinition], Set[int]]:
     """Assign scratch slot values for an entire program.
 
@@ -97,6 +329,13 @@ def assignScratchSlotsToSubroutines(
             blocks. The key None is taken to mean the main program routine. The values of this
             map will be modified in order to assign specific slot values to all referenced scratch
             slots.
+        shareSlots (optional): If true, local slots whose values are never needed at the same time
+            share IDs, see shareScratchSlots. Otherwise every slot gets its own ID, unless the
+            program references more than 256 slots, in which case slots are shared as well.
+        liveSlotsAtCalls (optional): If present, this dictionary will be filled with the assigned
+            IDs of the local slots which are live after each callsub op, keyed by the id of the op,
+            see findLiveSlotsAtCalls. This must be computed here, since the ops no longer reference
+            ScratchSlots once IDs are assigned.
 
     Raises:
         TealInternalError: if the scratch slots referenced by the program do not fit into 256 slots,
@@ -127,12 +366,8 @@ def assignScratchSlotsToSubroutines(
             )
         slotIds.add(slot.id)
 
-    if len(allSlots) > NUM_SLOTS:
-        # TODO: identify which slots can be reused
-        # subroutines which never invoke each other can use the same slot ID for local slots
-        raise TealInternalError(
-            "Too many slots in use: {}, maximum is {}".format(len(allSlots), NUM_SLOTS)
-        )
+    # if every slot cannot have its own ID, try to share IDs between slots
+    shareSlots = shareSlots or len(allSlots) > NUM_SLOTS
 
     # verify that all local slots are assigned to before being loaded.
     # TODO: for simplicity, the current implementation does not perform this check with global slots
@@ -145,18 +380,34 @@ def assignScratchSlotsToSubroutines(
             )
             raise TealInternalError(msg) from errors[0]
 
-    nextSlotIndex = 0
-    for slot in sorted(allSlots, key=lambda slot: slot.id):
-        # Find next vacant slot that compiler can assign to
-        while nextSlotIndex in slotIds:
-            nextSlotIndex += 1
+    if shareSlots:
+        slotAssignments = shareScratchSlots(
+            subroutineBlocks, allSlots, global_slots, local_slots
+        )
+    else:
+        nextSlotIndex = 0
+        for slot in sorted(allSlots, key=lambda slot: slot.id):
+            # Find next vacant slot that compiler can assign to
+            while nextSlotIndex in slotIds:
+                nextSlotIndex += 1
+
+            if slot.isReservedSlot:
+                # Slot ids under 256 are manually reserved slots
+                slotAssignments[slot] = slot.id
+            else:
+                slotAssignments[slot] = nextSlotIndex
+                slotIds.add(nextSlotIndex)
+
+    if any(slotId >= NUM_SLOTS for slotId in slotAssignments.values()):
+        raise TealInternalError(
+            "Too many slots in use: {}, maximum is {}".format(
+                len(set(slotAssignments.values())), NUM_SLOTS
+            )
+        )
 
-        if slot.isReservedSlot:
-            # Slot ids under 256 are manually reserved slots
-            slotAssignments[slot] = slot.id
-        else:
-            slotAssignments[slot] = nextSlotIndex
-            slotIds.add(nextSlotIndex)
+    if liveSlotsAtCalls is not None:
+        for opId, slots in findLiveSlotsAtCalls(subroutineBlocks, local_slots).items():
+            liveSlotsAtCalls[opId] = set(slotAssignments[slot] for slot in slots)
 
     for start in subroutineBlocks.values():
         for block in TealBlock.Iterate(start):
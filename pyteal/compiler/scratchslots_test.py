@@ -5,6 +5,9 @@ import pyteal as pt
 from pyteal.compiler.scratchslots import (
     collectScratchSlots,
     assignScratchSlotsToSubroutines,
+    buildSlotInterferenceGraph,
+    findLiveSlotsAtCalls,
+    findReachableSubroutines,
 )
 
 
@@ -433,3 +436,310 @@ def test_assignScratchSlotsToSubroutines_slot_used_before_assignment():
 
     with pytest.raises(pt.TealInternalError):
         assignScratchSlotsToSubroutines(subroutineBlocks)
+
+
+def slot_ids(ops):
+    return [op.args[0] for op in ops if op.op in (pt.Op.load, pt.Op.store)]
+
+
+def test_findReachableSubroutines():
+    def subImpl():
+        return None
+
+    subroutine1 = pt.SubroutineDefinition(subImpl, pt.TealType.none)
+    subroutine2 = pt.SubroutineDefinition(subImpl, pt.TealType.none)
+    subroutine3 = pt.SubroutineDefinition(subImpl, pt.TealType.none)
+
+    subroutineBlocks = {
+        None: pt.TealSimpleBlock([pt.TealOp(None, pt.Op.callsub, subroutine1)]),
+        subroutine1: pt.TealSimpleBlock(
+            [
+                pt.TealOp(None, pt.Op.callsub, subroutine2),
+                pt.TealOp(None, pt.Op.retsub),
+            ]
+        ),
+        subroutine2: pt.TealSimpleBlock(
+            [
+                pt.TealOp(None, pt.Op.callsub, subroutine1),
+                pt.TealOp(None, pt.Op.retsub),
+            ]
+        ),
+        subroutine3: pt.TealSimpleBlock([pt.TealOp(None, pt.Op.retsub)]),
+    }
+
+    assert findReachableSubroutines(subroutineBlocks) == {
+        None: {subroutine1, subroutine2},
+        subroutine1: {subroutine1, subroutine2},
+        subroutine2: {subroutine1, subroutine2},
+        subroutine3: set(),
+    }
+
+
+def test_assignScratchSlotsToSubroutines_share_within_subroutine():
+    slot1 = pt.ScratchSlot()
+    slot2 = pt.ScratchSlot()
+    slot3 = pt.ScratchSlot()
+    ops = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, slot1),
+        pt.TealOp(None, pt.Op.load, slot1),
+        pt.TealOp(None, pt.Op.store, slot2),
+        # slot1 is no longer live, so slot3 can use its ID, but slot2 is still live
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.store, slot3),
+        pt.TealOp(None, pt.Op.load, slot2),
+        pt.TealOp(None, pt.Op.load, slot3),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    subroutineBlocks = {None: pt.TealSimpleBlock(ops)}
+
+    assert buildSlotInterferenceGraph(
+        subroutineBlocks, {None: {slot1, slot2, slot3}}
+    ) == {slot1: set(), slot2: {slot3}, slot3: {slot2}}
+
+    actual = assignScratchSlotsToSubroutines(subroutineBlocks, shareSlots=True)
+    assert actual == {None: {0, 1}}
+    assert slot_ids(ops) == [0, 0, 0, 1, 0, 1]
+
+
+def test_assignScratchSlotsToSubroutines_share_across_subroutines():
+    def subImpl():
+        return None
+
+    subroutine1 = pt.SubroutineDefinition(subImpl, pt.TealType.uint64)
+    subroutine2 = pt.SubroutineDefinition(subImpl, pt.TealType.uint64)
+
+    subroutine1Slot = pt.ScratchSlot()
+    subroutine1Ops = [
+        pt.TealOp(None, pt.Op.store, subroutine1Slot),
+        pt.TealOp(None, pt.Op.load, subroutine1Slot),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+    subroutine2Slot = pt.ScratchSlot()
+    subroutine2Ops = [
+        pt.TealOp(None, pt.Op.store, subroutine2Slot),
+        pt.TealOp(None, pt.Op.callsub, subroutine1),
+        pt.TealOp(None, pt.Op.load, subroutine2Slot),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+    mainLiveSlot = pt.ScratchSlot()
+    mainDeadSlot = pt.ScratchSlot()
+    mainOps = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, mainDeadSlot),
+        pt.TealOp(None, pt.Op.load, mainDeadSlot),
+        pt.TealOp(None, pt.Op.store, mainLiveSlot),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.callsub, subroutine2),
+        pt.TealOp(None, pt.Op.load, mainLiveSlot),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    subroutineBlocks = {
+        None: pt.TealSimpleBlock(mainOps),
+        subroutine1: pt.TealSimpleBlock(subroutine1Ops),
+        subroutine2: pt.TealSimpleBlock(subroutine2Ops),
+    }
+
+    # mainLiveSlot is live while both subroutines run, and subroutine2Slot is live while
+    # subroutine1 runs
+    assert buildSlotInterferenceGraph(
+        subroutineBlocks,
+        {
+            None: {mainLiveSlot, mainDeadSlot},
+            subroutine1: {subroutine1Slot},
+            subroutine2: {subroutine2Slot},
+        },
+    ) == {
+        mainLiveSlot: {subroutine1Slot, subroutine2Slot},
+        mainDeadSlot: set(),
+        subroutine1Slot: {mainLiveSlot, subroutine2Slot},
+        subroutine2Slot: {mainLiveSlot, subroutine1Slot},
+    }
+
+    actual = assignScratchSlotsToSubroutines(subroutineBlocks, shareSlots=True)
+    assert actual == {None: {0, 2}, subroutine1: {0}, subroutine2: {1}}
+    assert slot_ids(mainOps) == [0, 0, 2, 2]
+    assert slot_ids(subroutine1Ops) == [0, 0]
+    assert slot_ids(subroutine2Ops) == [1, 1]
+
+
+def test_assignScratchSlotsToSubroutines_share_unshareable():
+    def subImpl():
+        return None
+
+    subroutine = pt.SubroutineDefinition(subImpl, pt.TealType.uint64)
+
+    globalSlot = pt.ScratchSlot()
+    reservedSlot = pt.ScratchSlot(requestedSlotId=0)
+    dynamicSlot = pt.ScratchSlot()
+    localSlot = pt.ScratchSlot()
+    subroutineSlot = pt.ScratchSlot()
+
+    mainOps = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, globalSlot),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.store, reservedSlot),
+        pt.TealOp(None, pt.Op.int, 3),
+        pt.TealOp(None, pt.Op.store, dynamicSlot),
+        pt.TealOp(None, pt.Op.int, dynamicSlot),
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.int, 4),
+        pt.TealOp(None, pt.Op.store, localSlot),
+        pt.TealOp(None, pt.Op.load, localSlot),
+        pt.TealOp(None, pt.Op.callsub, subroutine),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    subroutineOps = [
+        pt.TealOp(None, pt.Op.store, subroutineSlot),
+        pt.TealOp(None, pt.Op.load, subroutineSlot),
+        pt.TealOp(None, pt.Op.load, globalSlot),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+    subroutineBlocks = {
+        None: pt.TealSimpleBlock(mainOps),
+        subroutine: pt.TealSimpleBlock(subroutineOps),
+    }
+
+    actual = assignScratchSlotsToSubroutines(subroutineBlocks, shareSlots=True)
+
+    # only the local slots of the main program and the subroutine can share an ID
+    assert actual == {None: {0, 2, 3}, subroutine: {3}}
+    assert mainOps[1].args == [1]
+    assert mainOps[3].args == [0]
+    assert mainOps[5].args == [2]
+    assert mainOps[6].args == [2]
+    assert mainOps[9].args == [3]
+    assert subroutineOps[0].args == [3]
+    assert subroutineOps[2].args == [1]
+
+
+def test_assignScratchSlotsToSubroutines_more_than_256_slots():
+    slots = [pt.ScratchSlot() for _ in range(300)]
+    ops = []
+    for i, slot in enumerate(slots):
+        ops += [
+            pt.TealOp(None, pt.Op.int, i),
+            pt.TealOp(None, pt.Op.store, slot),
+            pt.TealOp(None, pt.Op.load, slot),
+            pt.TealOp(None, pt.Op.pop),
+        ]
+    ops.append(pt.TealOp(None, pt.Op.return_))
+    subroutineBlocks = {None: pt.TealSimpleBlock(ops)}
+
+    # the slots are never live at the same time, so they share IDs even if not requested
+    actual = assignScratchSlotsToSubroutines(subroutineBlocks)
+    assert actual == {None: {0}}
+
+    slots = [pt.ScratchSlot() for _ in range(300)]
+    ops = []
+    for i, slot in enumerate(slots):
+        ops += [pt.TealOp(None, pt.Op.int, i), pt.TealOp(None, pt.Op.store, slot)]
+    for slot in slots:
+        ops += [pt.TealOp(None, pt.Op.load, slot), pt.TealOp(None, pt.Op.pop)]
+    ops.append(pt.TealOp(None, pt.Op.return_))
+    subroutineBlocks = {None: pt.TealSimpleBlock(ops)}
+
+    with pytest.raises(pt.TealInternalError, match="Too many slots in use: 300"):
+        assignScratchSlotsToSubroutines(subroutineBlocks)
+
+
+def test_findLiveSlotsAtCalls():
+    def subImpl(a1):
+        return None
+
+    subroutine = pt.SubroutineDefinition(subImpl, pt.TealType.uint64)
+
+    argSlot = pt.ScratchSlot()
+    liveSlot = pt.ScratchSlot()
+    deadSlot = pt.ScratchSlot()
+    dynamicSlot = pt.ScratchSlot()
+    reservedSlot = pt.ScratchSlot(100)
+    firstCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    secondCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    ops = [
+        pt.TealOp(None, pt.Op.store, argSlot),
+        pt.TealOp(None, pt.Op.load, argSlot),
+        pt.TealOp(None, pt.Op.store, liveSlot),
+        pt.TealOp(None, pt.Op.load, argSlot),
+        pt.TealOp(None, pt.Op.store, deadSlot),
+        pt.TealOp(None, pt.Op.int, dynamicSlot),
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, reservedSlot),
+        pt.TealOp(None, pt.Op.load, deadSlot),
+        firstCall,
+        # deadSlot is stored again before it is loaded
+        pt.TealOp(None, pt.Op.store, deadSlot),
+        pt.TealOp(None, pt.Op.load, deadSlot),
+        secondCall,
+        pt.TealOp(None, pt.Op.load, liveSlot),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+    mainOps = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.callsub, subroutine),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    subroutineBlocks = {
+        None: pt.TealSimpleBlock(mainOps),
+        subroutine: pt.TealSimpleBlock(ops),
+    }
+    localSlots = {
+        None: set(),
+        subroutine: {argSlot, liveSlot, deadSlot, dynamicSlot, reservedSlot},
+    }
+
+    assert findLiveSlotsAtCalls(subroutineBlocks, localSlots) == {
+        id(firstCall): {liveSlot, dynamicSlot, reservedSlot},
+        id(secondCall): {liveSlot, dynamicSlot, reservedSlot},
+    }
+
+    liveSlotsAtCalls = dict()
+    actual = assignScratchSlotsToSubroutines(
+        subroutineBlocks, liveSlotsAtCalls=liveSlotsAtCalls
+    )
+    assert actual == {None: set(), subroutine: {0, 1, 2, 3, 100}}
+    assert liveSlotsAtCalls == {
+        id(firstCall): {1, 3, 100},
+        id(secondCall): {1, 3, 100},
+    }
+
+
+def test_share_slots_recursion():
+    @pt.Subroutine(pt.TealType.uint64)
+    def fib(n):
+        first = pt.ScratchVar(pt.TealType.uint64)
+        second = pt.ScratchVar(pt.TealType.uint64)
+        return (
+            pt.If(n <= pt.Int(1))
+            .Then(n)
+            .Else(
+                pt.Seq(
+                    first.store(fib(n - pt.Int(1))),
+                    second.store(fib(n - pt.Int(2))),
+                    first.load() + second.load(),
+                )
+            )
+        )
+
+    program = pt.Return(fib(pt.Int(10)))
+    unshared = pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+    shared = pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(scratch_slots=True),
+    )
+
+    # n is dead once the second call has its argument, so second shares its ID, and fewer slots
+    # are spilled around the recursive calls
+    assert "store 2" in unshared
+    assert "store 2" not in shared
+    assert len(shared.splitlines()) < len(unshared.splitlines())
@@ -1,43 +1,206 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple, cast
+import heapq
 
-from pyteal.ir import TealBlock
+from pyteal.ir import Op, TealBlock, TealConditionalBlock, TealSimpleBlock
 from pyteal.errors import TealInternalError
 
 
-def sortBlocks(start: TealBlock, end: TealBlock) -> List[TealBlock]:
-    """Topologically sort the graph which starts with the input TealBlock.
+def _forwardEdges(
+    start: TealBlock,
+) -> Tuple[List[TealBlock], Dict[int, List[TealBlock]]]:
+    """Find the blocks of a graph and its edges which are not the back edges of loops.
+
+    Returns:
+        The blocks of the graph in reverse postorder, which is a topological order of the graph
+        without its back edges, and the successors of each block, keyed by the id of the block,
+        without the back edges.
+    """
+    successors: Dict[int, List[TealBlock]] = dict()
+    onStack = {id(start)}
+    postorder: List[TealBlock] = []
+    stack: List[Tuple[TealBlock, List[TealBlock]]] = [(start, start.getOutgoing())]
+    successors[id(start)] = []
+
+    while len(stack) != 0:
+        block, outgoing = stack[-1]
+        if len(outgoing) == 0:
+            stack.pop()
+            onStack.discard(id(block))
+            postorder.append(block)
+            continue
+
+        # outgoing is consumed in reverse, so successors are entered in order
+        nextBlock = outgoing.pop()
+        if id(nextBlock) in onStack:
+            # a back edge, which goes to a block that is still being searched
+            continue
+        successors[id(block)].append(nextBlock)
+        if id(nextBlock) not in successors:
+            successors[id(nextBlock)] = []
+            onStack.add(id(nextBlock))
+            stack.append((nextBlock, nextBlock.getOutgoing()))
+
+    postorder.reverse()
+    return postorder, successors
+
+
+def _alwaysFails(block: TealBlock) -> bool:
+    """Check if a terminal block ends with an err op."""
+    return block.isTerminal() and len(block.ops) != 0 and block.ops[-1].op == Op.err
+
+
+def _estimateWeights(
+    order: List[TealBlock], successors: Dict[int, List[TealBlock]]
+) -> Dict[int, float]:
+    """Estimate the probability of each block, given the result of _forwardEdges."""
+    start = order[0]
+
+    # whether every path from each block fails, computed from the last block to the first
+    fails: Dict[int, bool] = dict()
+    for block in reversed(order):
+        blockSuccessors = successors[id(block)]
+        if len(blockSuccessors) == 0:
+            fails[id(block)] = _alwaysFails(block)
+        else:
+            fails[id(block)] = all(fails[id(s)] for s in blockSuccessors)
+
+    weights: Dict[int, float] = {id(block): 0.0 for block in order}
+    weights[id(start)] = 1.0
+    for block in order:
+        blockSuccessors = successors[id(block)]
+        if len(blockSuccessors) == 0:
+            continue
+        likely = [s for s in blockSuccessors if not fails[id(s)]]
+        if len(likely) == 0:
+            likely = blockSuccessors
+        for successor in likely:
+            weights[id(successor)] += weights[id(block)] / len(likely)
+
+    return weights
+
+
+def estimateBlockWeights(start: TealBlock) -> Dict[int, float]:
+    """Estimate the probability that each block of a graph is executed.
+
+    The estimate assumes that both sides of a conditional branch are equally likely, except that a
+    side from which every path fails the program with :code:`err`, such as the failure of an
+    :any:`Assert`, is never taken if the other side is not. The back edges of loops are ignored.
 
     Args:
-        start: The starting point of the graph to sort.
+        start: The starting point of the graph.
 
     Returns:
-        An ordered list of TealBlocks that is sorted such that every block is guaranteed to appear
-        in the list before all of its outgoing blocks.
+        The estimated probability of each block of the graph, keyed by the id of the block.
     """
-    S = [start]
-    order = []
-    visited = set()  # I changed visited to a set to be more efficient
-    while len(S) != 0:
-        n = S.pop()
+    return _estimateWeights(*_forwardEdges(start))
 
-        if id(n) in visited:
-            continue
 
-        S += n.getOutgoing()
+def sortBlocks(
+    start: TealBlock, end: TealBlock, weights: Optional[Dict[int, float]] = None
+) -> List[TealBlock]:
+    """Order the blocks of the graph which starts with the input TealBlock so that as many blocks as
+    possible are followed by one of their successors, which saves a branch op.
 
-        order.append(n)
-        visited.add(id(n))
+    Blocks are placed in a topological order of the graph without the back edges of loops, so every
+    branch jumps forward except those which continue a loop, as required before TEAL version 4.
+    After a block is placed, the next block is its most likely successor if all of that
+    successor's other predecessors have been placed, so that execution falls through to it.
+    Otherwise, the most likely block whose predecessors have all been placed is next.
 
-    endIndex = -1
-    for i, block in enumerate(order):
-        if block is end:
-            endIndex = i
-            break
+    Args:
+        start: The starting point of the graph to sort.
+        end: The end of the graph, which is placed last.
+        weights (optional): The probability or frequency with which each block is executed, keyed
+            by the id of the block, for instance from a profile of the program. More likely blocks
+            are placed first. Defaults to the estimate of :any:`estimateBlockWeights`.
 
-    if endIndex == -1:
+    Returns:
+        An ordered list of TealBlocks that is sorted such that every block appears in the list
+        before all of its outgoing blocks, other than the blocks at the start of a loop it
+        continues, and such that end is the last block.
+    """
+    order, successors = _forwardEdges(start)
+    if not any(block is end for block in order):
         raise TealInternalError("End block not present")
 
-    order.pop(endIndex)
-    order.append(end)
+    if weights is None:
+        weights = _estimateWeights(order, successors)
+    blockWeights = cast(Dict[int, float], weights)
+
+    remaining: Dict[int, int] = {id(block): 0 for block in order}
+    for block in order:
+        for successor in successors[id(block)]:
+            remaining[id(successor)] += 1
+
+    # the blocks whose predecessors have all been placed, with the most likely first, and the most
+    # recently added first among equally likely blocks
+    ready: List[Tuple[float, int, TealBlock]] = []
+    readyCount = 0
+    placed = set()
+    sortedBlocks: List[TealBlock] = []
+
+    def isReady(block: TealBlock) -> bool:
+        return remaining[id(block)] == 0 and id(block) not in placed
+
+    current: Optional[TealBlock] = start
+    while current is not None:
+        sortedBlocks.append(current)
+        placed.add(id(current))
+        for successor in successors[id(current)]:
+            remaining[id(successor)] -= 1
+            if remaining[id(successor)] == 0:
+                readyCount += 1
+                heapq.heappush(
+                    ready,
+                    (-blockWeights.get(id(successor), 0.0), -readyCount, successor),
+                )
+
+        # the successors which execution can fall through to, in order of preference
+        candidates: List[TealBlock] = []
+        if type(current) is TealSimpleBlock:
+            candidates = current.getOutgoing()
+        elif type(current) is TealConditionalBlock:
+            conditional = cast(TealConditionalBlock, current)
+            trueBlock = cast(TealBlock, conditional.trueBlock)
+            falseBlock = cast(TealBlock, conditional.falseBlock)
+            if blockWeights.get(id(trueBlock), 0.0) > blockWeights.get(
+                id(falseBlock), 0.0
+            ):
+                candidates = [trueBlock, falseBlock]
+            else:
+                candidates = [falseBlock, trueBlock]
+
+        lastBlock = len(sortedBlocks) == len(order) - 1
+        current = next(
+            (
+                candidate
+                for candidate in candidates
+                if isReady(candidate) and (candidate is not end or lastBlock)
+            ),
+            None,
+        )
+        if current is not None:
+            continue
+
+        deferred = []
+        while len(ready) != 0:
+            entry = heapq.heappop(ready)
+            candidate = entry[2]
+            if id(candidate) in placed:
+                continue
+            if candidate is end and not lastBlock:
+                deferred.append(entry)
+                continue
+            current = candidate
+            break
+        if current is None and len(deferred) != 0:
+            # the remaining blocks can only be reached from end
+            current = deferred.pop()[2]
+        for entry in deferred:
+            heapq.heappush(ready, entry)
+
+    if sortedBlocks[-1] is not end:
+        sortedBlocks.remove(end)
+        sortedBlocks.append(end)
 
-    return order
+    return sortedBlocks
@@ -1,6 +1,8 @@
+import pytest
+
 import pyteal as pt
 
-from pyteal.compiler.sort import sortBlocks
+from pyteal.compiler.sort import estimateBlockWeights, sortBlocks
 
 
 def test_sort_single():
@@ -92,3 +94,99 @@ def test_sort_branch_converge():
     actual = sortBlocks(block, blockEnd)
 
     assert actual == expected
+
+
+def test_sort_join_after_predecessors():
+    blockEnd = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    blockJoin = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"join"')])
+    blockJoin.setNextBlock(blockEnd)
+    blockTrueTrue = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"true true"')])
+    blockTrueTrue.setNextBlock(blockJoin)
+    blockTrue = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.int, 2)])
+    blockTrue.setTrueBlock(blockTrueTrue)
+    blockTrue.setFalseBlock(blockJoin)
+    blockFalse = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"false"')])
+    blockFalse.setNextBlock(blockJoin)
+    block = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.int, 1)])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+    block.addIncoming()
+    block.validateTree()
+
+    # the join is placed after all of its predecessors, so no branch jumps backward
+    expected = [block, blockFalse, blockTrue, blockTrueTrue, blockJoin, blockEnd]
+    actual = sortBlocks(block, blockEnd)
+
+    assert actual == expected
+
+
+def test_sort_cold_branch():
+    blockEnd = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    blockFail = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.err)])
+    blockNext = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, 2)])
+    blockNext.setNextBlock(blockEnd)
+    block = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.int, 1)])
+    block.setTrueBlock(blockNext)
+    block.setFalseBlock(blockFail)
+    block.addIncoming()
+    block.validateTree()
+
+    weights = estimateBlockWeights(block)
+    assert weights == {
+        id(block): 1.0,
+        id(blockNext): 1.0,
+        id(blockEnd): 1.0,
+        id(blockFail): 0.0,
+    }
+
+    # execution falls through to the branch which does not fail the program
+    expected = [block, blockNext, blockFail, blockEnd]
+    actual = sortBlocks(block, blockEnd)
+
+    assert actual == expected
+
+
+def test_sort_weights():
+    blockEnd = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    blockTrue = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"true"')])
+    blockTrue.setNextBlock(blockEnd)
+    blockFalse = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"false"')])
+    blockFalse.setNextBlock(blockEnd)
+    block = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.int, 1)])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+    block.addIncoming()
+    block.validateTree()
+
+    weights = {id(block): 10, id(blockTrue): 9, id(blockFalse): 1, id(blockEnd): 10}
+    expected = [block, blockTrue, blockFalse, blockEnd]
+    actual = sortBlocks(block, blockEnd, weights)
+
+    assert actual == expected
+
+
+def test_sort_loop():
+    blockEnd = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    blockBody = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"body"')])
+    blockLoop = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.int, 1)])
+    blockLoop.setTrueBlock(blockBody)
+    blockLoop.setFalseBlock(blockEnd)
+    blockBody.setNextBlock(blockLoop)
+    block = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, 0)])
+    block.setNextBlock(blockLoop)
+    block.addIncoming()
+    block.validateTree()
+
+    # only the branch which continues the loop jumps backward
+    expected = [block, blockLoop, blockBody, blockEnd]
+    actual = sortBlocks(block, blockEnd)
+
+    assert actual == expected
+
+
+def test_sort_end_not_present():
+    block = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    other = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.err)])
+
+    with pytest.raises(pt.TealInternalError):
+        sortBlocks(block, other)
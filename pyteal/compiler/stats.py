@@ -0,0 +1,294 @@
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from pyteal.ir import TealBlock, TealComponent, TealLabel
+
+# the subroutine name used for passes which run on the main program
+MAIN_PROGRAM = "<main>"
+
+# a function which computes the number of blocks and ops in the IR after a pass has run
+IRSize = Callable[[], Tuple[Optional[int], int]]
+
+# a function which computes the number of changes a pass has made, such as expressions folded
+ChangeCount = Callable[[], int]
+
+# the signature of CompileStats.measure and skipMeasure
+MeasurePass = Callable[..., ContextManager[None]]
+
+
+def graphSize(start: TealBlock) -> Tuple[int, int]:
+    """Get the number of blocks and ops in the graph of blocks starting with start."""
+    blocks = 0
+    ops = 0
+    for block in TealBlock.Iterate(start):
+        blocks += 1
+        ops += len(block.ops)
+    return blocks, ops
+
+
+def flatSize(teal: List[TealComponent]) -> Tuple[int, int]:
+    """Get the number of labelled blocks and ops in a flattened program."""
+    labels = sum(1 for stmt in teal if isinstance(stmt, TealLabel))
+    return labels, len(teal) - labels
+
+
+class PassStats:
+    """Measurements of a single run of a compiler pass."""
+
+    def __init__(self, name: str, subroutine: Optional[str]) -> None:
+        # the name of the pass
+        self.name = name
+        # the name of the subroutine the pass ran on, MAIN_PROGRAM if it ran on the main program, or
+        # None if it ran on the whole program
+        self.subroutine = subroutine
+        # wall time of the pass, in seconds
+        self.time = 0.0
+        # net number of memory blocks allocated by the interpreter during the pass
+        self.allocated_blocks = 0
+        # peak number of bytes allocated during the pass, or None if allocations were not traced
+        self.allocated_bytes: Optional[int] = None
+        # number of blocks in the IR after the pass, or None if the pass does not produce blocks
+        self.blocks: Optional[int] = None
+        # number of ops in the IR after the pass, or None if the pass does not produce IR
+        self.ops: Optional[int] = None
+        # number of changes the pass made, or None if the pass does not count them
+        self.changes: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return (
+            "PassStats({!r}, {!r}, time={:.6f}, blocks={}, ops={}, changes={})".format(
+                self.name,
+                self.subroutine,
+                self.time,
+                self.blocks,
+                self.ops,
+                self.changes,
+            )
+        )
+
+
+PassStats.__module__ = "pyteal"
+
+
+class CompileStats:
+    """Measurements of the passes run by :any:`compileTeal`.
+
+    Pass an instance to the :code:`stats` argument of :any:`compileTeal` to record how long each
+    pass takes, how much memory it allocates, and the size of the IR it produces, for the program
+    and for each subroutine. Use :any:`collectCompileStats` to receive the stats of every program
+    compiled in a block of code.
+    """
+
+    def __init__(self, *, trace_allocations: bool = False) -> None:
+        """Create a new CompileStats.
+
+        Args:
+            trace_allocations (optional): If true, use tracemalloc to measure the peak number of
+                bytes allocated by each pass. This slows down compilation considerably. Defaults to
+                false, in which case only the net number of allocated memory blocks is measured.
+        """
+        self.trace_allocations = trace_allocations
+        self.passes: List[PassStats] = []
+        # wall time of the whole compilation, in seconds
+        self.total_time = 0.0
+        # True if the program was served from a CompileCache, False if a cache was used but the
+        # program was compiled, and None if no cache was used
+        self.cache_hit: Optional[bool] = None
+        # True if parallel compilation was requested but the program was lowered in the current
+        # process, False if it was lowered by worker processes, and None if it was not requested
+        self.parallel_fallback: Optional[bool] = None
+
+    @contextmanager
+    def measure(
+        self,
+        name: str,
+        subroutine: Optional[str] = None,
+        size: IRSize = None,
+        changes: ChangeCount = None,
+    ) -> Iterator[None]:
+        """Measure a pass which runs in the body of a with statement.
+
+        Args:
+            name: The name of the pass.
+            subroutine (optional): The name of the subroutine the pass runs on, or MAIN_PROGRAM. Omit
+                this for passes which run on the whole program.
+            size (optional): A function which returns the number of blocks and ops in the IR. It
+                is called after the pass has finished.
+            changes (optional): A function which returns the number of changes the pass made. It
+                is called after the pass has finished.
+        """
+        stats = PassStats(name, subroutine)
+        tracing = self.trace_allocations and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            startBytes = tracemalloc.get_traced_memory()[0]
+        startBlocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+
+        yield
+
+        stats.time = time.perf_counter() - start
+        stats.allocated_blocks = sys.getallocatedblocks() - startBlocks
+        if tracing:
+            stats.allocated_bytes = tracemalloc.get_traced_memory()[1] - startBytes
+        if size is not None:
+            stats.blocks, stats.ops = size()
+        if changes is not None:
+            stats.changes = changes()
+        self.passes.append(stats)
+
+    @contextmanager
+    def compiling(self) -> Iterator[None]:
+        """Measure the total time of a compilation which runs in the body of a with statement.
+
+        If allocations are traced and tracemalloc is not already running, it is started for the
+        duration of the compilation.
+        """
+        startTracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if startTracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.total_time = time.perf_counter() - start
+            if startTracing:
+                tracemalloc.stop()
+
+    def passTotals(self) -> Dict[str, PassStats]:
+        """Get the measurements of each pass summed over every subroutine it ran on.
+
+        IR sizes are summed as well, so they describe the whole program after the pass.
+        """
+        totals: Dict[str, PassStats] = dict()
+        for stats in self.passes:
+            total = totals.get(stats.name)
+            if total is None:
+                total = PassStats(stats.name, None)
+                totals[stats.name] = total
+            total.time += stats.time
+            total.allocated_blocks += stats.allocated_blocks
+            if stats.allocated_bytes is not None:
+                total.allocated_bytes = (
+                    total.allocated_bytes or 0
+                ) + stats.allocated_bytes
+            if stats.blocks is not None:
+                total.blocks = (total.blocks or 0) + stats.blocks
+            if stats.ops is not None:
+                total.ops = (total.ops or 0) + stats.ops
+            if stats.changes is not None:
+                total.changes = (total.changes or 0) + stats.changes
+        return totals
+
+    def subroutineTimes(self) -> Dict[str, float]:
+        """Get the time spent in passes which ran on each subroutine, keyed by subroutine name.
+
+        The main program is reported under the key MAIN_PROGRAM. Subroutines with the same name are
+        reported together.
+        """
+        times: Dict[str, float] = dict()
+        for stats in self.passes:
+            if stats.subroutine is None:
+                continue
+            times[stats.subroutine] = times.get(stats.subroutine, 0.0) + stats.time
+        return times
+
+    def report(self) -> str:
+        """Format the totals of each pass as a table."""
+
+        def optional(value: Optional[int]) -> str:
+            return "-" if value is None else str(value)
+
+        lines = [
+            "{:<32} {:>12} {:>12} {:>12} {:>10} {:>10} {:>10}".format(
+                "pass",
+                "time (ms)",
+                "alloc blocks",
+                "alloc bytes",
+                "blocks",
+                "ops",
+                "changes",
+            )
+        ]
+        for stats in self.passTotals().values():
+            lines.append(
+                "{:<32} {:>12.3f} {:>12} {:>12} {:>10} {:>10} {:>10}".format(
+                    stats.name,
+                    stats.time * 1e3,
+                    stats.allocated_blocks,
+                    optional(stats.allocated_bytes),
+                    optional(stats.blocks),
+                    optional(stats.ops),
+                    optional(stats.changes),
+                )
+            )
+        lines.append("{:<32} {:>12.3f}".format("total", self.total_time * 1e3))
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return (
+            "CompileStats(passes={}, total_time={:.6f}, cache_hit={}, "
+            "parallel_fallback={})".format(
+                len(self.passes),
+                self.total_time,
+                self.cache_hit,
+                self.parallel_fallback,
+            )
+        )
+
+
+CompileStats.__module__ = "pyteal"
+
+
+@contextmanager
+def skipMeasure(
+    name: str,
+    subroutine: Optional[str] = None,
+    size: IRSize = None,
+    changes: ChangeCount = None,
+) -> Iterator[None]:
+    """A replacement for CompileStats.measure which does not measure anything."""
+    yield
+
+
+# callbacks registered by collectCompileStats, along with whether they requested allocation tracing
+_statsCallbacks: List[Tuple[Callable[[CompileStats], None], bool]] = []
+
+
+def getStatsCallbacks() -> List[Tuple[Callable[[CompileStats], None], bool]]:
+    return list(_statsCallbacks)
+
+
+@contextmanager
+def collectCompileStats(
+    callback: Callable[[CompileStats], None], *, trace_allocations: bool = False
+) -> Iterator[None]:
+    """Receive the CompileStats of every program compiled within a with statement.
+
+    This can be used to send compiler metrics to a monitoring system during a build, without
+    changing the code that calls :any:`compileTeal`.
+
+    Example:
+        .. code-block:: python
+
+            def report(stats: CompileStats) -> None:
+                metrics.timing("pyteal.compile", stats.total_time)
+
+            with collectCompileStats(report):
+                build_contracts()
+
+    Args:
+        callback: A function which is called with the CompileStats of each compiled program, after
+            the program has been compiled.
+        trace_allocations (optional): Whether to measure the bytes allocated by each pass. See
+            :any:`CompileStats`. Defaults to false.
+    """
+    entry = (callback, trace_allocations)
+    _statsCallbacks.append(entry)
+    try:
+        yield
+    finally:
+        _statsCallbacks.remove(entry)
@@ -0,0 +1,169 @@
+import pyteal as pt
+
+from pyteal.compiler.stats import MAIN_PROGRAM
+
+
+def build_program() -> pt.Expr:
+    @pt.Subroutine(pt.TealType.uint64)
+    def add_one(x):
+        return x + pt.Int(1)
+
+    counter = pt.ScratchVar(pt.TealType.uint64)
+    return pt.Seq(
+        counter.store(add_one(pt.Int(1))),
+        pt.If(
+            counter.load() > pt.Int(1),
+            counter.store(pt.Int(0)),
+            counter.store(pt.Int(2)),
+        ),
+        pt.Return(counter.load()),
+    )
+
+
+def test_stats_passes():
+    stats = pt.CompileStats()
+    actual = pt.compileTeal(
+        build_program(),
+        mode=pt.Mode.Application,
+        version=6,
+        assembleConstants=True,
+        stats=stats,
+    )
+    expected = pt.compileTeal(
+        build_program(), mode=pt.Mode.Application, version=6, assembleConstants=True
+    )
+    assert actual == expected
+
+    names = [(p.name, p.subroutine) for p in stats.passes]
+    for name in (
+        "lower",
+        "validateTree",
+        "NormalizeBlocks",
+        "sortBlocks",
+        "flattenBlocks",
+        "verifyOps",
+        "sortSubroutineBlocks",
+    ):
+        assert (name, MAIN_PROGRAM) in names
+        assert (name, "add_one") in names
+    for name in (
+        "assignScratchSlots",
+        "spillLocalSlotsDuringRecursion",
+        "resolveSubroutines",
+        "flattenSubroutines",
+        "createConstantBlocks",
+        "assemble",
+    ):
+        assert (name, None) in names
+    assert ("cacheLookup", None) not in names
+    assert stats.cache_hit is None
+    assert stats.parallel_fallback is None
+
+    assert all(p.time >= 0 for p in stats.passes)
+    assert all(p.allocated_bytes is None for p in stats.passes)
+    assert stats.total_time >= sum(p.time for p in stats.passes)
+
+    totals = stats.passTotals()
+    flattened = totals["flattenSubroutines"]
+    lines = [
+        line
+        for line in actual.split("\n")[1:]
+        if len(line) != 0 and not line.startswith("//")
+    ]
+    labels = [line for line in lines if line.endswith(":")]
+    assert flattened.blocks == len(labels)
+    assert totals["createConstantBlocks"].ops == len(lines) - len(labels)
+    # createConstantBlocks adds the intcblock op
+    assert flattened.ops == totals["createConstantBlocks"].ops - 1
+
+    normalized = [p for p in stats.passes if p.name == "NormalizeBlocks"]
+    assert all(p.blocks is not None and p.blocks > 0 for p in normalized)
+    assert totals["NormalizeBlocks"].blocks == sum(p.blocks for p in normalized)
+
+    times = stats.subroutineTimes()
+    assert set(times.keys()) == {MAIN_PROGRAM, "add_one"}
+
+    report = stats.report()
+    assert "NormalizeBlocks" in report
+    assert report.split("\n")[-1].startswith("total")
+
+
+def test_stats_optimize():
+    stats = pt.CompileStats()
+    pt.compileTeal(
+        build_program(),
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(scratch_slots=True),
+        stats=stats,
+    )
+
+    names = [(p.name, p.subroutine) for p in stats.passes]
+    assert ("collectUnoptimizedSlots", None) in names
+    assert ("optimizeScratchSlots", MAIN_PROGRAM) in names
+    assert ("optimizeScratchSlots", "add_one") in names
+
+
+def test_stats_cache():
+    cache = pt.CompileCache()
+
+    first = pt.CompileStats()
+    pt.compileTeal(
+        build_program(), mode=pt.Mode.Application, version=6, cache=cache, stats=first
+    )
+    assert first.cache_hit is False
+    assert first.passes[0].name == "cacheLookup"
+
+    second = pt.CompileStats()
+    pt.compileTeal(
+        build_program(), mode=pt.Mode.Application, version=6, cache=cache, stats=second
+    )
+    assert second.cache_hit is True
+    assert [p.name for p in second.passes] == ["cacheLookup"]
+
+
+def test_stats_trace_allocations():
+    stats = pt.CompileStats(trace_allocations=True)
+    pt.compileTeal(build_program(), mode=pt.Mode.Application, version=6, stats=stats)
+
+    assert all(p.allocated_bytes is not None for p in stats.passes)
+    lowered = [p for p in stats.passes if p.name == "lower"]
+    assert all(p.allocated_bytes > 0 for p in lowered)
+
+
+def test_collect_compile_stats():
+    collected = []
+    with pt.collectCompileStats(collected.append):
+        pt.compileTeal(build_program(), mode=pt.Mode.Application, version=6)
+        pt.compileTeal(build_program(), mode=pt.Mode.Signature, version=6)
+    pt.compileTeal(build_program(), mode=pt.Mode.Application, version=6)
+
+    assert len(collected) == 2
+    assert all(isinstance(stats, pt.CompileStats) for stats in collected)
+    assert all(len(stats.passes) > 0 for stats in collected)
+
+    nested = []
+    explicit = pt.CompileStats()
+    with pt.collectCompileStats(collected.append):
+        with pt.collectCompileStats(nested.append, trace_allocations=True):
+            pt.compileTeal(
+                build_program(), mode=pt.Mode.Application, version=6, stats=explicit
+            )
+
+    assert collected[-1] is explicit
+    assert nested == [explicit]
+
+
+def test_collect_compile_stats_error():
+    collected = []
+    with pt.collectCompileStats(collected.append):
+        try:
+            pt.compileTeal(
+                pt.Seq(pt.Log(pt.Bytes("log")), pt.Approve()),
+                mode=pt.Mode.Application,
+                version=4,
+            )
+        except pt.TealInputError:
+            pass
+
+    assert collected == []
@@ -1,6 +1,6 @@
 import re
-from typing import List, Dict, Set, Optional, TypeVar
-from collections import OrderedDict
+from typing import Iterator, List, Dict, Set, Optional, Tuple, TypeVar
+from collections import OrderedDict, deque
 
 from pyteal.errors import TealInputError
 from pyteal.types import TealType
@@ -11,52 +11,99 @@ from pyteal.ir import TealComponent, TealOp, Op
 Node = TypeVar("Node")
 
 
-def graph_search(graph: Dict[Node, Set[Node]], start: Node, end: Node) -> bool:
-    """Check whether a path between start and end exists in the graph.
+def strongly_connected_components(graph: Dict[Node, Set[Node]]) -> Dict[Node, int]:
+    """Find the strongly connected components of a graph, using Tarjan's algorithm.
 
-    This works even if start == end, in which case True is only returned if the
-    node belongs to a cycle.
-    """
-    visited: Set[Node] = set()
-    stack: List[Node] = list(graph[start])
+    Two nodes are in the same component if each one can be reached from the other. This runs in
+    time linear in the number of nodes and edges, and without recursion, so it works for graphs of
+    any depth.
+
+    Args:
+        graph: A graph. Each key is a node, and each value is the set of nodes it has edges to. Nodes
+            which only appear in a value are treated as having no edges.
 
-    while len(stack) != 0:
-        current = stack.pop()
-        if current in visited:
+    Returns:
+        A dictionary whose keys are all the nodes of the graph, and whose values are the indices of
+        their components. Components are numbered in reverse topological order, i.e. a component
+        only has edges to components with lower indices.
+    """
+    index: Dict[Node, int] = dict()
+    lowlink: Dict[Node, int] = dict()
+    components: Dict[Node, int] = dict()
+    # the nodes whose component has not been found yet, in the order they were visited
+    stack: List[Node] = []
+    onStack: Set[Node] = set()
+    componentCount = 0
+
+    def visit(node: Node) -> Iterator[Node]:
+        index[node] = lowlink[node] = len(index)
+        stack.append(node)
+        onStack.add(node)
+        return iter(graph.get(node, ()))
+
+    for root in graph:
+        if root in index:
             continue
-        visited.add(current)
-        if end == current:
-            return True
-        stack += list(graph[current])
 
-    return False
+        work: List[Tuple[Node, Iterator[Node]]] = [(root, visit(root))]
+        while len(work) != 0:
+            node, edges = work[-1]
+            for successor in edges:
+                if successor not in index:
+                    work.append((successor, visit(successor)))
+                    break
+                if successor in onStack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if len(work) != 0:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    # node is the first visited node of its component, which is on the stack above it
+                    while True:
+                        member = stack.pop()
+                        onStack.remove(member)
+                        components[member] = componentCount
+                        if member == node:
+                            break
+                    componentCount += 1
+
+    return components
 
 
 def findRecursionPoints(
-    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]]
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
+    components: Dict[SubroutineDefinition, int] = None,
 ) -> Dict[SubroutineDefinition, Set[SubroutineDefinition]]:
     """Find all subroutine calls which may result in the current subroutine being called again
     recursively.
 
+    A callee may reenter its caller exactly when both are in the same strongly connected component
+    of the graph, so this takes time linear in the size of the graph.
+
     Args:
         subroutineGraph: A graph of subroutines. Each key is a subroutine (the main routine should
             be present), which represents a node in the graph. Each value is a set of all
             subroutines that specific subroutine calls, which represent directional edges in the
             graph.
+        components (optional): The strongly connected components of subroutineGraph, as returned
+            by strongly_connected_components. If not present, they will be computed.
 
     Returns:
         A dictionary whose keys are the same as subroutineGraph, and whose values are a subset of
         the key's values from subroutineGraph. Each element in this subset represents a subroutine
         which may reenter the calling subroutine.
     """
+    if components is None:
+        components = strongly_connected_components(subroutineGraph)
+
     reentryPoints: Dict[SubroutineDefinition, Set[SubroutineDefinition]] = dict()
 
-    for subroutine in subroutineGraph.keys():
-        # perform a depth first search to see which callers (if any) have a path to invoke the calling subroutine again
+    for subroutine, callees in subroutineGraph.items():
         reentryPoints[subroutine] = set(
-            callee
-            for callee in subroutineGraph[subroutine]
-            if graph_search(subroutineGraph, callee, subroutine)
+            callee for callee in callees if components[callee] == components[subroutine]
         )
 
     return reentryPoints
@@ -65,27 +112,43 @@ def findRecursionPoints(
 def find_recursive_path(
     subroutine_graph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
     subroutine: SubroutineDefinition,
+    components: Dict[SubroutineDefinition, int] = None,
 ) -> List[SubroutineDefinition]:
-    visited = set()
-    loop = []
+    """Find a shortest path of calls from a subroutine back to itself.
 
-    def dfs(x):
-        if x in visited:
-            return False
+    The search only visits the subroutines in the same strongly connected component as subroutine,
+    since no other subroutine can be on such a path.
 
-        visited.add(x)
-        loop.append(x)
-        for y in subroutine_graph[x]:
-            if y == subroutine:
-                loop.append(y)
-                return True
-            if dfs(y):
-                return True
-        loop.pop()
-        return False
+    Args:
+        subroutine_graph: A graph of subroutines, as in findRecursionPoints.
+        subroutine: The subroutine which starts and ends the path.
+        components (optional): The strongly connected components of subroutine_graph, as returned
+            by strongly_connected_components. If not present, they will be computed.
 
-    found = dfs(subroutine)
-    return loop if found else []
+    Returns:
+        The subroutines on the path, starting and ending with subroutine, or an empty list if
+        subroutine is not recursive.
+    """
+    if components is None:
+        components = strongly_connected_components(subroutine_graph)
+    component = components[subroutine]
+
+    # the subroutine each visited subroutine was first called from
+    callers: Dict[SubroutineDefinition, SubroutineDefinition] = dict()
+    queue = deque([subroutine])
+    while len(queue) != 0:
+        current = queue.popleft()
+        for callee in subroutine_graph.get(current, ()):
+            if callee == subroutine:
+                path = [subroutine, current]
+                while path[-1] != subroutine:
+                    path.append(callers[path[-1]])
+                return path[::-1]
+            if components[callee] == component and callee not in callers:
+                callers[callee] = current
+                queue.append(callee)
+
+    return []
 
 
 def spillLocalSlotsDuringRecursion(
@@ -93,6 +156,7 @@ def spillLocalSlotsDuringRecursion(
     subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]],
     subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
     localSlots: Dict[Optional[SubroutineDefinition], Set[int]],
+    liveSlots: Dict[int, Set[int]] = None,
 ) -> None:
     """In order to prevent recursion from modifying the local scratch slots a subroutine uses,
     subroutines must "spill" their local slots to the stack before calling any other subroutine
@@ -113,8 +177,15 @@ def spillLocalSlotsDuringRecursion(
             graph.
         localSlots: The output from the function `assignScratchSlotsToSubroutines`, which indicates
             the local slots which must be spilled for each subroutine.
+        liveSlots (optional): The local slots which are live after each callsub op, keyed by the id
+            of the op, as computed by `assignScratchSlotsToSubroutines`. If present, only these
+            slots are spilled around a call, since the values of the other slots are not needed
+            once it returns. Otherwise, or if a call is not present, all local slots are spilled.
     """
-    recursivePoints = findRecursionPoints(subroutineGraph)
+    # the components are computed once, and used both to find the calls which may reenter a
+    # subroutine and the path reported for a recursive subroutine with ScratchVar arguments
+    components = strongly_connected_components(subroutineGraph)
+    recursivePoints = findRecursionPoints(subroutineGraph, components)
 
     recursive_byref = None
     for k, v in recursivePoints.items():
@@ -128,7 +199,9 @@ def spillLocalSlotsDuringRecursion(
             msg.format(
                 "()-->".join(
                     f.name()
-                    for f in find_recursive_path(subroutineGraph, recursive_byref)
+                    for f in find_recursive_path(
+                        subroutineGraph, recursive_byref, components
+                    )
                 )
             )
         )
@@ -136,9 +209,9 @@ def spillLocalSlotsDuringRecursion(
     coverAvailable = version >= Op.cover.min_version
 
     for subroutine, reentryPoints in recursivePoints.items():
-        slots = list(sorted(slot for slot in localSlots[subroutine]))
+        subroutineSlots = list(sorted(slot for slot in localSlots[subroutine]))
 
-        if len(reentryPoints) == 0 or len(slots) == 0:
+        if len(reentryPoints) == 0 or len(subroutineSlots) == 0:
             # no need to spill slots
             continue
 
@@ -157,7 +230,15 @@ def spillLocalSlotsDuringRecursion(
             ), "Multiple subroutines are called from the same TealComponent"
 
             reentrySubroutineCalls = list(reentryPoints.intersection(calledSubroutines))
-            if len(reentrySubroutineCalls) != 0:
+
+            slots = subroutineSlots
+            if len(reentrySubroutineCalls) != 0 and liveSlots is not None:
+                # only the slots whose values are needed after the call returns must be spilled
+                live = liveSlots.get(id(stmt))
+                if live is not None:
+                    slots = [slot for slot in subroutineSlots if slot in live]
+
+            if len(reentrySubroutineCalls) != 0 and len(slots) != 0:
                 # A subroutine is being called which may reenter the current subroutine, so insert
                 # ops to spill local slots to the stack before calling the subroutine and also to
                 # restore the local slots after returning from the subroutine. This prevents a
@@ -285,9 +366,12 @@ def resolveSubroutines(
         safer_name = re.sub(r"[^A-Za-z0-9]", "", subroutine.name())
         subroutineToLabel[subroutine] = "{}_{}".format(safer_name, index)
 
-    for subroutine, label in subroutineToLabel.items():
-        for ops in subroutineMapping.values():
-            for stmt in ops:
-                stmt.resolveSubroutine(subroutine, label)
+    # resolve every reference in a single pass over the program, rather than one pass per subroutine
+    for ops in subroutineMapping.values():
+        for stmt in ops:
+            for subroutine in stmt.getSubroutines():
+                label = subroutineToLabel.get(subroutine)
+                if label is not None:
+                    stmt.resolveSubroutine(subroutine, label)
 
     return subroutineToLabel
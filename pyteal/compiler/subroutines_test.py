@@ -5,7 +5,9 @@ import pytest
 import pyteal as pt
 
 from pyteal.compiler.subroutines import (
+    find_recursive_path,
     findRecursionPoints,
+    strongly_connected_components,
     spillLocalSlotsDuringRecursion,
     resolveSubroutines,
 )
@@ -139,6 +141,65 @@ def test_findRecursionPoints_direct_and_mutual_recursion():
     assert actual == expected
 
 
+def test_findRecursionPoints_large_graph():
+    def subImpl(a1):
+        return None
+
+    # a long chain of calls, whose last subroutine calls the middle one, which is too deep to search
+    # recursively
+    count = 5000
+    subroutines = [
+        pt.SubroutineDefinition(subImpl, pt.TealType.uint64) for _ in range(count)
+    ]
+    graph = {
+        subroutine: {subroutines[i + 1]} if i + 1 < count else {subroutines[count // 2]}
+        for i, subroutine in enumerate(subroutines)
+    }
+
+    actual = findRecursionPoints(graph)
+    for i, subroutine in enumerate(subroutines):
+        assert actual[subroutine] == (graph[subroutine] if i >= count // 2 else set())
+
+    path = find_recursive_path(graph, subroutines[-1])
+    assert path == [subroutines[-1]] + subroutines[count // 2 :]
+    assert find_recursive_path(graph, subroutines[0]) == []
+
+
+def test_strongly_connected_components():
+    graph = {
+        "a": {"b"},
+        "b": {"c", "e"},
+        "c": {"a", "d"},
+        "d": {"d"},
+        "e": {"f"},
+        "f": set(),
+    }
+
+    components = strongly_connected_components(graph)
+    assert components["a"] == components["b"] == components["c"]
+    assert len(set(components.values())) == 4
+    # a component only has edges to components with lower indices
+    for node, successors in graph.items():
+        for successor in successors:
+            assert components[successor] <= components[node]
+
+
+def test_find_recursive_path():
+    graph = {
+        "a": {"b", "d"},
+        "b": {"c"},
+        "c": {"a"},
+        "d": {"a"},
+        "e": {"e", "a"},
+        "f": {"a"},
+    }
+
+    assert find_recursive_path(graph, "a") == ["a", "d", "a"]
+    assert find_recursive_path(graph, "b") == ["b", "c", "a", "b"]
+    assert find_recursive_path(graph, "e") == ["e", "e"]
+    assert find_recursive_path(graph, "f") == []
+
+
 def test_spillLocalSlotsDuringRecursion_no_subroutines():
     for version in (4, 5):
         l1Label = pt.LabelReference("l1")
@@ -1279,6 +1340,119 @@ def test_spillLocalSlotsDuringRecursion_recursive_more_slots_than_args_v5():
     }
 
 
+def test_spillLocalSlotsDuringRecursion_recursive_live_slots_v5():
+    def subImpl(a1, a2, a3):
+        return None
+
+    subroutine = pt.SubroutineDefinition(subImpl, pt.TealType.uint64)
+
+    firstCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    secondCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    subroutineOps = [
+        pt.TealOp(None, pt.Op.store, 0),
+        pt.TealOp(None, pt.Op.store, 1),
+        pt.TealOp(None, pt.Op.store, 2),
+        pt.TealOp(None, pt.Op.int, 10),
+        pt.TealOp(None, pt.Op.store, 3),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.int, 3),
+        firstCall,
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.load, 1),
+        pt.TealOp(None, pt.Op.load, 3),
+        pt.TealOp(None, pt.Op.int, 3),
+        secondCall,
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+
+    mainOps = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.int, 3),
+        pt.TealOp(None, pt.Op.callsub, subroutine),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    subroutineMapping = {
+        None: mainOps,
+        subroutine: subroutineOps,
+    }
+
+    subroutineGraph = {
+        subroutine: {subroutine},
+    }
+
+    localSlots = {None: set(), subroutine: {0, 1, 2, 3}}
+
+    # only slots 1 and 3 are loaded after the first call, and no slot is loaded after the second
+    liveSlots = {id(firstCall): {1, 3}, id(secondCall): set()}
+
+    spillLocalSlotsDuringRecursion(
+        5, subroutineMapping, subroutineGraph, localSlots, liveSlots
+    )
+
+    assert subroutineMapping == {
+        None: [
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.int, 2),
+            pt.TealOp(None, pt.Op.int, 3),
+            pt.TealOp(None, pt.Op.callsub, subroutine),
+            pt.TealOp(None, pt.Op.return_),
+        ],
+        subroutine: [
+            pt.TealOp(None, pt.Op.store, 0),
+            pt.TealOp(None, pt.Op.store, 1),
+            pt.TealOp(None, pt.Op.store, 2),
+            pt.TealOp(None, pt.Op.int, 10),
+            pt.TealOp(None, pt.Op.store, 3),
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.int, 2),
+            pt.TealOp(None, pt.Op.int, 3),
+            pt.TealOp(None, pt.Op.load, 1),
+            pt.TealOp(None, pt.Op.cover, 3),
+            pt.TealOp(None, pt.Op.load, 3),
+            pt.TealOp(None, pt.Op.cover, 3),
+            pt.TealOp(None, pt.Op.callsub, subroutine),
+            pt.TealOp(None, pt.Op.cover, 2),
+            pt.TealOp(None, pt.Op.store, 3),
+            pt.TealOp(None, pt.Op.store, 1),
+            pt.TealOp(None, pt.Op.pop),
+            pt.TealOp(None, pt.Op.load, 1),
+            pt.TealOp(None, pt.Op.load, 3),
+            pt.TealOp(None, pt.Op.int, 3),
+            pt.TealOp(None, pt.Op.callsub, subroutine),
+            pt.TealOp(None, pt.Op.retsub),
+        ],
+    }
+
+
+def test_spillLocalSlotsDuringRecursion_compile_live_slots():
+    @pt.Subroutine(pt.TealType.uint64)
+    def factorial(n):
+        doubled = pt.ScratchVar(pt.TealType.uint64)
+        return pt.Seq(
+            doubled.store(n * pt.Int(2)),
+            pt.If(n <= pt.Int(1))
+            .Then(doubled.load())
+            .Else(n * factorial(n - pt.Int(1))),
+        )
+
+    program = pt.Return(factorial(pt.Int(5)))
+    unoptimized = pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+    optimized = pt.compileTeal(
+        program,
+        mode=pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(scratch_slots=True),
+    )
+
+    # both n and doubled are spilled without the optimization, but neither is loaded after the
+    # call, since n is loaded before it
+    assert "load 0\nload 1\nuncover 2\ncallsub factorial_0\ncover 2" in unoptimized
+    assert "int 1\n-\ncallsub factorial_0\n*" in optimized
+
+
 def test_spillLocalSlotsDuringRecursion_recursive_with_scratchvar():
     # modifying test_spillLocalSlotsDuringRecursion_multiple_subroutines_no_recursion()
     # to be recursive and fail due to by-ref args
@@ -0,0 +1,307 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+from algosdk import encoding
+
+from pyteal.ast import Expr, Tmpl
+from pyteal.ir import Mode, Op, TealComponent, TealOp, LabelReference
+from pyteal.errors import TealInputError
+from pyteal.compiler.compiler import (
+    DEFAULT_TEAL_VERSION,
+    CompileOptions,
+    compileComponents,
+    verifyCompileArgs,
+)
+from pyteal.compiler.optimizer import OptimizeOptions
+from pyteal.compiler.assembler import linkProgram, programAddress, tokenizeProgram
+from pyteal.compiler.parallel import canCompileInParallel
+
+# the value of a template variable: an int for Tmpl.Int, bytes for Tmpl.Bytes, and an address for
+# Tmpl.Addr
+TemplateValue = Union[int, bytes, str]
+
+
+class CompiledTemplate:
+    """A program with template variables, which has been compiled once so that instances of it with
+    different values can be made quickly.
+
+    Templates are created with :any:`compileTemplate`. The TEAL of an instance is the same as
+    replacing each template variable in the output of :any:`compileTeal` with its value, and the
+    bytecode of an instance is the same as assembling that TEAL with algod.
+    """
+
+    def __init__(self, teal: List[TealComponent], version: int) -> None:
+        self.version = version
+        # the op of the Tmpl expression that declares each template variable: Op.int, Op.byte, or
+        # Op.addr
+        self.variables: Dict[str, Op] = dict()
+
+        for component in teal:
+            if isinstance(component, TealOp) and isinstance(component.expr, Tmpl):
+                self.variables[component.expr.name] = component.expr.op
+
+        # the text of the program is split into segments between placeholders, and each placeholder
+        # is the name of a template variable and whether it is written as an address
+        self._segments: List[str] = []
+        self._placeholders: List[Tuple[str, bool]] = []
+
+        text = ["#pragma version {}".format(version)]
+        for component in teal:
+            if not isinstance(component, TealOp) or not any(
+                self._isPlaceholder(arg) for arg in component.args
+            ):
+                text.append("\n" + component.assemble())
+                continue
+
+            text.append("\n" + str(component.op))
+            for arg in component.args:
+                if self._isPlaceholder(arg):
+                    self._segments.append("".join(text) + " ")
+                    self._placeholders.append((cast(str, arg), component.op == Op.addr))
+                    text = []
+                elif isinstance(arg, LabelReference):
+                    text.append(" " + arg.getLabel())
+                else:
+                    text.append(" " + str(arg))
+        self._segments.append("".join(text))
+
+        self._tokens = tokenizeProgram(teal)
+
+    def _isPlaceholder(self, arg: object) -> bool:
+        return isinstance(arg, str) and arg in self.variables
+
+    def _checkValues(
+        self, values: Mapping[str, TemplateValue]
+    ) -> Dict[str, Union[int, bytes]]:
+        """Check the values of every template variable, and convert addresses to bytes."""
+        for name in values:
+            if name not in self.variables:
+                raise TealInputError("Unknown template variable: {}".format(name))
+
+        checked: Dict[str, Union[int, bytes]] = dict()
+        for name, op in self.variables.items():
+            if name not in values:
+                raise TealInputError(
+                    "No value for the template variable {}".format(name)
+                )
+            value = values[name]
+
+            if op == Op.int:
+                if type(value) is not int or not (0 <= value < 2**64):
+                    raise TealInputError(
+                        "Expected a uint64 for the template variable {}, got {}".format(
+                            name, repr(value)
+                        )
+                    )
+                checked[name] = value
+            elif op == Op.addr:
+                if type(value) is not str:
+                    raise TealInputError(
+                        "Expected an address for the template variable {}, got {}".format(
+                            name, repr(value)
+                        )
+                    )
+                try:
+                    checked[name] = encoding.decode_address(value)
+                except Exception:
+                    raise TealInputError(
+                        "Invalid address for the template variable {}: {}".format(
+                            name, value
+                        )
+                    )
+            else:
+                if type(value) is not bytes:
+                    raise TealInputError(
+                        "Expected bytes for the template variable {}, got {}".format(
+                            name, repr(value)
+                        )
+                    )
+                checked[name] = value
+
+        return checked
+
+    def teal(self, values: Mapping[str, TemplateValue]) -> str:
+        """Make the TEAL program of an instance of this template.
+
+        Args:
+            values: The value of each template variable, keyed by name. Tmpl.Int variables must be
+                ints, Tmpl.Bytes variables must be bytes, and Tmpl.Addr variables must be addresses.
+
+        Raises:
+            TealInputError: if a variable is missing, unknown, or has an invalid value.
+        """
+        checked = self._checkValues(values)
+
+        parts = [self._segments[0]]
+        for (name, isAddr), segment in zip(self._placeholders, self._segments[1:]):
+            value = checked[name]
+            if isAddr:
+                parts.append(cast(str, values[name]))
+            elif isinstance(value, int):
+                parts.append(str(value))
+            else:
+                parts.append("0x" + value.hex())
+            parts.append(segment)
+        return "".join(parts)
+
+    def bytecode(self, values: Mapping[str, TemplateValue]) -> bytes:
+        """Make the bytecode of an instance of this template.
+
+        Args:
+            values: The value of each template variable, keyed by name, as in :any:`teal`.
+
+        Raises:
+            TealInputError: if a variable is missing, unknown, or has an invalid value.
+        """
+        return linkProgram(self._tokens, self.version, self._checkValues(values))
+
+    def tealBatch(self, valueSets: Iterable[Mapping[str, TemplateValue]]) -> List[str]:
+        """Make the TEAL programs of many instances of this template.
+
+        Args:
+            valueSets: The values of the template variables of each instance.
+        """
+        return [self.teal(values) for values in valueSets]
+
+    def bytecodeBatch(
+        self, valueSets: Iterable[Mapping[str, TemplateValue]]
+    ) -> List[bytes]:
+        """Make the bytecode of many instances of this template.
+
+        Args:
+            valueSets: The values of the template variables of each instance.
+        """
+        return [self.bytecode(values) for values in valueSets]
+
+    def contractAccounts(
+        self,
+        valueSets: Iterable[Mapping[str, TemplateValue]],
+        *,
+        processes: int = 0,
+        chunksize: int = 256,
+    ) -> Iterator[Tuple[bytes, str]]:
+        """Derive the contract accounts of many instances of this template.
+
+        The value sets are read lazily and the results are produced in the same order, so a large
+        number of instances can be processed without holding all of them in memory.
+
+        Args:
+            valueSets: The values of the template variables of each instance.
+            processes (optional): The number of worker processes to use. If 0 (the default), or if
+                worker processes cannot be forked on this platform, every instance is made in this
+                process.
+            chunksize (optional): The number of instances sent to a worker process at a time.
+                Defaults to 256.
+
+        Returns:
+            An iterator of the bytecode and address of each instance.
+
+        Raises:
+            TealInputError: if processes or chunksize is invalid. When the iterator is consumed, it
+                raises TealInputError if an instance has a missing, unknown, or invalid value.
+        """
+        if type(processes) is not int or processes < 0:
+            raise TealInputError(
+                "Invalid number of processes: {}".format(repr(processes))
+            )
+        if type(chunksize) is not int or chunksize < 1:
+            raise TealInputError("Invalid chunksize: {}".format(repr(chunksize)))
+
+        if processes == 0 or not canCompileInParallel():
+            return self._contractAccounts(valueSets)
+        return self._contractAccountsInParallel(valueSets, processes, chunksize)
+
+    def _contractAccounts(
+        self, valueSets: Iterable[Mapping[str, TemplateValue]]
+    ) -> Iterator[Tuple[bytes, str]]:
+        for values in valueSets:
+            program = self.bytecode(values)
+            yield program, programAddress(program)
+
+    def _contractAccountsInParallel(
+        self,
+        valueSets: Iterable[Mapping[str, TemplateValue]],
+        processes: int,
+        chunksize: int,
+    ) -> Iterator[Tuple[bytes, str]]:
+        values = iter(valueSets)
+        executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_initTemplateWorker,
+            initargs=(self,),
+        )
+        # at most two chunks per process are submitted ahead of the results being consumed
+        pending: Deque[Future[List[Tuple[bytes, str]]]] = deque()
+        try:
+            while True:
+                chunk = list(islice(values, chunksize))
+                if len(chunk) != 0:
+                    pending.append(executor.submit(_contractAccountsInWorker, chunk))
+                if len(pending) == 0:
+                    break
+                if len(chunk) == 0 or len(pending) >= processes * 2:
+                    yield from pending.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+CompiledTemplate.__module__ = "pyteal"
+
+
+# the template used by a worker process, which is inherited when the worker is forked
+_workerTemplate: Optional[CompiledTemplate] = None
+
+
+def _initTemplateWorker(template: CompiledTemplate) -> None:
+    global _workerTemplate
+    _workerTemplate = template
+
+
+def _contractAccountsInWorker(
+    chunk: List[Mapping[str, TemplateValue]]
+) -> List[Tuple[bytes, str]]:
+    template = _workerTemplate
+    assert template is not None
+    return list(template._contractAccounts(chunk))
+
+
+def compileTemplate(
+    ast: Expr,
+    mode: Mode,
+    *,
+    version: int = DEFAULT_TEAL_VERSION,
+    assembleConstants: bool = False,
+    optimize: OptimizeOptions = None,
+) -> CompiledTemplate:
+    """Compile a PyTeal expression which contains template variables into a template.
+
+    Each template variable must be declared with :any:`Tmpl.Int`, :any:`Tmpl.Bytes`, or
+    :any:`Tmpl.Addr`. The arguments are the same as the ones of :any:`compileTeal`.
+
+    Returns:
+        A CompiledTemplate, from which TEAL or bytecode of instances of the program can be made.
+
+    Raises:
+        TealInputError: if an operation in ast is not supported by the supplied mode and version.
+        TealInternalError: if an internal error is encounter during compilation.
+    """
+    verifyCompileArgs(version, 0)
+
+    options = CompileOptions(mode=mode, version=version, optimize=optimize)
+    teal = compileComponents(ast, options, assembleConstants, None, 0)
+    return CompiledTemplate(teal, version)
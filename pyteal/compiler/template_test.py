@@ -0,0 +1,206 @@
+import pytest
+
+import pyteal as pt
+
+RECEIVER = "6ZHGHH5Z5CTPCF5WCESXMGRSVK7QJETR63M3NY5FJCUYDHO57VTCMJOBGY"
+ZERO_ADDRESS = "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAY5HFKQ"
+
+
+def payment(amount: pt.Expr, lease: pt.Expr, receiver: pt.Expr) -> pt.Expr:
+    return pt.And(
+        pt.Txn.amount() == amount,
+        pt.Txn.fee() < pt.Int(1000),
+        pt.Txn.lease() == lease,
+        pt.Txn.receiver() == receiver,
+        pt.If(pt.Txn.first_valid() > amount)
+        .Then(pt.Txn.close_remainder_to() == receiver)
+        .Else(pt.Txn.close_remainder_to() == pt.Global.zero_address()),
+    )
+
+
+def payment_template() -> pt.Expr:
+    return payment(
+        pt.Tmpl.Int("TMPL_AMOUNT"),
+        pt.Tmpl.Bytes("TMPL_LEASE"),
+        pt.Tmpl.Addr("TMPL_RECEIVER"),
+    )
+
+
+def payment_instance(amount: int, lease: bytes, receiver: str) -> pt.Expr:
+    return payment(pt.Int(amount), pt.Bytes("base16", lease.hex()), pt.Addr(receiver))
+
+
+VALUE_SETS = [
+    dict(TMPL_AMOUNT=0, TMPL_LEASE=b"", TMPL_RECEIVER=RECEIVER),
+    dict(TMPL_AMOUNT=1000, TMPL_LEASE=b"lease", TMPL_RECEIVER=RECEIVER),
+    dict(TMPL_AMOUNT=2**64 - 1, TMPL_LEASE=b"\x00" * 32, TMPL_RECEIVER=ZERO_ADDRESS),
+    dict(TMPL_AMOUNT=127, TMPL_LEASE=b"x" * 200, TMPL_RECEIVER=ZERO_ADDRESS),
+]
+
+
+def test_variables():
+    template = pt.compileTemplate(payment_template(), pt.Mode.Signature, version=2)
+    assert template.variables == {
+        "TMPL_AMOUNT": pt.Op.int,
+        "TMPL_LEASE": pt.Op.byte,
+        "TMPL_RECEIVER": pt.Op.addr,
+    }
+
+
+@pytest.mark.parametrize("version", [2, 3, 4, 6])
+def test_teal(version):
+    template = pt.compileTemplate(
+        payment_template(), pt.Mode.Signature, version=version
+    )
+    teal = pt.compileTeal(payment_template(), pt.Mode.Signature, version=version)
+
+    for values in VALUE_SETS:
+        expected = (
+            teal.replace("TMPL_AMOUNT", str(values["TMPL_AMOUNT"]))
+            .replace("TMPL_LEASE", "0x" + values["TMPL_LEASE"].hex())
+            .replace("TMPL_RECEIVER", values["TMPL_RECEIVER"])
+        )
+        assert template.teal(values) == expected
+
+
+@pytest.mark.parametrize("version", [2, 3, 4, 6])
+def test_bytecode(version):
+    template = pt.compileTemplate(
+        payment_template(), pt.Mode.Signature, version=version
+    )
+
+    for values in VALUE_SETS:
+        # constants with the same value are merged, as they would be by algod
+        expected = pt.compileBytecode(
+            payment_instance(
+                values["TMPL_AMOUNT"], values["TMPL_LEASE"], values["TMPL_RECEIVER"]
+            ),
+            pt.Mode.Signature,
+            version=version,
+        )
+        assert template.bytecode(values) == expected
+
+
+def test_assembled_constants():
+    program = pt.Seq(
+        pt.Pop(pt.Tmpl.Int("TMPL_A")),
+        pt.Pop(pt.Tmpl.Bytes("TMPL_B")),
+        pt.Pop(pt.Tmpl.Bytes("TMPL_B")),
+        pt.Tmpl.Int("TMPL_A") == pt.Int(1),
+    )
+    template = pt.compileTemplate(
+        program, pt.Mode.Signature, version=3, assembleConstants=True
+    )
+    values = dict(TMPL_A=300, TMPL_B=b"\x01\x02")
+
+    assert template.teal(values) == "\n".join(
+        [
+            "#pragma version 3",
+            "intcblock 300",
+            "bytecblock 0x0102",
+            "intc_0 // 300",
+            "pop",
+            "bytec_0 // 0x0102",
+            "pop",
+            "bytec_0 // 0x0102",
+            "pop",
+            "intc_0 // 300",
+            "pushint 1 // 1",
+            "==",
+            "return",
+        ]
+    )
+
+    assert template.bytecode(values) == bytes(
+        [0x03]
+        + [0x20, 0x01, 0xAC, 0x02]
+        + [0x26, 0x01, 0x02, 0x01, 0x02]
+        + [0x22, 0x48, 0x28, 0x48, 0x28, 0x48, 0x22, 0x81, 0x01, 0x12, 0x43]
+    )
+
+
+def test_batch():
+    template = pt.compileTemplate(payment_template(), pt.Mode.Signature, version=4)
+    assert template.tealBatch(VALUE_SETS) == [
+        template.teal(values) for values in VALUE_SETS
+    ]
+    assert template.bytecodeBatch(VALUE_SETS) == [
+        template.bytecode(values) for values in VALUE_SETS
+    ]
+    assert template.tealBatch([]) == []
+
+
+def test_invalid_values():
+    template = pt.compileTemplate(payment_template(), pt.Mode.Signature, version=4)
+    valid = VALUE_SETS[0]
+
+    invalid = [
+        dict(TMPL_LEASE=b"", TMPL_RECEIVER=RECEIVER),
+        dict(valid, TMPL_OTHER=1),
+        dict(valid, TMPL_AMOUNT=-1),
+        dict(valid, TMPL_AMOUNT=2**64),
+        dict(valid, TMPL_AMOUNT="1"),
+        dict(valid, TMPL_LEASE="lease"),
+        dict(valid, TMPL_RECEIVER=b"\x00" * 32),
+        dict(valid, TMPL_RECEIVER=RECEIVER[:-1] + "A"),
+    ]
+    for values in invalid:
+        with pytest.raises(pt.TealInputError):
+            template.teal(values)
+        with pytest.raises(pt.TealInputError):
+            template.bytecode(values)
+
+
+def test_no_variables():
+    template = pt.compileTemplate(pt.Int(1), pt.Mode.Signature, version=2)
+    assert template.variables == {}
+    assert template.teal({}) == pt.compileTeal(pt.Int(1), pt.Mode.Signature, version=2)
+    assert template.bytecode({}) == pt.compileBytecode(
+        pt.Int(1), pt.Mode.Signature, version=2
+    )
+
+
+def test_contract_accounts():
+    template = pt.compileTemplate(payment_template(), pt.Mode.Signature, version=2)
+    expected = [
+        (program, pt.programAddress(program))
+        for program in template.bytecodeBatch(VALUE_SETS)
+    ]
+
+    accounts = template.contractAccounts(iter(VALUE_SETS))
+    assert not isinstance(accounts, list)
+    assert list(accounts) == expected
+    assert list(template.contractAccounts([])) == []
+
+
+@pytest.mark.skipif(
+    not pt.compiler.parallel.canCompileInParallel(),
+    reason="worker processes cannot be forked",
+)
+@pytest.mark.parametrize("processes, chunksize", [(1, 1), (2, 1), (2, 3), (3, 256)])
+def test_contract_accounts_parallel(processes, chunksize):
+    template = pt.compileTemplate(payment_template(), pt.Mode.Signature, version=4)
+    valueSets = [
+        dict(VALUE_SETS[i % len(VALUE_SETS)], TMPL_AMOUNT=i) for i in range(20)
+    ]
+
+    assert list(
+        template.contractAccounts(
+            iter(valueSets), processes=processes, chunksize=chunksize
+        )
+    ) == list(template.contractAccounts(valueSets))
+
+    invalid = valueSets[:5] + [dict(valueSets[5], TMPL_AMOUNT=-1)] + valueSets[6:]
+    accounts = template.contractAccounts(invalid, processes=processes, chunksize=2)
+    with pytest.raises(pt.TealInputError):
+        list(accounts)
+
+
+def test_contract_accounts_invalid_args():
+    template = pt.compileTemplate(payment_template(), pt.Mode.Signature, version=4)
+    for processes in (-1, 1.5, None):
+        with pytest.raises(pt.TealInputError):
+            template.contractAccounts(VALUE_SETS, processes=processes)
+    for chunksize in (0, -1, 2.0):
+        with pytest.raises(pt.TealInputError):
+            template.contractAccounts(VALUE_SETS, processes=1, chunksize=chunksize)
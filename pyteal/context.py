@@ -0,0 +1,116 @@
+import threading
+from contextvars import ContextVar, Token
+from typing import Tuple
+
+from pyteal.config import NUM_SLOTS
+
+
+class _IdAllocator:
+    """Allocates the ids of ScratchSlots and SubroutineDefinitions for a CompileContext."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # slot ids under NUM_SLOTS are manually reserved slots
+        self.nextSlotId = NUM_SLOTS
+        self.nextSubroutineId = 0
+
+    def allocateSlotId(self) -> int:
+        with self.lock:
+            slotId = self.nextSlotId
+            self.nextSlotId += 1
+        return slotId
+
+    def allocateSubroutineId(self) -> int:
+        with self.lock:
+            subroutineId = self.nextSubroutineId
+            self.nextSubroutineId += 1
+        return subroutineId
+
+    def reset(self) -> None:
+        with self.lock:
+            self.nextSlotId = NUM_SLOTS
+            self.nextSubroutineId = 0
+
+
+class CompileContext:
+    """The state shared by the expressions of a program while it is built and compiled.
+
+    A context allocates the ids of ScratchSlots and SubroutineDefinitions, which the compiler uses
+    to order slots and subroutines, and controls whether TEAL components compare their source
+    expressions when checked for equality.
+
+    Expressions use the current context of the thread or task that creates them. By default this is
+    a context shared by the whole process, which allocates ids safely from multiple threads. To
+    build and compile programs independently of other threads, and to keep ids from growing in
+    long-lived processes, create a new context for each build:
+
+    .. code-block:: python
+
+        with CompileContext():
+            teal = compileTeal(approval_program(), mode=Mode.Application, version=6)
+
+    Expressions and subroutines from different contexts must not be combined in one program, since
+    their ids may collide.
+    """
+
+    def __init__(self) -> None:
+        self._ids = _IdAllocator()
+        # whether TealComponents compare the expressions that created them when checked for equality
+        self.checkExpr = True
+
+    def allocateSlotId(self) -> int:
+        """Allocate a new id for a ScratchSlot which is not a reserved slot."""
+        return self._ids.allocateSlotId()
+
+    def allocateSubroutineId(self) -> int:
+        """Allocate a new id for a SubroutineDefinition."""
+        return self._ids.allocateSubroutineId()
+
+    def reset(self) -> None:
+        """Restart the allocation of ids.
+
+        This should only be done between builds, once the expressions created in this context are
+        no longer going to be compiled.
+        """
+        self._ids.reset()
+
+    def ignoreExprEquality(self) -> "CompileContext":
+        """Get a context which shares ids with this one, but in which TealComponents do not compare
+        the expressions that created them when checked for equality.
+
+        The returned context should be used in a with statement.
+        """
+        derived = CompileContext()
+        derived._ids = self._ids
+        derived.checkExpr = False
+        return derived
+
+    def __enter__(self) -> "CompileContext":
+        # the tokens are kept in a ContextVar, so that threads and tasks which enter the same
+        # context each restore their own previous context
+        token = _currentContext.set(self)
+        _enteredTokens.set(_enteredTokens.get() + (token,))
+        return self
+
+    def __exit__(self, *args) -> None:
+        tokens = _enteredTokens.get()
+        _enteredTokens.set(tokens[:-1])
+        _currentContext.reset(tokens[-1])
+
+
+CompileContext.__module__ = "pyteal"
+
+_currentContext: ContextVar[CompileContext] = ContextVar(
+    "pyteal_compile_context", default=CompileContext()
+)
+
+# the tokens which restore the previous context when each with statement of the current thread or
+# task exits, innermost last
+_enteredTokens: ContextVar[Tuple[Token, ...]] = ContextVar(
+    "pyteal_compile_context_tokens", default=()
+)
+
+
+def getCompileContext() -> CompileContext:
+    """Get the CompileContext of the current thread or task."""
+    return _currentContext.get()
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pyteal as pt
+
+
+def build_program(seed: int) -> pt.Expr:
+    @pt.Subroutine(pt.TealType.uint64)
+    def accumulate(total: pt.ScratchVar, value):
+        temp = pt.ScratchVar(pt.TealType.uint64)
+        return pt.Seq(
+            temp.store(value * pt.Int(seed)),
+            total.store(total.load() + temp.load()),
+            total.load(),
+        )
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def fib(n):
+        return pt.If(n <= pt.Int(1), n, fib(n - pt.Int(1)) + fib(n - pt.Int(2)))
+
+    total = pt.ScratchVar(pt.TealType.uint64)
+    i = pt.ScratchVar(pt.TealType.uint64)
+    return pt.Seq(
+        total.store(pt.Int(0)),
+        pt.For(
+            i.store(pt.Int(0)), i.load() < pt.Int(seed), i.store(i.load() + pt.Int(1))
+        ).Do(pt.Pop(accumulate(total, fib(i.load())))),
+        pt.Return(total.load() > pt.Int(seed)),
+    )
+
+
+def compile_program(seed: int) -> str:
+    return pt.compileTeal(build_program(seed), mode=pt.Mode.Application, version=6)
+
+
+def test_context_ids():
+    with pt.CompileContext() as context:
+        assert pt.getCompileContext() is context
+
+        slot = pt.ScratchSlot()
+        assert slot.id == pt.NUM_SLOTS
+        assert pt.ScratchSlot().id == pt.NUM_SLOTS + 1
+        assert pt.ScratchSlot(3).id == 3
+
+        subroutine = pt.SubroutineDefinition(lambda: pt.Int(1), pt.TealType.uint64)
+        assert subroutine.id == 0
+
+        context.reset()
+        assert pt.ScratchSlot().id == pt.NUM_SLOTS
+        assert pt.SubroutineDefinition(lambda: pt.Int(1), pt.TealType.uint64).id == 0
+
+    assert pt.getCompileContext() is not context
+
+
+def test_context_nested():
+    outer = pt.CompileContext()
+    inner = pt.CompileContext()
+    default = pt.getCompileContext()
+
+    with outer:
+        with inner:
+            assert pt.getCompileContext() is inner
+            with outer:
+                assert pt.getCompileContext() is outer
+            assert pt.getCompileContext() is inner
+        assert pt.getCompileContext() is outer
+    assert pt.getCompileContext() is default
+
+
+def test_context_ignore_expr_equality():
+    with pt.CompileContext() as context:
+        pt.ScratchSlot()
+
+        a = pt.TealOp(pt.Int(1), pt.Op.int, 1)
+        b = pt.TealOp(pt.Int(1), pt.Op.int, 1)
+        assert a != b
+
+        with pt.TealComponent.Context.ignoreExprEquality() as derived:
+            assert pt.getCompileContext() is derived
+            assert not derived.checkExpr
+            assert a == b
+            # ids are shared with the original context
+            assert pt.ScratchSlot().id == pt.NUM_SLOTS + 1
+
+        assert pt.getCompileContext() is context
+        assert context.checkExpr
+        assert a != b
+        assert pt.ScratchSlot().id == pt.NUM_SLOTS + 2
+
+
+def test_context_ignore_expr_equality_thread():
+    a = pt.TealOp(pt.Int(1), pt.Op.int, 1)
+    b = pt.TealOp(pt.Int(1), pt.Op.int, 1)
+
+    entered = threading.Event()
+    checked = threading.Event()
+    results = []
+
+    def ignoring():
+        with pt.TealComponent.Context.ignoreExprEquality():
+            results.append(a == b)
+            entered.set()
+            checked.wait()
+
+    thread = threading.Thread(target=ignoring)
+    thread.start()
+    entered.wait()
+    # the equality setting of another thread does not apply to this one
+    results.append(a == b)
+    checked.set()
+    thread.join()
+
+    assert results == [True, False]
+
+
+def test_context_tasks():
+    context = pt.CompileContext()
+    default = pt.getCompileContext()
+
+    async def enter(inner: pt.CompileContext) -> bool:
+        with context:
+            await asyncio.sleep(0)
+            with inner:
+                await asyncio.sleep(0)
+                entered = pt.getCompileContext() is inner
+            await asyncio.sleep(0)
+            return entered and pt.getCompileContext() is context
+
+    async def enterAll():
+        # the tasks enter and exit the same context in an interleaved order
+        return await asyncio.gather(*[enter(pt.CompileContext()) for _ in range(4)])
+
+    assert asyncio.run(enterAll()) == [True] * 4
+    assert pt.getCompileContext() is default
+
+
+def test_context_concurrent_ids():
+    def allocate(_):
+        return [pt.ScratchSlot().id for _ in range(1000)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        ids = [i for batch in executor.map(allocate, range(16)) for i in batch]
+
+    assert len(set(ids)) == len(ids)
+
+
+def test_context_concurrent_compile_separate_contexts():
+    seeds = list(range(2, 18))
+    expected = [compile_program(seed) for seed in seeds]
+
+    def compile_in_context(seed: int) -> str:
+        with pt.CompileContext():
+            return compile_program(seed)
+
+    for _ in range(3):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            actual = list(executor.map(compile_in_context, seeds))
+        assert actual == expected
+
+
+def test_context_concurrent_compile_shared_context():
+    seeds = list(range(2, 18))
+    expected = [compile_program(seed) for seed in seeds]
+
+    for _ in range(3):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            actual = list(executor.map(compile_program, seeds))
+        assert actual == expected
+
+
+def test_context_concurrent_compile_same_program():
+    expected = compile_program(7)
+
+    for _ in range(3):
+        # the subroutine declarations of this program are evaluated by whichever thread compiles
+        # it first
+        program = build_program(7)
+        optimize = pt.OptimizeOptions(scratch_slots=True)
+        optimized = pt.compileTeal(
+            build_program(7), mode=pt.Mode.Application, version=6, optimize=optimize
+        )
+
+        def compile_shared(optimized_run: bool) -> str:
+            return pt.compileTeal(
+                program,
+                mode=pt.Mode.Application,
+                version=6,
+                optimize=optimize if optimized_run else None,
+            )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            runs = [i % 2 == 0 for i in range(16)]
+            actual = list(executor.map(compile_shared, runs))
+
+        for optimized_run, teal in zip(runs, actual):
+            assert teal == (optimized if optimized_run else expected)
@@ -30,6 +30,11 @@ class Op(Enum):
         """Get the minimum version where this op is available."""
         return self.value.min_version
 
+    @property
+    def cost(self) -> int:
+        """Get the opcode cost of this op in TEAL version 2 and later."""
+        return _OP_COSTS.get(self, 1)
+
     # fmt: off
     err                 = OpType("err",                 Mode.Signature | Mode.Application, 2)
     sha256              = OpType("sha256",              Mode.Signature | Mode.Application, 2)
@@ -183,3 +188,27 @@ class Op(Enum):
 
 
 Op.__module__ = "pyteal"
+
+# the opcode cost of each op which costs more than 1, in TEAL version 2 and later
+_OP_COSTS = {
+    Op.sha256: 35,
+    Op.keccak256: 130,
+    Op.sha512_256: 45,
+    Op.ed25519verify: 1900,
+    Op.sqrt: 4,
+    Op.divmodw: 20,
+    Op.expw: 10,
+    Op.b_add: 10,
+    Op.b_minus: 10,
+    Op.b_div: 20,
+    Op.b_mul: 20,
+    Op.b_mod: 20,
+    Op.b_or: 6,
+    Op.b_and: 6,
+    Op.b_xor: 6,
+    Op.b_not: 4,
+    Op.ecdsa_verify: 1700,
+    Op.ecdsa_pk_decompress: 650,
+    Op.ecdsa_pk_recover: 2000,
+    Op.bsqrt: 40,
+}
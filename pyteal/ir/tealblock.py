@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Set, Iterator, cast, TYPE_CHECKING
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple, Set, Iterator, cast, TYPE_CHECKING
 
 from pyteal.ir.tealop import TealOp, Op
 from pyteal.errors import TealCompileError
@@ -35,52 +36,54 @@ class TealBlock(ABC):
         return len(self.getOutgoing()) == 0
 
     def validateTree(
-        self, parent: "TealBlock" = None, visited: List["TealBlock"] = None
+        self, parent: "TealBlock" = None, visited: Set[int] = None
     ) -> None:
         """Check that this block and its children have valid parent pointers.
 
         Args:
             parent (optional): The parent block to this one, if it has one. Defaults to None.
-            visited (optional): Used internally to remember blocks that have been visited. Set to None.
+            visited (optional): Used internally to remember the ids of blocks that have been
+                visited. Set to None.
         """
         if visited is None:
-            # using a list instead of a set as TealBlock is not hashable and PyTEAL programs should be short anyway
-            visited = []
-
-        if parent is not None:
-            count = 0
-            for block in self.incoming:
-                if parent is block:
-                    count += 1
-            assert count == 1
-
-        if all(self is not b for b in visited):
-            # if the block was not already visited
-            visited.append(self)
-            for block in self.getOutgoing():
-                block.validateTree(self, visited)
-
-    def addIncoming(
-        self, parent: "TealBlock" = None, visited: List["TealBlock"] = None
-    ) -> None:
+            visited = set()
+
+        # the number of times each parent appears in a block's incoming list, keyed by identity
+        incomingCounts: Dict[int, Counter[int]] = dict()
+
+        for edgeParent, block in TealBlock._iterateEdges(self, parent, visited):
+            if edgeParent is None:
+                continue
+            counts = incomingCounts.get(id(block))
+            if counts is None:
+                counts = Counter(id(b) for b in block.incoming)
+                incomingCounts[id(block)] = counts
+            assert counts[id(edgeParent)] == 1
+
+    def addIncoming(self, parent: "TealBlock" = None, visited: Set[int] = None) -> None:
         """Calculate the parent blocks for this block and its children.
 
         Args:
             parent (optional): The parent block to this one, if it has one. Defaults to None.
-            visited (optional): Used internally to remember blocks that have been visited. Set to None.
+            visited (optional): Used internally to remember the ids of blocks that have been
+                visited. Set to None.
         """
         if visited is None:
-            # using a list instead of a set as TealBlock is not hashable and PyTEAL programs should be short anyway
-            visited = []
+            visited = set()
 
-        if parent is not None and all(parent is not b for b in self.incoming):
-            self.incoming.append(parent)
+        # the ids of the blocks in each block's incoming list, keyed by identity
+        incomingIds: Dict[int, Set[int]] = dict()
 
-        if all(self is not b for b in visited):
-            # if the block was not already visited
-            visited.append(self)
-            for b in self.getOutgoing():
-                b.addIncoming(self, visited)
+        for edgeParent, block in TealBlock._iterateEdges(self, parent, visited):
+            if edgeParent is None:
+                continue
+            ids = incomingIds.get(id(block))
+            if ids is None:
+                ids = set(id(b) for b in block.incoming)
+                incomingIds[id(block)] = ids
+            if id(edgeParent) not in ids:
+                ids.add(id(edgeParent))
+                block.incoming.append(edgeParent)
 
     def validateSlots(
         self,
@@ -93,33 +96,48 @@ class TealBlock(ABC):
         if slotsInUse is None:
             slotsInUse = set()
 
-        currentSlotsInUse = set(slotsInUse)
-        errors = []
-
-        for op in self.ops:
-            if op.getOp() == Op.store:
-                for slot in op.getSlots():
-                    currentSlotsInUse.add(slot)
-
-            if op.getOp() == Op.load:
-                for slot in op.getSlots():
-                    if slot not in currentSlotsInUse:
-                        e = TealCompileError(
-                            "Scratch slot load occurs before store", op.expr
-                        )
-                        errors.append(e)
-
-        if not self.isTerminal():
-            sortedSlots = sorted(slot.id for slot in currentSlotsInUse)
-            for block in self.getOutgoing():
-                visitedKey = (id(block), *sortedSlots)
-                if visitedKey in visited:
-                    continue
-                visited.add(visitedKey)
-
-                for error in block.validateSlots(currentSlotsInUse, visited):
-                    if error not in errors:
-                        errors.append(error)
+        errors: List[TealCompileError] = []
+        # each entry holds the slots in use at the end of a block, along with an iterator over the
+        # block's children which have not been checked yet
+        stack: List[Tuple[Set["ScratchSlot"], List[int], Iterator[TealBlock]]] = []
+
+        def checkBlock(block: TealBlock, slotsInUse: Set["ScratchSlot"]) -> None:
+            currentSlotsInUse = set(slotsInUse)
+
+            for op in block.ops:
+                if op.getOp() == Op.store:
+                    for slot in op.getSlots():
+                        currentSlotsInUse.add(slot)
+
+                if op.getOp() == Op.load:
+                    for slot in op.getSlots():
+                        if slot not in currentSlotsInUse:
+                            e = TealCompileError(
+                                "Scratch slot load occurs before store", op.expr
+                            )
+                            if e not in errors:
+                                errors.append(e)
+
+            if not block.isTerminal():
+                sortedSlots = sorted(slot.id for slot in currentSlotsInUse)
+                stack.append(
+                    (currentSlotsInUse, sortedSlots, iter(block.getOutgoing()))
+                )
+
+        checkBlock(self, slotsInUse)
+        while len(stack) != 0:
+            currentSlotsInUse, sortedSlots, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+
+            visitedKey = (id(child), *sortedSlots)
+            if visitedKey in visited:
+                continue
+            visited.add(visitedKey)
+
+            checkBlock(child, currentSlotsInUse)
 
         return errors
 
@@ -163,25 +181,53 @@ class TealBlock(ABC):
 
     @classmethod
     def Iterate(cls, start: "TealBlock") -> Iterator["TealBlock"]:
-        """Perform a depth-first search of the graph of blocks starting with start."""
-        queue = [start]
-        visited = list(queue)
-
-        def is_in_visited(block):
-            for v in visited:
-                if block is v:
-                    return True
-            return False
+        """Perform a breadth-first search of the graph of blocks starting with start."""
+        queue = deque([start])
+        visited = {id(start)}
 
         while len(queue) != 0:
-            w = queue.pop(0)
+            w = queue.popleft()
             nextBlocks = w.getOutgoing()
             yield w
             for nextBlock in nextBlocks:
-                if not is_in_visited(nextBlock):
-                    visited.append(nextBlock)
+                if id(nextBlock) not in visited:
+                    visited.add(id(nextBlock))
                     queue.append(nextBlock)
 
+    @classmethod
+    def _iterateEdges(
+        cls, start: "TealBlock", parent: Optional["TealBlock"], visited: Set[int]
+    ) -> Iterator[Tuple[Optional["TealBlock"], "TealBlock"]]:
+        """Perform a depth-first search of the graph of blocks starting with start, yielding each
+        (parent, child) edge.
+
+        Edges are produced in the same order as a recursive traversal which enters every block
+        once, but without using the Python call stack, so very large graphs can be traversed.
+
+        Args:
+            start: The block to start from.
+            parent: The parent of start, which is reported with the first edge. May be None.
+            visited: The ids of blocks which have already been entered. This set will be updated
+                with the ids of all blocks entered by this traversal.
+        """
+        yield parent, start
+        if id(start) in visited:
+            return
+        visited.add(id(start))
+
+        stack = [(start, iter(start.getOutgoing()))]
+        while len(stack) != 0:
+            block, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+
+            yield block, child
+            if id(child) not in visited:
+                visited.add(id(child))
+                stack.append((child, iter(child.getOutgoing())))
+
     @classmethod
     def NormalizeBlocks(cls, start: "TealBlock") -> "TealBlock":
         """Minimize the number of blocks in the graph of blocks starting with start by combining
@@ -204,6 +250,18 @@ class TealBlock(ABC):
                     if prev is start:
                         start = block
 
+        # Incoming blocks are tracked in insertion-ordered dicts keyed by identity while blocks are
+        # being removed, so that removing and deduplicating parents does not require scanning
+        # incoming lists. The lists are updated once all blocks have been removed.
+        incomingById: Dict[int, Tuple[TealBlock, Dict[int, TealBlock]]] = dict()
+
+        def incomingOf(block: TealBlock) -> Dict[int, TealBlock]:
+            entry = incomingById.get(id(block))
+            if entry is None:
+                entry = (block, {id(b): b for b in block.incoming})
+                incomingById[id(block)] = entry
+            return entry[1]
+
         for block in TealBlock.Iterate(start):
             if len(block.ops) == 0:
                 outgoing = block.getOutgoing()
@@ -212,20 +270,20 @@ class TealBlock(ABC):
                     # to the single outgoing block, thereby removing an unnecessary intermediate
                     # jump to this block
                     outgoingBlock = outgoing[0]
-                    for i, incomingBlock in enumerate(outgoingBlock.incoming):
-                        if block is incomingBlock:
-                            # remove block from incoming of outgoing
-                            outgoingBlock.incoming.pop(i)
-                            break
+                    outgoingIncoming = incomingOf(outgoingBlock)
+                    # remove block from incoming of outgoing
+                    outgoingIncoming.pop(id(block), None)
 
-                    for prev in block.incoming:
+                    for prev in list(incomingOf(block).values()):
                         prev.replaceOutgoing(block, outgoing[0])
-                        if id(prev) not in [id(b) for b in outgoingBlock.incoming]:
-                            outgoingBlock.incoming.append(prev)
+                        outgoingIncoming.setdefault(id(prev), prev)
 
                     if block is start:
                         start = block
 
+        for updatedBlock, updatedIncoming in incomingById.values():
+            updatedBlock.incoming = list(updatedIncoming.values())
+
         return start
 
 
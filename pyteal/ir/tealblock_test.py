@@ -1,3 +1,5 @@
+import pytest
+
 import pyteal as pt
 
 options = pt.CompileOptions()
@@ -147,6 +149,77 @@ def test_iterate_branch_converge():
     assert blocks == [block, blockTrue, blockFalse, blockEnd]
 
 
+def test_add_incoming_branch_converge():
+    blockEnd = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    blockTrue = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"true"')])
+    blockTrue.setNextBlock(blockEnd)
+    blockFalse = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"false"')])
+    blockFalse.setNextBlock(blockEnd)
+    block = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.int, 1)])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+
+    block.addIncoming()
+    block.validateTree()
+
+    assert block.incoming == []
+    assert blockTrue.incoming == [block]
+    assert blockFalse.incoming == [block]
+    assert len(blockEnd.incoming) == 2
+    assert blockEnd.incoming[0] is blockTrue
+    assert blockEnd.incoming[1] is blockFalse
+
+    # calculating incoming blocks again should not introduce duplicates
+    block.addIncoming()
+    block.validateTree()
+    assert len(blockEnd.incoming) == 2
+
+
+def test_validate_tree_invalid():
+    blockEnd = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    block = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, 1)])
+    block.setNextBlock(blockEnd)
+
+    with pytest.raises(AssertionError):
+        block.validateTree()
+
+    block.addIncoming()
+    blockEnd.incoming.append(block)
+    with pytest.raises(AssertionError):
+        block.validateTree()
+
+
+def test_long_sequence():
+    # longer than the default recursion limit, so traversals must not recurse per block
+    numBlocks = 5000
+    blocks = [
+        pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, i)]) for i in range(numBlocks)
+    ]
+    for prev, block in zip(blocks, blocks[1:]):
+        prev.setNextBlock(block)
+
+    start = blocks[0]
+    start.addIncoming()
+    start.validateTree()
+    assert all(
+        len(block.incoming) == 1 and block.incoming[0] is prev
+        for prev, block in zip(blocks, blocks[1:])
+    )
+    assert start.validateSlots() == []
+
+    iterated = list(pt.TealBlock.Iterate(start))
+    assert len(iterated) == numBlocks
+    assert all(actual is expected for actual, expected in zip(iterated, blocks))
+
+    actual = pt.TealBlock.NormalizeBlocks(start)
+    actual.validateTree()
+
+    expected = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.int, i) for i in range(numBlocks)]
+    )
+    assert actual.ops == expected.ops
+
+
 def test_normalize_single():
     original = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, 1)])
 
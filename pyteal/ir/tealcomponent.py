@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional, TYPE_CHECKING
-from contextlib import AbstractContextManager
+
+from pyteal.context import CompileContext, getCompileContext
 
 if TYPE_CHECKING:
     from pyteal.ast import Expr, ScratchSlot, SubroutineDefinition
@@ -39,21 +40,11 @@ class TealComponent(ABC):
         pass
 
     class Context:
-
-        checkExpr = True
-
-        class EqualityContext(AbstractContextManager):
-            def __enter__(self):
-                TealComponent.Context.checkExpr = False
-                return self
-
-            def __exit__(self, *args):
-                TealComponent.Context.checkExpr = True
-                return None
-
         @classmethod
-        def ignoreExprEquality(cls):
-            return cls.EqualityContext()
+        def ignoreExprEquality(cls) -> "CompileContext":
+            """Get a context in which TealComponents do not compare the expressions that created
+            them when checked for equality. The context should be used in a with statement."""
+            return getCompileContext().ignoreExprEquality()
 
 
 TealComponent.__module__ = "pyteal"
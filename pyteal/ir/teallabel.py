@@ -2,6 +2,7 @@ from typing import Optional, TYPE_CHECKING
 
 from pyteal.ir.tealcomponent import TealComponent
 from pyteal.ir.labelref import LabelReference
+from pyteal.context import getCompileContext
 
 if TYPE_CHECKING:
     from pyteal.ast import Expr
@@ -33,7 +34,7 @@ class TealLabel(TealComponent):
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, TealLabel):
             return False
-        if TealComponent.Context.checkExpr and self.expr is not other.expr:
+        if getCompileContext().checkExpr and self.expr is not other.expr:
             return False
         return self.label == other.label and self.comment == other.comment
 
@@ -4,6 +4,7 @@ from pyteal.ir.tealcomponent import TealComponent
 from pyteal.ir.labelref import LabelReference
 from pyteal.ir.ops import Op
 from pyteal.errors import TealInternalError
+from pyteal.context import getCompileContext
 
 if TYPE_CHECKING:
     from pyteal.ast import Expr, ScratchSlot, SubroutineDefinition
@@ -76,7 +77,7 @@ class TealOp(TealComponent):
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, TealOp):
             return False
-        if TealComponent.Context.checkExpr and self.expr is not other.expr:
+        if getCompileContext().checkExpr and self.expr is not other.expr:
             return False
         return self.op == other.op and self.args == other.args
 
@@ -0,0 +1,152 @@
+"""Report the branch ops and size of programs with different orders of their blocks.
+
+For each program, this lowers the main program and its subroutines into blocks, orders them with
+the depth-first order which sortBlocks used before, and with sortBlocks, and prints the number of
+branch ops, the number of backward branches, which require TEAL version 4 or later outside of loops,
+and the estimated size of the program in bytes.
+
+Usage:
+    python -m scripts.benchmarks.block_layout
+"""
+
+from typing import Callable, Dict, List, Optional, Set, Tuple, cast
+
+import pyteal as pt
+
+from pyteal.compiler.compiler import compileSubroutine
+from pyteal.compiler.flatten import flattenBlocks
+from pyteal.compiler.assembler import opSize
+from pyteal.compiler.sort import sortBlocks
+
+from examples.application import asset, security_token, vote
+from examples.signature.dutch_auction import dutch_auction
+from examples.signature.factorizer_game import logicsig
+from examples.signature.periodic_payment import periodic_payment
+from examples.signature.recurring_swap import recurring_swap
+from examples.signature.split import split
+from scripts.benchmarks.cond_scaling import build_router
+
+BRANCH_OPS = (pt.Op.b, pt.Op.bz, pt.Op.bnz)
+
+
+def depth_first_order(start: pt.TealBlock, end: pt.TealBlock) -> List[pt.TealBlock]:
+    """Order blocks in the order a depth-first search enters them, with end last."""
+    stack = [start]
+    order = []
+    visited: Set[int] = set()
+    while len(stack) != 0:
+        block = stack.pop()
+        if id(block) in visited:
+            continue
+        stack += block.getOutgoing()
+        order.append(block)
+        visited.add(id(block))
+
+    order.remove(end)
+    order.append(end)
+    return order
+
+
+def nested_ifs(depth: int) -> pt.Expr:
+    if depth == 0:
+        return pt.Txn.fee()
+    return pt.Seq(
+        pt.If(pt.Txn.application_args.length() > pt.Int(depth))
+        .Then(pt.Assert(pt.Txn.fee() > pt.Int(depth)))
+        .Else(pt.Assert(pt.Txn.fee() < pt.Int(depth))),
+        pt.If(pt.Txn.amount() == pt.Int(depth))
+        .Then(nested_ifs(depth - 1))
+        .Else(pt.Int(depth)),
+    )
+
+
+def layout_stats(
+    program: pt.Expr,
+    options: pt.CompileOptions,
+    order: Callable[[pt.TealBlock, pt.TealBlock], List[pt.TealBlock]],
+) -> Tuple[int, int, int]:
+    """Get the number of branch ops, backward branches, and bytes of a program."""
+    graph: Dict[pt.SubroutineDefinition, Set[pt.SubroutineDefinition]] = dict()
+    starts: Dict[Optional[pt.SubroutineDefinition], pt.TealBlock] = dict()
+    ends: Dict[Optional[pt.SubroutineDefinition], pt.TealBlock] = dict()
+    compileSubroutine(program, options, graph, starts, ends)
+
+    branches = backward = size = 0
+    for subroutine, start in starts.items():
+        teal = flattenBlocks(order(start, ends[subroutine]))
+        labels = {
+            stmt.getLabelRef().getLabel(): i
+            for i, stmt in enumerate(teal)
+            if isinstance(stmt, pt.TealLabel)
+        }
+        for i, stmt in enumerate(teal):
+            if not isinstance(stmt, pt.TealOp):
+                continue
+            size += opSize(stmt)
+            if stmt.op in BRANCH_OPS:
+                branches += 1
+                if labels[cast(pt.LabelReference, stmt.args[0]).getLabel()] < i:
+                    backward += 1
+    return branches, backward, size
+
+
+def main() -> None:
+    programs: Dict[str, Tuple[pt.Expr, pt.Mode, pt.OptimizeOptions]] = {
+        "asset": (asset.approval_program(), pt.Mode.Application, pt.OptimizeOptions()),
+        "vote": (vote.approval_program(), pt.Mode.Application, pt.OptimizeOptions()),
+        "security_token": (
+            security_token.approval_program(),
+            pt.Mode.Application,
+            pt.OptimizeOptions(),
+        ),
+        "dutch_auction": (
+            pt.Return(dutch_auction()),
+            pt.Mode.Signature,
+            pt.OptimizeOptions(short_circuit=True),
+        ),
+        "periodic_payment": (
+            pt.Return(periodic_payment()),
+            pt.Mode.Signature,
+            pt.OptimizeOptions(short_circuit=True),
+        ),
+        "recurring_swap": (
+            pt.Return(recurring_swap()),
+            pt.Mode.Signature,
+            pt.OptimizeOptions(short_circuit=True),
+        ),
+        "split": (
+            pt.Return(split()),
+            pt.Mode.Signature,
+            pt.OptimizeOptions(short_circuit=True),
+        ),
+        "factorizer_game": (
+            pt.Return(logicsig(1, 5, 7)),
+            pt.Mode.Signature,
+            pt.OptimizeOptions(short_circuit=True),
+        ),
+        "nested_ifs_8": (
+            pt.Return(nested_ifs(8)),
+            pt.Mode.Application,
+            pt.OptimizeOptions(),
+        ),
+        "cond_200": (build_router(200), pt.Mode.Application, pt.OptimizeOptions()),
+    }
+
+    print(
+        "{:<18} {:>8} {:>8} {:>9} {:>9} {:>8} {:>8}".format(
+            "program", "branches", "after", "backward", "after", "bytes", "after"
+        )
+    )
+    for name, (program, mode, optimize) in programs.items():
+        options = pt.CompileOptions(mode=mode, version=6, optimize=optimize)
+        before = layout_stats(program, options, depth_first_order)
+        after = layout_stats(program, options, sortBlocks)
+        print(
+            "{:<18} {:>8} {:>8} {:>9} {:>9} {:>8} {:>8}".format(
+                name, before[0], after[0], before[1], after[1], before[2], after[2]
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
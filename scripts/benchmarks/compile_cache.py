@@ -0,0 +1,80 @@
+"""Benchmark compileTeal with and without a CompileCache.
+
+For each example program, this reports the time of an uncached compile, the time to compute the
+cache key alone, and the time of a warm compile served from memory and from disk.
+
+Usage:
+    python -m scripts.benchmarks.compile_cache [--repeat N]
+"""
+
+import argparse
+import tempfile
+import time
+from typing import Callable
+
+import pyteal as pt
+from pyteal.compiler.cache import compileCacheKey
+
+from examples.application import security_token, vote
+from scripts.benchmarks.cond_scaling import build_router
+
+PROGRAMS = {
+    "vote": (vote.approval_program, 2),
+    "security_token": (security_token.approval_program, 2),
+    "cond_1000": (lambda: build_router(1000), 6),
+}
+
+
+def average(fn: Callable[[], object], repeat: int) -> float:
+    began = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - began) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(
+        "{:<16} {:>14} {:>14} {:>14} {:>14}".format(
+            "program", "cold (ms)", "key (ms)", "memory (ms)", "disk (ms)"
+        )
+    )
+    for name, (build, version) in PROGRAMS.items():
+        program = build()
+
+        def compile(cache: pt.CompileCache = None) -> str:
+            return pt.compileTeal(
+                program, mode=pt.Mode.Application, version=version, cache=cache
+            )
+
+        cold = average(compile, args.repeat)
+        key = average(
+            lambda: compileCacheKey(
+                program, pt.Mode.Application, version, False, pt.OptimizeOptions()
+            ),
+            args.repeat,
+        )
+
+        memoryCache = pt.CompileCache()
+        compile(memoryCache)
+        memory = average(lambda: compile(memoryCache), args.repeat)
+
+        with tempfile.TemporaryDirectory() as directory:
+            compile(pt.CompileCache(directory=directory))
+            # use a new cache for each compile so that entries are always read from disk
+            disk = average(
+                lambda: compile(pt.CompileCache(directory=directory)), args.repeat
+            )
+
+        print(
+            "{:<16} {:>14.2f} {:>14.2f} {:>14.2f} {:>14.2f}".format(
+                name, cold * 1e3, key * 1e3, memory * 1e3, disk * 1e3
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
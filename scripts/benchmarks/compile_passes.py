@@ -0,0 +1,53 @@
+"""Report where compileTeal spends its time, using CompileStats.
+
+For each program, this prints the total time, allocations and IR sizes of every compiler pass, and
+the slowest subroutines.
+
+Usage:
+    python -m scripts.benchmarks.compile_passes [--trace-allocations] [--branches N]
+"""
+
+import argparse
+
+import pyteal as pt
+
+from examples.application import security_token, vote
+from scripts.benchmarks.cond_scaling import build_router
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--branches", type=int, default=2000)
+    parser.add_argument("--trace-allocations", action="store_true")
+    args = parser.parse_args()
+
+    programs = {
+        "vote": (vote.approval_program(), 3),
+        "security_token": (security_token.approval_program(), 3),
+        "cond_{}".format(args.branches): (build_router(args.branches), 6),
+    }
+
+    for name, (program, version) in programs.items():
+        stats = pt.CompileStats(trace_allocations=args.trace_allocations)
+        pt.compileTeal(
+            program,
+            mode=pt.Mode.Application,
+            version=version,
+            assembleConstants=True,
+            stats=stats,
+        )
+
+        print("## {}".format(name))
+        print(stats.report())
+
+        subroutines = sorted(
+            stats.subroutineTimes().items(), key=lambda item: item[1], reverse=True
+        )
+        print()
+        for subroutine, elapsed in subroutines[:5]:
+            print("{:<32} {:>12.3f}".format(subroutine, elapsed * 1e3))
+        print()
+
+
+if __name__ == "__main__":
+    main()
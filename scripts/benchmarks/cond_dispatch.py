@@ -0,0 +1,117 @@
+"""Report the number of ops a method router runs before the body of a method.
+
+For each number of methods, this compiles a Cond router which compares the first application
+argument against the selector of each method, with and without OptimizeOptions(cond_dispatch=True),
+and prints the most and the mean number of ops run before the body of a method is reached.
+
+Usage:
+    python -m scripts.benchmarks.cond_dispatch [--sizes 8 16 64 256]
+"""
+
+import argparse
+from typing import Any, Callable, Dict, List, Tuple
+
+from algosdk import encoding
+
+import pyteal as pt
+
+
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": lambda a, b: a == b,
+    "<=": lambda a, b: a <= b,
+    "b<": lambda a, b: int.from_bytes(a, "big") < int.from_bytes(b, "big"),
+}
+
+
+def method(index: int) -> str:
+    return "method{}(uint64)void".format(index)
+
+
+def build_router(methods: int) -> pt.Expr:
+    return pt.Cond(
+        *[
+            [
+                pt.Txn.application_args[0] == pt.MethodSignature(method(i)),
+                pt.Return(pt.Int(i)),
+            ]
+            for i in range(methods)
+        ]
+    )
+
+
+def dispatch_ops(teal: str, argument: bytes) -> Tuple[int, int]:
+    """Run the ops of a router until it returns, and get the number of ops run before the body
+    of the method, which is the last two ops, along with the method which was called."""
+    lines = [line for line in teal.splitlines()[1:] if line != ""]
+    labels = {line[:-1]: i for i, line in enumerate(lines) if line.endswith(":")}
+    stack: List = []
+    slots: Dict[str, object] = dict()
+    count = 0
+    pc = 0
+    while True:
+        op, _, arg = lines[pc].partition(" ")
+        pc += 1
+        if op.endswith(":"):
+            continue
+        count += 1
+        if op == "txna":
+            stack.append(argument)
+        elif op == "method":
+            stack.append(encoding.checksum(arg.strip('"').encode())[:4])
+        elif op == "int":
+            stack.append(int(arg))
+        elif op == "store":
+            slots[arg] = stack.pop()
+        elif op == "load":
+            stack.append(slots[arg])
+        elif op == "len":
+            stack.append(len(stack.pop()))
+        elif op in COMPARISONS:
+            right, left = stack.pop(), stack.pop()
+            stack.append(int(COMPARISONS[op](left, right)))
+        elif op in ("bnz", "bz"):
+            if bool(stack.pop()) == (op == "bnz"):
+                pc = labels[arg]
+        elif op == "b":
+            pc = labels[arg]
+        elif op == "return":
+            return count - 2, stack.pop()
+        else:
+            raise ValueError("Unexpected op: {}".format(lines[pc - 1]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 64, 256])
+    args = parser.parse_args()
+
+    print("{:>8} {:>20} {:>20}".format("methods", "most ops", "mean ops"))
+    for size in args.sizes:
+        results: List[Tuple[int, float]] = []
+        for optimize in (False, True):
+            teal = pt.compileTeal(
+                build_router(size),
+                mode=pt.Mode.Application,
+                version=6,
+                optimize=pt.OptimizeOptions(cond_dispatch=optimize),
+            )
+            counts = []
+            for i in range(size):
+                count, called = dispatch_ops(
+                    teal, encoding.checksum(method(i).encode())[:4]
+                )
+                assert called == i
+                counts.append(count)
+            results.append((max(counts), sum(counts) / size))
+
+        print(
+            "{:>8} {:>20} {:>20}".format(
+                size,
+                "{} -> {}".format(results[0][0], results[1][0]),
+                "{:.1f} -> {:.1f}".format(results[0][1], results[1][1]),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark how compile time scales with the number of branches in a Cond router.
+
+For each size, this reports the time spent in the TealBlock graph passes (addIncoming,
+validateTree, NormalizeBlocks and Iterate) and the total time of compileTeal. Near-linear scaling
+shows up as a roughly constant time per branch.
+
+Usage:
+    python -m scripts.benchmarks.cond_scaling [--sizes 1250 2500 5000 10000]
+"""
+
+import argparse
+import time
+
+import pyteal as pt
+
+
+def build_router(branches: int) -> pt.Expr:
+    return pt.Cond(
+        *[
+            [
+                pt.Txn.application_args[0] == pt.Bytes("method{}".format(i)),
+                pt.Return(pt.Int(i)),
+            ]
+            for i in range(branches)
+        ]
+    )
+
+
+def time_block_passes(program: pt.Expr) -> float:
+    options = pt.CompileOptions(mode=pt.Mode.Application, version=6)
+    start, _ = program.__teal__(options)
+
+    began = time.perf_counter()
+    start.addIncoming()
+    start.validateTree()
+    start = pt.TealBlock.NormalizeBlocks(start)
+    start.validateTree()
+    for _ in pt.TealBlock.Iterate(start):
+        pass
+    return time.perf_counter() - began
+
+
+def time_compile(program: pt.Expr) -> float:
+    began = time.perf_counter()
+    pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+    return time.perf_counter() - began
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1250, 2500, 5000, 10000]
+    )
+    args = parser.parse_args()
+
+    print(
+        "{:>10} {:>16} {:>20} {:>16} {:>20}".format(
+            "branches",
+            "block passes (s)",
+            "per branch (us)",
+            "compileTeal (s)",
+            "per branch (us)",
+        )
+    )
+    for size in args.sizes:
+        passes = time_block_passes(build_router(size))
+        total = time_compile(build_router(size))
+        print(
+            "{:>10} {:>16.3f} {:>20.1f} {:>16.3f} {:>20.1f}".format(
+                size,
+                passes,
+                passes / size * 1e6,
+                total,
+                total / size * 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
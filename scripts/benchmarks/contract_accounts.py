@@ -0,0 +1,52 @@
+"""Benchmark deriving the contract accounts of many instances of a template program.
+
+This derives the bytecode and address of instances of the periodic payment example, in this
+process and on a pool of worker processes.
+
+Usage:
+    python -m scripts.benchmarks.contract_accounts [--count N] [--processes N]
+"""
+
+import argparse
+import os
+import time
+
+import pyteal as pt
+
+from scripts.benchmarks.template_instances import template_program, value_sets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    template = pt.compileTemplate(template_program(), mode=pt.Mode.Signature, version=2)
+
+    began = time.perf_counter()
+    serial = list(template.contractAccounts(value_sets(args.count)))
+    serial_time = time.perf_counter() - began
+
+    began = time.perf_counter()
+    parallel = list(
+        template.contractAccounts(value_sets(args.count), processes=args.processes)
+    )
+    parallel_time = time.perf_counter() - began
+
+    assert parallel == serial
+
+    print(
+        "serial:                {:>10.1f} us per account, {:.2f} s total".format(
+            serial_time / args.count * 1e6, serial_time
+        )
+    )
+    print(
+        "{:>2} processes:          {:>10.1f} us per account, {:.2f} s total".format(
+            args.processes, parallel_time / args.count * 1e6, parallel_time
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
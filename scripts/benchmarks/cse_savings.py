@@ -0,0 +1,89 @@
+"""Report what common subexpression elimination saves on the example programs.
+
+For each program, this compiles it with and without OptimizeOptions(common_subexpressions=True),
+and prints the number of ops and the static opcode cost, i.e. the sum of the cost of every op in the
+program, along with the compile times.
+
+Usage:
+    python -m scripts.benchmarks.cse_savings
+"""
+
+import time
+from typing import Dict, Tuple
+
+import pyteal as pt
+
+from examples.application import asset, security_token, vote
+from examples.signature.dutch_auction import dutch_auction
+from examples.signature.factorizer_game import logicsig
+from examples.signature.periodic_payment import periodic_payment
+from examples.signature.recurring_swap import recurring_swap
+from examples.signature.split import split
+
+OPS = {str(op): op for op in pt.Op}
+
+
+def static_cost(teal: str) -> Tuple[int, int]:
+    """Get the number of ops and their total cost in a TEAL program."""
+    count = 0
+    cost = 0
+    for line in teal.splitlines():
+        token = line.split(" ", 1)[0]
+        if token in OPS:
+            count += 1
+            cost += OPS[token].cost
+    return count, cost
+
+
+def repeated_hashes() -> pt.Expr:
+    """A program which checks several parts of the same hash."""
+    digest = pt.Sha256(pt.Concat(pt.Txn.note(), pt.Txn.sender()))
+    return pt.Seq(
+        pt.Assert(pt.Len(digest) == pt.Int(32)),
+        pt.Assert(pt.Extract(digest, pt.Int(0), pt.Int(8)) == pt.Txn.lease()),
+        pt.Btoi(pt.Extract(digest, pt.Int(8), pt.Int(8)))
+        < pt.Btoi(pt.Extract(digest, pt.Int(16), pt.Int(8))),
+    )
+
+
+def main() -> None:
+    programs: Dict[str, Tuple[pt.Expr, pt.Mode, int]] = {
+        "asset": (asset.approval_program(), pt.Mode.Application, 2),
+        "vote": (vote.approval_program(), pt.Mode.Application, 2),
+        "security_token": (security_token.approval_program(), pt.Mode.Application, 2),
+        "dutch_auction": (dutch_auction(), pt.Mode.Signature, 2),
+        "periodic_payment": (periodic_payment(), pt.Mode.Signature, 2),
+        "recurring_swap": (recurring_swap(), pt.Mode.Signature, 2),
+        "split": (split(), pt.Mode.Signature, 2),
+        "factorizer_game": (logicsig(1, 5, 7), pt.Mode.Signature, 6),
+        "repeated_hashes": (repeated_hashes(), pt.Mode.Signature, 6),
+    }
+
+    print(
+        "{:<18} {:>8} {:>8} {:>8} {:>8} {:>10} {:>10}".format(
+            "program", "ops", "cse ops", "cost", "cse cost", "ms", "cse ms"
+        )
+    )
+    for name, (program, mode, version) in programs.items():
+        results = []
+        for enabled in (False, True):
+            began = time.perf_counter()
+            teal = pt.compileTeal(
+                program,
+                mode=mode,
+                version=version,
+                optimize=pt.OptimizeOptions(common_subexpressions=enabled),
+            )
+            elapsed = time.perf_counter() - began
+            results.append((static_cost(teal), elapsed))
+
+        ((ops, cost), elapsed), ((cseOps, cseCost), cseElapsed) = results
+        print(
+            "{:<18} {:>8} {:>8} {:>8} {:>8} {:>10.1f} {:>10.1f}".format(
+                name, ops, cseOps, cost, cseCost, elapsed * 1e3, cseElapsed * 1e3
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
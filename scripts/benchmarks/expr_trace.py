@@ -0,0 +1,90 @@
+"""Benchmark AST construction throughput and peak memory for each TraceMode.
+
+Each mode is measured in a fresh process so that the peak RSS of one mode does not hide the peak
+RSS of another.
+
+Usage:
+    python -m scripts.benchmarks.expr_trace [--branches N]
+"""
+
+import argparse
+import gc
+import multiprocessing
+import resource
+import time
+
+import pyteal as pt
+
+
+def build_program(branches: int) -> pt.Expr:
+    counter = pt.ScratchVar(pt.TealType.uint64)
+    return pt.Seq(
+        [counter.store(pt.Int(0))]
+        + [
+            pt.If(
+                pt.And(
+                    pt.Txn.application_args.length() > pt.Int(i % 16),
+                    pt.Btoi(pt.Txn.application_args[i % 16]) == pt.Int(i),
+                ),
+                counter.store(counter.load() + pt.Int(i) * pt.Int(2)),
+                counter.store(counter.load() - pt.Int(1)),
+            )
+            for i in range(branches)
+        ]
+        + [pt.Return(counter.load() > pt.Int(0))]
+    )
+
+
+def count_exprs() -> int:
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, pt.Expr))
+
+
+def measure(mode: pt.TraceMode, branches: int, results) -> None:
+    pt.setTraceMode(mode)
+    baselineNodes = count_exprs()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    program = build_program(branches)
+    elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    nodes = count_exprs() - baselineNodes
+    results.put((mode.name, nodes, elapsed, baseline, peak))
+    del program
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--branches", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(
+        "{:<12} {:>10} {:>10} {:>14} {:>14} {:>14}".format(
+            "mode", "nodes", "time (s)", "nodes/s", "peak RSS (MB)", "delta RSS (MB)"
+        )
+    )
+
+    ctx = multiprocessing.get_context("spawn")
+    for mode in pt.TraceMode:
+        results = ctx.Queue()
+        process = ctx.Process(target=measure, args=(mode, args.branches, results))
+        process.start()
+        name, nodes, elapsed, baseline, peak = results.get()
+        process.join()
+
+        # ru_maxrss is reported in kilobytes on Linux
+        print(
+            "{:<12} {:>10} {:>10.3f} {:>14.0f} {:>14.1f} {:>14.1f}".format(
+                name,
+                nodes,
+                elapsed,
+                nodes / elapsed,
+                peak / 1024,
+                (peak - baseline) / 1024,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Report the effect of inlining subroutines.
+
+For each program, this compiles it in Signature and Application mode with and without
+OptimizeOptions(inline_subroutines=True), and prints the number of subroutines, the size of the
+bytecode, and the opcode cost of running every op of the main program once, where each callsub also
+runs every op of the subroutine it calls.
+
+Usage:
+    python -m scripts.benchmarks.inlining
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pyteal as pt
+
+from scripts.benchmarks.cse_savings import OPS
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def is_even(x: pt.Expr) -> pt.Expr:
+    return x % pt.Int(2) == pt.Int(0)
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def clamp(x: pt.Expr, low: pt.Expr, high: pt.Expr) -> pt.Expr:
+    return pt.Seq(
+        pt.If(x < low).Then(pt.Return(low)),
+        pt.If(x > high).Then(pt.Return(high)),
+        x,
+    )
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def checksum(data: pt.Expr) -> pt.Expr:
+    return pt.Btoi(pt.Extract(pt.Sha256(data), pt.Int(0), pt.Int(8)))
+
+
+def call_cost(teal: str) -> int:
+    """Get the cost of running every op of the main program once, including the subroutines it
+    calls."""
+    # the ops of the main program and of each subroutine, keyed by the label of the subroutine
+    sections: Dict[str, List[str]] = {"": []}
+    current: Optional[str] = ""
+    for line in teal.splitlines():
+        if line.startswith("// "):
+            current = None
+        elif current is None and line.endswith(":"):
+            current = line[:-1]
+            sections[current] = []
+        elif current is not None:
+            sections[current].append(line)
+
+    def cost(section: str) -> int:
+        total = 0
+        for line in sections[section]:
+            token, _, arg = line.partition(" ")
+            if token in OPS:
+                total += OPS[token].cost
+            if token == "callsub":
+                total += cost(arg)
+        return total
+
+    return cost("")
+
+
+def predicates() -> pt.Expr:
+    """Check several values with a one-line predicate."""
+    return pt.And(*(is_even(pt.Btoi(pt.Txn.application_args[i])) for i in range(6)))
+
+
+def clamped_sum() -> pt.Expr:
+    """Sum values clamped by a helper with several returns."""
+    total = pt.Int(0)
+    for i in range(4):
+        total = total + clamp(
+            pt.Btoi(pt.Txn.application_args[i]), pt.Int(10), pt.Int(100)
+        )
+    return total > pt.Int(0)
+
+
+def single_checksum() -> pt.Expr:
+    """Call an expensive helper from one place."""
+    return checksum(pt.Txn.note()) > pt.Int(0)
+
+
+def main() -> None:
+    programs: List[Tuple[str, Callable[[], pt.Expr]]] = [
+        ("predicates", predicates),
+        ("clamped_sum", clamped_sum),
+        ("single_checksum", single_checksum),
+    ]
+
+    print(
+        "{:<16} {:<12} {:>12} {:>12} {:>12}".format(
+            "program", "mode", "subroutines", "bytes", "cost"
+        )
+    )
+    for name, build in programs:
+        for mode in (pt.Mode.Signature, pt.Mode.Application):
+            results: List[Tuple[int, int, int]] = []
+            for optimize in (False, True):
+                options = pt.OptimizeOptions(inline_subroutines=optimize)
+                teal = pt.compileTeal(
+                    pt.Return(build()), mode=mode, version=6, optimize=options
+                )
+                bytecode = pt.compileBytecode(
+                    pt.Return(build()), mode=mode, version=6, optimize=options
+                )
+                results.append((teal.count("\n// "), len(bytecode), call_cost(teal)))
+
+            print(
+                "{:<16} {:<12} {:>12} {:>12} {:>12}".format(
+                    name,
+                    mode.name,
+                    *("{} -> {}".format(*values) for values in zip(*results))
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
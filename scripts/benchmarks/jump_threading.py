@@ -0,0 +1,137 @@
+"""Report the bytes saved by threading jumps in method routers.
+
+For each number of methods, this compiles routers with and without
+OptimizeOptions(jump_threading=True), and prints the size of their bytecode, the number of branch
+ops, and the time jump threading took.
+
+Usage:
+    python -m scripts.benchmarks.jump_threading [--sizes 16 64 256]
+"""
+
+import argparse
+import time
+from copy import copy
+from typing import Callable, Dict, Tuple
+
+import pyteal as pt
+
+from pyteal.compiler.optimizer import apply_jump_threading
+from pyteal.compiler.compiler import compileComponents
+
+BRANCH_OPS = ("b", "bz", "bnz")
+
+
+def method(index: int) -> pt.Expr:
+    return pt.MethodSignature("method{}(uint64)void".format(index))
+
+
+def value_router(methods: int) -> pt.Expr:
+    """A router which returns a different value for each method."""
+    return pt.Return(
+        pt.Cond(
+            *[
+                [pt.Txn.application_args[0] == method(i), pt.Int(i + 1)]
+                for i in range(methods)
+            ]
+        )
+    )
+
+
+def handler(index: int) -> pt.SubroutineFnWrapper:
+    @pt.Subroutine(pt.TealType.none, name="handler{}".format(index))
+    def handle(value: pt.Expr) -> pt.Expr:
+        return (
+            pt.If(value > pt.Int(index))
+            .Then(pt.App.globalPut(pt.Bytes("value"), value))
+            .ElseIf(value == pt.Int(0))
+            .Then(pt.Reject())
+        )
+
+    return handle
+
+
+def handler_router(methods: int) -> pt.Expr:
+    """A router which calls a subroutine for each method and then approves the call. With
+    OptimizeOptions(inline_subroutines=True), the subroutines are inlined into the router."""
+    return pt.Seq(
+        pt.Cond(
+            *[
+                [
+                    pt.Txn.application_args[0] == method(i),
+                    handler(i)(pt.Btoi(pt.Txn.application_args[1])),
+                ]
+                for i in range(methods)
+            ]
+        ),
+        pt.Approve(),
+    )
+
+
+def stats(program: pt.Expr, optimize: pt.OptimizeOptions) -> Tuple[int, int]:
+    """Get the size of the bytecode and the number of branch ops of a program."""
+    teal = pt.compileTeal(
+        program, mode=pt.Mode.Application, version=6, optimize=optimize
+    )
+    size = len(
+        pt.compileBytecode(
+            program, mode=pt.Mode.Application, version=6, optimize=optimize
+        )
+    )
+    branches = sum(
+        1 for line in teal.splitlines() if line.partition(" ")[0] in BRANCH_OPS
+    )
+    return size, branches
+
+
+def threading_time(program: pt.Expr, optimize: pt.OptimizeOptions) -> float:
+    options = pt.CompileOptions(mode=pt.Mode.Application, version=6, optimize=optimize)
+    teal = compileComponents(program, options, False, None, 0)
+    began = time.perf_counter()
+    apply_jump_threading(teal)
+    return time.perf_counter() - began
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 256])
+    args = parser.parse_args()
+
+    routers: Dict[str, Tuple[Callable[[int], pt.Expr], pt.OptimizeOptions]] = {
+        "value": (value_router, pt.OptimizeOptions()),
+        "handler": (handler_router, pt.OptimizeOptions(inline_subroutines=True)),
+    }
+    print(
+        "{:<8} {:>7} {:>9} {:>9} {:>9} {:>9} {:>9} {:>8}".format(
+            "router",
+            "methods",
+            "bytes",
+            "after",
+            "saved",
+            "branches",
+            "after",
+            "ms",
+        )
+    )
+    for name, (build, optimize) in routers.items():
+        threaded = copy(optimize)
+        threaded.jump_threading = True
+        for methods in args.sizes:
+            program = build(methods)
+            size, branches = stats(program, optimize)
+            threaded_size, threaded_branches = stats(program, threaded)
+            print(
+                "{:<8} {:>7} {:>9} {:>9} {:>9} {:>9} {:>9} {:>8.2f}".format(
+                    name,
+                    methods,
+                    size,
+                    threaded_size,
+                    size - threaded_size,
+                    branches,
+                    threaded_branches,
+                    threading_time(program, optimize) * 1e3,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
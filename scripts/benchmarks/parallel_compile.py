@@ -0,0 +1,78 @@
+"""Benchmark compileTeal with subroutines lowered on a pool of worker processes.
+
+The program calls many independent subroutines, each of which contains a Cond router. This reports
+the compile time for each number of processes, and checks that the output is identical to a
+serial compile. Speedups depend on the number of available cores.
+
+Usage:
+    python -m scripts.benchmarks.parallel_compile [--subroutines N] [--processes 0 2 4]
+"""
+
+import argparse
+import os
+import time
+
+import pyteal as pt
+
+
+def build_program(subroutines: int) -> pt.Expr:
+    def make(i: int) -> pt.SubroutineFnWrapper:
+        @pt.Subroutine(pt.TealType.uint64, name="handler{}".format(i))
+        def handler(selector, result: pt.ScratchVar):
+            return pt.Seq(
+                result.store(selector + pt.Int(i)),
+                pt.Cond(
+                    *[
+                        [selector == pt.Int(k), pt.Return(result.load() * pt.Int(k))]
+                        for k in range(40)
+                    ]
+                ),
+                pt.Return(pt.Int(0)),
+            )
+
+        return handler
+
+    handlers = [make(i) for i in range(subroutines)]
+    result = pt.ScratchVar(pt.TealType.uint64)
+    selector = pt.Btoi(pt.Txn.application_args[0])
+    return pt.Seq(
+        result.store(pt.Int(0)),
+        pt.Cond(
+            *[
+                [selector == pt.Int(i), pt.Return(handler(selector, result))]
+                for i, handler in enumerate(handlers)
+            ]
+        ),
+        pt.Reject(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subroutines", type=int, default=120)
+    parser.add_argument(
+        "--processes", type=int, nargs="+", default=[0, 2, os.cpu_count() or 1]
+    )
+    args = parser.parse_args()
+
+    print("available cores: {}".format(os.cpu_count()))
+    print("{:>10} {:>14} {:>10}".format("processes", "compile (s)", "identical"))
+
+    expected = None
+    for processes in args.processes:
+        program = build_program(args.subroutines)
+        began = time.perf_counter()
+        teal = pt.compileTeal(
+            program, mode=pt.Mode.Application, version=6, parallel=processes
+        )
+        elapsed = time.perf_counter() - began
+
+        if expected is None:
+            expected = teal
+        print(
+            "{:>10} {:>14.3f} {:>10}".format(processes, elapsed, str(teal == expected))
+        )
+
+
+if __name__ == "__main__":
+    main()
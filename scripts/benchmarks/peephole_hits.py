@@ -0,0 +1,65 @@
+"""Report how often each peephole rule applies to the example programs.
+
+For each program, this flattens it without peephole optimization, applies the rules in
+PEEPHOLE_RULES, and prints the number of ops before and after along with the time the rules took.
+The number of times each rule was applied is then printed for each program and in total.
+
+Usage:
+    python -m scripts.benchmarks.peephole_hits
+"""
+
+import time
+from typing import Dict, Tuple
+
+import pyteal as pt
+
+from pyteal.compiler.compiler import compileComponents
+from pyteal.compiler.optimizer import PEEPHOLE_RULES, apply_peephole_optimizations
+
+from examples.application import asset, security_token, vote
+from examples.signature.dutch_auction import dutch_auction
+from examples.signature.factorizer_game import logicsig
+from examples.signature.periodic_payment import periodic_payment
+from examples.signature.recurring_swap import recurring_swap
+from examples.signature.split import split
+from scripts.benchmarks.cond_scaling import build_router
+
+
+def main() -> None:
+    programs: Dict[str, Tuple[pt.Expr, pt.Mode, int]] = {
+        "asset": (asset.approval_program(), pt.Mode.Application, 6),
+        "vote": (vote.approval_program(), pt.Mode.Application, 6),
+        "security_token": (security_token.approval_program(), pt.Mode.Application, 6),
+        "dutch_auction": (dutch_auction(), pt.Mode.Signature, 6),
+        "periodic_payment": (periodic_payment(), pt.Mode.Signature, 6),
+        "recurring_swap": (recurring_swap(), pt.Mode.Signature, 6),
+        "split": (split(), pt.Mode.Signature, 6),
+        "factorizer_game": (logicsig(1, 5, 7), pt.Mode.Signature, 6),
+        "cond_2000": (build_router(2000), pt.Mode.Application, 6),
+    }
+
+    totals: Dict[str, int] = {rule.name: 0 for rule in PEEPHOLE_RULES}
+    print("{:<18} {:>8} {:>8} {:>10}".format("program", "ops", "after", "ms"))
+    for name, (program, mode, version) in programs.items():
+        options = pt.CompileOptions(mode=mode, version=version)
+        teal = compileComponents(program, options, False, None, 0)
+
+        began = time.perf_counter()
+        optimized, hits = apply_peephole_optimizations(teal, version, mode)
+        elapsed = time.perf_counter() - began
+
+        ops = sum(1 for stmt in teal if isinstance(stmt, pt.TealOp))
+        after = sum(1 for stmt in optimized if isinstance(stmt, pt.TealOp))
+        print("{:<18} {:>8} {:>8} {:>10.2f}".format(name, ops, after, elapsed * 1e3))
+        for rule, count in sorted(hits.items()):
+            print("    {:<24} {:>6}".format(rule, count))
+            totals[rule] += count
+
+    print()
+    print("{:<28} {:>6}".format("rule", "hits"))
+    for rule, count in totals.items():
+        print("{:<28} {:>6}".format(rule, count))
+
+
+if __name__ == "__main__":
+    main()
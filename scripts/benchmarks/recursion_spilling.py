@@ -0,0 +1,105 @@
+"""Report the cost of spilling local slots around recursive calls.
+
+For each recursive program, this compiles it with and without OptimizeOptions(scratch_slots=True),
+which only spills the local slots that are live after each recursive call, and prints the number of
+ops and the static opcode cost of the program, along with the number of ops which save and restore
+slots around the first recursive call.
+
+Usage:
+    python -m scripts.benchmarks.recursion_spilling
+"""
+
+from typing import Callable, List, Tuple
+
+import pyteal as pt
+
+from scripts.benchmarks.cse_savings import static_cost
+
+SPILL_OPS = {"load", "store", "cover", "uncover", "dig", "swap", "pop"}
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def fibonacci(n: pt.Expr) -> pt.Expr:
+    return (
+        pt.If(n <= pt.Int(1))
+        .Then(n)
+        .Else(fibonacci(n - pt.Int(2)) + fibonacci(n - pt.Int(1)))
+    )
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def factorial(n: pt.Expr) -> pt.Expr:
+    return pt.If(n <= pt.Int(1)).Then(pt.Int(1)).Else(n * factorial(n - pt.Int(1)))
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def tree_sum(node: pt.Expr, depth: pt.Expr) -> pt.Expr:
+    """Sum the values of a complete binary tree, numbered like a heap, using several locals."""
+    left = pt.ScratchVar(pt.TealType.uint64)
+    right = pt.ScratchVar(pt.TealType.uint64)
+    weight = pt.ScratchVar(pt.TealType.uint64)
+    total = pt.ScratchVar(pt.TealType.uint64)
+    return pt.Seq(
+        left.store(node * pt.Int(2)),
+        right.store(left.load() + pt.Int(1)),
+        weight.store(node % pt.Int(7)),
+        pt.If(depth == pt.Int(0)).Then(pt.Return(weight.load())),
+        total.store(tree_sum(left.load(), depth - pt.Int(1))),
+        total.store(total.load() + tree_sum(right.load(), depth - pt.Int(1))),
+        total.load() + weight.load(),
+    )
+
+
+def spill_ops(teal: str, call: str) -> int:
+    """Count the ops used to save and restore slots around the first recursive call."""
+    lines = teal.splitlines()
+    index = lines.index("callsub {}".format(call), lines.index(call + ":"))
+    count = 0
+    for line in reversed(lines[:index]):
+        if line.split(" ", 1)[0] not in SPILL_OPS or line.startswith("store"):
+            break
+        count += 1
+    for line in lines[index + 1 :]:
+        if line.split(" ", 1)[0] not in SPILL_OPS or line.startswith("load"):
+            break
+        count += 1
+    return count
+
+
+def main() -> None:
+    # the name of each program, the label of its recursive subroutine, and the program
+    programs: List[Tuple[str, str, Callable[[], pt.Expr]]] = [
+        ("fibonacci", "fibonacci_0", lambda: fibonacci(pt.Int(20))),
+        ("factorial", "factorial_0", lambda: factorial(pt.Int(20))),
+        ("tree_sum", "treesum_0", lambda: tree_sum(pt.Int(1), pt.Int(10))),
+    ]
+
+    print(
+        "{:<12} {:>8} {:>14} {:>14} {:>14}".format(
+            "program", "version", "ops", "cost", "spill ops"
+        )
+    )
+    for name, label, build in programs:
+        for version in (4, 6):
+            results: List[Tuple[int, int, int]] = []
+            for optimize in (False, True):
+                teal = pt.compileTeal(
+                    pt.Return(build()),
+                    mode=pt.Mode.Application,
+                    version=version,
+                    optimize=pt.OptimizeOptions(scratch_slots=optimize),
+                )
+                count, cost = static_cost(teal)
+                results.append((count, cost, spill_ops(teal, label)))
+
+            print(
+                "{:<12} {:>8} {:>14} {:>14} {:>14}".format(
+                    name,
+                    version,
+                    *("{} -> {}".format(*values) for values in zip(*results))
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
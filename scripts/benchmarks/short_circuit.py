@@ -0,0 +1,110 @@
+"""Report the effect of short-circuit evaluation of And and Or on the example programs.
+
+For each program, this compiles it with and without OptimizeOptions(short_circuit=True), and prints
+the opcode cost of its most expensive path, and its mean cost when each conditional branch is taken
+with equal probability. A subroutine call adds the cost of running the subroutine.
+
+Usage:
+    python -m scripts.benchmarks.short_circuit
+"""
+
+from typing import Dict, List, Set, Tuple
+
+import pyteal as pt
+
+from examples.application import asset, security_token, vote
+from examples.signature.dutch_auction import dutch_auction
+from examples.signature.factorizer_game import logicsig
+from examples.signature.periodic_payment import periodic_payment
+from examples.signature.recurring_swap import recurring_swap
+from examples.signature.split import split
+from scripts.benchmarks.cse_savings import OPS
+
+# ops after which execution does not continue at the next op
+EXITS = ("return", "err", "retsub")
+
+
+def path_costs(teal: str) -> Tuple[int, float]:
+    """Get the worst-case and mean opcode cost of a program without loops."""
+    lines = [
+        line.split(" ", 1)
+        for line in teal.splitlines()
+        if line != "" and not line.startswith("#") and not line.startswith("//")
+    ]
+    labels = {line[0][:-1]: i for i, line in enumerate(lines) if line[0].endswith(":")}
+    memo: Dict[int, Tuple[int, float]] = dict()
+    visiting: Set[int] = set()
+
+    def cost(pc: int) -> Tuple[int, float]:
+        """Get the worst-case and mean cost of running the program from pc until it exits."""
+        if pc in memo:
+            return memo[pc]
+        if pc in visiting:
+            raise ValueError("The program contains a loop")
+        visiting.add(pc)
+
+        token = lines[pc][0]
+        if token.endswith(":"):
+            result = cost(pc + 1)
+        else:
+            worst = OPS[token].cost
+            mean = float(worst)
+            if token == "callsub":
+                call_worst, call_mean = cost(labels[lines[pc][1]])
+                worst += call_worst
+                mean += call_mean
+
+            successors: List[Tuple[int, float]] = []
+            if token in ("b", "bz", "bnz"):
+                successors.append(cost(labels[lines[pc][1]]))
+            if token not in EXITS and token != "b":
+                successors.append(cost(pc + 1))
+            if len(successors) != 0:
+                worst += max(successor[0] for successor in successors)
+                mean += sum(successor[1] for successor in successors) / len(successors)
+            result = (worst, mean)
+
+        visiting.remove(pc)
+        memo[pc] = result
+        return result
+
+    return cost(0)
+
+
+def main() -> None:
+    programs: Dict[str, Tuple[pt.Expr, pt.Mode]] = {
+        "asset": (asset.approval_program(), pt.Mode.Application),
+        "vote": (vote.approval_program(), pt.Mode.Application),
+        "security_token": (security_token.approval_program(), pt.Mode.Application),
+        "dutch_auction": (dutch_auction(), pt.Mode.Signature),
+        "periodic_payment": (periodic_payment(), pt.Mode.Signature),
+        "recurring_swap": (recurring_swap(), pt.Mode.Signature),
+        "split": (split(), pt.Mode.Signature),
+        "factorizer_game": (logicsig(1, 5, 7), pt.Mode.Signature),
+    }
+
+    print(
+        "{:<18} {:>8} {:>8} {:>10} {:>10}".format(
+            "program", "worst", "after", "mean", "after"
+        )
+    )
+    for name, (program, mode) in programs.items():
+        results = []
+        for short_circuit in (False, True):
+            teal = pt.compileTeal(
+                program,
+                mode=mode,
+                version=6,
+                optimize=pt.OptimizeOptions(short_circuit=short_circuit),
+            )
+            results.append(path_costs(teal))
+        (worst, mean), (worst_after, mean_after) = results
+        print(
+            "{:<18} {:>8} {:>8} {:>10.1f} {:>10.1f}".format(
+                name, worst, worst_after, mean, mean_after
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
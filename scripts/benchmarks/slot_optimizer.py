@@ -0,0 +1,52 @@
+"""Measure how the scratch slot optimizer scales with the size of a program.
+
+For each size, this builds a program in which values are stored and immediately loaded again, in
+sequence and in branches, and prints the time of the optimizeScratchSlots pass along with the
+number of stores left in the output.
+
+Usage:
+    python -m scripts.benchmarks.slot_optimizer [--sizes N ...]
+"""
+
+import argparse
+
+import pyteal as pt
+
+
+def build_program(statements: int) -> pt.Expr:
+    """A program with the given number of statements which store a value and load it back."""
+    slots = [pt.ScratchVar(pt.TealType.uint64) for _ in range(100)]
+    body = []
+    for i in range(statements):
+        var = slots[i % len(slots)]
+        stored = pt.Seq(var.store(pt.Txn.fee() + pt.Int(i)), pt.Pop(var.load()))
+        if i % 10 == 0:
+            stored = pt.If(pt.Txn.amount() > pt.Int(i)).Then(stored)
+        body.append(stored)
+    return pt.Seq(*body, pt.Int(1))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000]
+    )
+    args = parser.parse_args()
+
+    print("{:>10} {:>10} {:>10}".format("statements", "ms", "stores"))
+    for size in args.sizes:
+        stats = pt.CompileStats()
+        teal = pt.compileTeal(
+            build_program(size),
+            mode=pt.Mode.Application,
+            version=6,
+            optimize=pt.OptimizeOptions(scratch_slots=True),
+            stats=stats,
+        )
+        elapsed = stats.passTotals()["optimizeScratchSlots"].time
+        stores = sum(1 for line in teal.splitlines() if line.startswith("store"))
+        print("{:>10} {:>10.1f} {:>10}".format(size, elapsed * 1e3, stores))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Report the cost of passing subroutine arguments through scratch slots.
+
+For each program, this compiles it with and without OptimizeOptions(stack_arguments=True), which
+keeps subroutine arguments on the stack instead of storing them in scratch slots, and prints the
+number of ops, the static opcode cost, and the number of load and store ops of the program.
+
+Usage:
+    python -m scripts.benchmarks.stack_arguments
+"""
+
+from typing import Callable, List, Tuple
+
+import pyteal as pt
+
+from scripts.benchmarks.cse_savings import static_cost
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def mix(a: pt.Expr, b: pt.Expr, c: pt.Expr) -> pt.Expr:
+    return a * pt.Int(3) + b - c
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def distance(a: pt.Expr, b: pt.Expr) -> pt.Expr:
+    return pt.If(a > b).Then(a - b).Else(b - a)
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def fibonacci(n: pt.Expr) -> pt.Expr:
+    return (
+        pt.If(n <= pt.Int(1))
+        .Then(n)
+        .Else(fibonacci(n - pt.Int(2)) + fibonacci(n - pt.Int(1)))
+    )
+
+
+@pt.Subroutine(pt.TealType.uint64)
+def ackermann(m: pt.Expr, n: pt.Expr) -> pt.Expr:
+    return (
+        pt.If(m == pt.Int(0))
+        .Then(n + pt.Int(1))
+        .ElseIf(n == pt.Int(0))
+        .Then(ackermann(m - pt.Int(1), pt.Int(1)))
+        .Else(ackermann(m - pt.Int(1), ackermann(m, n - pt.Int(1))))
+    )
+
+
+def slot_ops(teal: str) -> int:
+    """Count the load and store ops of a program."""
+    return sum(
+        1 for line in teal.splitlines() if line.split(" ", 1)[0] in ("load", "store")
+    )
+
+
+def main() -> None:
+    programs: List[Tuple[str, Callable[[], pt.Expr]]] = [
+        ("mix", lambda: mix(pt.Int(1), pt.Int(2), pt.Int(3))),
+        ("distance", lambda: distance(pt.Int(7), pt.Int(3))),
+        ("fibonacci", lambda: fibonacci(pt.Int(20))),
+        ("ackermann", lambda: ackermann(pt.Int(2), pt.Int(3))),
+    ]
+
+    print("{:<12} {:>14} {:>14} {:>14}".format("program", "ops", "cost", "slot ops"))
+    for name, build in programs:
+        results: List[Tuple[int, int, int]] = []
+        for optimize in (False, True):
+            teal = pt.compileTeal(
+                pt.Return(build()),
+                mode=pt.Mode.Application,
+                version=6,
+                optimize=pt.OptimizeOptions(stack_arguments=optimize),
+            )
+            count, cost = static_cost(teal)
+            results.append((count, cost, slot_ops(teal)))
+
+        print(
+            "{:<12} {:>14} {:>14} {:>14}".format(
+                name, *("{} -> {}".format(*values) for values in zip(*results))
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
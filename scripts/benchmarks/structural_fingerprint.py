@@ -0,0 +1,52 @@
+"""Benchmark structural fingerprints of large expression trees.
+
+This builds a program with many statements, then measures fingerprinting it, fingerprinting it
+again from the memoized fingerprints, and fingerprinting a slightly larger program that contains it.
+
+Usage:
+    python -m scripts.benchmarks.structural_fingerprint [--statements N]
+"""
+
+import argparse
+import time
+
+import pyteal as pt
+
+
+def build_statements(count: int) -> list:
+    total = pt.ScratchVar(pt.TealType.uint64)
+    return [
+        total.store(total.load() + pt.Btoi(pt.Txn.application_args[i % 16]) * pt.Int(i))
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statements", type=int, default=50000)
+    args = parser.parse_args()
+
+    pt.setTraceMode(pt.TraceMode.Off)
+    statements = build_statements(args.statements)
+    program = pt.Seq(*statements, pt.Approve())
+
+    began = time.perf_counter()
+    pt.structuralFingerprint(program)
+    first = time.perf_counter() - began
+
+    began = time.perf_counter()
+    pt.structuralFingerprint(program)
+    memoized = time.perf_counter() - began
+
+    began = time.perf_counter()
+    pt.structuralFingerprint(pt.Seq(program, pt.Approve()))
+    extended = time.perf_counter() - began
+
+    print("statements:  {}".format(args.statements))
+    print("first:       {:>10.3f} s".format(first))
+    print("memoized:    {:>10.1f} us".format(memoized * 1e6))
+    print("extended:    {:>10.1f} us".format(extended * 1e6))
+
+
+if __name__ == "__main__":
+    main()
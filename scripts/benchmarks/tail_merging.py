@@ -0,0 +1,125 @@
+"""Report the bytes saved by merging identical tails.
+
+For each program, this compiles it with and without OptimizeOptions(tail_merging=True), and prints
+the size of its bytecode, the number of bytes saved by the estimate of the pass, and the time the
+pass took. The example signatures are left out, since their template variables need values to be
+assembled. The synthetic programs end every branch with the same ops, as routers and logic
+signatures often do.
+
+Usage:
+    python -m scripts.benchmarks.tail_merging
+"""
+
+import time
+from copy import copy
+from typing import Dict, Tuple
+
+from algosdk import encoding
+
+import pyteal as pt
+
+from pyteal.compiler.optimizer import apply_tail_merging
+from pyteal.compiler.compiler import compileComponents
+
+from examples.application import asset, security_token, vote
+
+
+def record_call() -> pt.Expr:
+    """The ops which end every method of a router."""
+    return pt.Seq(
+        pt.App.globalPut(
+            pt.Bytes("calls"), pt.App.globalGet(pt.Bytes("calls")) + pt.Int(1)
+        ),
+        pt.App.globalPut(pt.Bytes("last_call"), pt.Global.latest_timestamp()),
+        pt.Approve(),
+    )
+
+
+def router(methods: int) -> pt.Expr:
+    """A router whose methods each set a value and then record the call."""
+    return pt.Cond(
+        *[
+            [
+                pt.Txn.application_args[0] == pt.Bytes("method{}".format(i)),
+                pt.Seq(
+                    pt.App.globalPut(pt.Bytes("value"), pt.Int(i)),
+                    record_call(),
+                ),
+            ]
+            for i in range(methods)
+        ]
+    )
+
+
+def safe_payment() -> pt.Expr:
+    """The checks which end every branch of a logic signature."""
+    return pt.Seq(
+        pt.Assert(pt.Txn.type_enum() == pt.TxnType.Payment),
+        pt.Assert(pt.Txn.close_remainder_to() == pt.Global.zero_address()),
+        pt.Assert(pt.Txn.rekey_to() == pt.Global.zero_address()),
+        pt.Assert(pt.Txn.fee() <= pt.Int(1000)),
+        pt.Approve(),
+    )
+
+
+def escrow(receivers: int) -> pt.Expr:
+    """A logic signature which pays a fixed amount to one of several receivers."""
+    return pt.Cond(
+        *[
+            [
+                pt.Txn.receiver() == pt.Addr(encoding.encode_address(bytes([i]) * 32)),
+                pt.Seq(pt.Assert(pt.Txn.amount() == pt.Int(i + 1)), safe_payment()),
+            ]
+            for i in range(receivers)
+        ]
+    )
+
+
+def merging_stats(
+    program: pt.Expr, mode: pt.Mode, optimize: pt.OptimizeOptions
+) -> Tuple[int, float]:
+    """Get the estimated bytes saved by merging the tails of a program, and the time it took."""
+    options = pt.CompileOptions(mode=mode, version=6, optimize=optimize)
+    teal = compileComponents(program, options, False, None, 0)
+    began = time.perf_counter()
+    _, saved = apply_tail_merging(teal, options.version)
+    return saved, time.perf_counter() - began
+
+
+def main() -> None:
+    programs: Dict[str, Tuple[pt.Expr, pt.Mode, pt.OptimizeOptions]] = {
+        "asset": (asset.approval_program(), pt.Mode.Application, pt.OptimizeOptions()),
+        "vote": (vote.approval_program(), pt.Mode.Application, pt.OptimizeOptions()),
+        "security_token": (
+            security_token.approval_program(),
+            pt.Mode.Application,
+            pt.OptimizeOptions(),
+        ),
+        "router_16": (router(16), pt.Mode.Application, pt.OptimizeOptions()),
+        "router_64": (router(64), pt.Mode.Application, pt.OptimizeOptions()),
+        "escrow_8": (escrow(8), pt.Mode.Signature, pt.OptimizeOptions()),
+        "escrow_32": (escrow(32), pt.Mode.Signature, pt.OptimizeOptions()),
+    }
+
+    print(
+        "{:<18} {:>8} {:>8} {:>8} {:>10} {:>8}".format(
+            "program", "bytes", "after", "saved", "estimated", "ms"
+        )
+    )
+    for name, (program, mode, optimize) in programs.items():
+        merged = copy(optimize)
+        merged.tail_merging = True
+        size = len(pt.compileBytecode(program, mode=mode, version=6, optimize=optimize))
+        mergedSize = len(
+            pt.compileBytecode(program, mode=mode, version=6, optimize=merged)
+        )
+        estimated, elapsed = merging_stats(program, mode, optimize)
+        print(
+            "{:<18} {:>8} {:>8} {:>8} {:>10} {:>8.2f}".format(
+                name, size, mergedSize, size - mergedSize, estimated, elapsed * 1e3
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
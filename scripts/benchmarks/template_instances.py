@@ -0,0 +1,91 @@
+"""Benchmark making instances of a template program.
+
+This compares compiling the periodic payment example with compileTeal and replacing its template
+variables as strings, with making TEAL and bytecode instances of a CompiledTemplate.
+
+Usage:
+    python -m scripts.benchmarks.template_instances [--count N]
+"""
+
+import argparse
+import time
+from typing import Dict, List, Union
+
+import pyteal as pt
+
+from examples.signature.periodic_payment import periodic_payment
+
+RECEIVER = "6ZHGHH5Z5CTPCF5WCESXMGRSVK7QJETR63M3NY5FJCUYDHO57VTCMJOBGY"
+
+
+def template_program() -> pt.Expr:
+    return periodic_payment(
+        tmpl_fee=pt.Tmpl.Int("TMPL_FEE"),
+        tmpl_period=pt.Tmpl.Int("TMPL_PERIOD"),
+        tmpl_dur=pt.Tmpl.Int("TMPL_DUR"),
+        tmpl_lease=pt.Tmpl.Bytes("TMPL_LEASE"),
+        tmpl_amt=pt.Tmpl.Int("TMPL_AMT"),
+        tmpl_rcv=pt.Tmpl.Addr("TMPL_RCV"),
+        tmpl_timeout=pt.Tmpl.Int("TMPL_TIMEOUT"),
+    )
+
+
+def value_sets(count: int) -> List[Dict[str, Union[int, bytes, str]]]:
+    return [
+        dict(
+            TMPL_FEE=1000,
+            TMPL_PERIOD=50,
+            TMPL_DUR=5000,
+            TMPL_LEASE=i.to_bytes(32, "big"),
+            TMPL_AMT=2000 + i,
+            TMPL_RCV=RECEIVER,
+            TMPL_TIMEOUT=30000,
+        )
+        for i in range(count)
+    ]
+
+
+def encode(value: Union[int, bytes, str]) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    return value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    values = value_sets(args.count)
+
+    began = time.perf_counter()
+    for instance in values[: max(1, args.count // 10)]:
+        teal = pt.compileTeal(template_program(), mode=pt.Mode.Signature, version=2)
+        for name, value in instance.items():
+            teal = teal.replace(name, encode(value))
+    replace_time = (time.perf_counter() - began) / max(1, args.count // 10)
+
+    began = time.perf_counter()
+    template = pt.compileTemplate(template_program(), mode=pt.Mode.Signature, version=2)
+    compile_time = time.perf_counter() - began
+
+    began = time.perf_counter()
+    template.tealBatch(values)
+    teal_time = (time.perf_counter() - began) / args.count
+
+    began = time.perf_counter()
+    template.bytecodeBatch(values)
+    bytecode_time = (time.perf_counter() - began) / args.count
+
+    print("compileTeal + replace: {:>10.1f} us per instance".format(replace_time * 1e6))
+    print("compileTemplate:       {:>10.1f} us once".format(compile_time * 1e6))
+    print("template TEAL:         {:>10.1f} us per instance".format(teal_time * 1e6))
+    print(
+        "template bytecode:     {:>10.1f} us per instance".format(bytecode_time * 1e6)
+    )
+
+
+if __name__ == "__main__":
+    main()
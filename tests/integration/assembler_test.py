@@ -0,0 +1,47 @@
+import base64
+
+import pytest
+
+from pyteal import Mode, compileBytecode, compileTeal, programAddress
+
+from tests.blackbox import algod_with_assertion
+
+from examples.application.asset import approval_program as asset_approval
+from examples.application.security_token import (
+    approval_program as security_token_approval,
+)
+from examples.application.vote import (
+    approval_program as vote_approval,
+    clear_state_program as vote_clear_state,
+)
+from examples.signature.atomic_swap import htlc
+from examples.signature.periodic_payment import periodic_payment
+from examples.signature.split import split
+
+PROGRAMS = [
+    (periodic_payment, Mode.Signature, 2),
+    (htlc, Mode.Signature, 2),
+    (split, Mode.Signature, 2),
+    (vote_clear_state, Mode.Application, 2),
+    (vote_approval, Mode.Application, 4),
+    (asset_approval, Mode.Application, 5),
+    (security_token_approval, Mode.Application, 6),
+]
+
+
+@pytest.mark.parametrize("program, mode, version", PROGRAMS)
+@pytest.mark.parametrize("assemble_constants", [False, True])
+def test_matches_algod(program, mode, version, assemble_constants):
+    if assemble_constants and version < 3:
+        version = 3
+
+    teal = compileTeal(
+        program(), mode, version=version, assembleConstants=assemble_constants
+    )
+    response = algod_with_assertion().compile(teal)
+
+    bytecode = compileBytecode(
+        program(), mode, version=version, assembleConstants=assemble_constants
+    )
+    assert bytecode == base64.b64decode(response["result"])
+    assert programAddress(bytecode) == response["hash"]
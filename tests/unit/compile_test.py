@@ -146,3 +146,26 @@ def test_many_ifs():
     )
 
     pt.compileTeal(s, mode=pt.Mode.Signature, version=2)
+
+
+@pytest.mark.timeout(15)
+def test_many_cond_branches():
+    """
+    Test a pt.Cond with many branches, which previously took quadratic time to compile and exceeded
+    the recursion limit.
+    """
+
+    numBranches = 5000
+    program = pt.Cond(
+        *[
+            [
+                pt.Txn.application_args[0] == pt.Bytes("method{}".format(i)),
+                pt.Return(pt.Int(i)),
+            ]
+            for i in range(numBranches)
+        ]
+    )
+
+    teal = pt.compileTeal(program, mode=pt.Mode.Application, version=6)
+    assert teal.count("\nerr\n") + teal.endswith("\nerr") == 1
+    assert teal.count("return") == numBranches